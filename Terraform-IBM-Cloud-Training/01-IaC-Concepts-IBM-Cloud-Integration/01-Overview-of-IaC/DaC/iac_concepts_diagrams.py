@@ -10,9 +10,14 @@ from matplotlib.patches import FancyBboxPatch, ConnectionPatch
 import numpy as np
 import os
 
-# Set up the output directory
-output_dir = "generated_diagrams"
-os.makedirs(output_dir, exist_ok=True)
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = "generated_diagrams"
+
+# Matplotlib style applied while each figure is built and saved
+STYLE = 'default'
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight'}
 
 def create_traditional_vs_iac_comparison():
     """Create a comparison diagram between traditional and IaC approaches"""
@@ -81,8 +86,7 @@ def create_traditional_vs_iac_comparison():
                  head_width=0.2, head_length=0.1, fc='green', ec='green')
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/traditional_vs_iac_comparison.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def create_iac_principles_diagram():
     """Create a diagram showing the core principles of IaC"""
@@ -123,8 +127,7 @@ def create_iac_principles_diagram():
                 'k--', linewidth=2, alpha=0.6)
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/iac_principles.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def create_iac_workflow_diagram():
     """Create a diagram showing the typical IaC workflow"""
@@ -182,8 +185,7 @@ def create_iac_workflow_diagram():
                        arrowprops=dict(arrowstyle='->', lw=2, color='blue'))
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/iac_workflow.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def create_iac_tools_landscape():
     """Create a diagram showing the IaC tools landscape"""
@@ -250,8 +252,7 @@ def create_iac_tools_landscape():
                 ha='center', va='center', fontsize=10)
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/iac_tools_landscape.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def create_iac_benefits_diagram():
     """Create a diagram showing the benefits of IaC implementation"""
@@ -298,31 +299,32 @@ def create_iac_benefits_diagram():
                 'gray', linewidth=1, alpha=0.6, linestyle='--')
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/iac_benefits.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
+
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    'traditional_vs_iac_comparison.png': create_traditional_vs_iac_comparison,
+    'iac_principles.png': create_iac_principles_diagram,
+    'iac_workflow.png': create_iac_workflow_diagram,
+    'iac_tools_landscape.png': create_iac_tools_landscape,
+    'iac_benefits.png': create_iac_benefits_diagram,
+}
 
 def generate_all_diagrams():
     """Generate all IaC concept diagrams"""
     print("Generating Infrastructure as Code concept diagrams...")
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     
-    create_traditional_vs_iac_comparison()
-    print("✓ Traditional vs IaC comparison diagram created")
-    
-    create_iac_principles_diagram()
-    print("✓ IaC principles diagram created")
-    
-    create_iac_workflow_diagram()
-    print("✓ IaC workflow diagram created")
-    
-    create_iac_tools_landscape()
-    print("✓ IaC tools landscape diagram created")
-    
-    create_iac_benefits_diagram()
-    print("✓ IaC benefits diagram created")
+    with plt.style.context(STYLE):
+        for filename, builder in FIGURES.items():
+            fig = builder()
+            fig.savefig(os.path.join(OUTPUT_DIR, filename), **SAVEFIG_OPTIONS)
+            plt.close(fig)
+            print(f"✓ {filename} created")
     
-    print(f"\nAll diagrams have been generated and saved to '{output_dir}/' directory")
+    print(f"\nAll diagrams have been generated and saved to '{OUTPUT_DIR}/' directory")
     print("\nGenerated files:")
-    for file in os.listdir(output_dir):
+    for file in os.listdir(OUTPUT_DIR):
         if file.endswith('.png'):
             print(f"  - {file}")
 
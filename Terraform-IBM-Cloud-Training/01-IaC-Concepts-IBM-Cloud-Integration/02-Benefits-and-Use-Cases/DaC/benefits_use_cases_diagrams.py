@@ -10,9 +10,14 @@ from matplotlib.patches import FancyBboxPatch, Circle, Rectangle
 import numpy as np
 import os
 
-# Set up the output directory
-output_dir = "generated_diagrams"
-os.makedirs(output_dir, exist_ok=True)
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = "generated_diagrams"
+
+# Matplotlib style applied while each figure is built and saved
+STYLE = 'default'
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight'}
 
 def create_roi_comparison_chart():
     """Create ROI comparison between traditional and IaC approaches"""
@@ -46,8 +51,7 @@ def create_roi_comparison_chart():
              bbox=dict(boxstyle="round,pad=0.3", facecolor='lightblue'))
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/roi_comparison.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def create_ibm_cloud_benefits_diagram():
     """Create a comprehensive benefits diagram for IBM Cloud IaC"""
@@ -141,8 +145,7 @@ def create_ibm_cloud_benefits_diagram():
                 'gray', linewidth=2, alpha=0.4, linestyle='--')
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/ibm_cloud_benefits.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def create_use_case_timeline():
     """Create a timeline showing IaC implementation phases"""
@@ -228,8 +231,7 @@ def create_use_case_timeline():
             bbox=dict(boxstyle="round,pad=0.3", facecolor='lightyellow'))
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/use_case_timeline.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def create_cost_optimization_diagram():
     """Create a diagram showing cost optimization strategies"""
@@ -311,8 +313,7 @@ def create_cost_optimization_diagram():
             ha='center', va='center', fontsize=14, fontweight='bold')
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/cost_optimization.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def create_industry_use_cases():
     """Create industry-specific use case diagram"""
@@ -403,31 +404,32 @@ def create_industry_use_cases():
                 'gray', linewidth=1, alpha=0.5, linestyle='--', zorder=0)
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/industry_use_cases.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
+
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    'roi_comparison.png': create_roi_comparison_chart,
+    'ibm_cloud_benefits.png': create_ibm_cloud_benefits_diagram,
+    'use_case_timeline.png': create_use_case_timeline,
+    'cost_optimization.png': create_cost_optimization_diagram,
+    'industry_use_cases.png': create_industry_use_cases,
+}
 
 def generate_all_diagrams():
     """Generate all benefits and use cases diagrams"""
     print("Generating IaC Benefits and Use Cases diagrams...")
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     
-    create_roi_comparison_chart()
-    print("✓ ROI comparison chart created")
-    
-    create_ibm_cloud_benefits_diagram()
-    print("✓ IBM Cloud benefits diagram created")
-    
-    create_use_case_timeline()
-    print("✓ Use case timeline created")
-    
-    create_cost_optimization_diagram()
-    print("✓ Cost optimization diagram created")
-    
-    create_industry_use_cases()
-    print("✓ Industry use cases diagram created")
+    with plt.style.context(STYLE):
+        for filename, builder in FIGURES.items():
+            fig = builder()
+            fig.savefig(os.path.join(OUTPUT_DIR, filename), **SAVEFIG_OPTIONS)
+            plt.close(fig)
+            print(f"✓ {filename} created")
     
-    print(f"\nAll diagrams have been generated and saved to '{output_dir}/' directory")
+    print(f"\nAll diagrams have been generated and saved to '{OUTPUT_DIR}/' directory")
     print("\nGenerated files:")
-    for file in sorted(os.listdir(output_dir)):
+    for file in sorted(os.listdir(OUTPUT_DIR)):
         if file.endswith('.png'):
             print(f"  - {file}")
 
@@ -6,16 +6,22 @@ This script generates visual diagrams to illustrate Terraform CLI installation c
 
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, Rectangle, Circle, ConnectionPatch
+from matplotlib import cycler
+from matplotlib.patches import FancyBboxPatch, Circle, ConnectionPatch
 import numpy as np
 import pandas as pd
 import seaborn as sns
 from PIL import Image, ImageDraw, ImageFont
 import os
+import sys
 
-# Set professional styling
-plt.style.use('seaborn-v0_8-whitegrid')
-sns.set_palette("husl")
+# Shared DaC primitives live in Terraform-IBM-Cloud-Training/dac_toolkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from dac_toolkit.gradient import create_gradient_box
+from dac_toolkit.primitives import ANNOTATION, ArrowKit
+
+# Professional styling, applied while each figure is built and saved
+STYLE = ['seaborn-v0_8-whitegrid', {'axes.prop_cycle': cycler(color=sns.color_palette("husl"))}]
 
 # Professional color scheme
 COLORS = {
@@ -42,9 +48,11 @@ FONT_SIZES = {
     'small': 7
 }
 
-# Set up the output directory
-output_dir = "generated_diagrams"
-os.makedirs(output_dir, exist_ok=True)
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = "generated_diagrams"
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight', 'facecolor': 'white', 'edgecolor': 'none'}
 
 def create_professional_figure(figsize=(16, 10), title="", subtitle=""):
     """Create a professionally styled figure with consistent formatting"""
@@ -67,25 +75,6 @@ def create_professional_figure(figsize=(16, 10), title="", subtitle=""):
 
     return fig, ax
 
-def create_gradient_box(ax, pos, size, start_color, end_color, alpha=0.8):
-    """Create a gradient-filled box for professional appearance"""
-    x, y = pos
-    width, height = size
-
-    # Create gradient effect using multiple rectangles
-    n_steps = 20
-    for i in range(n_steps):
-        # Interpolate between colors
-        ratio = i / (n_steps - 1)
-        r = int(int(start_color[1:3], 16) * (1 - ratio) + int(end_color[1:3], 16) * ratio)
-        g = int(int(start_color[3:5], 16) * (1 - ratio) + int(end_color[3:5], 16) * ratio)
-        b = int(int(start_color[5:7], 16) * (1 - ratio) + int(end_color[5:7], 16) * ratio)
-        color = f'#{r:02x}{g:02x}{b:02x}'
-
-        rect = Rectangle((x, y + i * height / n_steps), width, height / n_steps,
-                        facecolor=color, alpha=alpha, edgecolor='none')
-        ax.add_patch(rect)
-
 def add_professional_legend(ax, items, position='upper right'):
     """Add a professionally styled legend"""
     legend_elements = []
@@ -100,13 +89,14 @@ def add_professional_legend(ax, items, position='upper right'):
     legend.get_frame().set_facecolor('white')
     legend.get_frame().set_alpha(0.9)
 
+# Shared box and arrow styles, built once (see dac_toolkit/primitives.py)
+ARROW_KIT = ArrowKit(color=COLORS['primary'], linewidth=2, alpha=0.8,
+                     connectionstyle='arc3,rad=0.1', kind=ANNOTATION)
+
 def create_professional_arrow(ax, start, end, style='->', color=COLORS['primary'],
                             linewidth=2, alpha=0.8):
     """Create a professional arrow with consistent styling"""
-    ax.annotate('', xy=end, xytext=start,
-                arrowprops=dict(arrowstyle=style, lw=linewidth,
-                              color=color, alpha=alpha,
-                              connectionstyle="arc3,rad=0.1"))
+    ARROW_KIT.draw(ax, start, end, color, style, linewidth, alpha)
 
 def add_watermark(ax, text="IBM Cloud Terraform Training"):
     """Add a subtle watermark to the diagram"""
@@ -250,9 +240,7 @@ def create_installation_methods_diagram():
     add_watermark(ax)
 
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/installation_methods.png', dpi=300, bbox_inches='tight',
-                facecolor='white', edgecolor='none')
-    plt.close()
+    return fig
 
 def create_terraform_architecture_diagram():
     """Create a diagram showing Terraform CLI architecture and components"""
@@ -334,8 +322,7 @@ def create_terraform_architecture_diagram():
                 arrowprops=dict(arrowstyle='->', lw=2, color='red'))
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/terraform_architecture.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def create_installation_workflow_diagram():
     """Create a step-by-step installation workflow diagram"""
@@ -392,8 +379,7 @@ def create_installation_workflow_diagram():
             bbox=dict(boxstyle="round,pad=0.3", facecolor='lightyellow'))
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/installation_workflow.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def create_version_management_diagram():
     """Create a diagram showing Terraform version management strategies"""
@@ -488,8 +474,7 @@ def create_version_management_diagram():
             fontsize=10, fontweight='bold')
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/version_management.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def create_troubleshooting_flowchart():
     """Create a troubleshooting flowchart for common installation issues"""
@@ -603,31 +588,32 @@ def create_troubleshooting_flowchart():
     ax.text(10, 5.2, 'No', ha='center', va='center', fontsize=8, color='red', fontweight='bold')
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/troubleshooting_flowchart.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
+
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    'installation_methods.png': create_installation_methods_diagram,
+    'terraform_architecture.png': create_terraform_architecture_diagram,
+    'installation_workflow.png': create_installation_workflow_diagram,
+    'version_management.png': create_version_management_diagram,
+    'troubleshooting_flowchart.png': create_troubleshooting_flowchart,
+}
 
 def generate_all_diagrams():
     """Generate all Terraform CLI installation diagrams"""
     print("Generating Terraform CLI Installation diagrams...")
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     
-    create_installation_methods_diagram()
-    print("✓ Installation methods diagram created")
-    
-    create_terraform_architecture_diagram()
-    print("✓ Terraform architecture diagram created")
-    
-    create_installation_workflow_diagram()
-    print("✓ Installation workflow diagram created")
-    
-    create_version_management_diagram()
-    print("✓ Version management diagram created")
-    
-    create_troubleshooting_flowchart()
-    print("✓ Troubleshooting flowchart created")
+    with plt.style.context(STYLE):
+        for filename, builder in FIGURES.items():
+            fig = builder()
+            fig.savefig(os.path.join(OUTPUT_DIR, filename), **SAVEFIG_OPTIONS)
+            plt.close(fig)
+            print(f"✓ {filename} created")
     
-    print(f"\nAll diagrams have been generated and saved to '{output_dir}/' directory")
+    print(f"\nAll diagrams have been generated and saved to '{OUTPUT_DIR}/' directory")
     print("\nGenerated files:")
-    for file in sorted(os.listdir(output_dir)):
+    for file in sorted(os.listdir(OUTPUT_DIR)):
         if file.endswith('.png'):
             print(f"  - {file}")
 
@@ -19,16 +19,22 @@ Version: 2.2.0
 
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, Rectangle, Circle, ConnectionPatch, Polygon
+from matplotlib import cycler
+from matplotlib.patches import FancyBboxPatch, Circle, ConnectionPatch, Polygon
 import numpy as np
 import pandas as pd
 import seaborn as sns
 from PIL import Image, ImageDraw, ImageFont
 import os
+import sys
 
-# Set professional styling
-plt.style.use('seaborn-v0_8-whitegrid')
-sns.set_palette("husl")
+# Shared DaC primitives live in Terraform-IBM-Cloud-Training/dac_toolkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from dac_toolkit.gradient import create_gradient_box
+from dac_toolkit.primitives import ANNOTATION, ArrowKit
+
+# Professional styling, applied while each figure is built and saved
+STYLE = ['seaborn-v0_8-whitegrid', {'axes.prop_cycle': cycler(color=sns.color_palette("husl"))}]
 
 # Professional color scheme
 COLORS = {
@@ -59,9 +65,11 @@ FONT_SIZES = {
     'small': 7
 }
 
-# Set up the output directory
-output_dir = "generated_diagrams"
-os.makedirs(output_dir, exist_ok=True)
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = "generated_diagrams"
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight', 'facecolor': 'white', 'edgecolor': 'none'}
 
 def create_professional_figure(figsize=(18, 12), title="", subtitle=""):
     """Create a professionally styled figure with consistent formatting"""
@@ -84,25 +92,6 @@ def create_professional_figure(figsize=(18, 12), title="", subtitle=""):
     
     return fig, ax
 
-def create_gradient_box(ax, pos, size, start_color, end_color, alpha=0.8):
-    """Create a gradient-filled box for professional appearance"""
-    x, y = pos
-    width, height = size
-    
-    # Create gradient effect using multiple rectangles
-    n_steps = 20
-    for i in range(n_steps):
-        # Interpolate between colors
-        ratio = i / (n_steps - 1)
-        r = int(int(start_color[1:3], 16) * (1 - ratio) + int(end_color[1:3], 16) * ratio)
-        g = int(int(start_color[3:5], 16) * (1 - ratio) + int(end_color[3:5], 16) * ratio)
-        b = int(int(start_color[5:7], 16) * (1 - ratio) + int(end_color[5:7], 16) * ratio)
-        color = f'#{r:02x}{g:02x}{b:02x}'
-        
-        rect = Rectangle((x, y + i * height / n_steps), width, height / n_steps,
-                        facecolor=color, alpha=alpha, edgecolor='none')
-        ax.add_patch(rect)
-
 def add_professional_legend(ax, items, position='upper right'):
     """Add a professionally styled legend"""
     legend_elements = []
@@ -117,13 +106,14 @@ def add_professional_legend(ax, items, position='upper right'):
     legend.get_frame().set_facecolor('white')
     legend.get_frame().set_alpha(0.9)
 
+# Shared box and arrow styles, built once (see dac_toolkit/primitives.py)
+ARROW_KIT = ArrowKit(color=COLORS['primary'], linewidth=2, alpha=0.8,
+                     connectionstyle='arc3,rad=0.1', kind=ANNOTATION)
+
 def create_professional_arrow(ax, start, end, style='->', color=COLORS['primary'], 
                             linewidth=2, alpha=0.8):
     """Create a professional arrow with consistent styling"""
-    ax.annotate('', xy=end, xytext=start,
-                arrowprops=dict(arrowstyle=style, lw=linewidth, 
-                              color=color, alpha=alpha,
-                              connectionstyle="arc3,rad=0.1"))
+    ARROW_KIT.draw(ax, start, end, color, style, linewidth, alpha)
 
 def add_watermark(ax, text="IBM Cloud Terraform Training"):
     """Add a subtle watermark to the diagram"""
@@ -273,9 +263,7 @@ def create_authentication_methods_diagram():
     add_watermark(ax)
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/authentication_methods.png', dpi=300, bbox_inches='tight', 
-                facecolor='white', edgecolor='none')
-    plt.close()
+    return fig
 
 def create_provider_architecture_diagram():
     """Create a diagram showing IBM Cloud provider architecture and configuration flow"""
@@ -409,9 +397,7 @@ def create_provider_architecture_diagram():
     add_watermark(ax)
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/provider_architecture.png', dpi=300, bbox_inches='tight', 
-                facecolor='white', edgecolor='none')
-    plt.close()
+    return fig
 
 def create_multi_region_strategy_diagram():
     """Create a diagram showing multi-region deployment strategy"""
@@ -552,9 +538,7 @@ def create_multi_region_strategy_diagram():
     add_watermark(ax)
 
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/multi_region_strategy.png', dpi=300, bbox_inches='tight',
-                facecolor='white', edgecolor='none')
-    plt.close()
+    return fig
 
 def create_enterprise_security_diagram():
     """Create a diagram showing enterprise security framework for IBM Cloud provider"""
@@ -631,9 +615,7 @@ def create_enterprise_security_diagram():
     add_watermark(ax)
 
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/enterprise_security.png', dpi=300, bbox_inches='tight',
-                facecolor='white', edgecolor='none')
-    plt.close()
+    return fig
 
 def create_performance_optimization_diagram():
     """Create a diagram showing performance optimization workflow"""
@@ -745,32 +727,36 @@ def create_performance_optimization_diagram():
     add_watermark(ax)
 
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/performance_optimization.png', dpi=300, bbox_inches='tight',
-                facecolor='white', edgecolor='none')
-    plt.close()
+    return fig
 
 # Main execution
-if __name__ == "__main__":
-    print("Generating IBM Cloud Provider Configuration diagrams...")
-
-    # Generate all diagrams
-    create_authentication_methods_diagram()
-    print("✓ Authentication methods diagram created")
-
-    create_provider_architecture_diagram()
-    print("✓ Provider architecture diagram created")
-
-    create_multi_region_strategy_diagram()
-    print("✓ Multi-region strategy diagram created")
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    'authentication_methods.png': create_authentication_methods_diagram,
+    'provider_architecture.png': create_provider_architecture_diagram,
+    'multi_region_strategy.png': create_multi_region_strategy_diagram,
+    'enterprise_security.png': create_enterprise_security_diagram,
+    'performance_optimization.png': create_performance_optimization_diagram,
+}
 
-    create_enterprise_security_diagram()
-    print("✓ Enterprise security diagram created")
+def generate_all_diagrams():
+    """Generate all IBM Cloud provider configuration diagrams"""
+    print("Generating IBM Cloud Provider Configuration diagrams...")
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    create_performance_optimization_diagram()
-    print("✓ Performance optimization diagram created")
+    with plt.style.context(STYLE):
+        for filename, builder in FIGURES.items():
+            fig = builder()
+            fig.savefig(os.path.join(OUTPUT_DIR, filename), **SAVEFIG_OPTIONS)
+            plt.close(fig)
+            print(f"✓ {filename} created")
 
-    print(f"\nAll diagrams have been generated and saved to '{output_dir}/' directory")
+    print(f"\nAll diagrams have been generated and saved to '{OUTPUT_DIR}/' directory")
     print("\nGenerated files:")
-    for file in sorted(os.listdir(output_dir)):
+    for file in sorted(os.listdir(OUTPUT_DIR)):
         if file.endswith('.png'):
             print(f"  - {file}")
+
+
+if __name__ == "__main__":
+    generate_all_diagrams()
@@ -16,14 +16,24 @@ Created: 2024-01-20
 
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib import cycler
 import numpy as np
 import seaborn as sns
-from matplotlib.patches import FancyBboxPatch, ConnectionPatch
 import os
+import sys
 
-# Set style and color palette
-plt.style.use('default')
-sns.set_palette("husl")
+# Shared DaC primitives live in Terraform-IBM-Cloud-Training/dac_toolkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from dac_toolkit.primitives import ArrowKit, BoxKit
+
+# Style and color palette, applied while each figure is built and saved
+STYLE = ['default', {'axes.prop_cycle': cycler(color=sns.color_palette("husl"))}]
+
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = 'generated_diagrams'
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight'}
 
 # IBM Brand Colors
 IBM_BLUE = '#1261FE'
@@ -53,23 +63,18 @@ def setup_figure(title, figsize=(16, 12)):
     
     return fig, ax
 
+# Shared box and arrow styles, built once (see dac_toolkit/primitives.py)
+BOX_KIT = BoxKit(boxstyle='round,pad=0.02', edgecolor=IBM_GRAY, linewidth=1.5, color=IBM_BLUE,
+                 text_color=IBM_WHITE, fontsize=10)
+ARROW_KIT = ArrowKit(color=IBM_GRAY, shrink=5, mutation_scale=20, linewidth=2)
+
 def create_rounded_box(ax, x, y, width, height, text, color=IBM_BLUE, text_color=IBM_WHITE, fontsize=10):
     """Create a rounded rectangle with text."""
-    box = FancyBboxPatch((x, y), width, height,
-                         boxstyle="round,pad=0.02",
-                         facecolor=color, edgecolor=IBM_GRAY, linewidth=1.5)
-    ax.add_patch(box)
-    
-    # Add text
-    ax.text(x + width/2, y + height/2, text, ha='center', va='center',
-            fontsize=fontsize, color=text_color, weight='bold', wrap=True)
+    BOX_KIT.draw(ax, x, y, width, height, text, color, text_color, fontsize)
 
 def create_arrow(ax, start, end, color=IBM_GRAY, style='->'):
     """Create an arrow between two points."""
-    arrow = ConnectionPatch(start, end, "data", "data",
-                           arrowstyle=style, shrinkA=5, shrinkB=5,
-                           mutation_scale=20, fc=color, ec=color, linewidth=2)
-    ax.add_patch(arrow)
+    ARROW_KIT.draw(ax, start, end, color, style)
 
 def diagram_1_project_organization():
     """Generate comprehensive project structure overview diagram."""
@@ -115,8 +120,7 @@ def diagram_1_project_organization():
     create_arrow(ax, (8.4, 5.5), (7.5, 4.8), IBM_GRAY)
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/project_organization.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_2_file_relationships():
     """Generate technical file interaction mapping diagram."""
@@ -159,8 +163,7 @@ def diagram_2_file_relationships():
                       IBM_LIGHT_GRAY, IBM_GRAY, 11)
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/file_relationships.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_3_enterprise_patterns():
     """Generate team collaboration and scaling patterns diagram."""
@@ -192,8 +195,7 @@ def diagram_3_enterprise_patterns():
                       IBM_GREEN, IBM_WHITE, 11)
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/enterprise_patterns.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_4_naming_conventions():
     """Generate standardized naming patterns and consistency guidelines diagram."""
@@ -226,8 +228,7 @@ def diagram_4_naming_conventions():
                       IBM_GREEN, IBM_WHITE, 11)
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/naming_conventions.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_5_lifecycle_management():
     """Generate project evolution and maintenance strategies diagram."""
@@ -272,31 +273,31 @@ def diagram_5_lifecycle_management():
     ax.text(4.75, 0.2, "Project Maturity Timeline", ha='center', fontsize=12, color=IBM_BLUE, weight='bold')
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/lifecycle_management.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
+
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    'project_organization.png': diagram_1_project_organization,
+    'file_relationships.png': diagram_2_file_relationships,
+    'enterprise_patterns.png': diagram_3_enterprise_patterns,
+    'naming_conventions.png': diagram_4_naming_conventions,
+    'lifecycle_management.png': diagram_5_lifecycle_management,
+}
 
 def main():
     """Generate all diagrams for directory structure and configuration files."""
     # Create output directory if it doesn't exist
-    os.makedirs('generated_diagrams', exist_ok=True)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     
     print("Generating Directory Structure and Configuration Files diagrams...")
     
     # Generate all diagrams
-    diagram_1_project_organization()
-    print("✅ Generated: project_organization.png")
-    
-    diagram_2_file_relationships()
-    print("✅ Generated: file_relationships.png")
-    
-    diagram_3_enterprise_patterns()
-    print("✅ Generated: enterprise_patterns.png")
-    
-    diagram_4_naming_conventions()
-    print("✅ Generated: naming_conventions.png")
-    
-    diagram_5_lifecycle_management()
-    print("✅ Generated: lifecycle_management.png")
+    with plt.style.context(STYLE):
+        for filename, builder in FIGURES.items():
+            fig = builder()
+            fig.savefig(os.path.join(OUTPUT_DIR, filename), **SAVEFIG_OPTIONS)
+            plt.close(fig)
+            print(f"✅ Generated: {filename}")
     
     print("\n🎉 All diagrams generated successfully!")
     print("📁 Output directory: generated_diagrams/")
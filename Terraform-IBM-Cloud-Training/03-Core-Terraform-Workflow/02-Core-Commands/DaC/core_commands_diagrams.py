@@ -16,14 +16,29 @@ Created: 2024-01-20
 
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib import cycler
 import numpy as np
 import seaborn as sns
-from matplotlib.patches import FancyBboxPatch, ConnectionPatch, Circle, Arrow
+from matplotlib.patches import FancyBboxPatch, Circle, Arrow
 import os
+import sys
 
-# Set style and color palette
-plt.style.use('default')
-sns.set_palette("husl")
+# Shared DaC primitives live in Terraform-IBM-Cloud-Training/dac_toolkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from dac_toolkit.spec import compile_spec, load_spec
+from dac_toolkit.primitives import ArrowKit, BoxKit
+
+# Style and color palette, applied while each figure is built and saved
+STYLE = ['default', {'axes.prop_cycle': cycler(color=sns.color_palette("husl"))}]
+
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = 'generated_diagrams'
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight'}
+
+# Declarative diagram specs (see dac_toolkit/spec.py)
+SPEC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'specs')
 
 # IBM Brand Colors
 IBM_BLUE = '#1261FE'
@@ -54,23 +69,18 @@ def setup_figure(title, figsize=(16, 12)):
     
     return fig, ax
 
+# Shared box and arrow styles, built once (see dac_toolkit/primitives.py)
+BOX_KIT = BoxKit(boxstyle='round,pad=0.02', edgecolor=IBM_GRAY, linewidth=1.5, color=IBM_BLUE,
+                 text_color=IBM_WHITE, fontsize=10)
+ARROW_KIT = ArrowKit(color=IBM_GRAY, shrink=5, mutation_scale=20, linewidth=2)
+
 def create_rounded_box(ax, x, y, width, height, text, color=IBM_BLUE, text_color=IBM_WHITE, fontsize=10):
     """Create a rounded rectangle with text."""
-    box = FancyBboxPatch((x, y), width, height,
-                         boxstyle="round,pad=0.02",
-                         facecolor=color, edgecolor=IBM_GRAY, linewidth=1.5)
-    ax.add_patch(box)
-    
-    # Add text
-    ax.text(x + width/2, y + height/2, text, ha='center', va='center',
-            fontsize=fontsize, color=text_color, weight='bold', wrap=True)
+    BOX_KIT.draw(ax, x, y, width, height, text, color, text_color, fontsize)
 
 def create_arrow(ax, start, end, color=IBM_GRAY, style='->'):
     """Create an arrow between two points."""
-    arrow = ConnectionPatch(start, end, "data", "data",
-                           arrowstyle=style, shrinkA=5, shrinkB=5,
-                           mutation_scale=20, fc=color, ec=color, linewidth=2)
-    ax.add_patch(arrow)
+    ARROW_KIT.draw(ax, start, end, color, style)
 
 def create_command_box(ax, x, y, width, height, command, description, color):
     """Create a command box with command name and description."""
@@ -87,52 +97,8 @@ def create_command_box(ax, x, y, width, height, command, description, color):
 
 def diagram_1_terraform_workflow():
     """Generate complete workflow lifecycle overview diagram."""
-    fig, ax = setup_figure("Terraform Workflow Lifecycle - Complete Command Sequence")
-    
-    # Workflow title
-    create_rounded_box(ax, 1, 8.5, 8, 1, 
-                      "Complete Terraform Workflow - From Initialization to Cleanup", 
-                      IBM_BLUE, IBM_WHITE, 14)
-    
-    # Command sequence
-    commands = [
-        ("terraform init", "Initialize\nProviders & Backend", IBM_GREEN, 0.5),
-        ("terraform validate", "Validate\nConfiguration", IBM_ORANGE, 2.5),
-        ("terraform plan", "Generate\nExecution Plan", IBM_PURPLE, 4.5),
-        ("terraform apply", "Deploy\nInfrastructure", IBM_BLUE, 6.5),
-        ("terraform destroy", "Cleanup\nResources", IBM_RED, 8.5)
-    ]
-    
-    y_pos = 6.5
-    for i, (cmd, desc, color, x_pos) in enumerate(commands):
-        create_command_box(ax, x_pos, y_pos, 1.8, 1.5, cmd, desc, color)
-        
-        # Add arrows between commands
-        if i < len(commands) - 1:
-            create_arrow(ax, (x_pos + 1.8, y_pos + 0.75), (commands[i+1][3], y_pos + 0.75), color)
-    
-    # Workflow phases
-    create_rounded_box(ax, 0.5, 4.5, 4.5, 1.5, 
-                      "Development Phase\n\n• Frequent init, validate, plan cycles\n• Iterative development and testing\n• Local state management", 
-                      IBM_LIGHT_BLUE, IBM_WHITE, 9)
-    
-    create_rounded_box(ax, 5.2, 4.5, 4.3, 1.5, 
-                      "Production Phase\n\n• Plan-based deployments\n• Change approval workflows\n• Remote state management", 
-                      IBM_DARK_BLUE, IBM_WHITE, 9)
-    
-    # Best practices
-    create_rounded_box(ax, 1, 2.5, 8, 1.5, 
-                      "Enterprise Best Practices\n\nAlways validate before planning • Save plans for approval • Use automation scripts\nImplement proper error handling • Monitor command execution • Maintain audit logs", 
-                      IBM_LIGHT_GRAY, IBM_GRAY, 10)
-    
-    # Success metrics
-    create_rounded_box(ax, 2, 0.5, 6, 1.5, 
-                      "Workflow Benefits\n\n85% fewer deployment errors • 70% faster provisioning • 90% better change management\n60% fewer rollbacks • 95% improved compliance", 
-                      IBM_GREEN, IBM_WHITE, 10)
-    
-    plt.tight_layout()
-    plt.savefig('generated_diagrams/terraform_workflow.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    # Boxes, arrows and labels are declared in specs/terraform_workflow.json
+    return compile_spec(load_spec(os.path.join(SPEC_DIR, 'terraform_workflow.json')))
 
 def diagram_2_init_process():
     """Generate detailed initialization process diagram."""
@@ -186,8 +152,7 @@ def diagram_2_init_process():
                       IBM_ORANGE, IBM_WHITE, 9)
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/init_process.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_3_plan_analysis():
     """Generate plan generation and analysis workflow diagram."""
@@ -243,8 +208,7 @@ def diagram_3_plan_analysis():
                       IBM_LIGHT_GRAY, IBM_GRAY, 10)
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/plan_analysis.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_4_apply_process():
     """Generate apply execution and state management diagram."""
@@ -300,8 +264,7 @@ def diagram_4_apply_process():
                       IBM_LIGHT_GRAY, IBM_GRAY, 10)
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/apply_process.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_5_destroy_process():
     """Generate destruction workflow and safety procedures diagram."""
@@ -361,31 +324,31 @@ def diagram_5_destroy_process():
                       IBM_LIGHT_GRAY, IBM_GRAY, 10)
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/destroy_process.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
+
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    'terraform_workflow.png': diagram_1_terraform_workflow,
+    'init_process.png': diagram_2_init_process,
+    'plan_analysis.png': diagram_3_plan_analysis,
+    'apply_process.png': diagram_4_apply_process,
+    'destroy_process.png': diagram_5_destroy_process,
+}
 
 def main():
     """Generate all diagrams for core Terraform commands."""
     # Create output directory if it doesn't exist
-    os.makedirs('generated_diagrams', exist_ok=True)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     
     print("Generating Core Terraform Commands diagrams...")
     
     # Generate all diagrams
-    diagram_1_terraform_workflow()
-    print("✅ Generated: terraform_workflow.png")
-    
-    diagram_2_init_process()
-    print("✅ Generated: init_process.png")
-    
-    diagram_3_plan_analysis()
-    print("✅ Generated: plan_analysis.png")
-    
-    diagram_4_apply_process()
-    print("✅ Generated: apply_process.png")
-    
-    diagram_5_destroy_process()
-    print("✅ Generated: destroy_process.png")
+    with plt.style.context(STYLE):
+        for filename, builder in FIGURES.items():
+            fig = builder()
+            fig.savefig(os.path.join(OUTPUT_DIR, filename), **SAVEFIG_OPTIONS)
+            plt.close(fig)
+            print(f"✅ Generated: {filename}")
     
     print("\n🎉 All diagrams generated successfully!")
     print("📁 Output directory: generated_diagrams/")
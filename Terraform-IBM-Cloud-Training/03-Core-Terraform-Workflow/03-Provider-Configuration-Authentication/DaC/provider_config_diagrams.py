@@ -16,14 +16,25 @@ Created: 2024-01-20
 
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib import cycler
 import numpy as np
 import seaborn as sns
-from matplotlib.patches import FancyBboxPatch, ConnectionPatch, Circle, Arrow, Rectangle
+from matplotlib.patches import Circle, Arrow, Rectangle
 import os
+import sys
 
-# Set style and color palette
-plt.style.use('default')
-sns.set_palette("husl")
+# Shared DaC primitives live in Terraform-IBM-Cloud-Training/dac_toolkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from dac_toolkit.primitives import ArrowKit, BoxKit
+
+# Style and color palette, applied while each figure is built and saved
+STYLE = ['default', {'axes.prop_cycle': cycler(color=sns.color_palette("husl"))}]
+
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = 'generated_diagrams'
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight'}
 
 # IBM Brand Colors
 IBM_BLUE = '#1261FE'
@@ -55,23 +66,18 @@ def setup_figure(title, figsize=(16, 12)):
     
     return fig, ax
 
+# Shared box and arrow styles, built once (see dac_toolkit/primitives.py)
+BOX_KIT = BoxKit(boxstyle='round,pad=0.02', edgecolor=IBM_GRAY, linewidth=1.5, color=IBM_BLUE,
+                 text_color=IBM_WHITE, fontsize=10)
+ARROW_KIT = ArrowKit(color=IBM_GRAY, shrink=5, mutation_scale=20, linewidth=2)
+
 def create_rounded_box(ax, x, y, width, height, text, color=IBM_BLUE, text_color=IBM_WHITE, fontsize=10):
     """Create a rounded rectangle with text."""
-    box = FancyBboxPatch((x, y), width, height,
-                         boxstyle="round,pad=0.02",
-                         facecolor=color, edgecolor=IBM_GRAY, linewidth=1.5)
-    ax.add_patch(box)
-    
-    # Add text
-    ax.text(x + width/2, y + height/2, text, ha='center', va='center',
-            fontsize=fontsize, color=text_color, weight='bold', wrap=True)
+    BOX_KIT.draw(ax, x, y, width, height, text, color, text_color, fontsize)
 
 def create_arrow(ax, start, end, color=IBM_GRAY, style='->'):
     """Create an arrow between two points."""
-    arrow = ConnectionPatch(start, end, "data", "data",
-                           arrowstyle=style, shrinkA=5, shrinkB=5,
-                           mutation_scale=20, fc=color, ec=color, linewidth=2)
-    ax.add_patch(arrow)
+    ARROW_KIT.draw(ax, start, end, color, style)
 
 def create_security_shield(ax, x, y, size, color=IBM_GREEN):
     """Create a security shield icon."""
@@ -149,8 +155,7 @@ def diagram_1_provider_architecture():
     create_arrow(ax, (5, 6.5), (5, 6), IBM_GREEN)
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/provider_architecture.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_2_ibm_provider_config():
     """Generate detailed IBM Cloud provider configuration diagram."""
@@ -207,8 +212,7 @@ def diagram_2_ibm_provider_config():
                       IBM_ORANGE, IBM_WHITE, 10)
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/ibm_provider_config.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_3_authentication_security():
     """Generate authentication security framework diagram."""
@@ -266,8 +270,7 @@ def diagram_3_authentication_security():
                       IBM_LIGHT_GRAY, IBM_GRAY, 10)
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/authentication_security.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_4_multi_provider_setup():
     """Generate multi-provider and multi-environment setup diagram."""
@@ -333,8 +336,7 @@ def diagram_4_multi_provider_setup():
     create_arrow(ax, (8.1, 7), (6.4, 6.7), IBM_GRAY)
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/multi_provider_setup.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_5_provider_troubleshooting():
     """Generate provider troubleshooting and diagnostic procedures diagram."""
@@ -395,31 +397,31 @@ def diagram_5_provider_troubleshooting():
                       IBM_GREEN, IBM_WHITE, 10)
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/provider_troubleshooting.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
+
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    'provider_architecture.png': diagram_1_provider_architecture,
+    'ibm_provider_config.png': diagram_2_ibm_provider_config,
+    'authentication_security.png': diagram_3_authentication_security,
+    'multi_provider_setup.png': diagram_4_multi_provider_setup,
+    'provider_troubleshooting.png': diagram_5_provider_troubleshooting,
+}
 
 def main():
     """Generate all diagrams for provider configuration and authentication."""
     # Create output directory if it doesn't exist
-    os.makedirs('generated_diagrams', exist_ok=True)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     
     print("Generating Provider Configuration and Authentication diagrams...")
     
     # Generate all diagrams
-    diagram_1_provider_architecture()
-    print("✅ Generated: provider_architecture.png")
-    
-    diagram_2_ibm_provider_config()
-    print("✅ Generated: ibm_provider_config.png")
-    
-    diagram_3_authentication_security()
-    print("✅ Generated: authentication_security.png")
-    
-    diagram_4_multi_provider_setup()
-    print("✅ Generated: multi_provider_setup.png")
-    
-    diagram_5_provider_troubleshooting()
-    print("✅ Generated: provider_troubleshooting.png")
+    with plt.style.context(STYLE):
+        for filename, builder in FIGURES.items():
+            fig = builder()
+            fig.savefig(os.path.join(OUTPUT_DIR, filename), **SAVEFIG_OPTIONS)
+            plt.close(fig)
+            print(f"✅ Generated: {filename}")
     
     print("\n🎉 All diagrams generated successfully!")
     print("📁 Output directory: generated_diagrams/")
@@ -12,10 +12,15 @@ Version: 1.0.0
 
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, ConnectionPatch, Rectangle
+from matplotlib.patches import ConnectionPatch, Rectangle
 import numpy as np
 import os
 from datetime import datetime
+import sys
+
+# Shared DaC primitives live in Terraform-IBM-Cloud-Training/dac_toolkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from dac_toolkit.primitives import BoxKit
 
 # IBM Brand Colors
 IBM_BLUE = '#1f4e79'
@@ -67,6 +72,15 @@ ENTERPRISE_COLORS = {
     'text': IBM_GRAY
 }
 
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = "generated_diagrams"
+
+# Matplotlib style applied while each figure is built and saved
+STYLE = 'default'
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight', 'facecolor': 'white', 'edgecolor': 'none'}
+
 def setup_diagram(figsize=(16, 12), title="", subtitle=""):
     """Setup a professional diagram with IBM branding"""
     fig, ax = plt.subplots(figsize=figsize, dpi=300)
@@ -94,23 +108,13 @@ def setup_diagram(figsize=(16, 12), title="", subtitle=""):
     
     return fig, ax
 
+# Shared box and arrow styles, built once (see dac_toolkit/primitives.py)
+BOX_KIT = BoxKit(boxstyle='round,pad=0.5', edgecolor=IBM_GRAY, linewidth=2, text_color=IBM_WHITE,
+                 fontsize=12, wrap=False)
+
 def create_rounded_box(ax, x, y, width, height, label, color, text_color=IBM_WHITE):
     """Create a rounded rectangle with label"""
-    box = FancyBboxPatch(
-        (x, y), width, height,
-        boxstyle="round,pad=0.5",
-        facecolor=color,
-        edgecolor=IBM_GRAY,
-        linewidth=2
-    )
-    ax.add_patch(box)
-    
-    # Add label
-    ax.text(x + width/2, y + height/2, label, 
-            fontsize=12, fontweight='bold',
-            ha='center', va='center', color=text_color)
-    
-    return box
+    return BOX_KIT.draw(ax, x, y, width, height, label, color, text_color)
 
 def create_connection(ax, start_box, end_box, label="", style="->"):
     """Create a connection between two boxes"""
@@ -530,35 +534,35 @@ def generate_cost_optimization_strategies():
     plt.tight_layout()
     return fig
 
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    "ibm_cloud_resource_architecture.png": generate_ibm_cloud_resource_architecture,
+    "resource_lifecycle_management.png": generate_resource_lifecycle_management,
+    "enterprise_resource_patterns.png": generate_enterprise_resource_patterns,
+    "security_compliance_framework.png": generate_security_compliance_framework,
+    "cost_optimization_strategies.png": generate_cost_optimization_strategies,
+}
+
 def main():
     """Generate all diagrams for Topic 4.1"""
     print("🎨 Generating IBM Cloud Resource Provisioning Diagrams...")
     print("=" * 60)
     
     # Create output directory
-    output_dir = "generated_diagrams"
+    output_dir = OUTPUT_DIR
     os.makedirs(output_dir, exist_ok=True)
     
     # Generate diagrams
-    diagrams = [
-        ("ibm_cloud_resource_architecture", generate_ibm_cloud_resource_architecture),
-        ("resource_lifecycle_management", generate_resource_lifecycle_management),
-        ("enterprise_resource_patterns", generate_enterprise_resource_patterns),
-        ("security_compliance_framework", generate_security_compliance_framework),
-        ("cost_optimization_strategies", generate_cost_optimization_strategies)
-    ]
-    
-    for filename, generator_func in diagrams:
-        print(f"📊 Generating {filename}.png...")
+    for filename, generator_func in FIGURES.items():
+        print(f"📊 Generating {filename}...")
         
         try:
-            fig = generator_func()
-            
-            # Save with high quality
-            output_path = os.path.join(output_dir, f"{filename}.png")
-            fig.savefig(output_path, dpi=300, bbox_inches='tight', 
-                       facecolor='white', edgecolor='none')
-            plt.close(fig)
+            with plt.style.context(STYLE):
+                fig = generator_func()
+                
+                # Save with high quality
+                output_path = os.path.join(output_dir, filename)
+                fig.savefig(output_path, **SAVEFIG_OPTIONS)
             
             # Get file size
             file_size = os.path.getsize(output_path) / 1024  # KB
@@ -566,10 +570,13 @@ def main():
             
         except Exception as e:
             print(f"   ❌ Error generating {filename}: {str(e)}")
+        finally:
+            # Also closes a figure the builder created before failing
+            plt.close('all')
     
     print("\n🎯 Diagram Generation Summary:")
     print(f"📁 Output directory: {output_dir}")
-    print(f"📊 Total diagrams: {len(diagrams)}")
+    print(f"📊 Total diagrams: {len(FIGURES)}")
     print(f"🎨 Resolution: 300 DPI")
     print(f"🎨 Color scheme: IBM Brand Colors")
     print(f"📅 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
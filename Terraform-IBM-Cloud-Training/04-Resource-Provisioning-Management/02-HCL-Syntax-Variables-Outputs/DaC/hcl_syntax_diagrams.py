@@ -11,11 +11,15 @@ Version: 1.0.0
 """
 
 import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, ConnectionPatch
+from matplotlib.patches import ConnectionPatch
 import numpy as np
 import os
-from datetime import datetime
+import sys
+
+# Shared DaC primitives live in Terraform-IBM-Cloud-Training/dac_toolkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from dac_toolkit.reproducible import build_datetime
+from dac_toolkit.primitives import ArrowKit, BoxKit, FANCY
 
 # IBM Brand Colors
 IBM_COLORS = {
@@ -32,6 +36,15 @@ IBM_COLORS = {
     'teal': '#009d9a'
 }
 
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = "generated_diagrams"
+
+# Matplotlib style applied while each figure is built and saved
+STYLE = 'default'
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight', 'facecolor': 'white', 'edgecolor': 'none'}
+
 def setup_diagram(figsize=(16, 12), title="", subtitle=""):
     """Set up a professional diagram with IBM branding."""
     fig, ax = plt.subplots(figsize=figsize, dpi=300)
@@ -51,40 +64,24 @@ def setup_diagram(figsize=(16, 12), title="", subtitle=""):
     # Add IBM branding
     ax.text(2, 2, 'IBM Cloud Terraform Training', fontsize=10, 
             color=IBM_COLORS['gray'], alpha=0.7)
-    ax.text(98, 2, f'Generated: {datetime.now().strftime("%Y-%m-%d")}', 
+    ax.text(98, 2, f'Generated: {build_datetime().strftime("%Y-%m-%d")}', 
             fontsize=10, ha='right', color=IBM_COLORS['gray'], alpha=0.7)
     
     return fig, ax
 
+# Shared box and arrow styles, built once (see dac_toolkit/primitives.py)
+BOX_KIT = BoxKit(boxstyle='round,pad=0.5', edgecolor=IBM_COLORS['dark_blue'], linewidth=2,
+                 color=IBM_COLORS['blue'], text_color=IBM_COLORS['white'], fontsize=12)
+ARROW_KIT = ArrowKit(color=IBM_COLORS['gray'], mutation_scale=20, linewidth=2, kind=FANCY)
+
 def create_rounded_box(ax, x, y, width, height, text, color=IBM_COLORS['blue'], 
                       text_color=IBM_COLORS['white'], fontsize=12, alpha=1.0):
     """Create a rounded rectangle with text."""
-    box = FancyBboxPatch(
-        (x, y), width, height,
-        boxstyle="round,pad=0.5",
-        facecolor=color,
-        edgecolor=IBM_COLORS['dark_blue'],
-        linewidth=2,
-        alpha=alpha
-    )
-    ax.add_patch(box)
-    
-    # Add text
-    ax.text(x + width/2, y + height/2, text, fontsize=fontsize, 
-            ha='center', va='center', color=text_color, fontweight='bold',
-            wrap=True)
-    
-    return box
+    return BOX_KIT.draw(ax, x, y, width, height, text, color, text_color, fontsize, alpha=alpha)
 
 def create_arrow(ax, start_x, start_y, end_x, end_y, color=IBM_COLORS['gray']):
     """Create an arrow between two points."""
-    arrow = patches.FancyArrowPatch(
-        (start_x, start_y), (end_x, end_y),
-        arrowstyle='->', mutation_scale=20,
-        color=color, linewidth=2
-    )
-    ax.add_patch(arrow)
-    return arrow
+    return ARROW_KIT.draw_xy(ax, start_x, start_y, end_x, end_y, color)
 
 def diagram_1_hcl_syntax_overview():
     """Generate HCL Syntax Overview diagram."""
@@ -566,41 +563,42 @@ def diagram_5_enterprise_hcl_governance():
     plt.tight_layout()
     return fig
 
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    "hcl_syntax_overview.png": diagram_1_hcl_syntax_overview,
+    "variable_patterns.png": diagram_2_variable_patterns,
+    "output_strategies.png": diagram_3_output_strategies,
+    "local_values_optimization.png": diagram_4_local_values_optimization,
+    "enterprise_hcl_governance.png": diagram_5_enterprise_hcl_governance,
+}
+
 def main():
     """Generate all HCL syntax and configuration diagrams."""
     print("🎨 Generating HCL Syntax and Configuration Diagrams...")
     
     # Create output directory
-    output_dir = "generated_diagrams"
+    output_dir = OUTPUT_DIR
     os.makedirs(output_dir, exist_ok=True)
     
-    # Generate all diagrams
-    diagrams = [
-        ("hcl_syntax_overview", diagram_1_hcl_syntax_overview),
-        ("variable_patterns", diagram_2_variable_patterns),
-        ("output_strategies", diagram_3_output_strategies),
-        ("local_values_optimization", diagram_4_local_values_optimization),
-        ("enterprise_hcl_governance", diagram_5_enterprise_hcl_governance)
-    ]
-    
     total_size = 0
     
-    for name, diagram_func in diagrams:
+    # Generate all diagrams
+    for name, diagram_func in FIGURES.items():
         print(f"  📊 Generating {name}...")
-        fig = diagram_func()
-        
-        # Save diagram
-        filename = f"{output_dir}/{name}.png"
-        fig.savefig(filename, dpi=300, bbox_inches='tight', 
-                   facecolor='white', edgecolor='none')
-        plt.close(fig)
+        with plt.style.context(STYLE):
+            fig = diagram_func()
+            
+            # Save diagram
+            filename = f"{output_dir}/{name}"
+            fig.savefig(filename, **SAVEFIG_OPTIONS)
+            plt.close(fig)
         
         # Get file size
         size = os.path.getsize(filename)
         total_size += size
         print(f"     ✅ Saved {filename} ({size/1024:.1f} KB)")
     
-    print(f"\n🎉 Successfully generated {len(diagrams)} diagrams!")
+    print(f"\n🎉 Successfully generated {len(FIGURES)} diagrams!")
     print(f"📁 Total size: {total_size/1024/1024:.1f} MB")
     print(f"📍 Location: {output_dir}/")
     print(f"🎯 Resolution: 300 DPI (print quality)")
@@ -15,9 +15,14 @@ All diagrams are generated at 300 DPI with IBM brand colors for enterprise prese
 
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, ConnectionPatch, Circle
+from matplotlib.patches import Circle
 import numpy as np
 import os
+import sys
+
+# Shared DaC primitives live in Terraform-IBM-Cloud-Training/dac_toolkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from dac_toolkit.primitives import ArrowKit, BoxKit
 
 # IBM Brand Colors
 IBM_BLUE = '#0f62fe'
@@ -36,6 +41,15 @@ IBM_PURPLE = '#8a3ffc'
 IBM_CYAN = '#1192e8'
 IBM_ORANGE = '#ff832b'
 
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = "generated_diagrams"
+
+# Matplotlib style applied while each figure is built and saved
+STYLE = 'default'
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight', 'facecolor': 'white', 'edgecolor': 'none'}
+
 def setup_diagram(figsize=(16, 12), title="", subtitle=""):
     """Setup a professional diagram with IBM styling"""
     fig, ax = plt.subplots(figsize=figsize, dpi=300)
@@ -58,34 +72,19 @@ def setup_diagram(figsize=(16, 12), title="", subtitle=""):
     
     return fig, ax
 
+# Shared box and arrow styles, built once (see dac_toolkit/primitives.py)
+BOX_KIT = BoxKit(boxstyle='round,pad=0.3', edgecolor=IBM_GRAY_70, linewidth=1.5, color=IBM_BLUE,
+                 text_color='white', fontsize=12)
+ARROW_KIT = ArrowKit(color=IBM_GRAY_70, shrink=5, linewidth=2)
+
 def create_rounded_box(ax, x, y, width, height, text, color=IBM_BLUE, text_color='white', 
                       fontsize=12, style='round,pad=0.3'):
     """Create a rounded rectangle with text"""
-    box = FancyBboxPatch((x, y), width, height,
-                        boxstyle=style,
-                        facecolor=color,
-                        edgecolor=IBM_GRAY_70,
-                        linewidth=1.5)
-    ax.add_patch(box)
-    
-    ax.text(x + width/2, y + height/2, text, ha='center', va='center',
-            fontsize=fontsize, color=text_color, weight='bold', wrap=True)
-    
-    return box
+    return BOX_KIT.draw(ax, x, y, width, height, text, color, text_color, fontsize, style)
 
 def create_arrow(ax, start, end, color=IBM_GRAY_70, style='->', linewidth=2, label=''):
     """Create an arrow between two points"""
-    arrow = ConnectionPatch(start, end, "data", "data",
-                          arrowstyle=style, shrinkA=5, shrinkB=5,
-                          color=color, linewidth=linewidth)
-    ax.add_patch(arrow)
-    
-    if label:
-        mid_x = (start[0] + end[0]) / 2
-        mid_y = (start[1] + end[1]) / 2
-        ax.text(mid_x, mid_y + 2, label, ha='center', va='bottom',
-                fontsize=10, color=color, weight='bold',
-                bbox=dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8))
+    ARROW_KIT.draw(ax, start, end, color, style, linewidth, label=label)
 
 def diagram_1_dependency_types():
     """Diagram 1: Dependency Types and Relationships"""
@@ -466,32 +465,32 @@ def diagram_5_optimization():
     plt.tight_layout()
     return fig
 
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    "01_dependency_types_relationships.png": diagram_1_dependency_types,
+    "02_resource_attribute_flow.png": diagram_2_resource_attributes,
+    "03_data_source_integration.png": diagram_3_data_sources,
+    "04_multi_tier_dependencies.png": diagram_4_multi_tier_architecture,
+    "05_dependency_optimization.png": diagram_5_optimization,
+}
+
 def main():
     """Generate all dependency management diagrams"""
     # Create output directory
-    output_dir = "generated_diagrams"
+    output_dir = OUTPUT_DIR
     os.makedirs(output_dir, exist_ok=True)
     
-    # Generate all diagrams
-    diagrams = [
-        (diagram_1_dependency_types, "01_dependency_types_relationships.png"),
-        (diagram_2_resource_attributes, "02_resource_attribute_flow.png"),
-        (diagram_3_data_sources, "03_data_source_integration.png"),
-        (diagram_4_multi_tier_architecture, "04_multi_tier_dependencies.png"),
-        (diagram_5_optimization, "05_dependency_optimization.png")
-    ]
-    
     total_size = 0
     
-    for diagram_func, filename in diagrams:
+    for filename, diagram_func in FIGURES.items():
         print(f"Generating {filename}...")
-        fig = diagram_func()
-        
-        # Save with high quality
-        filepath = os.path.join(output_dir, filename)
-        fig.savefig(filepath, dpi=300, bbox_inches='tight', 
-                   facecolor='white', edgecolor='none')
-        plt.close(fig)
+        with plt.style.context(STYLE):
+            fig = diagram_func()
+            
+            # Save with high quality
+            filepath = os.path.join(output_dir, filename)
+            fig.savefig(filepath, **SAVEFIG_OPTIONS)
+            plt.close(fig)
         
         # Calculate file size
         size = os.path.getsize(filepath)
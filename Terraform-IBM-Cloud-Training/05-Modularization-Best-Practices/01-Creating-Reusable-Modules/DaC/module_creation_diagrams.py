@@ -12,10 +12,15 @@ Version: 1.0.0
 
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, ConnectionPatch, Circle
+from matplotlib.patches import Circle
 import numpy as np
 import os
 from datetime import datetime
+import sys
+
+# Shared DaC primitives live in Terraform-IBM-Cloud-Training/dac_toolkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from dac_toolkit.primitives import ArrowKit, BoxKit
 
 # IBM Brand Colors
 COLORS = {
@@ -32,6 +37,16 @@ COLORS = {
     'dark_blue': '#002d9c'
 }
 
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = "generated_diagrams"
+
+# Matplotlib style applied while each figure is built and saved
+STYLE = 'default'
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight',
+                   'facecolor': COLORS['background'], 'edgecolor': 'none'}
+
 def setup_diagram(figsize=(16, 12), title="", subtitle=""):
     """Setup a professional diagram with IBM branding"""
     fig, ax = plt.subplots(figsize=figsize, dpi=300)
@@ -53,29 +68,17 @@ def setup_diagram(figsize=(16, 12), title="", subtitle=""):
     
     return fig, ax
 
+# Shared box and arrow styles, built once (see dac_toolkit/primitives.py)
+BOX_KIT = BoxKit(boxstyle='round,pad=0.5', edgecolor=COLORS['secondary'], linewidth=2, fontsize=12)
+ARROW_KIT = ArrowKit(color=COLORS['primary'], shrink=5, mutation_scale=20, linewidth=3)
+
 def create_rounded_box(ax, x, y, width, height, text, color, text_color='white', fontsize=12):
     """Create a rounded rectangle with text"""
-    box = FancyBboxPatch(
-        (x, y), width, height,
-        boxstyle="round,pad=0.5",
-        facecolor=color,
-        edgecolor=COLORS['secondary'],
-        linewidth=2
-    )
-    ax.add_patch(box)
-    
-    ax.text(x + width/2, y + height/2, text, fontsize=fontsize, fontweight='bold',
-            ha='center', va='center', color=text_color, wrap=True)
-    
-    return box
+    return BOX_KIT.draw(ax, x, y, width, height, text, color, text_color, fontsize)
 
 def create_arrow(ax, start, end, color=COLORS['primary'], style='->', linewidth=3):
     """Create a professional arrow between two points"""
-    arrow = ConnectionPatch(start, end, "data", "data",
-                          arrowstyle=style, shrinkA=5, shrinkB=5,
-                          mutation_scale=20, fc=color, ec=color, linewidth=linewidth)
-    ax.add_patch(arrow)
-    return arrow
+    return ARROW_KIT.draw(ax, start, end, color, style, linewidth)
 
 def diagram_1_module_architecture():
     """Generate Figure 5.1: Module Architecture and Composition Patterns"""
@@ -372,34 +375,34 @@ def diagram_5_enterprise_governance():
     plt.tight_layout()
     return fig
 
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    "01_module_architecture_composition.png": diagram_1_module_architecture,
+    "02_module_interface_dataflow.png": diagram_2_interface_design,
+    "03_versioning_lifecycle_management.png": diagram_3_versioning_lifecycle,
+    "04_testing_validation_workflows.png": diagram_4_testing_validation,
+    "05_enterprise_governance_distribution.png": diagram_5_enterprise_governance,
+}
+
 def generate_all_diagrams():
     """Generate all 5 diagrams and save them"""
     # Create output directory
-    output_dir = "generated_diagrams"
+    output_dir = OUTPUT_DIR
     os.makedirs(output_dir, exist_ok=True)
     
-    diagrams = [
-        (diagram_1_module_architecture, "01_module_architecture_composition.png"),
-        (diagram_2_interface_design, "02_module_interface_dataflow.png"),
-        (diagram_3_versioning_lifecycle, "03_versioning_lifecycle_management.png"),
-        (diagram_4_testing_validation, "04_testing_validation_workflows.png"),
-        (diagram_5_enterprise_governance, "05_enterprise_governance_distribution.png")
-    ]
-    
     print("🎨 Generating Module Creation Diagrams...")
     print("=" * 50)
     
     total_size = 0
     
-    for diagram_func, filename in diagrams:
+    for filename, diagram_func in FIGURES.items():
         print(f"📊 Creating {filename}...")
         
         try:
-            fig = diagram_func()
-            filepath = os.path.join(output_dir, filename)
-            fig.savefig(filepath, dpi=300, bbox_inches='tight', 
-                       facecolor=COLORS['background'], edgecolor='none')
-            plt.close(fig)
+            with plt.style.context(STYLE):
+                fig = diagram_func()
+                filepath = os.path.join(output_dir, filename)
+                fig.savefig(filepath, **SAVEFIG_OPTIONS)
             
             # Get file size
             size = os.path.getsize(filepath)
@@ -408,6 +411,9 @@ def generate_all_diagrams():
             
         except Exception as e:
             print(f"   ❌ Error creating {filename}: {str(e)}")
+        finally:
+            # Also closes a figure the builder created before failing
+            plt.close('all')
     
     print("=" * 50)
     print(f"🎉 Successfully generated 5 diagrams!")
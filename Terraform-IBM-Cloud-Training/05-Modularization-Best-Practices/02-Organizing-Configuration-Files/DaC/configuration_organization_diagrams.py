@@ -6,10 +6,16 @@ Generates 5 high-quality diagrams (300 DPI) for Terraform configuration organiza
 
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib import cycler
 import numpy as np
 import seaborn as sns
-from matplotlib.patches import FancyBboxPatch, ConnectionPatch
+from matplotlib.patches import ConnectionPatch
 import os
+import sys
+
+# Shared DaC primitives live in Terraform-IBM-Cloud-Training/dac_toolkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from dac_toolkit.primitives import BoxKit
 
 # IBM Brand Colors
 IBM_COLORS = {
@@ -25,10 +31,17 @@ IBM_COLORS = {
     'purple': '#8a3ffc'
 }
 
-# Set style
-plt.style.use('seaborn-v0_8-whitegrid')
-sns.set_palette([IBM_COLORS['blue'], IBM_COLORS['green'], IBM_COLORS['yellow'], 
-                IBM_COLORS['red'], IBM_COLORS['purple']])
+# Style and palette, applied while each figure is built and saved
+STYLE = ['seaborn-v0_8-whitegrid',
+         {'axes.prop_cycle': cycler(color=sns.color_palette([IBM_COLORS['blue'], IBM_COLORS['green'],
+                                                             IBM_COLORS['yellow'], IBM_COLORS['red'],
+                                                             IBM_COLORS['purple']]))}]
+
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = 'generated_diagrams'
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight', 'facecolor': 'white'}
 
 def setup_figure(figsize=(16, 12)):
     """Setup figure with IBM styling"""
@@ -49,13 +62,12 @@ def add_title_and_branding(ax, title, subtitle=""):
     ax.text(0.98, 0.02, 'IBM Cloud Terraform Training', transform=ax.transAxes, 
             fontsize=10, color=IBM_COLORS['gray'], ha='right', va='bottom')
 
+# Shared box and arrow styles, built once (see dac_toolkit/primitives.py)
+BOX_KIT = BoxKit(boxstyle='round,pad=0.02', edgecolor=IBM_COLORS['gray'], linewidth=1, fontsize=10)
+
 def create_rounded_box(ax, x, y, width, height, text, color, text_color='white'):
     """Create a rounded rectangle with text"""
-    box = FancyBboxPatch((x, y), width, height, boxstyle="round,pad=0.02",
-                         facecolor=color, edgecolor=IBM_COLORS['gray'], linewidth=1)
-    ax.add_patch(box)
-    ax.text(x + width/2, y + height/2, text, ha='center', va='center',
-            fontsize=10, color=text_color, fontweight='bold', wrap=True)
+    BOX_KIT.draw(ax, x, y, width, height, text, color, text_color)
 
 def diagram_1_configuration_challenges():
     """Figure 5.6: Configuration Organization Challenges and Solutions"""
@@ -115,9 +127,7 @@ def diagram_1_configuration_challenges():
     ax.axis('off')
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/06_configuration_organization_challenges.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    return fig
 
 def diagram_2_hierarchical_patterns():
     """Figure 5.7: Hierarchical Configuration Patterns"""
@@ -198,9 +208,7 @@ def diagram_2_hierarchical_patterns():
     ax.axis('off')
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/07_hierarchical_configuration_patterns.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    return fig
 
 def diagram_3_naming_conventions():
     """Figure 5.8: Enterprise Naming Conventions"""
@@ -285,9 +293,7 @@ def diagram_3_naming_conventions():
     ax.axis('off')
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/08_enterprise_naming_conventions.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    return fig
 
 def diagram_4_validation_workflows():
     """Figure 5.9: Configuration Validation Workflows"""
@@ -377,9 +383,7 @@ def diagram_4_validation_workflows():
     ax.axis('off')
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/09_configuration_validation_workflows.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    return fig
 
 def diagram_5_team_collaboration():
     """Figure 5.10: Team Collaboration and Governance"""
@@ -491,38 +495,37 @@ def diagram_5_team_collaboration():
     ax.axis('off')
     
     plt.tight_layout()
-    plt.savefig('generated_diagrams/10_team_collaboration_governance.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    return fig
+
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    '06_configuration_organization_challenges.png': diagram_1_configuration_challenges,
+    '07_hierarchical_configuration_patterns.png': diagram_2_hierarchical_patterns,
+    '08_enterprise_naming_conventions.png': diagram_3_naming_conventions,
+    '09_configuration_validation_workflows.png': diagram_4_validation_workflows,
+    '10_team_collaboration_governance.png': diagram_5_team_collaboration,
+}
 
 def main():
     """Generate all configuration organization diagrams"""
     # Create output directory
-    os.makedirs('generated_diagrams', exist_ok=True)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     
     print("Generating Configuration Organization Diagrams...")
     
     # Generate all diagrams
-    diagram_1_configuration_challenges()
-    print("✓ Generated Figure 5.6: Configuration Organization Challenges")
-    
-    diagram_2_hierarchical_patterns()
-    print("✓ Generated Figure 5.7: Hierarchical Configuration Patterns")
-    
-    diagram_3_naming_conventions()
-    print("✓ Generated Figure 5.8: Enterprise Naming Conventions")
-    
-    diagram_4_validation_workflows()
-    print("✓ Generated Figure 5.9: Configuration Validation Workflows")
-    
-    diagram_5_team_collaboration()
-    print("✓ Generated Figure 5.10: Team Collaboration and Governance")
+    with plt.style.context(STYLE):
+        for filename, builder in FIGURES.items():
+            fig = builder()
+            fig.savefig(os.path.join(OUTPUT_DIR, filename), **SAVEFIG_OPTIONS)
+            plt.close(fig)
+            print(f"✓ Generated {filename}")
     
     # Calculate total file size
     total_size = 0
-    for filename in os.listdir('generated_diagrams'):
+    for filename in os.listdir(OUTPUT_DIR):
         if filename.endswith('.png'):
-            filepath = os.path.join('generated_diagrams', filename)
+            filepath = os.path.join(OUTPUT_DIR, filename)
             total_size += os.path.getsize(filepath)
     
     print(f"\n📊 Generation Summary:")
@@ -9,15 +9,19 @@ CI/CD pipelines, team collaboration patterns, and enterprise governance.
 
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib import cycler
 from matplotlib.patches import FancyBboxPatch, ConnectionPatch, Circle
 import numpy as np
 import seaborn as sns
-from datetime import datetime
 import os
+import sys
 
-# Set style and color palette
-plt.style.use('default')
-sns.set_palette("husl")
+# Shared DaC primitives live in Terraform-IBM-Cloud-Training/dac_toolkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from dac_toolkit.reproducible import build_datetime
+
+# Style and color palette, applied while each figure is built and saved
+STYLE = ['default', {'axes.prop_cycle': cycler(color=sns.color_palette("husl"))}]
 
 # IBM Brand Colors
 IBM_BLUE = '#1261FE'
@@ -30,9 +34,8 @@ IBM_RED = '#DA1E28'
 IBM_YELLOW = '#F1C21B'
 IBM_PURPLE = '#8A3FFC'
 
-# Create output directory
-output_dir = 'generated_diagrams'
-os.makedirs(output_dir, exist_ok=True)
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = 'generated_diagrams'
 
 def create_professional_style():
     """Create consistent professional styling for all diagrams"""
@@ -48,17 +51,21 @@ def create_professional_style():
         'arrow_style': '->'
     }
 
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': create_professional_style()['dpi'], 'bbox_inches': 'tight'}
+
 def add_watermark(ax, style):
     """Add professional watermark to diagrams"""
-    ax.text(0.99, 0.01, f'IBM Cloud Terraform Training - Topic 5.3\nGenerated: {datetime.now().strftime("%Y-%m-%d")}',
+    ax.text(0.99, 0.01, f'IBM Cloud Terraform Training - Topic 5.3\nGenerated: {build_datetime().strftime("%Y-%m-%d")}',
             transform=ax.transAxes, fontsize=8, alpha=0.6,
             ha='right', va='bottom', style='italic')
 
-def diagram_11_git_workflow_patterns(style):
+def diagram_11_git_workflow_patterns():
     """
     Figure 5.3.1: Git Workflow Patterns for Infrastructure Teams
     Shows GitFlow, GitHub Flow, and GitLab Flow with Terraform-specific adaptations
     """
+    style = create_professional_style()
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=style['figure_size'], dpi=style['dpi'])
     fig.suptitle('Git Workflow Patterns for Infrastructure Teams', fontsize=style['title_size'], fontweight='bold', y=0.95)
     
@@ -201,14 +208,14 @@ def diagram_11_git_workflow_patterns(style):
     
     plt.tight_layout()
     add_watermark(ax4, style)
-    plt.savefig(f'{output_dir}/11_git_workflow_patterns.png', dpi=style['dpi'], bbox_inches='tight')
-    plt.close()
+    return fig
 
-def diagram_12_multi_team_branching(style):
+def diagram_12_multi_team_branching():
     """
     Figure 5.3.2: Multi-Team Branching Strategy with Dependency Management
     Illustrates team-based branching, shared modules, and cross-team dependencies
     """
+    style = create_professional_style()
     fig, ax = plt.subplots(figsize=style['figure_size'], dpi=style['dpi'])
     fig.suptitle('Multi-Team Branching Strategy with Dependency Management', 
                 fontsize=style['title_size'], fontweight='bold', y=0.95)
@@ -305,14 +312,14 @@ def diagram_12_multi_team_branching(style):
     
     add_watermark(ax, style)
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/12_multi_team_branching.png', dpi=style['dpi'], bbox_inches='tight')
-    plt.close()
+    return fig
 
-def diagram_13_cicd_pipeline_architecture(style):
+def diagram_13_cicd_pipeline_architecture():
     """
     Figure 5.3.3: CI/CD Pipeline Architecture with State Management
     Shows complete CI/CD pipeline with validation stages, deployment gates, and state management
     """
+    style = create_professional_style()
     fig, ax = plt.subplots(figsize=style['figure_size'], dpi=style['dpi'])
     fig.suptitle('CI/CD Pipeline Architecture with State Management', 
                 fontsize=style['title_size'], fontweight='bold', y=0.95)
@@ -408,14 +415,14 @@ def diagram_13_cicd_pipeline_architecture(style):
     
     add_watermark(ax, style)
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/13_cicd_pipeline_architecture.png', dpi=style['dpi'], bbox_inches='tight')
-    plt.close()
+    return fig
 
-def diagram_14_team_collaboration_workflow(style):
+def diagram_14_team_collaboration_workflow():
     """
     Figure 5.3.4: Team Collaboration Workflow with RBAC and Approval Gates
     Shows team roles, permission matrix, review workflows, and approval processes
     """
+    style = create_professional_style()
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=style['figure_size'], dpi=style['dpi'])
     fig.suptitle('Team Collaboration Workflow with RBAC and Approval Gates', 
                 fontsize=style['title_size'], fontweight='bold', y=0.95)
@@ -552,14 +559,14 @@ def diagram_14_team_collaboration_workflow(style):
     
     plt.tight_layout()
     add_watermark(ax4, style)
-    plt.savefig(f'{output_dir}/14_team_collaboration_workflow.png', dpi=style['dpi'], bbox_inches='tight')
-    plt.close()
+    return fig
 
-def diagram_15_security_compliance_integration(style):
+def diagram_15_security_compliance_integration():
     """
     Figure 5.3.5: Security and Compliance Integration Architecture
     Shows policy-as-code implementation, secrets management, audit trails, and compliance automation
     """
+    style = create_professional_style()
     fig, ax = plt.subplots(figsize=style['figure_size'], dpi=style['dpi'])
     fig.suptitle('Security and Compliance Integration Architecture', 
                 fontsize=style['title_size'], fontweight='bold', y=0.95)
@@ -687,28 +694,33 @@ def diagram_15_security_compliance_integration(style):
     
     add_watermark(ax, style)
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/15_security_compliance_integration.png', dpi=style['dpi'], bbox_inches='tight')
-    plt.close()
+    return fig
+
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    '11_git_workflow_patterns.png': diagram_11_git_workflow_patterns,
+    '12_multi_team_branching.png': diagram_12_multi_team_branching,
+    '13_cicd_pipeline_architecture.png': diagram_13_cicd_pipeline_architecture,
+    '14_team_collaboration_workflow.png': diagram_14_team_collaboration_workflow,
+    '15_security_compliance_integration.png': diagram_15_security_compliance_integration,
+}
 
 def main():
     """Generate all diagrams for Topic 5.3"""
     print("🎨 Generating Git Collaboration Diagrams for Topic 5.3...")
     
     style = create_professional_style()
+    output_dir = OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
     
     # Generate all diagrams
-    diagrams = [
-        ("Git Workflow Patterns", diagram_11_git_workflow_patterns),
-        ("Multi-Team Branching Strategy", diagram_12_multi_team_branching),
-        ("CI/CD Pipeline Architecture", diagram_13_cicd_pipeline_architecture),
-        ("Team Collaboration Workflow", diagram_14_team_collaboration_workflow),
-        ("Security and Compliance Integration", diagram_15_security_compliance_integration)
-    ]
-    
-    for name, diagram_func in diagrams:
-        print(f"  📊 Creating {name}...")
-        diagram_func(style)
-        print(f"  ✅ {name} completed")
+    with plt.style.context(STYLE):
+        for filename, diagram_func in FIGURES.items():
+            print(f"  📊 Creating {filename}...")
+            fig = diagram_func()
+            fig.savefig(os.path.join(output_dir, filename), **SAVEFIG_OPTIONS)
+            plt.close(fig)
+            print(f"  ✅ {filename} completed")
     
     # Calculate total file size
     total_size = 0
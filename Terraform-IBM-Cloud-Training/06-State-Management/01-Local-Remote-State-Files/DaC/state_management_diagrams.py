@@ -18,6 +18,11 @@ import matplotlib.patches as patches
 from matplotlib.patches import FancyBboxPatch, Circle, Rectangle, Arrow
 import numpy as np
 import os
+import sys
+
+# Shared DaC primitives live in Terraform-IBM-Cloud-Training/dac_toolkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from dac_toolkit.batching import batch_patches
 
 # IBM Brand Colors
 IBM_BLUE = '#1261FE'
@@ -30,12 +35,17 @@ IBM_ORANGE = '#FF832B'
 IBM_RED = '#DA1E28'
 IBM_PURPLE = '#8A3FFC'
 
-# Create output directory
-os.makedirs('generated_diagrams', exist_ok=True)
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = 'generated_diagrams'
+
+# Matplotlib style applied while each figure is built and saved
+STYLE = 'default'
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight'}
 
 def setup_diagram_style():
     """Setup consistent diagram styling"""
-    plt.style.use('default')
     return {
         'title_size': 16,
         'label_size': 12,
@@ -48,6 +58,7 @@ def setup_diagram_style():
 def create_figure(title, figsize=(14, 10)):
     """Create a new figure with consistent styling"""
     fig, ax = plt.subplots(figsize=figsize, dpi=300)
+    batch_patches(ax)
     ax.set_xlim(0, 16)
     ax.set_ylim(0, 12)
     ax.set_aspect('equal')
@@ -131,8 +142,7 @@ def diagram_1_state_lifecycle():
     
     add_ibm_branding(ax)
     plt.tight_layout()
-    plt.savefig('generated_diagrams/figure_6_1_1_state_lifecycle.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_2_local_vs_remote():
     """Figure 6.1.2: Local vs Remote State Architecture Comparison"""
@@ -212,8 +222,7 @@ def diagram_2_local_vs_remote():
     
     add_ibm_branding(ax)
     plt.tight_layout()
-    plt.savefig('generated_diagrams/figure_6_1_2_local_vs_remote.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_3_cos_backend():
     """Figure 6.1.3: IBM Cloud Object Storage Backend Architecture"""
@@ -296,8 +305,7 @@ def diagram_3_cos_backend():
     
     add_ibm_branding(ax)
     plt.tight_layout()
-    plt.savefig('generated_diagrams/figure_6_1_3_cos_backend.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_4_migration_workflow():
     """Figure 6.1.4: State Migration Workflow Process"""
@@ -369,8 +377,7 @@ def diagram_4_migration_workflow():
     
     add_ibm_branding(ax)
     plt.tight_layout()
-    plt.savefig('generated_diagrams/figure_6_1_4_migration_workflow.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_5_team_collaboration():
     """Figure 6.1.5: Team Collaboration and Access Control Model"""
@@ -460,8 +467,16 @@ def diagram_5_team_collaboration():
     
     add_ibm_branding(ax)
     plt.tight_layout()
-    plt.savefig('generated_diagrams/figure_6_1_5_team_collaboration.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
+
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    'figure_6_1_1_state_lifecycle.png': diagram_1_state_lifecycle,
+    'figure_6_1_2_local_vs_remote.png': diagram_2_local_vs_remote,
+    'figure_6_1_3_cos_backend.png': diagram_3_cos_backend,
+    'figure_6_1_4_migration_workflow.png': diagram_4_migration_workflow,
+    'figure_6_1_5_team_collaboration.png': diagram_5_team_collaboration,
+}
 
 def main():
     """Generate all state management diagrams"""
@@ -469,27 +484,31 @@ def main():
     print("=" * 50)
     
     diagrams = [
-        ("Figure 6.1.1: State Lifecycle Overview", diagram_1_state_lifecycle),
-        ("Figure 6.1.2: Local vs Remote Comparison", diagram_2_local_vs_remote),
-        ("Figure 6.1.3: IBM COS Backend Architecture", diagram_3_cos_backend),
-        ("Figure 6.1.4: Migration Workflow Process", diagram_4_migration_workflow),
-        ("Figure 6.1.5: Team Collaboration Model", diagram_5_team_collaboration)
+        ("Figure 6.1.1: State Lifecycle Overview", "figure_6_1_1_state_lifecycle.png"),
+        ("Figure 6.1.2: Local vs Remote Comparison", "figure_6_1_2_local_vs_remote.png"),
+        ("Figure 6.1.3: IBM COS Backend Architecture", "figure_6_1_3_cos_backend.png"),
+        ("Figure 6.1.4: Migration Workflow Process", "figure_6_1_4_migration_workflow.png"),
+        ("Figure 6.1.5: Team Collaboration Model", "figure_6_1_5_team_collaboration.png")
     ]
     
-    for name, func in diagrams:
-        print(f"Generating {name}...")
-        func()
-        print(f"✅ {name} completed")
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    with plt.style.context(STYLE):
+        for name, filename in diagrams:
+            print(f"Generating {name}...")
+            fig = FIGURES[filename]()
+            fig.savefig(os.path.join(OUTPUT_DIR, filename), **SAVEFIG_OPTIONS)
+            plt.close(fig)
+            print(f"✅ {name} completed")
     
     print("=" * 50)
     print("All diagrams generated successfully!")
-    print(f"Output directory: generated_diagrams/")
+    print(f"Output directory: {OUTPUT_DIR}/")
     print(f"Resolution: 300 DPI")
     print(f"Format: PNG")
     
     # List generated files
     import glob
-    files = glob.glob('generated_diagrams/*.png')
+    files = glob.glob(os.path.join(OUTPUT_DIR, '*.png'))
     print(f"\nGenerated files ({len(files)}):")
     for file in sorted(files):
         print(f"  - {file}")
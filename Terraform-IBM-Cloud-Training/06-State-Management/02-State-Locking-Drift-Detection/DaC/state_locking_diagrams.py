@@ -18,6 +18,11 @@ import matplotlib.patches as patches
 from matplotlib.patches import FancyBboxPatch, Circle, Rectangle, Arrow, Polygon
 import numpy as np
 import os
+import sys
+
+# Shared DaC primitives live in Terraform-IBM-Cloud-Training/dac_toolkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from dac_toolkit.batching import batch_patches
 
 # IBM Brand Colors
 IBM_BLUE = '#1261FE'
@@ -31,12 +36,17 @@ IBM_RED = '#DA1E28'
 IBM_PURPLE = '#8A3FFC'
 IBM_YELLOW = '#F1C21B'
 
-# Create output directory
-os.makedirs('generated_diagrams', exist_ok=True)
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = 'generated_diagrams'
+
+# Matplotlib style applied while each figure is built and saved
+STYLE = 'default'
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight'}
 
 def setup_diagram_style():
     """Setup consistent diagram styling"""
-    plt.style.use('default')
     return {
         'title_size': 16,
         'label_size': 12,
@@ -49,6 +59,7 @@ def setup_diagram_style():
 def create_figure(title, figsize=(14, 10)):
     """Create a new figure with consistent styling"""
     fig, ax = plt.subplots(figsize=figsize, dpi=300)
+    batch_patches(ax)
     ax.set_xlim(0, 16)
     ax.set_ylim(0, 12)
     ax.set_aspect('equal')
@@ -152,8 +163,7 @@ def diagram_1_state_locking_mechanism():
     
     add_ibm_branding(ax)
     plt.tight_layout()
-    plt.savefig('generated_diagrams/figure_6_2_1_state_locking_mechanism.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_2_drift_detection_architecture():
     """Figure 6.2.2: Drift Detection Architecture"""
@@ -251,8 +261,7 @@ def diagram_2_drift_detection_architecture():
     
     add_ibm_branding(ax)
     plt.tight_layout()
-    plt.savefig('generated_diagrams/figure_6_2_2_drift_detection_architecture.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_3_conflict_resolution_workflow():
     """Figure 6.2.3: Conflict Resolution Workflow"""
@@ -353,8 +362,7 @@ def diagram_3_conflict_resolution_workflow():
     
     add_ibm_branding(ax)
     plt.tight_layout()
-    plt.savefig('generated_diagrams/figure_6_2_3_conflict_resolution_workflow.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_4_automated_remediation():
     """Figure 6.2.4: Automated Remediation Process"""
@@ -491,8 +499,7 @@ def diagram_4_automated_remediation():
     
     add_ibm_branding(ax)
     plt.tight_layout()
-    plt.savefig('generated_diagrams/figure_6_2_4_automated_remediation.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
 
 def diagram_5_enterprise_monitoring():
     """Figure 6.2.5: Enterprise Monitoring Dashboard"""
@@ -599,8 +606,16 @@ def diagram_5_enterprise_monitoring():
     
     add_ibm_branding(ax)
     plt.tight_layout()
-    plt.savefig('generated_diagrams/figure_6_2_5_enterprise_monitoring.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
+
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    'figure_6_2_1_state_locking_mechanism.png': diagram_1_state_locking_mechanism,
+    'figure_6_2_2_drift_detection_architecture.png': diagram_2_drift_detection_architecture,
+    'figure_6_2_3_conflict_resolution_workflow.png': diagram_3_conflict_resolution_workflow,
+    'figure_6_2_4_automated_remediation.png': diagram_4_automated_remediation,
+    'figure_6_2_5_enterprise_monitoring.png': diagram_5_enterprise_monitoring,
+}
 
 def main():
     """Generate all state locking and drift detection diagrams"""
@@ -608,27 +623,40 @@ def main():
     print("=" * 60)
     
     diagrams = [
-        ("Figure 6.2.1: State Locking Mechanism", diagram_1_state_locking_mechanism),
-        ("Figure 6.2.2: Drift Detection Architecture", diagram_2_drift_detection_architecture),
-        ("Figure 6.2.3: Conflict Resolution Workflow", diagram_3_conflict_resolution_workflow),
-        ("Figure 6.2.4: Automated Remediation Process", diagram_4_automated_remediation),
-        ("Figure 6.2.5: Enterprise Monitoring Dashboard", diagram_5_enterprise_monitoring)
+        ("Figure 6.2.1: State Locking Mechanism", "figure_6_2_1_state_locking_mechanism.png"),
+        ("Figure 6.2.2: Drift Detection Architecture", "figure_6_2_2_drift_detection_architecture.png"),
+        ("Figure 6.2.3: Conflict Resolution Workflow", "figure_6_2_3_conflict_resolution_workflow.png"),
+        ("Figure 6.2.4: Automated Remediation Process", "figure_6_2_4_automated_remediation.png"),
+        ("Figure 6.2.5: Enterprise Monitoring Dashboard", "figure_6_2_5_enterprise_monitoring.png")
     ]
     
-    for name, func in diagrams:
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    failed = []
+    for name, filename in diagrams:
         print(f"Generating {name}...")
-        func()
-        print(f"✅ {name} completed")
+        try:
+            with plt.style.context(STYLE):
+                fig = FIGURES[filename]()
+                fig.savefig(os.path.join(OUTPUT_DIR, filename), **SAVEFIG_OPTIONS)
+            print(f"✅ {name} completed")
+        except Exception as e:
+            print(f"❌ Error generating {name}: {str(e)}")
+            failed.append(filename)
+        finally:
+            plt.close('all')
     
     print("=" * 60)
-    print("All diagrams generated successfully!")
-    print(f"Output directory: generated_diagrams/")
+    if failed:
+        print(f"{len(failed)} of {len(diagrams)} diagrams failed: {', '.join(failed)}")
+    else:
+        print("All diagrams generated successfully!")
+    print(f"Output directory: {OUTPUT_DIR}/")
     print(f"Resolution: 300 DPI")
     print(f"Format: PNG")
     
     # List generated files
     import glob
-    files = glob.glob('generated_diagrams/*.png')
+    files = glob.glob(os.path.join(OUTPUT_DIR, '*.png'))
     print(f"\nGenerated files ({len(files)}):")
     for file in sorted(files):
         print(f"  - {file}")
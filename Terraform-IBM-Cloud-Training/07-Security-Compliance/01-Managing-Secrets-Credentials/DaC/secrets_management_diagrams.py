@@ -37,8 +37,8 @@ IBM_COLORS = {
     'white': '#ffffff'
 }
 
-# Configure matplotlib for high-quality output
-plt.rcParams.update({
+# Matplotlib settings for high-quality output, applied while each figure is built and saved
+STYLE = {
     'figure.dpi': 300,
     'savefig.dpi': 300,
     'font.family': 'IBM Plex Sans',
@@ -49,15 +49,20 @@ plt.rcParams.update({
     'ytick.labelsize': 10,
     'legend.fontsize': 10,
     'figure.titlesize': 16
-})
+}
+
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = 'diagrams'
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight', 'facecolor': 'white'}
 
 class SecurityDiagramGenerator:
     """Professional security diagram generator for IBM Cloud Terraform training."""
     
-    def __init__(self, output_dir='diagrams'):
+    def __init__(self, output_dir=OUTPUT_DIR):
         """Initialize the diagram generator with output directory."""
         self.output_dir = output_dir
-        self.ensure_output_directory()
         
     def ensure_output_directory(self):
         """Create output directory if it doesn't exist."""
@@ -211,9 +216,7 @@ class SecurityDiagramGenerator:
                 fontsize=9, color=IBM_COLORS['neutral_gray'])
         
         plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/01_enterprise_security_architecture.png', 
-                   dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close()
+        return fig
         
     def create_secrets_lifecycle_workflow(self):
         """
@@ -344,9 +347,7 @@ class SecurityDiagramGenerator:
                    fontsize=9, fontweight='bold', color=IBM_COLORS['primary_blue'])
         
         plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/02_secrets_lifecycle_workflow.png',
-                   dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close()
+        return fig
         
     def create_compliance_framework_matrix(self):
         """
@@ -473,9 +474,7 @@ class SecurityDiagramGenerator:
                    fontsize=8, color=IBM_COLORS['neutral_gray'])
         
         plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/03_compliance_framework_matrix.png',
-                   dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close()
+        return fig
 
     def create_threat_model_security_mitigation(self):
         """
@@ -634,9 +633,7 @@ class SecurityDiagramGenerator:
                    color=IBM_COLORS['primary_blue'])
 
         plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/04_threat_model_security_mitigation.png',
-                   dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close()
+        return fig
 
     def create_enterprise_governance_dashboard(self):
         """
@@ -731,37 +728,52 @@ class SecurityDiagramGenerator:
         ax4.set_title('Security Operations Automation', fontsize=12)
 
         plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/05_enterprise_governance_dashboard.png',
-                   dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close()
+        return fig
         
     def generate_all_diagrams(self):
         """Generate all 5 professional security diagrams."""
         print("🎨 Generating IBM Cloud Security Management Diagrams...")
         print(f"📁 Output directory: {self.output_dir}")
+        self.ensure_output_directory()
         
-        try:
-            print("📊 Creating Diagram 1: Enterprise Security Architecture Overview...")
-            self.create_enterprise_security_architecture()
-            
-            print("🔄 Creating Diagram 2: Secrets Lifecycle Management Workflow...")
-            self.create_secrets_lifecycle_workflow()
-            
-            print("📋 Creating Diagram 3: Compliance Framework Implementation Matrix...")
-            self.create_compliance_framework_matrix()
-            
-            print("🛡️ Creating Diagram 4: Threat Model and Security Mitigation...")
-            self.create_threat_model_security_mitigation()
-            
-            print("📈 Creating Diagram 5: Enterprise Governance Dashboard...")
-            self.create_enterprise_governance_dashboard()
-            
+        messages = [
+            "📊 Creating Diagram 1: Enterprise Security Architecture Overview...",
+            "🔄 Creating Diagram 2: Secrets Lifecycle Management Workflow...",
+            "📋 Creating Diagram 3: Compliance Framework Implementation Matrix...",
+            "🛡️ Creating Diagram 4: Threat Model and Security Mitigation...",
+            "📈 Creating Diagram 5: Enterprise Governance Dashboard...",
+        ]
+        
+        failed = []
+        for message, (filename, builder) in zip(messages, FIGURES.items()):
+            print(message)
+            try:
+                with plt.style.context(STYLE):
+                    fig = getattr(self, builder.__name__)()
+                    fig.savefig(os.path.join(self.output_dir, filename), **SAVEFIG_OPTIONS)
+            except Exception as e:
+                # Keep going so one broken diagram does not block the rest of the topic
+                print(f"❌ Error generating {filename}: {str(e)}")
+                failed.append(filename)
+            finally:
+                plt.close('all')
+        
+        if failed:
+            print(f"⚠️ {len(failed)} of {len(FIGURES)} diagrams failed: {', '.join(failed)}")
+        else:
             print("✅ All diagrams generated successfully!")
-            print(f"📂 Diagrams saved to: {os.path.abspath(self.output_dir)}")
-            
-        except Exception as e:
-            print(f"❌ Error generating diagrams: {str(e)}")
-            raise
+        print(f"📂 Diagrams saved to: {os.path.abspath(self.output_dir)}")
+        return failed
+
+# Figure registry: output filename -> builder returning a matplotlib Figure
+_generator = SecurityDiagramGenerator()
+FIGURES = {
+    '01_enterprise_security_architecture.png': _generator.create_enterprise_security_architecture,
+    '02_secrets_lifecycle_workflow.png': _generator.create_secrets_lifecycle_workflow,
+    '03_compliance_framework_matrix.png': _generator.create_compliance_framework_matrix,
+    '04_threat_model_security_mitigation.png': _generator.create_threat_model_security_mitigation,
+    '05_enterprise_governance_dashboard.png': _generator.create_enterprise_governance_dashboard,
+}
 
 if __name__ == "__main__":
     # Create diagram generator and generate all diagrams
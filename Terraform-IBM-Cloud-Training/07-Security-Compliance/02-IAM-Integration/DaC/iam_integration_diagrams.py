@@ -18,8 +18,15 @@ import matplotlib.patches as patches
 from matplotlib.patches import FancyBboxPatch, Circle, Rectangle, Arrow
 import numpy as np
 import seaborn as sns
-from datetime import datetime
 import os
+import sys
+
+# Shared DaC primitives live in Terraform-IBM-Cloud-Training/dac_toolkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from dac_toolkit.batching import batch_patches
+from dac_toolkit.primitives import ANNOTATION, ArrowKit
+from dac_toolkit.reproducible import build_datetime
+from dac_toolkit.routing import ORTHOGONAL
 
 # IBM Cloud brand colors
 IBM_COLORS = {
@@ -36,15 +43,27 @@ IBM_COLORS = {
     'teal': '#009d9a'
 }
 
-# Set up matplotlib for high-quality output
-plt.rcParams['figure.dpi'] = 300
-plt.rcParams['savefig.dpi'] = 300
-plt.rcParams['font.family'] = 'Arial'
-plt.rcParams['font.size'] = 10
+# Matplotlib settings for high-quality output, applied while each figure is built and saved
+STYLE = {
+    'figure.dpi': 300,
+    'savefig.dpi': 300,
+    'font.family': 'Arial',
+    'font.size': 10
+}
+
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = 'diagrams'
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight', 'facecolor': 'white', 'edgecolor': 'none'}
+
+# Connectors routed around the boxes and labels of dense diagrams (see dac_toolkit/routing.py)
+TRUST_ARROW_KIT = ArrowKit(arrowstyle='<->', linewidth=2, kind=ANNOTATION, routing=ORTHOGONAL)
+SSO_ARROW_KIT = ArrowKit(linewidth=1.5, kind=ANNOTATION, routing=ORTHOGONAL)
 
 def create_output_directory():
     """Create output directory for diagrams"""
-    output_dir = 'diagrams'
+    output_dir = OUTPUT_DIR
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     return output_dir
@@ -99,6 +118,7 @@ def add_business_metrics(ax, metrics):
 def create_enterprise_identity_architecture():
     """Generate Diagram 1: Enterprise Identity Architecture"""
     fig, ax = plt.subplots(1, 1, figsize=(16, 12))
+    batch_patches(ax)
     ax.set_xlim(0, 10)
     ax.set_ylim(0, 10)
     ax.axis('off')
@@ -233,7 +253,7 @@ def create_enterprise_identity_architecture():
     add_business_metrics(ax, metrics)
     
     # Add timestamp
-    ax.text(0.02, 0.02, f'Generated: {datetime.now().strftime("%Y-%m-%d %H:%M")}',
+    ax.text(0.02, 0.02, f'Generated: {build_datetime().strftime("%Y-%m-%d %H:%M")}',
             transform=ax.transAxes, fontsize=8, color=IBM_COLORS['gray'])
     
     plt.tight_layout()
@@ -242,6 +262,7 @@ def create_enterprise_identity_architecture():
 def create_authentication_flow_diagram():
     """Generate Diagram 2: Authentication Flow and Federation Patterns"""
     fig, ax = plt.subplots(1, 1, figsize=(16, 12))
+    batch_patches(ax)
     ax.set_xlim(0, 12)
     ax.set_ylim(0, 10)
     ax.axis('off')
@@ -382,7 +403,7 @@ def create_authentication_flow_diagram():
     add_business_metrics(ax, metrics)
     
     # Add timestamp
-    ax.text(0.02, 0.02, f'Generated: {datetime.now().strftime("%Y-%m-%d %H:%M")}',
+    ax.text(0.02, 0.02, f'Generated: {build_datetime().strftime("%Y-%m-%d %H:%M")}',
             transform=ax.transAxes, fontsize=8, color=IBM_COLORS['gray'])
     
     plt.tight_layout()
@@ -391,6 +412,7 @@ def create_authentication_flow_diagram():
 def create_identity_governance_dashboard():
     """Generate Diagram 3: Identity Governance and Compliance Dashboard"""
     fig, ax = plt.subplots(1, 1, figsize=(16, 12))
+    batch_patches(ax)
     ax.set_xlim(0, 12)
     ax.set_ylim(0, 10)
     ax.axis('off')
@@ -564,7 +586,7 @@ def create_identity_governance_dashboard():
     add_business_metrics(ax, metrics)
 
     # Add timestamp
-    ax.text(0.02, 0.02, f'Generated: {datetime.now().strftime("%Y-%m-%d %H:%M")}',
+    ax.text(0.02, 0.02, f'Generated: {build_datetime().strftime("%Y-%m-%d %H:%M")}',
             transform=ax.transAxes, fontsize=8, color=IBM_COLORS['gray'])
 
     plt.tight_layout()
@@ -573,6 +595,7 @@ def create_identity_governance_dashboard():
 def create_federated_trust_relationships():
     """Generate Diagram 4: Federated Trust Relationships and SSO Implementation"""
     fig, ax = plt.subplots(1, 1, figsize=(16, 12))
+    batch_patches(ax)
     ax.set_xlim(0, 12)
     ax.set_ylim(0, 10)
     ax.axis('off')
@@ -627,8 +650,7 @@ def create_federated_trust_relationships():
         end_x = 6 + 1.2 * unit_x
         end_y = 5 + 1.2 * unit_y
 
-        ax.annotate('', xy=(end_x, end_y), xytext=(start_x, start_y),
-                    arrowprops=dict(arrowstyle='<->', lw=2, color=color))
+        TRUST_ARROW_KIT.draw(ax, (start_x, start_y), (end_x, end_y), color)
 
     # Applications (right side)
     applications = [
@@ -649,8 +671,7 @@ def create_federated_trust_relationships():
                 ha='center', va='center', color='white')
 
         # SSO connection to hub
-        ax.annotate('', xy=(7.2, 5), xytext=(x-0.5, y),
-                    arrowprops=dict(arrowstyle='->', lw=1.5, color=color))
+        SSO_ARROW_KIT.draw(ax, (x-0.5, y), (7.2, 5), color)
 
     # Trust establishment process (bottom)
     trust_process_box = FancyBboxPatch((1, 0.5), 10, 1,
@@ -706,7 +727,7 @@ def create_federated_trust_relationships():
     add_business_metrics(ax, metrics)
 
     # Add timestamp
-    ax.text(0.02, 0.02, f'Generated: {datetime.now().strftime("%Y-%m-%d %H:%M")}',
+    ax.text(0.02, 0.02, f'Generated: {build_datetime().strftime("%Y-%m-%d %H:%M")}',
             transform=ax.transAxes, fontsize=8, color=IBM_COLORS['gray'])
 
     plt.tight_layout()
@@ -715,6 +736,7 @@ def create_federated_trust_relationships():
 def create_privileged_access_workflow():
     """Generate Diagram 5: Privileged Access Management and JIT Workflows"""
     fig, ax = plt.subplots(1, 1, figsize=(16, 12))
+    batch_patches(ax)
     ax.set_xlim(0, 12)
     ax.set_ylim(0, 10)
     ax.axis('off')
@@ -914,12 +936,21 @@ def create_privileged_access_workflow():
     add_business_metrics(ax, metrics)
 
     # Add timestamp
-    ax.text(0.02, 0.02, f'Generated: {datetime.now().strftime("%Y-%m-%d %H:%M")}',
+    ax.text(0.02, 0.02, f'Generated: {build_datetime().strftime("%Y-%m-%d %H:%M")}',
             transform=ax.transAxes, fontsize=8, color=IBM_COLORS['gray'])
 
     plt.tight_layout()
     return fig
 
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    "01_enterprise_identity_architecture.png": create_enterprise_identity_architecture,
+    "02_authentication_flow_diagram.png": create_authentication_flow_diagram,
+    "03_identity_governance_dashboard.png": create_identity_governance_dashboard,
+    "04_federated_trust_relationships.png": create_federated_trust_relationships,
+    "05_privileged_access_workflow.png": create_privileged_access_workflow,
+}
+
 def main():
     """Main function to generate all IAM integration diagrams"""
     print("🎨 Generating IBM Cloud IAM Integration Diagrams...")
@@ -929,32 +960,26 @@ def main():
     output_dir = create_output_directory()
 
     # Generate all diagrams
-    diagrams = [
-        ("01_enterprise_identity_architecture", create_enterprise_identity_architecture),
-        ("02_authentication_flow_diagram", create_authentication_flow_diagram),
-        ("03_identity_governance_dashboard", create_identity_governance_dashboard),
-        ("04_federated_trust_relationships", create_federated_trust_relationships),
-        ("05_privileged_access_workflow", create_privileged_access_workflow)
-    ]
-
-    for filename, diagram_func in diagrams:
+    for filename, diagram_func in FIGURES.items():
         print(f"📊 Generating {filename}...")
         try:
-            fig = diagram_func()
-            filepath = os.path.join(output_dir, f"{filename}.png")
-            fig.savefig(filepath, dpi=300, bbox_inches='tight',
-                       facecolor='white', edgecolor='none')
-            plt.close(fig)
+            with plt.style.context(STYLE):
+                fig = diagram_func()
+                filepath = os.path.join(output_dir, filename)
+                fig.savefig(filepath, **SAVEFIG_OPTIONS)
             print(f"✅ Successfully saved: {filepath}")
         except Exception as e:
             print(f"❌ Error generating {filename}: {str(e)}")
+        finally:
+            # Also closes a figure the builder created before failing
+            plt.close('all')
 
     print("=" * 60)
     print("🎉 All IAM Integration diagrams generated successfully!")
     print(f"📁 Output directory: {output_dir}")
     print("\n📋 Generated diagrams:")
-    for filename, _ in diagrams:
-        print(f"   • {filename}.png")
+    for filename in FIGURES:
+        print(f"   • {filename}")
 
 if __name__ == "__main__":
     main()
@@ -35,12 +35,19 @@ COLORS = {
     'white': '#ffffff'
 }
 
-# Set style and DPI for high-quality output
-plt.style.use('default')
-plt.rcParams['figure.dpi'] = 300
-plt.rcParams['savefig.dpi'] = 300
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = ['IBM Plex Sans', 'Arial', 'sans-serif']
+# Style and DPI for high-quality output, applied while each figure is built and saved
+STYLE = ['default', {
+    'figure.dpi': 300,
+    'savefig.dpi': 300,
+    'font.family': 'sans-serif',
+    'font.sans-serif': ['IBM Plex Sans', 'Arial', 'sans-serif']
+}]
+
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = 'diagrams'
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'bbox_inches': 'tight', 'facecolor': 'white', 'edgecolor': 'none'}
 
 def create_enterprise_cicd_architecture():
     """
@@ -183,9 +190,7 @@ def create_enterprise_cicd_architecture():
                 va='center', color=COLORS['text'])
     
     plt.tight_layout()
-    plt.savefig('Figure_8.1.1_Enterprise_CICD_Architecture.png', 
-                bbox_inches='tight', facecolor='white', edgecolor='none')
-    plt.close()
+    return fig
 
 def create_multiplatform_comparison():
     """
@@ -258,9 +263,7 @@ def create_multiplatform_comparison():
                 fontsize=10, ha='left', color=COLORS['secondary'])
     
     plt.tight_layout()
-    plt.savefig('Figure_8.1.2_MultiPlatform_Comparison.png', 
-                bbox_inches='tight', facecolor='white', edgecolor='none')
-    plt.close()
+    return fig
 
 def create_security_workflow():
     """
@@ -369,9 +372,7 @@ def create_security_workflow():
                 color=COLORS['text'])
     
     plt.tight_layout()
-    plt.savefig('Figure_8.1.3_Security_Workflow.png', 
-                bbox_inches='tight', facecolor='white', edgecolor='none')
-    plt.close()
+    return fig
 
 def create_deployment_strategies():
     """
@@ -510,9 +511,7 @@ def create_deployment_strategies():
             table[(i, j)].set_facecolor(colors[i % 2])
     
     plt.tight_layout()
-    plt.savefig('Figure_8.1.4_Deployment_Strategies.png', 
-                bbox_inches='tight', facecolor='white', edgecolor='none')
-    plt.close()
+    return fig
 
 def create_performance_metrics():
     """
@@ -602,9 +601,16 @@ def create_performance_metrics():
              ha='center', va='center', transform=ax4.transAxes, color=COLORS['primary'])
     
     plt.tight_layout()
-    plt.savefig('Figure_8.1.5_Performance_Metrics.png', 
-                bbox_inches='tight', facecolor='white', edgecolor='none')
-    plt.close()
+    return fig
+
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    'Figure_8.1.1_Enterprise_CICD_Architecture.png': create_enterprise_cicd_architecture,
+    'Figure_8.1.2_MultiPlatform_Comparison.png': create_multiplatform_comparison,
+    'Figure_8.1.3_Security_Workflow.png': create_security_workflow,
+    'Figure_8.1.4_Deployment_Strategies.png': create_deployment_strategies,
+    'Figure_8.1.5_Performance_Metrics.png': create_performance_metrics,
+}
 
 def main():
     """
@@ -614,29 +620,24 @@ def main():
     print("=" * 60)
     
     # Create output directory if it doesn't exist
-    os.makedirs('diagrams', exist_ok=True)
-    os.chdir('diagrams')
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    
+    diagrams = [
+        ("8.1.1", "Enterprise CI/CD Architecture", 'Figure_8.1.1_Enterprise_CICD_Architecture.png'),
+        ("8.1.2", "Multi-Platform Comparison", 'Figure_8.1.2_MultiPlatform_Comparison.png'),
+        ("8.1.3", "Security Workflow", 'Figure_8.1.3_Security_Workflow.png'),
+        ("8.1.4", "Deployment Strategies", 'Figure_8.1.4_Deployment_Strategies.png'),
+        ("8.1.5", "Performance Metrics", 'Figure_8.1.5_Performance_Metrics.png')
+    ]
     
     try:
-        print("📊 Creating Figure 8.1.1: Enterprise CI/CD Architecture...")
-        create_enterprise_cicd_architecture()
-        print("✅ Figure 8.1.1 completed successfully")
-        
-        print("📊 Creating Figure 8.1.2: Multi-Platform Comparison...")
-        create_multiplatform_comparison()
-        print("✅ Figure 8.1.2 completed successfully")
-        
-        print("📊 Creating Figure 8.1.3: Security Workflow...")
-        create_security_workflow()
-        print("✅ Figure 8.1.3 completed successfully")
-        
-        print("📊 Creating Figure 8.1.4: Deployment Strategies...")
-        create_deployment_strategies()
-        print("✅ Figure 8.1.4 completed successfully")
-        
-        print("📊 Creating Figure 8.1.5: Performance Metrics...")
-        create_performance_metrics()
-        print("✅ Figure 8.1.5 completed successfully")
+        with plt.style.context(STYLE):
+            for figure_num, title, filename in diagrams:
+                print(f"📊 Creating Figure {figure_num}: {title}...")
+                fig = FIGURES[filename]()
+                fig.savefig(os.path.join(OUTPUT_DIR, filename), **SAVEFIG_OPTIONS)
+                plt.close(fig)
+                print(f"✅ Figure {figure_num} completed successfully")
         
         print("\n🎉 All diagrams generated successfully!")
         print("📁 Diagrams saved in: ./diagrams/")
@@ -15,11 +15,16 @@ Version: 1.0.0
 
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, ConnectionPatch
 import numpy as np
 import os
+import sys
 from datetime import datetime
 
+# Shared DaC primitives live in Terraform-IBM-Cloud-Training/dac_toolkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from dac_toolkit.spec import compile_spec, load_spec
+from dac_toolkit.primitives import ArrowKit, BoxKit
+
 # IBM Cloud color palette
 IBM_COLORS = {
     'blue': '#0f62fe',
@@ -34,6 +39,18 @@ IBM_COLORS = {
     'purple': '#8a3ffc'
 }
 
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = 'diagrams'
+
+# Matplotlib style applied while each figure is built and saved
+STYLE = 'default'
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight', 'facecolor': 'white'}
+
+# Declarative diagram specs (see dac_toolkit/spec.py)
+SPEC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'specs')
+
 def setup_figure(title, figsize=(16, 12)):
     """Setup figure with IBM Cloud styling"""
     fig, ax = plt.subplots(figsize=figsize)
@@ -48,66 +65,22 @@ def setup_figure(title, figsize=(16, 12)):
     
     return fig, ax
 
+# Shared box and arrow styles, built once (see dac_toolkit/primitives.py)
+BOX_KIT = BoxKit(boxstyle='round,pad=0.5', edgecolor=IBM_COLORS['gray'], linewidth=1.5, fontsize=10)
+ARROW_KIT = ArrowKit(color=IBM_COLORS['gray'], shrink=5, mutation_scale=20, linewidth=2)
+
 def add_rounded_box(ax, x, y, width, height, text, color, text_color='white'):
     """Add a rounded rectangle with text"""
-    box = FancyBboxPatch((x, y), width, height,
-                         boxstyle="round,pad=0.5",
-                         facecolor=color,
-                         edgecolor=IBM_COLORS['gray'],
-                         linewidth=1.5)
-    ax.add_patch(box)
-    
-    ax.text(x + width/2, y + height/2, text,
-            ha='center', va='center', fontsize=10, fontweight='bold',
-            color=text_color, wrap=True)
+    BOX_KIT.draw(ax, x, y, width, height, text, color, text_color)
 
 def add_arrow(ax, start, end, color=IBM_COLORS['gray'], style='->'):
     """Add arrow between two points"""
-    arrow = ConnectionPatch(start, end, "data", "data",
-                          arrowstyle=style, shrinkA=5, shrinkB=5,
-                          mutation_scale=20, fc=color, ec=color, linewidth=2)
-    ax.add_patch(arrow)
+    ARROW_KIT.draw(ax, start, end, color, style)
 
 def generate_diagram_1_schematics_architecture():
     """Generate Diagram 1: Schematics Enterprise Architecture"""
-    fig, ax = setup_figure("IBM Cloud Schematics Enterprise Architecture")
-    
-    # IBM Cloud Platform Layer
-    add_rounded_box(ax, 5, 80, 90, 12, "IBM Cloud Platform", IBM_COLORS['dark_blue'])
-    
-    # Schematics Service Components
-    add_rounded_box(ax, 10, 65, 18, 10, "Workspace\nEngine", IBM_COLORS['blue'])
-    add_rounded_box(ax, 32, 65, 18, 10, "State\nManagement", IBM_COLORS['blue'])
-    add_rounded_box(ax, 54, 65, 18, 10, "Variable\nManagement", IBM_COLORS['blue'])
-    add_rounded_box(ax, 76, 65, 18, 10, "Execution\nEngine", IBM_COLORS['blue'])
-    
-    # Security Layer
-    add_rounded_box(ax, 5, 50, 25, 8, "IAM Integration", IBM_COLORS['green'])
-    add_rounded_box(ax, 35, 50, 25, 8, "Encryption at Rest", IBM_COLORS['green'])
-    add_rounded_box(ax, 70, 50, 25, 8, "Network Isolation", IBM_COLORS['green'])
-    
-    # Workspace Hierarchy
-    add_rounded_box(ax, 10, 30, 35, 15, "Production\nWorkspaces\n• Core Infrastructure\n• Application Tier\n• Security Layer", IBM_COLORS['orange'])
-    add_rounded_box(ax, 55, 30, 35, 15, "Development\nWorkspaces\n• Feature Development\n• Testing\n• Experimentation", IBM_COLORS['light_blue'])
-    
-    # External Integrations
-    add_rounded_box(ax, 10, 10, 20, 8, "Git Repositories", IBM_COLORS['purple'])
-    add_rounded_box(ax, 40, 10, 20, 8, "CI/CD Pipelines", IBM_COLORS['purple'])
-    add_rounded_box(ax, 70, 10, 20, 8, "Monitoring", IBM_COLORS['purple'])
-    
-    # Add connections
-    add_arrow(ax, (19, 65), (19, 58))
-    add_arrow(ax, (41, 65), (41, 58))
-    add_arrow(ax, (63, 65), (63, 58))
-    add_arrow(ax, (85, 65), (85, 58))
-    
-    add_arrow(ax, (27.5, 45), (27.5, 30))
-    add_arrow(ax, (72.5, 45), (72.5, 30))
-    
-    plt.tight_layout()
-    plt.savefig('Terraform-IBM-Cloud-Training/08-Automation-Advanced-Integration/02-IBM-Cloud-Schematics-Terraform-Cloud/DaC/diagrams/Figure_8.2.1_Schematics_Enterprise_Architecture.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    # Boxes, arrows and title are declared in specs/schematics_architecture.json
+    return compile_spec(load_spec(os.path.join(SPEC_DIR, 'schematics_architecture.json')))
 
 def generate_diagram_2_terraform_cloud_integration():
     """Generate Diagram 2: Terraform Cloud Integration Patterns"""
@@ -148,9 +121,7 @@ def generate_diagram_2_terraform_cloud_integration():
     add_arrow(ax, (80, 40), (82.5, 32))
     
     plt.tight_layout()
-    plt.savefig('Terraform-IBM-Cloud-Training/08-Automation-Advanced-Integration/02-IBM-Cloud-Schematics-Terraform-Cloud/DaC/diagrams/Figure_8.2.2_Terraform_Cloud_Integration.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    return fig
 
 def generate_diagram_3_multi_workspace_orchestration():
     """Generate Diagram 3: Multi-Workspace Orchestration"""
@@ -202,9 +173,7 @@ def generate_diagram_3_multi_workspace_orchestration():
             bbox=dict(boxstyle="circle", facecolor=IBM_COLORS['white'], edgecolor=IBM_COLORS['green']))
     
     plt.tight_layout()
-    plt.savefig('Terraform-IBM-Cloud-Training/08-Automation-Advanced-Integration/02-IBM-Cloud-Schematics-Terraform-Cloud/DaC/diagrams/Figure_8.2.3_Multi_Workspace_Orchestration.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    return fig
 
 def generate_diagram_4_team_collaboration():
     """Generate Diagram 4: Team Collaboration Workflows"""
@@ -241,9 +210,7 @@ def generate_diagram_4_team_collaboration():
     add_arrow(ax, (50, 40), (50, 28))
     
     plt.tight_layout()
-    plt.savefig('Terraform-IBM-Cloud-Training/08-Automation-Advanced-Integration/02-IBM-Cloud-Schematics-Terraform-Cloud/DaC/diagrams/Figure_8.2.4_Team_Collaboration_Workflows.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    return fig
 
 def generate_diagram_5_cost_optimization():
     """Generate Diagram 5: Cost Optimization Dashboard"""
@@ -276,9 +243,16 @@ def generate_diagram_5_cost_optimization():
     ax.text(82.5, 75, "↗", fontsize=20, fontweight='bold', ha='center', va='center', color=IBM_COLORS['white'])
     
     plt.tight_layout()
-    plt.savefig('Terraform-IBM-Cloud-Training/08-Automation-Advanced-Integration/02-IBM-Cloud-Schematics-Terraform-Cloud/DaC/diagrams/Figure_8.2.5_Cost_Optimization_Dashboard.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    return fig
+
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    'Figure_8.2.1_Schematics_Enterprise_Architecture.png': generate_diagram_1_schematics_architecture,
+    'Figure_8.2.2_Terraform_Cloud_Integration.png': generate_diagram_2_terraform_cloud_integration,
+    'Figure_8.2.3_Multi_Workspace_Orchestration.png': generate_diagram_3_multi_workspace_orchestration,
+    'Figure_8.2.4_Team_Collaboration_Workflows.png': generate_diagram_4_team_collaboration,
+    'Figure_8.2.5_Cost_Optimization_Dashboard.png': generate_diagram_5_cost_optimization,
+}
 
 def main():
     """Generate all diagrams for Topic 8.2"""
@@ -286,24 +260,27 @@ def main():
     print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     # Create output directory if it doesn't exist
-    os.makedirs('Terraform-IBM-Cloud-Training/08-Automation-Advanced-Integration/02-IBM-Cloud-Schematics-Terraform-Cloud/DaC/diagrams', exist_ok=True)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     
     # Generate all diagrams
     diagrams = [
-        ("Schematics Enterprise Architecture", generate_diagram_1_schematics_architecture),
-        ("Terraform Cloud Integration Patterns", generate_diagram_2_terraform_cloud_integration),
-        ("Multi-Workspace Orchestration", generate_diagram_3_multi_workspace_orchestration),
-        ("Team Collaboration Workflows", generate_diagram_4_team_collaboration),
-        ("Cost Optimization Dashboard", generate_diagram_5_cost_optimization)
+        ("Schematics Enterprise Architecture", 'Figure_8.2.1_Schematics_Enterprise_Architecture.png'),
+        ("Terraform Cloud Integration Patterns", 'Figure_8.2.2_Terraform_Cloud_Integration.png'),
+        ("Multi-Workspace Orchestration", 'Figure_8.2.3_Multi_Workspace_Orchestration.png'),
+        ("Team Collaboration Workflows", 'Figure_8.2.4_Team_Collaboration_Workflows.png'),
+        ("Cost Optimization Dashboard", 'Figure_8.2.5_Cost_Optimization_Dashboard.png')
     ]
     
-    for i, (name, func) in enumerate(diagrams, 1):
-        print(f"Generating Figure 8.2.{i}: {name}...")
-        func()
-        print(f"✓ Figure 8.2.{i} completed")
+    with plt.style.context(STYLE):
+        for i, (name, filename) in enumerate(diagrams, 1):
+            print(f"Generating Figure 8.2.{i}: {name}...")
+            fig = FIGURES[filename]()
+            fig.savefig(os.path.join(OUTPUT_DIR, filename), **SAVEFIG_OPTIONS)
+            plt.close(fig)
+            print(f"✓ Figure 8.2.{i} completed")
     
     print("\n🎉 All diagrams generated successfully!")
-    print("📁 Output directory: Terraform-IBM-Cloud-Training/08-Automation-Advanced-Integration/02-IBM-Cloud-Schematics-Terraform-Cloud/DaC/diagrams/")
+    print("📁 Output directory: diagrams/")
     print("📊 Resolution: 300 DPI")
     print("🎨 Style: IBM Cloud Enterprise Theme")
 
@@ -15,10 +15,14 @@ All diagrams are generated at 300 DPI with IBM Cloud branding and consistent sty
 
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, ConnectionPatch
 import numpy as np
 import os
 from datetime import datetime
+import sys
+
+# Shared DaC primitives live in Terraform-IBM-Cloud-Training/dac_toolkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from dac_toolkit.primitives import ArrowKit, BoxKit
 
 # IBM Cloud color palette
 IBM_COLORS = {
@@ -34,6 +38,15 @@ IBM_COLORS = {
     'orange': '#ff832b'
 }
 
+# Output directory, relative to this DaC directory
+OUTPUT_DIR = 'diagrams'
+
+# Matplotlib style applied while each figure is built and saved
+STYLE = 'default'
+
+# Options passed to savefig for every figure
+SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight', 'facecolor': 'white'}
+
 def setup_figure(title, figsize=(16, 12)):
     """Setup figure with IBM Cloud styling"""
     fig, ax = plt.subplots(figsize=figsize, dpi=300)
@@ -51,24 +64,18 @@ def setup_figure(title, figsize=(16, 12)):
     
     return fig, ax
 
+# Shared box and arrow styles, built once (see dac_toolkit/primitives.py)
+BOX_KIT = BoxKit(boxstyle='round,pad=0.5', edgecolor=IBM_COLORS['dark_blue'], linewidth=2,
+                 color=IBM_COLORS['blue'], fontsize=10)
+ARROW_KIT = ArrowKit(color=IBM_COLORS['gray'], shrink=5, mutation_scale=20, linewidth=2)
+
 def add_component_box(ax, x, y, width, height, text, color=IBM_COLORS['blue'], text_color='white'):
     """Add a styled component box"""
-    box = FancyBboxPatch((x, y), width, height,
-                         boxstyle="round,pad=0.5",
-                         facecolor=color,
-                         edgecolor=IBM_COLORS['dark_blue'],
-                         linewidth=2)
-    ax.add_patch(box)
-    
-    ax.text(x + width/2, y + height/2, text, fontsize=10, fontweight='bold',
-            ha='center', va='center', color=text_color, wrap=True)
+    BOX_KIT.draw(ax, x, y, width, height, text, color, text_color)
 
 def add_arrow(ax, start_x, start_y, end_x, end_y, color=IBM_COLORS['gray']):
     """Add styled arrow between components"""
-    arrow = ConnectionPatch((start_x, start_y), (end_x, end_y), "data", "data",
-                          arrowstyle="->", shrinkA=5, shrinkB=5,
-                          mutation_scale=20, fc=color, ec=color, linewidth=2)
-    ax.add_patch(arrow)
+    ARROW_KIT.draw_xy(ax, start_x, start_y, end_x, end_y, color)
 
 def generate_diagram_1_debugging_architecture():
     """Generate Figure 8.3.1: Advanced Debugging Architecture"""
@@ -109,9 +116,7 @@ def generate_diagram_1_debugging_architecture():
     ax.text(5, 1, "• Comprehensive audit trail", fontsize=10, color=IBM_COLORS['gray'])
     
     plt.tight_layout()
-    plt.savefig('diagrams/Figure_8.3.1_Advanced_Debugging_Architecture.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    return fig
 
 def generate_diagram_2_monitoring_stack():
     """Generate Figure 8.3.2: Performance Monitoring Stack"""
@@ -154,9 +159,7 @@ def generate_diagram_2_monitoring_stack():
     add_arrow(ax, 57.5, 30, 62.5, 22)
     
     plt.tight_layout()
-    plt.savefig('diagrams/Figure_8.3.2_Performance_Monitoring_Stack.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    return fig
 
 def generate_diagram_3_self_healing():
     """Generate Figure 8.3.3: Self-Healing Infrastructure"""
@@ -203,9 +206,7 @@ def generate_diagram_3_self_healing():
             fontsize=10, fontweight='bold', color=IBM_COLORS['dark_blue'])
     
     plt.tight_layout()
-    plt.savefig('diagrams/Figure_8.3.3_Self_Healing_Infrastructure.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    return fig
 
 def generate_diagram_4_optimization_framework():
     """Generate Figure 8.3.4: Performance Optimization Framework"""
@@ -248,9 +249,7 @@ def generate_diagram_4_optimization_framework():
     add_arrow(ax, 62.5, 25, 62.5, 17)
     
     plt.tight_layout()
-    plt.savefig('diagrams/Figure_8.3.4_Performance_Optimization_Framework.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    return fig
 
 def generate_diagram_5_operational_excellence():
     """Generate Figure 8.3.5: Operational Excellence Dashboard"""
@@ -297,9 +296,16 @@ def generate_diagram_5_operational_excellence():
             fontsize=10, fontweight='bold', color=IBM_COLORS['dark_blue'])
     
     plt.tight_layout()
-    plt.savefig('diagrams/Figure_8.3.5_Operational_Excellence_Dashboard.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    return fig
+
+# Figure registry: output filename -> builder returning a matplotlib Figure
+FIGURES = {
+    'Figure_8.3.1_Advanced_Debugging_Architecture.png': generate_diagram_1_debugging_architecture,
+    'Figure_8.3.2_Performance_Monitoring_Stack.png': generate_diagram_2_monitoring_stack,
+    'Figure_8.3.3_Self_Healing_Infrastructure.png': generate_diagram_3_self_healing,
+    'Figure_8.3.4_Performance_Optimization_Framework.png': generate_diagram_4_optimization_framework,
+    'Figure_8.3.5_Operational_Excellence_Dashboard.png': generate_diagram_5_operational_excellence,
+}
 
 def main():
     """Generate all diagrams for Topic 8.3"""
@@ -307,32 +313,36 @@ def main():
     print("=" * 70)
     
     # Create diagrams directory if it doesn't exist
-    os.makedirs('diagrams', exist_ok=True)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     
     # Generate all diagrams
     diagrams = [
-        ("Figure 8.3.1", "Advanced Debugging Architecture", generate_diagram_1_debugging_architecture),
-        ("Figure 8.3.2", "Performance Monitoring Stack", generate_diagram_2_monitoring_stack),
-        ("Figure 8.3.3", "Self-Healing Infrastructure", generate_diagram_3_self_healing),
-        ("Figure 8.3.4", "Performance Optimization Framework", generate_diagram_4_optimization_framework),
-        ("Figure 8.3.5", "Operational Excellence Dashboard", generate_diagram_5_operational_excellence)
+        ("Figure 8.3.1", "Advanced Debugging Architecture", 'Figure_8.3.1_Advanced_Debugging_Architecture.png'),
+        ("Figure 8.3.2", "Performance Monitoring Stack", 'Figure_8.3.2_Performance_Monitoring_Stack.png'),
+        ("Figure 8.3.3", "Self-Healing Infrastructure", 'Figure_8.3.3_Self_Healing_Infrastructure.png'),
+        ("Figure 8.3.4", "Performance Optimization Framework", 'Figure_8.3.4_Performance_Optimization_Framework.png'),
+        ("Figure 8.3.5", "Operational Excellence Dashboard", 'Figure_8.3.5_Operational_Excellence_Dashboard.png')
     ]
     
-    for figure_num, title, generator_func in diagrams:
+    for figure_num, title, filename in diagrams:
         print(f"Generating {figure_num}: {title}...")
         try:
-            generator_func()
+            with plt.style.context(STYLE):
+                fig = FIGURES[filename]()
+                fig.savefig(os.path.join(OUTPUT_DIR, filename), **SAVEFIG_OPTIONS)
             print(f"✅ {figure_num} generated successfully")
         except Exception as e:
             print(f"❌ Error generating {figure_num}: {str(e)}")
+        finally:
+            # Also closes a figure the builder created before failing
+            plt.close('all')
     
     print("\n" + "=" * 70)
     print("All diagrams generated successfully!")
     print(f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("Location: ./diagrams/")
     print("\nDiagram files:")
-    for figure_num, title, _ in diagrams:
-        filename = f"Figure_8.3.{figure_num.split('.')[2]}_{'_'.join(title.split())}.png"
+    for filename in FIGURES:
         print(f"  - {filename}")
 
 if __name__ == "__main__":
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+IBM Cloud Terraform Training - Course-wide Diagram Build
+
+Renders every figure from all ``*/DaC/*_diagrams.py`` scripts as independent
+tasks across all CPU cores.
+
+Examples:
+    python3 build_diagrams.py                       # build everything
+    python3 build_diagrams.py --jobs 4              # limit worker processes
+    python3 build_diagrams.py --topic 07-Security   # one topic group
+    python3 build_diagrams.py --figure '*locking*'  # matching figures only
+    python3 build_diagrams.py --list                # show what would be built
+"""
+
+import sys
+
+from dac_toolkit.build import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+"""
+IBM Cloud Terraform Training - Diagram as Code (DaC) Build Toolkit
+
+Shared tooling for the per-topic ``*/DaC/*_diagrams.py`` scripts. The
+individual scripts stay runnable on their own; this package adds a single
+course-wide build that discovers every figure in the tree and renders the
+figures as independent tasks.
+
+Usage (from the Terraform-IBM-Cloud-Training directory):
+    python3 build_diagrams.py --jobs 8 --topic 06-State-Management
+"""
+
+from .discovery import COURSE_ROOT, discover_figures, discover_tasks, find_diagram_scripts
+from .tasks import FigureTask, RenderResult
+
+__all__ = [
+    'COURSE_ROOT',
+    'FigureTask',
+    'RenderResult',
+    'discover_figures',
+    'discover_tasks',
+    'find_diagram_scripts',
+]
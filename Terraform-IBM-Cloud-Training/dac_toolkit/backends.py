@@ -0,0 +1,221 @@
+"""
+Rendering backends for the DaC build.
+
+The build never lets ``matplotlib.pyplot`` pick a backend: on a desktop that
+can be an interactive toolkit (TkAgg, QtAgg, ...) and on a headless box a
+slower fallback or an error. ``runner.py`` pins ``POOLED_BACKEND``, Agg with
+reused pixel buffers, before pyplot is imported.
+
+The figure canvas is only used for layout. Each output format can then be
+written by any backend that supports it, via ``savefig(backend=...)``:
+
+    png         agg (default), cairo
+    svg         svg (default), cairo
+    pdf         pdf (default), cairo
+    ps, eps     ps (default), cairo
+
+Cairo is used only when pycairo or cairocffi is installed.
+
+The comparison mode renders each figure through every installed backend for
+every requested format and reports the time and size of each. It saves the
+fastest backend per format, which ``build_diagrams.py --backend auto`` then
+uses:
+
+    python3 -m dac_toolkit.backends --formats png,svg,pdf -t 06-State
+    python3 build_diagrams.py --formats png,svg --backend auto
+    python3 build_diagrams.py --backend png=cairo
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import tempfile
+
+from .discovery import COURSE_ROOT, discover_tasks
+from .export import parse_formats
+from .tasks import SAVE_SETTINGS
+
+# Non-interactive backend every build worker uses for figure canvases
+BUILD_BACKEND = 'Agg'
+
+# Agg with pooled pixel buffers, for workers that render many figures (see pool.py)
+POOLED_BACKEND = 'module://dac_toolkit.pool'
+
+# Output format -> backends able to write it, matplotlib's default first
+FORMAT_BACKENDS = {
+    'png': ('agg', 'cairo'),
+    'svg': ('svg', 'cairo'),
+    'pdf': ('pdf', 'cairo'),
+    'ps': ('ps', 'cairo'),
+    'eps': ('ps', 'cairo'),
+    'webp': ('agg',),
+    'jpg': ('agg',),
+    'jpeg': ('agg',),
+    'tif': ('agg',),
+    'tiff': ('agg',),
+}
+
+# Fastest backend per format, as last measured by the comparison mode
+DEFAULT_CHOICES_FILE = COURSE_ROOT / '.dac_bench' / 'backends.json'
+
+
+def is_available(backend):
+    """True if the backend module (and e.g. pycairo for 'cairo') imports."""
+    try:
+        importlib.import_module(f'matplotlib.backends.backend_{backend}')
+    except ImportError:
+        return False
+    return True
+
+
+def available_backends(extension):
+    """Installed backends that can write ``extension``, default first."""
+    return [backend for backend in FORMAT_BACKENDS.get(extension, ())
+            if is_available(backend)]
+
+
+def parse_backends(specs, choices_file=DEFAULT_CHOICES_FILE):
+    """
+    Turn ``['auto', 'png=cairo']`` into ``{'png': 'cairo', ...}``.
+
+    'auto' loads the fastest backends saved by the comparison mode; explicit
+    ``format=backend`` entries override it. Raises ValueError for unknown or
+    uninstalled backends, or a missing choices file.
+    """
+    choices = {}
+    for spec in specs:
+        for item in filter(None, (part.strip().lower() for part in spec.split(','))):
+            if item == 'auto':
+                try:
+                    with open(choices_file, encoding='utf-8') as handle:
+                        choices.update(json.load(handle)['fastest'])
+                except (OSError, ValueError, KeyError):
+                    raise ValueError(f'no backend comparison in {choices_file}; '
+                                     f'run python3 -m dac_toolkit.backends first') from None
+                continue
+            extension, _, backend = item.partition('=')
+            if extension not in FORMAT_BACKENDS or backend not in FORMAT_BACKENDS[extension]:
+                raise ValueError(f'invalid backend choice {item!r} (valid: ' + ', '.join(
+                    f'{ext}={name}' for ext, names in FORMAT_BACKENDS.items() for name in names) + ')')
+            if not is_available(backend):
+                raise ValueError(f'the {backend} backend is not installed')
+            choices[extension] = backend
+    # Default backends are implied; keep only real overrides
+    return {extension: backend for extension, backend in choices.items()
+            if backend != FORMAT_BACKENDS[extension][0]}
+
+
+def compare_task(task, formats, repeat=3):
+    """
+    ``{format label: {backend: (seconds, bytes)}}`` for one figure, using the
+    best of ``repeat`` saves. The figure is built once and saved repeatedly.
+    """
+    import matplotlib
+    matplotlib.use(BUILD_BACKEND)
+    import matplotlib.pyplot as plt
+
+    from .export import export_figure
+    from .runner import load_script
+
+    module = load_script(task)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='dac_backends_') as directory, \
+            plt.style.context(getattr(module, 'STYLE', []), after_reset=True):
+        fig = module.FIGURES[task.name]()
+        try:
+            for export_format in formats:
+                row = results.setdefault(export_format.label, {})
+                for backend in available_backends(export_format.extension):
+                    base = os.path.join(directory, f'{backend}_{task.name}')
+                    best = float('inf')
+                    for _ in range(repeat):
+                        paths, timings, _ = export_figure(
+                            fig, base, [export_format],
+                            getattr(module, 'SAVEFIG_OPTIONS', SAVE_SETTINGS),
+                            {export_format.extension: backend})
+                        best = min(best, timings[export_format.label])
+                    row[backend] = (best, os.path.getsize(paths[0]))
+        finally:
+            plt.close('all')
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Render each DaC figure through every installed backend and compare.')
+    parser.add_argument('-t', '--topic', action='append', default=[],
+                        help='only compare topics matching this substring or glob (repeatable)')
+    parser.add_argument('-f', '--figure', action='append', default=[],
+                        help='only compare figures whose function or file name matches (repeatable)')
+    parser.add_argument('--formats', action='append', default=[],
+                        help='formats to compare (default: png,svg,pdf)')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='saves per figure and backend; the best time is kept (default: 3)')
+    parser.add_argument('--choices-file', default=str(DEFAULT_CHOICES_FILE),
+                        help='where the fastest backend per format is saved (default: %(default)s)')
+    parser.add_argument('--no-save', action='store_true',
+                        help='report only; leave the saved backend choices untouched')
+    parser.add_argument('--root', default=str(COURSE_ROOT),
+                        help='course root to scan (default: this repository)')
+    args = parser.parse_args(argv)
+    try:
+        formats = parse_formats(args.formats or ['png,svg,pdf'])
+    except ValueError as error:
+        parser.error(str(error))
+
+    tasks = discover_tasks(args.root, topics=args.topic, figures=args.figure)
+    if not tasks:
+        print('❌ No figures matched the given filters')
+        return 1
+
+    print(f'🔬 Comparing backends for {len(tasks)} figures, best of {args.repeat} saves')
+    for export_format in formats:
+        installed = available_backends(export_format.extension)
+        missing = [backend for backend in FORMAT_BACKENDS.get(export_format.extension, ())
+                   if backend not in installed]
+        print(f'   {export_format.label}: {", ".join(installed)}'
+              + (f' (not installed: {", ".join(missing)})' if missing else ''))
+    print('=' * 78)
+
+    totals = {}
+    for task in tasks:
+        try:
+            results = compare_task(task, formats, args.repeat)
+        except Exception as error:
+            print(f'❌ {task.key}: {error}')
+            continue
+        cells = []
+        for label, row in results.items():
+            for backend, (seconds, size) in row.items():
+                total = totals.setdefault(label, {}).setdefault(backend, [0.0, 0])
+                total[0] += seconds
+                total[1] += size
+                cells.append(f'{label}/{backend} {seconds * 1000:.0f} ms {size / 1024:.0f} KB')
+        print(f'✅ {task.function[:40]:<40} ' + ' | '.join(cells))
+
+    print('=' * 78)
+    print(f'{"Format":<10} {"Backend":<8} {"Time (s)":>9} {"Size (MB)":>10}')
+    fastest = {}
+    for label, row in totals.items():
+        for backend, (seconds, size) in sorted(row.items(), key=lambda item: item[1][0]):
+            print(f'{label:<10} {backend:<8} {seconds:>9.2f} {size / (1024 * 1024):>10.1f}')
+        winner = min(row, key=lambda backend: row[backend][0])
+        fastest[label.split('@')[0]] = winner
+    print('🏁 Fastest: ' + ', '.join(f'{label} → {backend}' for label, backend in fastest.items()))
+
+    if not args.no_save and fastest:
+        os.makedirs(os.path.dirname(os.path.abspath(args.choices_file)), exist_ok=True)
+        with open(args.choices_file, 'w', encoding='utf-8') as handle:
+            json.dump({'fastest': fastest,
+                       'totals': {label: {backend: {'seconds': round(seconds, 4), 'bytes': size}
+                                          for backend, (seconds, size) in row.items()}
+                                  for label, row in totals.items()},
+                       'figures': len(tasks)}, handle, indent=2, sort_keys=True)
+        print(f'📝 Saved to {args.choices_file}; use build_diagrams.py --backend auto')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""
+Batched shape rendering for artist-heavy DaC diagrams.
+
+``batch_patches(ax)`` reroutes ``ax.add_patch`` for one Axes. Circles,
+rectangles, fancy boxes and other shapes with a static data-space outline are
+no longer added as individual artists. They are collected into
+``PatchCollection`` batches, and each batch is drawn in a single
+``draw_path_collection`` call. The diagram code does not change:
+``ax.add_patch(Circle(...))`` and helpers built on it (``create_rounded_box``,
+``add_component_box``, ...) keep working and still return the patch.
+
+Colors, alpha, line widths and line styles are per shape inside a batch, so
+shapes share a batch whenever their collection-wide settings match (z-order,
+hatch, join/cap style). Stacking order is preserved: a shape joins the
+current batch for its settings only if nothing drawn at the same z-order
+since that batch was started overlaps it. Otherwise it opens a new batch at
+the current position. Draw time therefore scales with the number of distinct
+styles and overlap layers, not with the number of shapes.
+
+Usage in a diagram script::
+
+    fig, ax = plt.subplots(figsize=(16, 12))
+    batch_patches(ax)
+
+Arrows are not static shapes: their shrink, head size and line width are
+set in points, so their outline depends on the figure DPI and the final
+axes position. ``ArrowBatch`` draws many ``FancyArrowPatch`` or
+``ConnectionPatch`` arrows in one call anyway, by recomputing their
+display-space paths when it is drawn (see ``spec.py``).
+``PatchBatcher.add_arrow`` places arrows in such batches with the same
+stacking rule as shapes (see ``primitives.py``).
+
+Batching relies on a few private matplotlib internals (the Axes child list,
+its autoscale request and ``FancyArrowPatch``'s display-space path). On a
+matplotlib without them, ``batch_patches`` leaves ``ax.add_patch`` alone
+and the batcher adds every shape and arrow as its own artist, as the
+scripts did before.
+"""
+
+import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.collections import PatchCollection, PathCollection
+from matplotlib.patches import (Circle, Ellipse, FancyArrowPatch, FancyBboxPatch, Polygon,
+                                Rectangle, RegularPolygon, Wedge)
+from matplotlib.path import Path
+from matplotlib.transforms import Bbox, IdentityTransform
+
+# Shapes whose outline is fixed in data coordinates once constructed
+BATCHABLE = (Circle, Ellipse, FancyBboxPatch, Polygon, Rectangle, RegularPolygon, Wedge)
+
+# Extra margin (display pixels) around extents for edges and antialiasing
+OVERLAP_MARGIN = 2
+
+# Collection.draw stamps a lone path as a pixel-snapped marker, which can move
+# its outline by a pixel; batches always hold at least two paths
+_EMPTY_PATH = Path(np.zeros((0, 2)))
+TRANSPARENT = (0, 0, 0, 0)
+
+# The private internals batching uses; Axes._children is checked per Axes
+SUPPORTED = all(hasattr(owner, name) for owner, name in (
+    (Axes, '_request_autoscale_view'), (Axes, '_set_artist_props'),
+    (FancyArrowPatch, '_get_path_in_displaycoord')))
+
+
+def _unsnapped(paths, faces, edges, widths):
+    """Pad a single-path batch with an invisible path."""
+    if len(paths) == 1:
+        paths, faces = paths + [_EMPTY_PATH], faces + [TRANSPARENT]
+        edges, widths = edges + [TRANSPARENT], widths + [0]
+    return paths, faces, edges, widths
+
+
+def _union(extent, other):
+    """Bounding box of two extents; ``Bbox.union`` without its list handling."""
+    if extent is None:
+        return other
+    return Bbox([np.minimum(extent.min, other.min), np.maximum(extent.max, other.max)])
+
+
+def _style_key(patch):
+    """Settings a PatchCollection can only hold once for all of its paths."""
+    return (patch.get_zorder(), patch.get_hatch(), patch.get_joinstyle(), patch.get_capstyle())
+
+
+def _is_batchable(patch):
+    """Static data-space shapes that are not clipped, hidden or meant for a legend."""
+    label = patch.get_label()
+    return (type(patch) in BATCHABLE and not patch.is_transform_set()
+            and patch.get_clip_path() is None and patch.get_visible()
+            and (not label or label.startswith('_')))
+
+
+class PatchBatch(PatchCollection):
+    """A PatchCollection that keeps its source patches and syncs them at draw time."""
+
+    def __init__(self, key):
+        zorder, hatch, joinstyle, capstyle = key
+        super().__init__([], match_original=True, zorder=zorder, hatch=hatch,
+                         joinstyle=joinstyle, capstyle=capstyle)
+        self.source_patches = []
+        self.extent = None  # data-space union of every shape in the batch
+
+    def add(self, patch, extent):
+        self.source_patches.append(patch)
+        self.extent = _union(self.extent, extent)
+        self.stale = True
+
+    def _sync(self):
+        patches = self.source_patches
+        paths, faces, edges, widths = _unsnapped(
+            [patch.get_transform().transform_path(patch.get_path()) for patch in patches],
+            [patch.get_facecolor() if patch.get_fill() else TRANSPARENT for patch in patches],
+            [patch.get_edgecolor() for patch in patches],
+            # Patch.draw strokes invisible edges with width 0, which changes pixel snapping
+            [0 if patch.get_edgecolor()[3] == 0 or patch.get_linestyle() in ('None', 'none')
+             else patch.get_linewidth() for patch in patches])
+        # PatchCollection.set_paths takes patches; these are its paths, padded
+        self._paths = paths
+        self.set_facecolor(faces)
+        self.set_edgecolor(edges)
+        self.set_linewidth(widths)
+        self.set_linestyle([patch.get_linestyle() for patch in patches])
+        self.set_antialiased([patch.get_antialiased() for patch in patches])
+
+    def draw(self, renderer):
+        self._sync()
+        super().draw(renderer)
+
+
+class ArrowBatch(PathCollection):
+    """
+    ``FancyArrowPatch`` (or ``ConnectionPatch``) arrows drawn as one
+    collection. The arrows are never added to the Axes; their paths are
+    recomputed in display space at draw time, exactly as their own ``draw``
+    computes them.
+    """
+
+    def __init__(self, arrows, zorder=1, joinstyle=None, capstyle=None):
+        if arrows:
+            joinstyle, capstyle = arrows[0].get_joinstyle(), arrows[0].get_capstyle()
+        super().__init__([], zorder=zorder, joinstyle=joinstyle, capstyle=capstyle)
+        self.arrows = arrows
+        self.set_transform(IdentityTransform())
+        # Arrows sit between shapes; they never widen a tight bounding box
+        self.set_in_layout(False)
+        self.extent = None  # data-space union of the arrows, when added with add()
+        self.margin = 0  # points the arrow heads and curves may reach beyond it
+        self.bounded = True  # False once it holds an arrow of unknown extent
+
+    def add(self, arrow, extent, margin):
+        self.arrows.append(arrow)
+        if extent is None:
+            self.bounded = False
+        else:
+            self.extent = _union(self.extent, extent)
+        self.margin = max(self.margin, margin)
+        self.stale = True
+
+    def draw(self, renderer):
+        paths, faces, edges, widths = [], [], [], []
+        for arrow in self.arrows:
+            # ConnectionPatch skips arrows whose data end points leave the Axes
+            if not arrow.get_visible() or \
+                    (hasattr(arrow, '_check_xy') and not arrow._check_xy(renderer)):
+                continue
+            arrow._dpi_cor = renderer.points_to_pixels(1.)
+            arrow_paths, fillable = arrow._get_path_in_displaycoord()
+            if not np.iterable(fillable):
+                arrow_paths, fillable = [arrow_paths], [fillable]
+            for path, fill in zip(arrow_paths, fillable):
+                paths.append(path)
+                faces.append(arrow.get_facecolor() if fill else TRANSPARENT)
+                edges.append(arrow.get_edgecolor())
+                widths.append(0 if arrow.get_edgecolor()[3] == 0 else arrow.get_linewidth())
+        paths, faces, edges, widths = _unsnapped(paths, faces, edges, widths)
+        self.set_paths(paths)
+        self.set_facecolor(faces)
+        self.set_edgecolor(edges)
+        self.set_linewidth(widths)
+        super().draw(renderer)
+
+
+class PatchBatcher:
+    """Replaces ``add_patch`` on one Axes with order-preserving batching."""
+
+    def __init__(self, ax):
+        self.ax = ax
+        self.add_unbatched = ax.add_patch
+        self._batches = {}
+        # False on a matplotlib without the internals: every artist is added as is
+        self.enabled = SUPPORTED and isinstance(getattr(ax, '_children', None), list)
+
+    def _points(self, points):
+        return points * self.ax.figure.dpi / 72
+
+    def _display_extent(self, artist):
+        """Current display-space extent of a batch or artist, or None if unknown."""
+        if isinstance(artist, PatchBatch):
+            return artist.extent.transformed(self.ax.transData)
+        if isinstance(artist, ArrowBatch):
+            if artist.extent is None or not artist.bounded:
+                return None
+            return artist.extent.transformed(self.ax.transData).padded(
+                self._points(artist.margin))
+        try:
+            return artist.get_window_extent()
+        except Exception:
+            return None
+
+    def _covered_since(self, batch, extent, zorder, margin=0):
+        """
+        True if a same-zorder artist added after ``batch`` overlaps ``extent``
+        (data space, widened by ``margin`` points). An unknown (None) extent
+        is overlapped by any such artist.
+        """
+        # Only artists added to the Axes can come between two of its batches;
+        # titles, spines and axis artists are always drawn after them
+        children = self.ax._children
+        padded = None if extent is None else extent.transformed(self.ax.transData).padded(
+            OVERLAP_MARGIN + self._points(margin))
+        for artist in children[children.index(batch) + 1:]:
+            if artist.get_zorder() != zorder:
+                continue
+            other = self._display_extent(artist)
+            # Unknown geometry: assume it covers the shape
+            if other is None or padded is None or padded.overlaps(other):
+                return True
+        return False
+
+    def add_patch(self, patch, extent=None):
+        """
+        Batch ``patch``. ``extent`` is its data-space bounding box when the
+        caller already knows it; otherwise it is computed from the outline.
+        """
+        if not self.enabled or not _is_batchable(patch):
+            return self.add_unbatched(patch)
+
+        key = _style_key(patch)
+        if extent is None:
+            extent = patch.get_path().get_extents(patch.get_patch_transform())
+        batch = self._batches.get(key)
+        if batch is None or self._covered_since(batch, extent, key[0]):
+            batch = PatchBatch(key)
+            self.ax.add_collection(batch, autolim=False)
+            self._batches[key] = batch
+
+        batch.add(patch, extent)
+        # Same data-limit bookkeeping as Axes.add_patch
+        self.ax.update_datalim(extent.get_points())
+        self.ax._request_autoscale_view()
+        return patch
+
+    def add_arrow(self, arrow, extent, margin):
+        """
+        Batch a ``FancyArrowPatch`` or data-to-data ``ConnectionPatch``.
+
+        ``extent`` is the data-space box of its end points and ``margin`` how
+        many points its head, line and curvature may reach beyond it. Unlike
+        ``add_patch``, no outline is computed and data limits are unchanged.
+        ``extent`` is None for arrows routed at draw time (see ``routing.py``).
+        """
+        if not self.enabled:
+            return self.ax.add_artist(arrow)
+        key = ('arrow', arrow.get_zorder(), arrow.get_joinstyle(), arrow.get_capstyle(),
+               arrow.get_clip_on())
+        self.ax._set_artist_props(arrow)
+        batch = self._batches.get(key)
+        if batch is None or self._covered_since(batch, extent, key[1], margin):
+            batch = ArrowBatch([], zorder=key[1], joinstyle=key[2], capstyle=key[3])
+            self.ax.add_collection(batch, autolim=False)
+            # Annotation arrows are drawn outside the Axes too
+            batch.set_clip_on(key[4])
+            self._batches[key] = batch
+        batch.add(arrow, extent, margin)
+        return arrow
+
+    @property
+    def batches(self):
+        return [artist for artist in self.ax.get_children() if isinstance(artist, PatchBatch)]
+
+
+def batch_patches(ax):
+    """
+    Enable batched shape rendering on ``ax``. Returns the PatchBatcher,
+    which is disabled on a matplotlib without the internals it needs.
+    """
+    batcher = PatchBatcher(ax)
+    if batcher.enabled:
+        ax.add_patch = batcher.add_patch
+    ax._dac_batcher = batcher
+    return batcher
+
+
+def patch_batcher(ax):
+    """
+    The PatchBatcher of ``ax``, created if needed. Unlike ``batch_patches``,
+    creating one here leaves ``ax.add_patch`` alone: only shapes and arrows
+    handed to the batcher are batched.
+    """
+    batcher = getattr(ax, '_dac_batcher', None)
+    if batcher is None:
+        batcher = ax._dac_batcher = PatchBatcher(ax)
+    return batcher
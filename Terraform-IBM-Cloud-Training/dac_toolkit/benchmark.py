@@ -0,0 +1,334 @@
+"""
+Rendering benchmark suite for the DaC figures.
+
+Every registered figure builder is run in a fresh process (so its peak
+memory is its own) on the headless Agg backend, and measured as:
+
+    build          seconds in the builder, i.e. creating the Figure and its artists
+    draw           seconds for one full Agg render at the save DPI
+    encode         seconds for the export (layout + savefig) beyond that draw
+    total          build + draw + encode
+    artists        artists in the figure (Figure.findobj())
+    peak_rss_mb    peak resident memory of the worker process
+    figure_rss_mb  growth of the peak over the worker's state before building
+    bytes          size of the exported files
+
+Times are the best of ``--repeat`` runs. Outputs are written to a temporary
+directory, never over the committed diagrams.
+
+Each run is appended to a JSON history file. Before appending, every figure
+is compared with the median of its last ``--baseline-runs`` results from
+the same machine and ``--repeat`` count. A gated metric that grows by more
+than ``--threshold`` (and by more than the noise floor in ``NOISE_FLOOR``)
+is a regression, and the command exits non-zero.
+
+Usage (from the Terraform-IBM-Cloud-Training directory):
+    python3 -m dac_toolkit.benchmark                           # all figures, record a run
+    python3 -m dac_toolkit.benchmark -t 06-State --threshold 0.1
+    python3 -m dac_toolkit.benchmark --gate total --gate bytes --no-record
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import traceback
+from datetime import datetime, timezone
+from importlib import metadata
+
+from .backends import BUILD_BACKEND
+from .discovery import COURSE_ROOT, discover_tasks
+from .tasks import SAVE_SETTINGS
+
+METRICS = ('build', 'draw', 'encode', 'total', 'artists', 'peak_rss_mb', 'figure_rss_mb', 'bytes')
+
+# Metrics checked for regressions unless --gate is given
+DEFAULT_GATES = ('total', 'peak_rss_mb')
+
+# Growth below these absolute amounts is treated as noise, whatever the ratio
+NOISE_FLOOR = {
+    'build': 0.02, 'draw': 0.02, 'encode': 0.02, 'total': 0.05,
+    'artists': 0, 'peak_rss_mb': 5.0, 'figure_rss_mb': 5.0, 'bytes': 1024,
+}
+
+DEFAULT_HISTORY = COURSE_ROOT / '.dac_bench' / 'history.json'
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_BASELINE_RUNS = 5
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def rss_mb():
+    """Current resident set size; the peak where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def machine_info():
+    """Where a run was measured; runs are only compared on the same machine."""
+    def version(name):
+        try:
+            return metadata.version(name)
+        except metadata.PackageNotFoundError:
+            return 'not-installed'
+
+    return {
+        'node': platform.node(),
+        'system': f'{platform.system()} {platform.machine()}',
+        'cpus': os.cpu_count(),
+        'python': platform.python_version(),
+        'matplotlib': version('matplotlib'),
+    }
+
+
+def _fingerprint(machine):
+    return f"{machine['node']}|{machine['system']}|{machine['cpus']}|{machine['matplotlib']}"
+
+
+def measure_task(task, repeat=3):
+    """Benchmark one FigureTask in the current process. Returns ``(task, metrics, error)``."""
+    try:
+        import matplotlib
+        matplotlib.use(BUILD_BACKEND)
+        import matplotlib.pyplot as plt
+
+        from .export import DEFAULT_FORMATS, export_figure
+        from .fonts import resolved_fonts
+        from .runner import load_script
+
+        module = load_script(task)
+        builder = module.FIGURES[task.name]
+        style = getattr(module, 'STYLE', [])
+        options = getattr(module, 'SAVEFIG_OPTIONS', SAVE_SETTINGS)
+        baseline_rss = peak_rss_mb()
+
+        best = {'build': float('inf'), 'draw': float('inf'), 'encode': float('inf')}
+        with tempfile.TemporaryDirectory(prefix='dac_bench_') as directory:
+            for _ in range(repeat):
+                with plt.style.context(style, after_reset=True), resolved_fonts():
+                    start = time.perf_counter()
+                    fig = builder()
+                    build = time.perf_counter() - start
+
+                    figure_dpi = fig.dpi
+                    fig.dpi = options.get('dpi', figure_dpi)
+                    start = time.perf_counter()
+                    fig.canvas.draw()
+                    draw = time.perf_counter() - start
+                    fig.dpi = figure_dpi
+
+                    start = time.perf_counter()
+                    paths, _, _ = export_figure(fig, os.path.join(directory, task.name),
+                                             DEFAULT_FORMATS, options)
+                    export = time.perf_counter() - start
+                    artists = len(fig.findobj())
+                plt.close('all')
+                best['build'] = min(best['build'], build)
+                best['draw'] = min(best['draw'], draw)
+                best['encode'] = min(best['encode'], max(0.0, export - draw))
+            output_bytes = sum(os.path.getsize(path) for path in paths)
+
+        peak_rss = peak_rss_mb()
+        metrics = dict(best)
+        metrics.update({
+            'total': best['build'] + best['draw'] + best['encode'],
+            'artists': artists,
+            'peak_rss_mb': round(peak_rss, 1),
+            'figure_rss_mb': round(peak_rss - baseline_rss, 1),
+            'bytes': output_bytes,
+        })
+        for stage in ('build', 'draw', 'encode', 'total'):
+            metrics[stage] = round(metrics[stage], 4)
+        return task, metrics, None
+    except Exception:
+        return task, None, traceback.format_exc()
+
+
+def _measure_star(args):
+    return measure_task(*args)
+
+
+def run_benchmarks(tasks, jobs=1, repeat=3, report=None):
+    """
+    Measure ``tasks``, each in its own spawned process, ``jobs`` at a time.
+
+    Returns ``{task.key: metrics}`` and ``{task.key: error}``.
+    """
+    results, errors = {}, {}
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(processes=max(1, jobs), maxtasksperchild=1) as pool:
+        for task, metrics, error in pool.imap_unordered(_measure_star,
+                                                        [(task, repeat) for task in tasks]):
+            if error is None:
+                results[task.key] = metrics
+            else:
+                errors[task.key] = error
+            if report:
+                report(task, metrics, error)
+    return results, errors
+
+
+def load_history(path):
+    try:
+        with open(path, encoding='utf-8') as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return {'runs': []}
+
+
+def save_history(path, history):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(str(path) + '.tmp', 'w', encoding='utf-8') as handle:
+        json.dump(history, handle, indent=1, sort_keys=True)
+        handle.write('\n')
+    os.replace(str(path) + '.tmp', path)
+
+
+def baselines(history, machine, repeat, baseline_runs=DEFAULT_BASELINE_RUNS):
+    """
+    ``{figure: {metric: median}}`` over the figure's last runs on ``machine``
+    with the same ``repeat`` (peak memory grows with the number of repeats).
+    """
+    fingerprint = _fingerprint(machine)
+    samples = {}
+    for run in reversed(history['runs']):
+        if _fingerprint(run['machine']) != fingerprint or run['repeat'] != repeat:
+            continue
+        for key, metrics in run['figures'].items():
+            figure = samples.setdefault(key, [])
+            if len(figure) < baseline_runs:
+                figure.append(metrics)
+    return {key: {metric: statistics.median(run[metric] for run in runs if metric in run)
+                  for metric in METRICS if any(metric in run for run in runs)}
+            for key, runs in samples.items()}
+
+
+def find_regressions(results, baseline, gates=DEFAULT_GATES, threshold=DEFAULT_THRESHOLD):
+    """``[(figure, metric, baseline, current)]`` for every gated metric past the threshold."""
+    regressions = []
+    for key, metrics in sorted(results.items()):
+        reference = baseline.get(key, {})
+        for metric in gates:
+            if metric not in reference:
+                continue
+            before, after = reference[metric], metrics[metric]
+            if after - before > NOISE_FLOOR[metric] and after > before * (1 + threshold):
+                regressions.append((key, metric, before, after))
+    return regressions
+
+
+def print_results(results, baseline):
+    print('=' * 104)
+    print(f'{"Figure":<44} {"Build":>7} {"Draw":>7} {"Encode":>7} {"Total":>7} '
+          f'{"Δ total":>8} {"Artists":>8} {"RSS MB":>7} {"KB":>6}')
+    for key in sorted(results):
+        metrics = results[key]
+        reference = baseline.get(key, {}).get('total')
+        change = f'{metrics["total"] / reference - 1:+.0%}' if reference else 'new'
+        print(f'{key.split(":")[-1][:44]:<44} {metrics["build"]:>7.2f} {metrics["draw"]:>7.2f} '
+              f'{metrics["encode"]:>7.2f} {metrics["total"]:>7.2f} {change:>8} '
+              f'{metrics["artists"]:>8} {metrics["peak_rss_mb"]:>7.0f} {metrics["bytes"] / 1024:>6.0f}')
+    print('=' * 104)
+    totals = {metric: sum(metrics[metric] for metrics in results.values())
+              for metric in ('build', 'draw', 'encode', 'total')}
+    print(f'📊 {len(results)} figures | build {totals["build"]:.1f}s | draw {totals["draw"]:.1f}s | '
+          f'encode {totals["encode"]:.1f}s | total {totals["total"]:.1f}s | '
+          f'max RSS {max(metrics["peak_rss_mb"] for metrics in results.values()):.0f} MB')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark every DaC figure and gate on performance regressions.')
+    parser.add_argument('-t', '--topic', action='append', default=[],
+                        help='only benchmark topics matching this substring or glob (repeatable)')
+    parser.add_argument('-f', '--figure', action='append', default=[],
+                        help='only benchmark figures whose function or file name matches (repeatable)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='figures measured concurrently (default: 1, for stable timings)')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='runs per figure; the best time is kept (default: 3)')
+    parser.add_argument('--gate', action='append', choices=METRICS,
+                        help=f'metric checked for regressions (repeatable; default: {", ".join(DEFAULT_GATES)})')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed growth over the baseline median, as a fraction (default: 0.2)')
+    parser.add_argument('--baseline-runs', type=int, default=DEFAULT_BASELINE_RUNS,
+                        help='previous runs the baseline median is taken over (default: 5)')
+    parser.add_argument('--history', default=str(DEFAULT_HISTORY),
+                        help='JSON history file (default: %(default)s)')
+    parser.add_argument('--no-record', action='store_true',
+                        help='compare against the history without appending this run')
+    parser.add_argument('--root', default=str(COURSE_ROOT),
+                        help='course root to scan (default: this repository)')
+    args = parser.parse_args(argv)
+
+    tasks = discover_tasks(args.root, topics=args.topic, figures=args.figure)
+    if not tasks:
+        print('❌ No figures matched the given filters')
+        return 1
+
+    # Headless everywhere, including the spawned workers
+    os.environ['MPLBACKEND'] = BUILD_BACKEND
+    machine = machine_info()
+    history = load_history(args.history)
+    baseline = baselines(history, machine, args.repeat, args.baseline_runs)
+
+    print(f'⏱️  Benchmarking {len(tasks)} figures, best of {args.repeat}, '
+          f'{args.jobs} at a time on {machine["node"]} ({machine["cpus"]} CPUs)')
+    done = []
+
+    def report(task, metrics, error):
+        done.append(task)
+        if error is None:
+            print(f'✅ [{len(done):3d}/{len(tasks)}] {task.key} ({metrics["total"]:.2f}s)')
+        else:
+            print(f'❌ [{len(done):3d}/{len(tasks)}] {task.key}: {error.strip().splitlines()[-1]}')
+
+    start = time.perf_counter()
+    results, errors = run_benchmarks(tasks, args.jobs, args.repeat, report)
+    print_results(results, baseline)
+    print(f'   Wall time: {time.perf_counter() - start:.1f}s')
+
+    gates = args.gate or DEFAULT_GATES
+    regressions = find_regressions(results, baseline, gates, args.threshold)
+    if regressions:
+        print(f'\n❌ Regressions beyond +{args.threshold:.0%} ({len(regressions)}):')
+        for key, metric, before, after in regressions:
+            print(f'   • {key} {metric}: {before:g} → {after:g} ({after / before - 1:+.0%})')
+    elif baseline:
+        print(f'\n✅ No regressions beyond +{args.threshold:.0%} in {", ".join(gates)}')
+    else:
+        print('\nℹ️  No earlier runs on this machine with this --repeat; this run becomes the baseline')
+
+    if errors:
+        print(f'\n❌ Failed figures ({len(errors)}):')
+        for key in sorted(errors):
+            print(f'   • {key}')
+
+    if not args.no_record:
+        history['runs'].append({
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'machine': machine,
+            'repeat': args.repeat,
+            'figures': results,
+            'failed': sorted(errors),
+        })
+        save_history(args.history, history)
+        print(f'📝 Recorded run {len(history["runs"])} in {args.history}')
+    return 1 if regressions or errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,374 @@
+"""
+Course-wide DaC build driver.
+
+Discovers every figure function across the topic folders and renders each
+one as an independent task in a process pool, then prints a run summary.
+"""
+
+import argparse
+import os
+import sys
+import time
+import traceback
+
+from .backends import parse_backends
+from .cache import DEFAULT_CACHE_DIR, RenderCache, SourceHasher, file_digest
+from .discovery import COURSE_ROOT, discover_tasks
+from .export import parse_formats
+from .extent import ExtentStore
+from .reproducible import source_date_epoch
+from .report import REPORT_NAME, build_report, write_report
+from .tasks import FAILED_STATUSES, RenderResult
+from .workers import DEFAULT_MAX_RSS_MB, DEFAULT_MAX_TASKS, DEFAULT_TIMEOUT, LEAK_CHECK_INTERVAL, \
+    WorkerPool
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Render every DaC diagram in the IBM Cloud Terraform training course.')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes (default: all cores)')
+    parser.add_argument('-t', '--topic', action='append', default=[],
+                        help='only build topics matching this substring or glob (repeatable)')
+    parser.add_argument('-f', '--figure', action='append', default=[],
+                        help='only build figures whose function or file name matches (repeatable)')
+    parser.add_argument('--formats', action='append', default=[],
+                        help='export formats, e.g. png,svg,pdf,webp@150 (default: png at the '
+                             'script DPI); each figure is laid out once for all of them')
+    parser.add_argument('--backend', action='append', default=[],
+                        help="backend per format, e.g. png=cairo, or 'auto' for the fastest "
+                             'measured by python3 -m dac_toolkit.backends (repeatable)')
+    parser.add_argument('--layout', choices=('fixed', 'tight'), default='fixed',
+                        help="'fixed' reuses each figure's stored tight extent so a save is one "
+                             "draw; 'tight' measures it on every save (default: fixed)")
+    parser.add_argument('--no-pool', action='store_true',
+                        help='allocate a fresh Agg buffer for every figure instead of reusing '
+                             'pooled ones (see pool.py)')
+    parser.add_argument('--no-text-cache', action='store_true',
+                        help='lay out every text from scratch instead of reusing wraps and '
+                             'layouts across figures (see textcache.py)')
+    parser.add_argument('--reproducible', action='store_true',
+                        help='byte-reproducible output: seeded RNGs, SOURCE_DATE_EPOCH dates, '
+                             'no version or date metadata (see reproducible.py)')
+    parser.add_argument('--verify-reproducible', action='store_true',
+                        help='render every figure twice in reproducible mode, bypassing the '
+                             'cache, and fail unless both passes write identical bytes')
+    parser.add_argument('--optimize', action='store_true',
+                        help='palette-optimize each PNG right after it is saved (see optimize.py)')
+    parser.add_argument('--derivatives', action='store_true',
+                        help='after rendering, refresh the web-size and thumbnail variants '
+                             'of every changed master (see derivatives.py)')
+    parser.add_argument('--tiles', action='store_true',
+                        help='after rendering, refresh the deep-zoom tile pyramid of every '
+                             'changed master (see tiles.py)')
+    parser.add_argument('--max-worker-rss', type=int, default=DEFAULT_MAX_RSS_MB, metavar='MB',
+                        help='replace a worker process once its RSS exceeds this after a figure '
+                             '(default: %(default)s; 0 = never; see workers.py)')
+    parser.add_argument('--max-tasks-per-worker', type=int, default=DEFAULT_MAX_TASKS, metavar='N',
+                        help='replace a worker process after N figures (default: never)')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, metavar='SECONDS',
+                        help='stop a figure that renders for longer than this and report it as '
+                             'timed out (default: %(default)s; 0 = no limit)')
+    parser.add_argument('--report', metavar='PATH',
+                        help='where to write the JSON build report (default: '
+                             f'<cache-dir>/{REPORT_NAME}; see report.py)')
+    parser.add_argument('--list', action='store_true',
+                        help='list the matching figures without rendering them')
+    parser.add_argument('--root', default=str(COURSE_ROOT),
+                        help='course root to scan (default: this repository)')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                        help='render cache location (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='re-render every figure and leave the cache untouched')
+    args = parser.parse_args(argv)
+    try:
+        args.formats = parse_formats(args.formats)
+        args.backend = parse_backends(args.backend)
+    except ValueError as error:
+        parser.error(str(error))
+    return args
+
+
+def _worker_failed(args, status, message, seconds):
+    return RenderResult(args[0], status, seconds, [], message, {})
+
+
+def run_tasks(tasks, jobs, formats, optimize=False, backends=None, extents=None, pool=True,
+              reproducible=False, isolated=False, text_cache=True,
+              max_tasks=DEFAULT_MAX_TASKS, max_rss_mb=DEFAULT_MAX_RSS_MB, timeout=DEFAULT_TIMEOUT):
+    """
+    Render tasks across ``jobs`` processes, yielding results as they finish.
+
+    ``extents`` maps a task to its stored tight extent, where one is known.
+    Worker processes are recycled after ``max_tasks`` tasks or above
+    ``max_rss_mb`` of RSS, and stopped when a figure runs longer than
+    ``timeout`` seconds (see ``workers.py``). With one job and no timeout,
+    tasks render in this process unless ``isolated`` is set. With no tasks,
+    the runner (and so matplotlib) is never imported.
+    """
+    if not tasks:
+        return
+    from .runner import render_task
+
+    extents = extents or {}
+    if jobs <= 1 and not isolated and not timeout:
+        for task in tasks:
+            yield render_task(task, formats, optimize, backends, extents.get(task), pool,
+                              reproducible, text_cache)
+        return
+
+    workers = WorkerPool(jobs, max_tasks, max_rss_mb, timeout)
+    jobs = [(task, formats, optimize, backends, extents.get(task), pool, reproducible, text_cache)
+            for task in tasks]
+    for _, result, health in workers.map(render_task, jobs, _worker_failed):
+        if health is not None:
+            result = result._replace(memory=dict(result.memory or {}, **health))
+        yield result
+
+
+def print_summary(results, wall_time, jobs, cache=None, extent_store=None):
+    ok = [result for result in results if result.status not in FAILED_STATUSES]
+    failed = [result for result in results if result.status in FAILED_STATUSES]
+    render_time = sum(result.seconds for result in results)
+    total_bytes = sum(os.path.getsize(path) for result in ok for path in result.outputs
+                      if os.path.exists(path))
+
+    print('=' * 70)
+    print('📊 DaC Build Summary')
+    print(f'   Figures rendered: {len(ok)}/{len(results)}')
+    print(f'   Topics: {len({result.task.topic for result in results})}')
+    print(f'   Workers: {jobs}')
+    print(f'   Wall time: {wall_time:.1f}s | Render time (sum): {render_time:.1f}s | '
+          f'Speedup: {render_time / wall_time if wall_time else 0:.1f}x')
+    print(f'   Output size: {total_bytes / (1024 * 1024):.1f} MB')
+    encoders = {}
+    for result in results:
+        for stage, seconds in result.timings.items():
+            encoders[stage] = encoders.get(stage, 0) + seconds
+    if encoders:
+        print('   Export time (sum): ' + ' | '.join(f'{stage} {seconds:.1f}s'
+                                                   for stage, seconds in encoders.items()))
+    memory = [result.memory for result in results if result.memory]
+    if memory:
+        line = f'   Memory: peak worker RSS {max(item["peak_rss_mb"] for item in memory):.0f} MB'
+        if all('allocations' in item for item in memory):
+            line += (f' | Agg buffers: {sum(item["allocations"] for item in memory)} allocated '
+                     f'({sum(item["allocated_bytes"] for item in memory) / (1024 * 1024):.0f} MB), '
+                     f'{sum(item["reuses"] for item in memory)} reused')
+        print(line)
+    workers = [item for item in memory if 'worker_rss_mb' in item]
+    if workers:
+        retired = [item['retired'] for item in workers if 'retired' in item]
+        print(f'   Worker RSS: up to {max(item["worker_rss_mb"] for item in workers):.0f} MB '
+              f'after a figure | '
+              f'{len(retired)} recycled ({retired.count("rss")} over the RSS ceiling, '
+              f'{retired.count("tasks")} at the task limit)')
+    text = [result.text for result in results if result.text]
+    if text:
+        parts = []
+        for kind in ('layout', 'wrap'):
+            hits = sum(item[f'{kind}_hits'] for item in text)
+            misses = sum(item[f'{kind}_misses'] for item in text)
+            if hits + misses:
+                parts.append(f'{kind}s {hits} reused, {misses} computed '
+                             f'({hits / (hits + misses):.0%} hit rate)')
+        if parts:
+            print('   Text cache: ' + ' | '.join(parts))
+    if cache is not None:
+        print(f'   Cache: {cache.hits} hit(s), {cache.misses} miss(es)')
+    if extent_store is not None:
+        print(f'   Layout: {extent_store.reused} stored extent(s) reused, '
+              f'{extent_store.measured} measured')
+    if results:
+        slowest = max(results, key=lambda result: result.seconds)
+        print(f'   Slowest figure: {slowest.task.key} ({slowest.seconds:.2f}s)')
+    leaks = [result for result in results if result.memory and (
+        result.memory.get('stray_figures') or result.memory.get('retained_figures'))]
+    if leaks:
+        print(f'\n⚠️  Leaked figures ({len(leaks)}):')
+        for result in leaks:
+            parts = []
+            if result.memory.get('stray_figures'):
+                parts.append(f'{result.memory["stray_figures"]} left open (closed by the worker)')
+            if result.memory.get('retained_figures'):
+                parts.append(f'{result.memory["retained_figures"]} still referenced after close '
+                             f'(found after this figure; check the {LEAK_CHECK_INTERVAL} before it '
+                             f'in the same worker)')
+            print(f'   • {result.task.key}: ' + ', '.join(parts))
+    if failed:
+        print(f'\n❌ Failed figures ({len(failed)}):')
+        notes = {'timeout': ' (timed out)', 'error': ' (not rendered)'}
+        for result in failed:
+            print(f'   • {result.task.key}{notes.get(result.status, "")}')
+            print('     ' + result.error.strip().splitlines()[-1])
+
+
+def verify_reproducible(results, jobs, formats, optimize=False, backends=None, pool=True,
+                        text_cache=True, max_tasks=DEFAULT_MAX_TASKS, max_rss_mb=DEFAULT_MAX_RSS_MB,
+                        timeout=DEFAULT_TIMEOUT):
+    """
+    Render the figures of ``results`` again in fresh worker processes.
+
+    Returns ``(changed, total)``: the outputs whose bytes differ from the
+    first pass (every output of a figure that fails the second pass counts),
+    and how many outputs were compared.
+    """
+    first = {result.task: {path: file_digest(path) for path in result.outputs}
+             for result in results if result.status == 'ok'}
+    changed = []
+    for result in run_tasks(list(first), jobs, formats, optimize, backends,
+                            pool=pool, reproducible=True, isolated=True, text_cache=text_cache,
+                            max_tasks=max_tasks, max_rss_mb=max_rss_mb, timeout=timeout):
+        digests = first[result.task]
+        if result.status != 'ok':
+            changed.extend(digests)
+        else:
+            changed.extend(path for path in digests
+                           if path not in result.outputs or digests[path] != file_digest(path))
+    return sorted(changed), sum(len(digests) for digests in first.values())
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # A script that does not parse is reported, not fatal to the rest of the build
+    errors = []
+    tasks = discover_tasks(args.root, topics=args.topic, figures=args.figure, errors=errors)
+    broken = [RenderResult(task, 'error', 0.0, [], error, {}) for task, error in errors]
+
+    if args.list:
+        for task in tasks:
+            print(task.key)
+        print(f'\n{len(tasks)} figures')
+        for result in broken:
+            print(f'❌ {result.task.key}: {result.error.strip().splitlines()[-1]}')
+        return 1 if broken else 0
+
+    if not tasks and not broken:
+        print('❌ No figures matched the given filters')
+        return 1
+
+    if args.verify_reproducible:
+        args.reproducible = args.no_cache = True
+    epoch = None
+    if args.reproducible:
+        # Inherited by the workers; matplotlib and build_datetime() read it
+        epoch = os.environ['SOURCE_DATE_EPOCH'] = source_date_epoch(args.root)
+
+    hasher = SourceHasher()
+    cache = None if args.no_cache else RenderCache(args.cache_dir, args.formats, args.optimize,
+                                                   args.backend, hasher, epoch)
+    extent_store = None
+    if not args.no_cache and args.layout == 'fixed':
+        extent_store = ExtentStore(args.cache_dir, hasher)
+    start = time.perf_counter()
+    results = []
+
+    planned = tasks + [result.task for result in broken]
+
+    def report(result):
+        results.append(result)
+        marker = {'ok': '✅', 'cached': '♻️ ', 'timeout': '⏱️ '}.get(result.status, '❌')
+        print(f'{marker} [{len(results):3d}/{len(planned)}] {result.task.key} '
+              f'({result.seconds:.2f}s)')
+
+    pending, cached, keys = [], [], {}
+    for task in tasks:
+        if cache is None:
+            pending.append(task)
+            continue
+        lookup_start = time.perf_counter()
+        try:
+            keys[task] = cache.key(task)
+        except (SyntaxError, ValueError, OSError):
+            # A toolkit module or spec the figure reads is broken; it would not render either
+            broken.append(RenderResult(task, 'error', time.perf_counter() - lookup_start, [],
+                                       traceback.format_exc(), {}))
+            continue
+        outputs = cache.restore(keys[task], task)
+        if outputs is None:
+            pending.append(task)
+        else:
+            cached.append(RenderResult(task, 'cached', time.perf_counter() - lookup_start,
+                                       outputs, None, {}))
+
+    extent_keys, extents = {}, {}
+    if extent_store is not None:
+        for task in pending:
+            extent_keys[task] = extent_store.key(task)
+            extent = extent_store.load(extent_keys[task])
+            if extent is not None:
+                extents[task] = extent
+
+    jobs = max(1, min(args.jobs, len(pending) or 1))
+    print(f'🎨 Rendering {len(pending)} of {len(tasks)} figures with {jobs} worker(s) '
+          f'as {", ".join(export_format.label for export_format in args.formats)}...')
+    print('=' * 70)
+    for result in broken + cached:
+        report(result)
+
+    for result in run_tasks(pending, jobs, args.formats, args.optimize, args.backend, extents,
+                            not args.no_pool, args.reproducible, args.verify_reproducible,
+                            not args.no_text_cache, args.max_tasks_per_worker,
+                            args.max_worker_rss, args.timeout):
+        if cache is not None and result.status == 'ok':
+            cache.store(keys[result.task], result.task, result.outputs)
+        if extent_store is not None and result.status == 'ok':
+            if result.task in extents:
+                extent_store.reused += 1
+            elif result.extent is not None:
+                extent_store.store(extent_keys[result.task], result.task, result.extent)
+                extent_store.measured += 1
+        report(result)
+    wall_time = time.perf_counter() - start
+
+    print_summary(results, wall_time, jobs, cache, extent_store)
+    status = 0 if all(result.status not in FAILED_STATUSES for result in results) else 1
+    report_path = args.report or os.path.join(args.cache_dir, REPORT_NAME)
+    write_report(report_path, build_report(results, planned, wall_time, jobs, args.formats,
+                                           args.timeout, args.root))
+    shown = os.path.relpath(report_path, args.root)
+    print(f'📝 Build report: {report_path if shown.startswith(os.pardir) else shown}')
+
+    if args.verify_reproducible:
+        print(f'\n🔁 Rendering {len(pending)} figures again to verify reproducibility...')
+        changed, total = verify_reproducible(results, jobs, args.formats, args.optimize,
+                                             args.backend, not args.no_pool,
+                                             not args.no_text_cache, args.max_tasks_per_worker,
+                                             args.max_worker_rss, args.timeout)
+        if changed:
+            print(f'❌ {len(changed)} of {total} outputs differ between the two passes:')
+            for path in changed:
+                print(f'   • {os.path.relpath(path, args.root)}')
+            status = 1
+        else:
+            print(f'✅ All {total} outputs are byte-identical across both passes')
+
+    if args.derivatives:
+        from .derivatives import build_derivatives, find_masters
+        from .derivatives import print_summary as print_derivatives_summary
+
+        masters = find_masters(args.root, topics=args.topic, figures=args.figure)
+        print(f'\n🖼️  Refreshing web variants of {len(masters)} masters...')
+        start = time.perf_counter()
+        derived = build_derivatives(masters, args.jobs)
+        print_derivatives_summary(derived, time.perf_counter() - start)
+        if any(result.status == 'failed' for result in derived):
+            status = 1
+
+    if args.tiles:
+        from .derivatives import find_masters
+        from .tiles import build_tiles
+        from .tiles import print_summary as print_tiles_summary
+
+        masters = find_masters(args.root, topics=args.topic, figures=args.figure)
+        print(f'\n🧩 Refreshing tile pyramids of {len(masters)} masters...')
+        start = time.perf_counter()
+        tiled = build_tiles(masters, args.jobs)
+        print_tiles_summary(tiled, time.perf_counter() - start)
+        if any(result.status == 'failed' for result in tiled):
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
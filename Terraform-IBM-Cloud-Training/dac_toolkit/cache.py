@@ -0,0 +1,316 @@
+"""
+Content-addressed render cache for DaC figures.
+
+The cache key of a figure is a SHA-256 over everything that can change its
+pixels:
+
+- the figure function's code, plus the module-level helpers, classes and
+  constants it reads (``IBM_COLORS``, ``COLORS``, ``FONT_SIZES``,
+  ``create_rounded_box`` ...), followed transitively;
+- the script's ``STYLE``, ``SAVEFIG_OPTIONS`` and ``OUTPUT_DIR`` constants
+  and any other module-level statements;
+- the source of every ``dac_toolkit`` module the script imports (shared
+  primitives such as ``dac_toolkit.gradient``), and of the toolkit modules
+  those import in turn;
+- every diagram spec file (``specs/*.json``, see ``spec.py``) the figure
+  names, as the digest of its canonical form;
+- the output path, export formats and backends, default save settings,
+  whether PNGs are palette-optimized, and the matplotlib version;
+- the bundled fonts and the installed font list (see ``fonts.fonts_digest``).
+
+Code is hashed as a normalised AST dump, so comment and whitespace edits do
+not invalidate a figure. Keys are computed from the source alone, and the
+build only imports the render runner when a figure misses, so a fully
+cached build never imports matplotlib or the scripts.
+
+Layout on disk::
+
+    <cache_dir>/keys/<key>.json          manifest: output path -> blob hash
+    <cache_dir>/blobs/<aa>/<sha256>      PNG bytes, shared by identical files
+"""
+
+import ast
+import hashlib
+import json
+import os
+import shutil
+from importlib import metadata
+
+from .discovery import COURSE_ROOT
+from .export import DEFAULT_FORMATS
+from .fonts import fonts_digest
+from .spec import SPEC_EXTENSIONS, SPECS_DIR, SpecError, load_spec, spec_digest
+from .tasks import SAVE_SETTINGS
+
+# Module-level settings every figure of a script depends on
+SCRIPT_SETTINGS = ('STYLE', 'SAVEFIG_OPTIONS', 'OUTPUT_DIR')
+
+# Bump to invalidate every entry when the key recipe changes
+CACHE_FORMAT = 3
+
+DEFAULT_CACHE_DIR = COURSE_ROOT / '.dac_cache'
+
+TOOLKIT_PACKAGE = __name__.split('.')[0]
+
+
+def _package_version(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return 'not-installed'
+
+
+def toolkit_path(module):
+    """Source file of a dac_toolkit module such as ``dac_toolkit.batching``."""
+    return COURSE_ROOT.joinpath(*module.split('.')).with_suffix('.py')
+
+
+class _ScriptIndex:
+    """Module-level definitions of one script, keyed by the name they bind."""
+
+    def __init__(self, script):
+        with open(script, encoding='utf-8') as handle:
+            tree = ast.parse(handle.read(), filename=script)
+        self.definitions = {}
+        self.setup = []
+        self.toolkit_modules = []
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+                self.definitions[node.name] = node
+                if isinstance(node, ast.ClassDef):
+                    for item in node.body:
+                        if isinstance(item, ast.FunctionDef):
+                            self.definitions[f'{node.name}.{item.name}'] = item
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                names = [target.id for target in targets if isinstance(target, ast.Name)]
+                for name in names:
+                    self.definitions[name] = node
+                if not names:
+                    self.setup.append(node)
+            elif isinstance(node, ast.ImportFrom):
+                if (node.module or '').split('.')[0] == TOOLKIT_PACKAGE:
+                    self.toolkit_modules.append(node.module)
+            elif isinstance(node, ast.Import):
+                continue
+            elif isinstance(node, ast.If) and '__main__' in ast.dump(node.test):
+                continue
+            else:
+                self.setup.append(node)
+
+    def closure(self, qualname, extra=()):
+        """Names of every definition reachable from ``qualname`` and ``extra``."""
+        class_name = qualname.split('.')[0] if '.' in qualname else None
+        seen = set()
+        pending = [qualname, *extra]
+        if class_name and f'{class_name}.__init__' in self.definitions:
+            pending.append(f'{class_name}.__init__')
+        while pending:
+            name = pending.pop()
+            if name in seen or name not in self.definitions:
+                continue
+            seen.add(name)
+            for child in ast.walk(self.definitions[name]):
+                if isinstance(child, ast.Name):
+                    pending.append(child.id)
+                elif (class_name and isinstance(child, ast.Attribute)
+                      and isinstance(child.value, ast.Name) and child.value.id == 'self'):
+                    pending.append(f'{class_name}.{child.attr}')
+        return seen
+
+
+class SourceHasher:
+    """Hashes the source a figure depends on; script indexes are kept per build."""
+
+    def __init__(self):
+        self._indexes = {}
+        self._toolkit_sources = {}
+        self._spec_digests = {}
+
+    def _index(self, script):
+        stamp = os.stat(script).st_mtime_ns
+        cached = self._indexes.get(script)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, _ScriptIndex(script))
+            self._indexes[script] = cached
+        return cached[1]
+
+    def _toolkit_source(self, module):
+        """Normalised AST dump of a dac_toolkit module, read again only once it is saved."""
+        path = toolkit_path(module)
+        stamp = os.stat(path).st_mtime_ns
+        cached = self._toolkit_sources.get(module)
+        if cached is None or cached[0] != stamp:
+            tree = ast.parse(path.read_text(encoding='utf-8'), filename=str(path))
+            package = module.rsplit('.', 1)[0]
+            imports = sorted({f'{package}.{node.module}' for node in ast.walk(tree)
+                              if isinstance(node, ast.ImportFrom) and node.level == 1
+                              and node.module})
+            cached = self._toolkit_sources[module] = (stamp, ast.dump(tree), imports)
+        return cached[1]
+
+    def toolkit_imports(self, module):
+        """The toolkit modules ``module`` imports."""
+        self._toolkit_source(module)
+        return self._toolkit_sources[module][2]
+
+    def _toolkit_closure(self, modules):
+        """``modules`` plus every toolkit module they import, transitively."""
+        seen = set()
+        pending = list(modules)
+        while pending:
+            module = pending.pop()
+            if module in seen:
+                continue
+            seen.add(module)
+            pending.extend(self.toolkit_imports(module))
+        return sorted(seen)
+
+    def toolkit_modules(self, task):
+        """Every toolkit module the task's script imports, directly or not."""
+        return self._toolkit_closure(self._index(task.script).toolkit_modules)
+
+    def _spec_digest(self, path):
+        """Canonical digest of a spec file, or of its bytes if it does not parse."""
+        try:
+            stamp = os.stat(path).st_mtime_ns
+        except OSError:
+            return 'missing'
+        cached = self._spec_digests.get(path)
+        if cached is None or cached[0] != stamp:
+            try:
+                digest = spec_digest(load_spec(path))
+            except SpecError:
+                digest = file_digest(path)
+            cached = (stamp, digest)
+            self._spec_digests[path] = cached
+        return cached[1]
+
+    def _spec_files(self, task, definitions):
+        """Spec files named by string literals in ``definitions``, resolved in the DaC directory."""
+        names = sorted({node.value for definition in definitions for node in ast.walk(definition)
+                        if isinstance(node, ast.Constant) and isinstance(node.value, str)
+                        and node.value.lower().endswith(SPEC_EXTENSIONS)})
+        paths = []
+        for name in names:
+            candidates = [os.path.join(task.dac_dir, name),
+                          os.path.join(task.dac_dir, SPECS_DIR, name)]
+            paths.append(next((path for path in candidates if os.path.exists(path)),
+                              candidates[-1]))
+        return paths
+
+    def files(self, task):
+        """
+        Every file the task's digest reads: its script, the toolkit modules
+        it imports and the spec files it names. Raises SyntaxError while the
+        script or a toolkit module does not parse.
+        """
+        index = self._index(task.script)
+        names = index.closure(task.function, SCRIPT_SETTINGS)
+        return ([task.script] + [str(toolkit_path(module)) for module in self.toolkit_modules(task)]
+                + self._spec_files(task, [index.definitions[name] for name in names]))
+
+    def digest(self, task, environment):
+        """SHA-256 over ``environment`` (a string) and the task's source closure."""
+        index = self._index(task.script)
+        digest = hashlib.sha256()
+        digest.update(environment.encode())
+        digest.update(f'{task.function}\0{task.output}\0'.encode())
+        for node in index.setup:
+            digest.update(ast.dump(node).encode())
+        for module in self._toolkit_closure(index.toolkit_modules):
+            digest.update(self._toolkit_source(module).encode())
+        names = sorted(index.closure(task.function, SCRIPT_SETTINGS))
+        for name in names:
+            digest.update(name.encode() + b'\0')
+            digest.update(ast.dump(index.definitions[name]).encode())
+        for path in self._spec_files(task, [index.definitions[name] for name in names]):
+            digest.update(f'{os.path.basename(path)}\0{self._spec_digest(path)}\0'.encode())
+        return digest.hexdigest()
+
+
+class RenderCache:
+    """Restores previously rendered outputs for figures whose inputs are unchanged."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, formats=DEFAULT_FORMATS, optimize=False,
+                 backends=None, hasher=None, reproducible=None):
+        """``reproducible`` is the build's SOURCE_DATE_EPOCH in reproducible mode, else None."""
+        self.cache_dir = str(cache_dir)
+        self.hits = 0
+        self.misses = 0
+        self._hasher = hasher or SourceHasher()
+        environment = {
+            'format': CACHE_FORMAT,
+            'matplotlib': _package_version('matplotlib'),
+            'save': SAVE_SETTINGS,
+            'formats': [export_format.label for export_format in formats],
+            'optimize': optimize,
+            'backends': backends or {},
+        }
+        if reproducible is not None:
+            environment['reproducible'] = reproducible
+        fonts = fonts_digest()
+        if fonts is not None:
+            environment['fonts'] = fonts
+        self._environment = json.dumps(environment, sort_keys=True)
+
+    def key(self, task):
+        """Content hash of everything that determines the task's output."""
+        return self._hasher.digest(task, self._environment)
+
+    def _manifest_path(self, key):
+        return os.path.join(self.cache_dir, 'keys', f'{key}.json')
+
+    def _blob_path(self, blob):
+        return os.path.join(self.cache_dir, 'blobs', blob[:2], blob)
+
+    def restore(self, key, task):
+        """Copy cached outputs into place. Returns their paths, or None on a miss."""
+        try:
+            with open(self._manifest_path(key), encoding='utf-8') as handle:
+                manifest = json.load(handle)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        entries = [(os.path.join(task.dac_dir, relative), self._blob_path(blob), blob)
+                   for relative, blob in manifest['outputs'].items()]
+        if not entries or not all(os.path.exists(blob_path) for _, blob_path, _ in entries):
+            self.misses += 1
+            return None
+
+        for path, blob_path, blob in entries:
+            if not (os.path.exists(path) and file_digest(path) == blob):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                shutil.copyfile(blob_path, path)
+        self.hits += 1
+        return [path for path, _, _ in entries]
+
+    def store(self, key, task, outputs):
+        """Record freshly rendered outputs under ``key``."""
+        if not outputs:
+            return
+        manifest = {'task': task.key, 'outputs': {}}
+        for path in outputs:
+            blob = file_digest(path)
+            blob_path = self._blob_path(blob)
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                shutil.copyfile(path, blob_path + '.tmp')
+                os.replace(blob_path + '.tmp', blob_path)
+            manifest['outputs'][os.path.relpath(path, task.dac_dir)] = blob
+
+        manifest_path = self._manifest_path(key)
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        with open(manifest_path + '.tmp', 'w', encoding='utf-8') as handle:
+            json.dump(manifest, handle, indent=2, sort_keys=True)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,282 @@
+"""
+Web-size derivatives of the 300 DPI master diagrams.
+
+The registry PNGs are print masters (often 4000+ px wide and several hundred
+KB). Lessons and web pages only need a fraction of that. This stage resizes
+each master with Pillow into:
+
+    <OUTPUT_DIR>/web/<stem>-960w.webp     1x content width
+    <OUTPUT_DIR>/web/<stem>-1920w.webp    2x (HiDPI) content width
+    <OUTPUT_DIR>/web/<stem>-320w.webp     thumbnail
+
+and records them in ``<OUTPUT_DIR>/web/manifest.json``::
+
+    {"figure_6_2_1_locking.png": {"sha256": "...", "width": 4770, "height": 3561,
+                                  "variants": {"1x": {"path": "figure_6_2_1_locking-960w.webp",
+                                                      "width": 960, "height": 717,
+                                                      "bytes": 48210}, ...}}}
+
+Only masters whose SHA-256 differs from the manifest (or whose variant files
+are missing, or whose variant settings changed) are reprocessed, in a
+process pool. Masters narrower than a variant are never upscaled.
+
+Usage (from the Terraform-IBM-Cloud-Training directory):
+    python3 -m dac_toolkit.derivatives --jobs 4 --topic 06-State-Management
+    python3 build_diagrams.py --derivatives
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .cache import file_digest
+from .discovery import COURSE_ROOT, discover_tasks
+
+
+class Variant(namedtuple('Variant', 'name width extension')):
+    """One resized copy of a master: manifest name, target width in px, format."""
+
+    __slots__ = ()
+
+    @property
+    def settings(self):
+        return {'width': self.width, 'extension': self.extension,
+                'options': ENCODER_OPTIONS.get(self.extension, {})}
+
+
+VARIANTS = (
+    Variant('2x', 1920, 'webp'),
+    Variant('1x', 960, 'webp'),
+    Variant('thumb', 320, 'webp'),
+)
+
+# Pillow save options per output format
+ENCODER_OPTIONS = {
+    'webp': {'quality': 85, 'method': 4},
+    'png': {'optimize': True},
+    'jpg': {'quality': 85, 'optimize': True, 'progressive': True},
+}
+
+# Sub-directory of each OUTPUT_DIR that holds the derivatives and manifest
+DERIVED_DIR = 'web'
+MANIFEST_NAME = 'manifest.json'
+
+# status is 'ok', 'unchanged' or 'failed'; entry is the master's manifest entry
+DerivativeResult = namedtuple('DerivativeResult', 'master status seconds entry error')
+
+
+def resample_source(image):
+    """
+    ``image`` in a mode Pillow can resample: RGB if it is fully opaque, else RGBA.
+
+    matplotlib writes RGBA even for opaque figures; three channels resize
+    faster. Palette masters (optimize.py) must be expanded to resample.
+    """
+    source = image if image.mode == 'RGB' else image.convert('RGBA')
+    if source.mode == 'RGBA' and source.getchannel('A').getextrema() == (255, 255):
+        source = source.convert('RGB')
+    return source
+
+
+def derived_dir(master):
+    return os.path.join(os.path.dirname(master), DERIVED_DIR)
+
+
+def variant_path(master, variant):
+    """Path of ``variant`` for ``master``."""
+    stem = os.path.splitext(os.path.basename(master))[0]
+    return os.path.join(derived_dir(master), f'{stem}-{variant.width}w.{variant.extension}')
+
+
+def find_masters(root=COURSE_ROOT, topics=None, figures=None):
+    """Absolute paths of the rendered registry PNGs, in build order (empty files are skipped)."""
+    masters = []
+    for task in discover_tasks(root, topics=topics, figures=figures):
+        path = os.path.join(task.dac_dir, task.output)
+        if path.endswith('.png') and os.path.isfile(path) and os.path.getsize(path) \
+                and path not in masters:
+            masters.append(path)
+    return masters
+
+
+def load_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), encoding='utf-8') as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST_NAME)
+    os.makedirs(directory, exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+        handle.write('\n')
+    os.replace(path + '.tmp', path)
+
+
+def is_current(master, entry, digest, variants=VARIANTS):
+    """True if ``entry`` already describes every variant of this exact master."""
+    if not entry or entry.get('sha256') != digest:
+        return False
+    recorded = entry.get('variants', {})
+    for variant in variants:
+        item = recorded.get(variant.name)
+        if item is None or item.get('settings') != variant.settings:
+            return False
+        if not os.path.exists(os.path.join(derived_dir(master), item['path'])):
+            return False
+    return True
+
+
+def derive_master(master, digest, variants=VARIANTS):
+    """Write every variant of one master and return its manifest entry. Never raises."""
+    from PIL import Image
+
+    start = time.perf_counter()
+    try:
+        with Image.open(master) as image:
+            image.load()
+            width, height = image.size
+            entry = {'sha256': digest, 'width': width, 'height': height,
+                     'bytes': os.path.getsize(master), 'variants': {}}
+            os.makedirs(derived_dir(master), exist_ok=True)
+            source = resample_source(image)
+            # Largest first, each variant resized from the previous one: only the
+            # first pass touches the full-size master
+            for variant in sorted(variants, key=lambda variant: -variant.width):
+                size = (min(variant.width, width),
+                        max(1, round(height * min(variant.width, width) / width)))
+                # reducing_gap lets Pillow box-reduce by whole factors before the
+                # Lanczos pass, which is most of the speed on 4000+ px masters
+                resized = source if size == source.size else \
+                    source.resize(size, Image.LANCZOS, reducing_gap=3.0)
+                source = resized
+                path = variant_path(master, variant)
+                resized.save(path + '.tmp', format=Image.registered_extensions()[
+                    f'.{variant.extension}'], **ENCODER_OPTIONS.get(variant.extension, {}))
+                os.replace(path + '.tmp', path)
+                entry['variants'][variant.name] = {
+                    'path': os.path.basename(path), 'width': size[0], 'height': size[1],
+                    'bytes': os.path.getsize(path), 'settings': variant.settings}
+        return DerivativeResult(master, 'ok', time.perf_counter() - start, entry, None)
+    except Exception:
+        return DerivativeResult(master, 'failed', time.perf_counter() - start, None,
+                                traceback.format_exc())
+
+
+def build_derivatives(masters, jobs=1, variants=VARIANTS, force=False, report=None):
+    """
+    Bring the derivatives of ``masters`` up to date and update their manifests.
+
+    Returns the DerivativeResults, one per master; ``report`` is called with
+    each result as it arrives.
+    """
+    manifests, pending, results = {}, [], []
+    for master in masters:
+        directory = derived_dir(master)
+        if directory not in manifests:
+            manifests[directory] = load_manifest(directory)
+        digest = file_digest(master)
+        entry = manifests[directory].get(os.path.basename(master))
+        if not force and is_current(master, entry, digest, variants):
+            results.append(DerivativeResult(master, 'unchanged', 0.0, entry, None))
+        else:
+            pending.append((master, digest))
+
+    for result in results:
+        if report:
+            report(result)
+
+    jobs = max(1, min(jobs, len(pending) or 1))
+    if jobs == 1:
+        fresh = (derive_master(master, digest, variants) for master, digest in pending)
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        futures = [executor.submit(derive_master, master, digest, variants)
+                   for master, digest in pending]
+        fresh = (future.result() for future in as_completed(futures))
+    try:
+        for result in fresh:
+            results.append(result)
+            if result.status == 'ok':
+                manifests[derived_dir(result.master)][os.path.basename(result.master)] = result.entry
+            if report:
+                report(result)
+    finally:
+        if jobs > 1:
+            executor.shutdown()
+
+    for directory, manifest in manifests.items():
+        # Drop entries whose master has been removed from the output directory
+        masters_dir = os.path.dirname(directory)
+        for name in [name for name in manifest if not os.path.exists(os.path.join(masters_dir, name))]:
+            del manifest[name]
+        save_manifest(directory, manifest)
+    return results
+
+
+def print_summary(results, wall_time):
+    done = [result for result in results if result.status != 'failed']
+    failed = [result for result in results if result.status == 'failed']
+    master_bytes = sum(result.entry['bytes'] for result in done)
+    print('=' * 70)
+    print('🖼️  Derivatives Summary')
+    print(f'   Masters: {len(done)}/{len(results)} '
+          f'({sum(result.status == "ok" for result in results)} resized, '
+          f'{sum(result.status == "unchanged" for result in results)} unchanged)')
+    print(f'   Wall time: {wall_time:.1f}s')
+    names = sorted({name for result in done for name in result.entry['variants']})
+    for name in names:
+        variant_bytes = sum(result.entry['variants'][name]['bytes'] for result in done
+                            if name in result.entry['variants'])
+        share = variant_bytes / master_bytes if master_bytes else 0
+        print(f'   {name:>6}: {variant_bytes / (1024 * 1024):6.1f} MB ({share:.0%} of the masters)')
+    if failed:
+        print(f'\n❌ Failed masters ({len(failed)}):')
+        for result in failed:
+            print(f'   • {os.path.relpath(result.master, COURSE_ROOT)}')
+            print('     ' + result.error.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Create web-size and thumbnail variants of the DaC master PNGs.')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes (default: all cores)')
+    parser.add_argument('-t', '--topic', action='append', default=[],
+                        help='only process topics matching this substring or glob (repeatable)')
+    parser.add_argument('-f', '--figure', action='append', default=[],
+                        help='only process figures whose function or file name matches (repeatable)')
+    parser.add_argument('--force', action='store_true',
+                        help='regenerate every variant even if the master is unchanged')
+    parser.add_argument('--root', default=str(COURSE_ROOT),
+                        help='course root to scan (default: this repository)')
+    args = parser.parse_args(argv)
+
+    masters = find_masters(args.root, topics=args.topic, figures=args.figure)
+    if not masters:
+        print('❌ No rendered masters matched the given filters')
+        return 1
+
+    print(f'🖼️  Checking {len(masters)} masters against their manifests...')
+    print('=' * 70)
+    start = time.perf_counter()
+
+    def report(result):
+        marker = {'ok': '✅', 'unchanged': '♻️ '}.get(result.status, '❌')
+        print(f'{marker} {os.path.relpath(result.master, args.root)} ({result.seconds:.2f}s)')
+
+    results = build_derivatives(masters, args.jobs, force=args.force, report=report)
+    print_summary(results, time.perf_counter() - start)
+    return 0 if all(result.status != 'failed' for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
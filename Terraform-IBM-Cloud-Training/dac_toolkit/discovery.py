@@ -0,0 +1,131 @@
+"""
+Figure discovery for the DaC build.
+
+The diagram scripts are parsed with ``ast`` rather than imported, so listing
+and filtering the ~100 figures in the course tree costs milliseconds.
+
+Every script exposes a module-level registry::
+
+    FIGURES = {'figure_6_1_1_state_lifecycle.png': diagram_1_state_lifecycle, ...}
+
+mapping an output file name (relative to ``OUTPUT_DIR``) to a builder that
+returns a matplotlib ``Figure``. Builders may also be bound methods of a
+module-level instance (``_generator.create_...``); they are reported as
+``'Class.method'``.
+"""
+
+import ast
+import fnmatch
+import traceback
+from pathlib import Path
+
+from .tasks import FigureTask
+
+# Training course root (the directory that holds the numbered topic folders)
+COURSE_ROOT = Path(__file__).resolve().parent.parent
+
+# Glob used to locate the per-topic diagram scripts
+SCRIPT_PATTERN = '*/*/DaC/*_diagrams.py'
+
+# Name of the figure registry every script defines
+REGISTRY_NAME = 'FIGURES'
+
+DEFAULT_OUTPUT_DIR = 'generated_diagrams'
+
+
+def find_diagram_scripts(root=COURSE_ROOT):
+    """Return every DaC diagram script below ``root`` in topic order."""
+    return sorted(Path(root).glob(SCRIPT_PATTERN))
+
+
+def topic_of(script, root=COURSE_ROOT):
+    """Topic folder of a script, relative to the course root."""
+    return Path(script).resolve().parent.parent.relative_to(Path(root).resolve()).as_posix()
+
+
+def _module_constant(tree, name):
+    """Value node of the module-level ``name = ...`` assignment, if any."""
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id == name:
+                    return node.value
+    return None
+
+
+def _builder_name(node, tree):
+    """Qualified builder name for one registry value node."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+        instance = _module_constant(tree, node.value.id)
+        if isinstance(instance, ast.Call) and isinstance(instance.func, ast.Name):
+            return f'{instance.func.id}.{node.attr}'
+    raise ValueError(f'unsupported {REGISTRY_NAME} entry: {ast.unparse(node)}')
+
+
+def discover_figures(script, root=COURSE_ROOT):
+    """Return the FigureTasks registered by one diagram script, in registry order."""
+    script = Path(script).resolve()
+    tree = ast.parse(script.read_text(encoding='utf-8'), filename=str(script))
+    topic = topic_of(script, root)
+
+    registry = _module_constant(tree, REGISTRY_NAME)
+    if not isinstance(registry, ast.Dict):
+        return []
+    output_dir = _module_constant(tree, 'OUTPUT_DIR')
+    output_dir = output_dir.value if isinstance(output_dir, ast.Constant) else DEFAULT_OUTPUT_DIR
+
+    tasks = []
+    for key, value in zip(registry.keys, registry.values):
+        name = ast.literal_eval(key)
+        tasks.append(FigureTask(topic, str(script), name, _builder_name(value, tree),
+                                f'{output_dir}/{name}'))
+    return tasks
+
+
+def _matches(value, patterns):
+    value = value.lower()
+    for pattern in patterns:
+        pattern = pattern.lower()
+        if pattern in value or fnmatch.fnmatch(value, pattern):
+            return True
+    return False
+
+
+def script_task(script, root=COURSE_ROOT):
+    """
+    Stand-in task for a whole script whose figures cannot be discovered; its
+    ``function`` is the script's file name and it has no ``name`` or ``output``.
+    """
+    script = Path(script).resolve()
+    return FigureTask(topic_of(script, root), str(script), None, script.name, None)
+
+
+def discover_tasks(root=COURSE_ROOT, topics=None, figures=None, errors=None):
+    """
+    Discover every figure in the course tree.
+
+    topics  -- optional patterns (substring or glob) matched against the topic
+    figures -- optional patterns matched against the function name and output
+    errors  -- optional list; a script that does not parse or has an
+               unsupported registry is skipped and ``(script_task(script),
+               traceback)`` appended here. Without it the error is raised.
+    """
+    tasks = []
+    for script in find_diagram_scripts(root):
+        if topics and not _matches(topic_of(script, root), topics):
+            continue
+        try:
+            discovered = discover_figures(script, root)
+        except (SyntaxError, ValueError, OSError):
+            if errors is None:
+                raise
+            errors.append((script_task(script, root), traceback.format_exc()))
+            continue
+        for task in discovered:
+            if figures and not _matches(task.function, figures) and \
+                    not _matches(task.name, figures):
+                continue
+            tasks.append(task)
+    return tasks
@@ -0,0 +1,142 @@
+"""
+Multi-format export for DaC figures.
+
+A figure is laid out once: the layout pass runs a single draw without
+rendering and computes the tight bounding box. That box is then reused for
+every requested format and DPI. Each ``savefig`` call therefore only does its
+own encoder draw, instead of repeating the layout pass that
+``bbox_inches='tight'`` normally runs per call. A box stored by an earlier
+build (``extent.py``) skips the layout pass altogether.
+
+Formats are given as ``ext`` or ``ext@dpi``::
+
+    png            script DPI (SAVEFIG_OPTIONS, usually 300) -> <name>.png
+    png@150        150 DPI                                   -> <name>-150dpi.png
+    svg, pdf       vector                                    -> <name>.svg, <name>.pdf
+    webp@150       150 DPI WebP (needs Pillow with WebP)     -> <name>-150dpi.webp
+
+Parsing is kept free of matplotlib imports so the build driver can plan a
+build (and serve cache hits) without paying the plotting import cost.
+"""
+
+import os
+import time
+from collections import namedtuple
+
+from .reproducible import save_options
+
+# Encoders matplotlib can write (WebP and JPEG go through Pillow)
+SUPPORTED_FORMATS = ('png', 'svg', 'pdf', 'webp', 'jpg', 'jpeg', 'tif', 'tiff', 'eps', 'ps')
+
+# Resolution-independent formats: DPI only affects rasterized artists
+VECTOR_FORMATS = ('svg', 'pdf', 'eps', 'ps')
+
+
+class ExportFormat(namedtuple('ExportFormat', 'extension dpi')):
+    """One output encoding; ``dpi`` None means the script's own DPI."""
+
+    __slots__ = ()
+
+    @property
+    def label(self):
+        return self.extension if self.dpi is None else f'{self.extension}@{self.dpi}'
+
+
+# What a build writes when no formats are requested: the registry PNG
+DEFAULT_FORMATS = (ExportFormat('png', None),)
+
+
+def parse_formats(specs):
+    """
+    Turn ``['png', 'svg,pdf', 'webp@150']`` into a tuple of ExportFormats.
+
+    Raises ValueError for unknown formats or invalid DPI values.
+    """
+    if isinstance(specs, str):
+        specs = [specs]
+    formats = []
+    for spec in specs:
+        for item in filter(None, (part.strip().lower() for part in spec.split(','))):
+            extension, _, dpi = item.partition('@')
+            if extension not in SUPPORTED_FORMATS:
+                raise ValueError(f'unsupported format {extension!r} '
+                                 f'(choose from {", ".join(SUPPORTED_FORMATS)})')
+            if dpi and (not dpi.isdigit() or int(dpi) <= 0):
+                raise ValueError(f'invalid DPI in {item!r}')
+            export_format = ExportFormat(extension, int(dpi) if dpi else None)
+            if export_format not in formats:
+                formats.append(export_format)
+    return tuple(formats) or DEFAULT_FORMATS
+
+
+def output_path(base_path, export_format):
+    """Path for ``export_format`` next to ``base_path`` (the registry output)."""
+    stem = os.path.splitext(base_path)[0]
+    suffix = ''
+    if export_format.dpi is not None and export_format.extension not in VECTOR_FORMATS:
+        suffix = f'-{export_format.dpi}dpi'
+    return f'{stem}{suffix}.{export_format.extension}'
+
+
+def export_figure(fig, base_path, formats=DEFAULT_FORMATS, savefig_options=None, backends=None,
+                  extent=None, reproducible=False):
+    """
+    Write ``fig`` once per format from a single layout pass.
+
+    ``backends`` optionally maps an extension to the backend that writes it
+    (``{'png': 'cairo'}``, see ``backends.py``); other formats use
+    matplotlib's default for the format. ``extent`` is a previously
+    measured tight box ``(x0, y0, x1, y1)`` in inches (see ``extent.py``);
+    when given, the layout pass is skipped and the box is used as a fixed crop.
+    ``reproducible`` strips version and date metadata and pins encoder
+    settings (see ``reproducible.py``).
+
+    Returns ``(paths, timings, extent)``: the files written, seconds per
+    stage keyed ``'layout'`` and each format label (``'png'``,
+    ``'webp@150'`` ...), and the tight extent used (None if the save
+    options do not crop tightly).
+    """
+    import matplotlib
+    from matplotlib.transforms import Bbox
+
+    options = dict(savefig_options or {})
+    timings = {}
+
+    start = time.perf_counter()
+    if options.get('bbox_inches') == 'tight':
+        pad = options.pop('pad_inches', None)
+        if extent is not None:
+            options['bbox_inches'] = Bbox.from_extents(*extent)
+        else:
+            if pad is None:
+                pad = matplotlib.rcParams['savefig.pad_inches']
+            dpi = options.get('dpi', matplotlib.rcParams['savefig.dpi'])
+            # Lay out at the primary save DPI, as savefig itself would
+            figure_dpi = fig.dpi
+            fig.dpi = figure_dpi if dpi == 'figure' else dpi
+            try:
+                fig.draw_without_rendering()
+                options['bbox_inches'] = fig.get_tightbbox().padded(pad)
+            finally:
+                fig.dpi = figure_dpi
+        extent = tuple(float(value) for value in options['bbox_inches'].extents)
+    else:
+        extent = None
+    timings['layout'] = time.perf_counter() - start
+
+    paths = []
+    for export_format in formats:
+        path = output_path(base_path, export_format)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        format_options = dict(options, format=export_format.extension)
+        if export_format.dpi is not None:
+            format_options['dpi'] = export_format.dpi
+        if backends and export_format.extension in backends:
+            format_options['backend'] = backends[export_format.extension]
+        if reproducible:
+            format_options.update(save_options(export_format.extension))
+        start = time.perf_counter()
+        fig.savefig(path, **format_options)
+        timings[export_format.label] = time.perf_counter() - start
+        paths.append(path)
+    return paths, timings, extent
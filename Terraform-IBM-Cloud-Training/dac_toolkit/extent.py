@@ -0,0 +1,75 @@
+"""
+Stored tight extents for DaC figures.
+
+Every script saves with ``bbox_inches='tight'``, which needs a full layout
+pass (every text extent measured) before the real draw. The result, the
+padded bounding box in inches, only changes when the figure does. The
+first build measures it once and stores it. Later builds pass the stored
+box to ``savefig`` as a fixed crop, so each save is a single draw.
+
+An extent is stored under a hash of the same source closure the render
+cache uses: the builder, the helpers and constants it reads, the script
+settings and the imported ``dac_toolkit`` modules. The hash also covers
+the matplotlib version, the default save settings and the same fonts
+digest as the render cache (bundled fonts and the installed font list),
+since fonts set every text extent. Any edit that can move an artist, or a
+font installed or removed, therefore invalidates the extent automatically.
+
+Figures are assumed to be deterministic. A ``Generated: <date>`` footer
+is fine because its digits keep the same width.
+
+Layout on disk::
+
+    <cache_dir>/extents/<key>.json    {"task": ..., "extent": [x0, y0, x1, y1]}
+"""
+
+import json
+import os
+
+from .cache import DEFAULT_CACHE_DIR, SourceHasher, _package_version
+from .fonts import fonts_digest
+from .tasks import SAVE_SETTINGS
+
+# Bump to invalidate every stored extent when the recipe changes
+EXTENT_FORMAT = 2
+
+
+class ExtentStore:
+    """Tight bounding boxes (inches, padded) of previously laid out figures."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, hasher=None):
+        self.directory = os.path.join(str(cache_dir), 'extents')
+        self.reused = 0
+        self.measured = 0
+        self._hasher = hasher or SourceHasher()
+        environment = {
+            'extent': EXTENT_FORMAT,
+            'matplotlib': _package_version('matplotlib'),
+            'save': SAVE_SETTINGS,
+        }
+        fonts = fonts_digest()
+        if fonts is not None:
+            environment['fonts'] = fonts
+        self._environment = json.dumps(environment, sort_keys=True)
+
+    def key(self, task):
+        return self._hasher.digest(task, self._environment)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def load(self, key):
+        """The stored ``(x0, y0, x1, y1)`` extent for ``key``, or None."""
+        try:
+            with open(self._path(key), encoding='utf-8') as handle:
+                extent = tuple(json.load(handle)['extent'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return extent if len(extent) == 4 else None
+
+    def store(self, key, task, extent):
+        path = self._path(key)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path + '.tmp', 'w', encoding='utf-8') as handle:
+            json.dump({'task': task.key, 'extent': list(extent)}, handle)
+        os.replace(path + '.tmp', path)
@@ -0,0 +1,314 @@
+"""
+Font setup for DaC render workers.
+
+Three scripts name brand fonts in their ``STYLE``: 'IBM Plex Sans'
+(secrets management, CI/CD pipelines) and 'Arial' (IAM integration). When a
+named family is not installed, matplotlib does not remember that. Every text
+layout, extent and draw looks the family up again, builds and catches a
+ValueError, logs a "findfont: Font family ... not found" warning and only
+then falls back to DejaVu Sans. A 300-text figure repeats this thousands of
+times.
+
+This module fixes that in two steps:
+
+- The fonts bundled in ``dac_toolkit/fonts/`` (``*.ttf``, ``*.otf``, e.g.
+  the IBM Plex family) are registered with matplotlib once per worker.
+  No such directory is shipped, so the published build registers nothing
+  and renders with the machine's installed fonts; this path only takes
+  effect once font files are added there.
+- Font families are resolved once per style, and the result is memoized.
+  Families that are not installed are dropped from ``font.family`` before
+  any text is created, as are generic families (``sans-serif``, ...) with
+  no installed member. If nothing remains, the family becomes matplotlib's
+  default, which is the font its fallback would have chosen. Text renders
+  exactly as before, without the failed lookups.
+
+matplotlib's own font list cache (``fontlist-*.json``) is built at most once
+per machine. When a build has figures to render, ``run_tasks`` imports the
+runner, and with it pyplot, in the driver before the worker pool starts.
+Workers then inherit the loaded font list (fork) or read the cached file
+(spawn) instead of scanning the system fonts. A fully cached build imports
+neither and never touches the font list.
+
+The benchmark mode shows the cost per text before and after, plus the cold
+and warm font cache load in a fresh interpreter:
+
+    python3 -m dac_toolkit.fonts
+    python3 -m dac_toolkit.fonts -t 07-Security --repeat 5
+"""
+
+import argparse
+import contextlib
+import hashlib
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+from .discovery import COURSE_ROOT, discover_tasks
+from .reproducible import reproducible_figure, source_date_epoch
+
+# Fonts shipped with the toolkit, registered in every render worker
+FONT_DIR = Path(__file__).resolve().parent / 'fonts'
+FONT_EXTENSIONS = ('.ttf', '.otf')
+
+def _system_font_dirs():
+    """Where matplotlib's font manager looks for system fonts, without importing it."""
+    if sys.platform == 'win32':
+        return tuple(os.path.join(root, *parts) for root, parts in (
+            (os.environ.get('WINDIR', 'C:\\Windows'), ('Fonts',)),
+            (os.environ.get('LOCALAPPDATA'), ('Microsoft', 'Windows', 'Fonts')),
+            (os.environ.get('APPDATA'), ('Microsoft', 'Windows', 'Fonts'))) if root)
+    home = os.path.expanduser('~')
+    directories = ('/usr/X11R6/lib/X11/fonts/TTF/', '/usr/X11/lib/X11/fonts', '/usr/share/fonts/',
+                   '/usr/local/share/fonts/', '/usr/lib/openoffice/share/fonts/truetype/',
+                   os.path.join(os.environ.get('XDG_DATA_HOME')
+                                or os.path.join(home, '.local', 'share'), 'fonts'),
+                   os.path.join(home, '.fonts'))
+    if sys.platform == 'darwin':
+        directories += ('/Library/Fonts/', '/Network/Library/Fonts/', '/System/Library/Fonts/',
+                        '/opt/local/share/fonts', os.path.join(home, 'Library', 'Fonts'))
+    return directories
+
+
+# System fonts matplotlib can resolve a family to (font_manager.findSystemFonts)
+SYSTEM_FONT_DIRS = _system_font_dirs()
+SYSTEM_FONT_EXTENSIONS = FONT_EXTENSIONS + ('.ttc', '.otc', '.afm')
+
+# Generic families matplotlib expands through the matching font.<generic> list
+GENERIC_FAMILIES = ('serif', 'sans-serif', 'sans serif', 'sans', 'cursive', 'fantasy', 'monospace')
+
+_registered = None
+_resolved = {}
+
+
+def bundled_fonts(directory=FONT_DIR):
+    """Font files in ``directory``, sorted by name."""
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    return sorted(path for path in directory.iterdir() if path.suffix.lower() in FONT_EXTENSIONS)
+
+
+def installed_fonts(directories=SYSTEM_FONT_DIRS):
+    """``(path, size)`` of every font file below ``directories``, sorted."""
+    fonts = set()
+    for top in directories:
+        for directory, _, names in os.walk(top):
+            for name in names:
+                if os.path.splitext(name)[1].lower() in SYSTEM_FONT_EXTENSIONS:
+                    path = os.path.join(directory, name)
+                    with contextlib.suppress(OSError):
+                        fonts.add((path, os.path.getsize(path)))
+    return sorted(fonts)
+
+
+def fonts_digest(directory=FONT_DIR, system_directories=SYSTEM_FONT_DIRS):
+    """
+    SHA-256 of the bundled font files and of the installed font list (paths
+    and sizes), or None if there are neither. Installing or removing a font
+    can change which family a style resolves to, and so every text extent.
+    """
+    fonts = bundled_fonts(directory)
+    system = installed_fonts(system_directories)
+    if not fonts and not system:
+        return None
+    digest = hashlib.sha256()
+    for path in fonts:
+        digest.update(path.name.encode('utf-8'))
+        digest.update(path.read_bytes())
+    for path, size in system:
+        digest.update(f'{path}\0{size}\n'.encode('utf-8', 'surrogateescape'))
+    return digest.hexdigest()
+
+
+def register_bundled_fonts(directory=FONT_DIR):
+    """Add the bundled fonts to matplotlib's font manager, once per process."""
+    global _registered
+    if _registered is None:
+        from matplotlib import font_manager
+
+        _registered = []
+        for path in bundled_fonts(directory):
+            font_manager.fontManager.addfont(str(path))
+            _registered.append(path.name)
+        _resolved.clear()
+    return _registered
+
+
+def _installed_names():
+    from matplotlib import font_manager
+
+    return {entry.name.lower() for entry in font_manager.fontManager.ttflist}
+
+
+def font_rc_key(rc):
+    """The rcParams that decide which font file a FontProperties resolves to."""
+    return (tuple(rc['font.family']),) + tuple(
+        tuple(rc[f'font.{generic}']) for generic in ('serif', 'sans-serif', 'cursive', 'fantasy',
+                                                     'monospace'))
+
+
+def resolve_font_family(rc=None):
+    """
+    ``font.family`` with every family that cannot be found removed, or
+    matplotlib's default family if none can. Memoized per font rc settings.
+    """
+    import matplotlib
+    from matplotlib import font_manager
+
+    rc = matplotlib.rcParams if rc is None else rc
+    key = font_rc_key(rc)
+    if key not in _resolved:
+        installed = _installed_names()
+        resolved = []
+        for family in rc['font.family']:
+            if family.lower() in GENERIC_FAMILIES:
+                members = font_manager.fontManager._expand_aliases(family)
+                if any(member.lower() in installed for member in members):
+                    resolved.append(family)
+            elif family.lower() in installed:
+                resolved.append(family)
+        _resolved[key] = resolved or [font_manager.fontManager.defaultFamily['ttf']]
+    return _resolved[key]
+
+
+@contextlib.contextmanager
+def resolved_fonts():
+    """Register the bundled fonts and use the resolved ``font.family`` for the block."""
+    import matplotlib
+
+    register_bundled_fonts()
+    with matplotlib.rc_context({'font.family': resolve_font_family()}):
+        yield
+
+
+def _time_font_cache():
+    """Seconds to import matplotlib.font_manager in a fresh interpreter: (cold, warm)."""
+    timings = []
+    with tempfile.TemporaryDirectory(prefix='dac_fonts_') as config_dir:
+        environment = dict(os.environ, MPLCONFIGDIR=config_dir)
+        for _ in range(2):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', 'import matplotlib.font_manager'],
+                           env=environment, check=True, capture_output=True)
+            timings.append(time.perf_counter() - start)
+    return tuple(timings)
+
+
+class _LookupCounter(logging.Handler):
+    """Counts matplotlib's "findfont" fallback warnings instead of printing them."""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+def benchmark_task(task, repeat=5):
+    """
+    ``(texts, lookups, fallback_seconds, resolved_seconds, max_delta)`` for
+    one figure: its Text count, the failed font lookups matplotlib logs while
+    building it and drawing it once (fallback, resolved), the best of ``repeat`` draws through the
+    fallback and then with the resolved families, and the largest pixel
+    difference between the two.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import numpy as np
+    from matplotlib.text import Text
+
+    from .microbench import time_draw
+    from .runner import load_script
+
+    module = load_script(task)
+    logger = logging.getLogger('matplotlib.font_manager')
+    results = []
+    for resolve in (False, True):
+        counter = _LookupCounter()
+        logger.addHandler(counter)
+        try:
+            with plt.style.context(getattr(module, 'STYLE', []), after_reset=True), \
+                    (resolved_fonts() if resolve else contextlib.nullcontext()), \
+                    reproducible_figure(task), warnings.catch_warnings():
+                # Missing emoji glyphs warn the same way in both modes
+                warnings.simplefilter('ignore')
+                fig = module.FIGURES[task.name]()
+                fig.canvas.draw()
+                lookups = counter.count
+                seconds = time_draw(fig, repeat)
+                results.append((len(fig.findobj(Text)), lookups, seconds,
+                                np.asarray(fig.canvas.buffer_rgba()).copy()))
+        finally:
+            logger.removeHandler(counter)
+            plt.close('all')
+    (texts, lookups, fallback, before), (_, remaining, resolved, after) = results
+    delta = int(np.abs(before.astype(int) - after.astype(int)).max()) if before.shape == after.shape \
+        else 255
+    return texts, (lookups, remaining), fallback, resolved, delta
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Measure font resolution cost per text, before and after resolving families.')
+    parser.add_argument('-t', '--topic', action='append', default=[],
+                        help='topics to measure (default: the scripts that name brand fonts)')
+    parser.add_argument('-f', '--figure', action='append', default=[],
+                        help='only measure figures whose function or file name matches (repeatable)')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='draws per figure and mode; the best time is kept (default: 5)')
+    parser.add_argument('--root', default=str(COURSE_ROOT),
+                        help='course root to scan (default: this repository)')
+    args = parser.parse_args(argv)
+
+    topics = args.topic or ['07-Security-Compliance', '08-Automation-Advanced-Integration/01']
+    tasks = discover_tasks(args.root, topics=topics, figures=args.figure)
+    if not tasks:
+        print('❌ No figures matched the given filters')
+        return 1
+
+    # Both modes must draw the same footer date for the pixel comparison
+    os.environ['SOURCE_DATE_EPOCH'] = source_date_epoch(args.root)
+    cold, warm = _time_font_cache()
+    print(f'🔤 Font cache (fresh interpreter, import matplotlib.font_manager): '
+          f'cold {cold:.2f}s, warm {warm:.2f}s')
+    print(f'   Bundled fonts: {", ".join(path.name for path in bundled_fonts()) or "none"}')
+    print(f'🧪 Font resolution: {len(tasks)} figures, best of {args.repeat} draws')
+    print('=' * 96)
+    print(f'{"Figure":<44} {"Texts":>6} {"Lookups":>8} {"Fallback µs/text":>17} '
+          f'{"Resolved µs/text":>17} {"Max Δ":>6}')
+    totals = [0, 0, 0, 0.0, 0.0]
+    for task in tasks:
+        try:
+            texts, lookups, fallback, resolved, delta = benchmark_task(task, args.repeat)
+        except Exception as error:
+            print(f'❌ {task.function}: {error}')
+            continue
+        totals[0] += texts
+        totals[1] += lookups[0]
+        totals[2] += lookups[1]
+        totals[3] += fallback
+        totals[4] += resolved
+        print(f'{task.function[:44]:<44} {texts:>6} {lookups[0]:>8} '
+              f'{fallback / max(texts, 1) * 1e6:>17.0f} {resolved / max(texts, 1) * 1e6:>17.0f} '
+              f'{delta:>6}')
+    print('=' * 96)
+    texts, lookups, remaining, fallback, resolved = totals
+    print(f'{"Total (draw s)":<44} {texts:>6} {lookups:>8} {fallback:>17.2f} {resolved:>17.2f}')
+    print(f'🔎 Failed font lookups while building and drawing: {lookups} with the fallback, '
+          f'{remaining} resolved')
+    if fallback:
+        print(f'🏁 Per text: {fallback / max(texts, 1) * 1e6:.0f} µs → '
+              f'{resolved / max(texts, 1) * 1e6:.0f} µs ({resolved / fallback - 1:+.0%})')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,524 @@
+"""
+Automatic layered (Sugiyama-style) layout for flowchart diagrams.
+
+The course diagrams place every box by hand, which stops being practical
+past about 20 nodes. ``layered_layout`` takes the edges of a directed graph
+and returns box positions in the shape the box helpers already take::
+
+    from dac_toolkit.layout import draw_layout, layered_layout
+
+    layout = layered_layout([('vpc', 'subnet'), ('subnet', 'vsi'), ('vpc', 'lb')],
+                            size=(2, 1)).fit((0.5, 9.5), (0.5, 8.5))
+    draw_layout(ax, layout, create_rounded_box, create_arrow,
+                route=ARROW_KIT.draw_path, labels={'vpc': 'VPC', ...})
+
+Helpers that take an arrow's end points as four coordinates (``add_arrow``
+in the troubleshooting lifecycle script) are accepted as they are, and
+``colors=`` fills in a box helper's required ``color`` (the module creation
+script's ``create_rounded_box``).
+
+``layout.boxes`` maps each node to ``(x, y, width, height)`` with ``(x, y)``
+the lower left corner, and ``layout.routes`` lists each edge as a polyline of
+data points. An edge that skips layers bends around the boxes in between.
+
+The layout is computed in four stages, each linear or close to it in the
+number of nodes plus edge segments:
+
+1. **Cycles**: edges that close a cycle in a depth-first search are laid out
+   reversed (and drawn in their own direction).
+2. **Layers**: longest path from the sources, then every source moves down to
+   just above its nearest successor. Edges that span several layers get one
+   dummy node per layer they cross.
+3. **Order**: alternating down and up barycenter sweeps order each layer, in
+   NumPy per layer. Crossings are counted as inversions (O(E log² E), also in
+   NumPy) and the order with the fewest is kept.
+4. **Coordinates**: each node is pulled to the mean position of its
+   neighbours, subject to the layer order and spacing, by weighted isotonic
+   regression (pool adjacent violators, linear per layer). Dummy nodes weigh
+   more, so long edges run straight.
+
+Usage (from the Terraform-IBM-Cloud-Training directory):
+    python3 -m dac_toolkit.layout                        # time random graphs
+    python3 -m dac_toolkit.layout --nodes 100 1000 5000 --render /tmp/layouts
+"""
+
+import argparse
+import gc
+import inspect
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+DIRECTIONS = ('TB', 'LR')
+
+# Coordinate assignment: how much a dummy node weighs against a real one
+DUMMY_WEIGHT = 8.0
+COORDINATE_PASSES = 4
+
+
+class Layout:
+    """Box positions and edge routes of a laid-out graph, in data units."""
+
+    def __init__(self, boxes, routes, layers, crossings, dummies, timings):
+        self.boxes = boxes  # node -> (x, y, width, height), lower left corner
+        self.routes = routes  # [(source, target, [(x, y), ...]), ...] in edge order
+        self.layers = layers  # node -> layer index, 0 first
+        self.crossings = crossings  # edge crossings between adjacent layers
+        self.dummies = dummies  # bend points added for edges spanning layers
+        self.timings = timings  # stage -> seconds
+
+    @property
+    def extent(self):
+        """``(left, bottom, width, height)`` of every box."""
+        if not self.boxes:
+            return 0.0, 0.0, 0.0, 0.0
+        boxes = np.array(list(self.boxes.values()), dtype=float)
+        left, bottom = boxes[:, 0].min(), boxes[:, 1].min()
+        right, top = (boxes[:, 0] + boxes[:, 2]).max(), (boxes[:, 1] + boxes[:, 3]).max()
+        return float(left), float(bottom), float(right - left), float(top - bottom)
+
+    def fit(self, xlim, ylim, stretch=False):
+        """
+        This layout scaled into the data rectangle ``xlim`` x ``ylim`` and
+        centred in it. Boxes keep their proportions unless ``stretch``.
+        """
+        left, bottom, width, height = self.extent
+        scale_x = (xlim[1] - xlim[0]) / width if width else 1.0
+        scale_y = (ylim[1] - ylim[0]) / height if height else 1.0
+        if not stretch:
+            scale_x = scale_y = min(scale_x, scale_y)
+        offset_x = (xlim[0] + xlim[1] - width * scale_x) / 2 - left * scale_x
+        offset_y = (ylim[0] + ylim[1] - height * scale_y) / 2 - bottom * scale_y
+
+        def point(x, y):
+            return x * scale_x + offset_x, y * scale_y + offset_y
+
+        boxes = {node: point(x, y) + (w * scale_x, h * scale_y)
+                 for node, (x, y, w, h) in self.boxes.items()}
+        routes = [(source, target, [point(x, y) for x, y in points])
+                  for source, target, points in self.routes]
+        return Layout(boxes, routes, self.layers, self.crossings, self.dummies, self.timings)
+
+
+def _break_cycles(count, pairs):
+    """
+    Per edge, whether a depth-first search found it closing a cycle, and the
+    search's preorder number of every node.
+    """
+    out = [[] for _ in range(count)]
+    for edge, (source, target) in enumerate(pairs):
+        if source != target:
+            out[source].append(edge)
+    reverse = [False] * len(pairs)
+    preorder = [0] * count
+    state = [0] * count  # 0 unvisited, 1 on the stack, 2 done
+    visited = 0
+    for root in range(count):
+        if state[root]:
+            continue
+        state[root], preorder[root] = 1, visited
+        visited += 1
+        stack = [(root, iter(out[root]))]
+        while stack:
+            node, edges = stack[-1]
+            for edge in edges:
+                target = pairs[edge][1]
+                if state[target] == 1:
+                    reverse[edge] = True
+                elif state[target] == 0:
+                    state[target], preorder[target] = 1, visited
+                    visited += 1
+                    stack.append((target, iter(out[target])))
+                    break
+            else:
+                state[node] = 2
+                stack.pop()
+    return reverse, preorder
+
+
+def _assign_layers(count, dag):
+    """Longest-path layers, with every source moved down next to its nearest successor."""
+    successors = [[] for _ in range(count)]
+    indegree = [0] * count
+    for source, target in dag:
+        successors[source].append(target)
+        indegree[target] += 1
+    layer = [0] * count
+    order = [node for node in range(count) if indegree[node] == 0]
+    for node in order:  # grows while it is walked: Kahn's topological sort
+        for target in successors[node]:
+            layer[target] = max(layer[target], layer[node] + 1)
+            indegree[target] -= 1
+            if indegree[target] == 0:
+                order.append(target)
+    has_predecessor = [False] * count
+    for _, target in dag:
+        has_predecessor[target] = True
+    for node in reversed(order):
+        if successors[node] and not has_predecessor[node]:
+            layer[node] = min(layer[target] for target in successors[node]) - 1
+    return layer
+
+
+def _inversions(values):
+    """Pairs ``i < j`` with ``values[i] > values[j]``, by a bottom-up merge sort in NumPy."""
+    values = np.asarray(values, dtype=np.int64)
+    count = len(values)
+    if count < 2:
+        return 0
+    span = int(values.max()) + 1
+    index = np.arange(count)
+    total = 0
+    width = 1
+    while width < count:
+        block = index // (2 * width)
+        right = (index // width) % 2 == 1
+        key = block * span + values
+        # Runs of ``width`` are sorted, so the left runs' keys are sorted overall
+        left_keys = key[~right]
+        right_keys, right_blocks = key[right], block[right]
+        total += int((np.searchsorted(left_keys, (right_blocks + 1) * span)
+                      - np.searchsorted(left_keys, right_keys, side='right')).sum())
+        values = values[np.argsort(key, kind='stable')]
+        width *= 2
+    return total
+
+
+def _isotonic(values, weights, runs):
+    """
+    Weighted least-squares fit of ``values`` that is non-decreasing within
+    each run of equal ``runs`` (pool adjacent violators).
+    """
+    means, totals, sizes, blocks = [], [], [], []
+    for value, weight, run in zip(values, weights, runs):
+        means.append(value)
+        totals.append(weight)
+        sizes.append(1)
+        blocks.append(run)
+        while len(means) > 1 and blocks[-2] == run and means[-2] > means[-1]:
+            mean, total, size = means.pop(), totals.pop(), sizes.pop()
+            blocks.pop()
+            merged = totals[-1] + total
+            means[-1] = (means[-1] * totals[-1] + mean * total) / merged
+            totals[-1] = merged
+            sizes[-1] += size
+    return np.repeat(means, sizes)
+
+
+class _Graph:
+    """
+    The layered graph of real and dummy nodes that stages 3 and 4 work on.
+
+    Ordering sweeps layer by layer, each layer in a few NumPy calls.
+    Crossings are counted for all layers in one call, and coordinates are
+    placed for every other layer at once from its neighbours (red-black
+    order).
+    """
+
+    def __init__(self, layer, segments, key):
+        self.layer = np.asarray(layer, dtype=np.int64)
+        self.count = len(self.layer)
+        self.widths = np.bincount(self.layer)
+        self.starts = np.concatenate(([0], np.cumsum(self.widths)[:-1]))
+        segments = np.asarray(segments, dtype=np.int64).reshape(-1, 2)
+        segments = segments[np.argsort(self.layer[segments[:, 0]], kind='stable')]
+        self.upper, self.lower = segments[:, 0], segments[:, 1]
+        # Segments from layer i to layer i + 1
+        bounds = np.searchsorted(self.layer[self.upper], np.arange(len(self.widths) + 1))
+        self.between = [(self.upper[bounds[i]:bounds[i + 1]], self.lower[bounds[i]:bounds[i + 1]])
+                        for i in range(len(self.widths) - 1)]
+        order = np.lexsort((np.asarray(key, dtype=float), self.layer))
+        self.layers = np.split(order, self.starts[1:])
+        self.rank = np.empty(self.count, dtype=np.int64)
+        self.rank[order] = np.arange(self.count) - self.starts[self.layer[order]]
+
+    def set_rank(self, rank):
+        self.rank = rank
+        self.layers = [nodes[np.argsort(rank[nodes], kind='stable')] for nodes in self.layers]
+
+    def _reorder(self, index, fixed, free):
+        """Order layer ``index`` by the mean rank of its neighbours ``fixed`` across ``free``."""
+        nodes = self.layers[index]
+        positions = self.rank[free]
+        counts = np.bincount(positions, minlength=len(nodes))
+        sums = np.bincount(positions, weights=self.rank[fixed], minlength=len(nodes))
+        # A node without neighbours there keeps its place
+        barycenter = np.where(counts > 0, sums / np.maximum(counts, 1), np.arange(len(nodes)))
+        nodes = nodes[np.argsort(barycenter, kind='stable')]
+        self.layers[index] = nodes
+        self.rank[nodes] = np.arange(len(nodes))
+
+    def sweep(self, downward):
+        """One pass ordering each layer by the one above (``downward``) or below."""
+        if downward:
+            for index in range(1, len(self.layers)):
+                upper, lower = self.between[index - 1]
+                self._reorder(index, upper, lower)
+        else:
+            for index in range(len(self.layers) - 2, -1, -1):
+                upper, lower = self.between[index]
+                self._reorder(index, lower, upper)
+
+    def _neighbour_means(self, values, weights):
+        """Per node, the weighted mean of ``values`` over its neighbours; their total weight."""
+        sums, counts = np.zeros(self.count), np.zeros(self.count)
+        for ours, theirs in ((self.lower, self.upper), (self.upper, self.lower)):
+            sums += np.bincount(ours, weights=values[theirs] * weights[theirs], minlength=self.count)
+            counts += np.bincount(ours, weights=weights[theirs], minlength=self.count)
+        return sums / np.maximum(counts, 1e-12), counts
+
+    def crossings(self):
+        """Edge crossings between all adjacent layers, in one inversion count."""
+        pair = self.layer[self.upper]
+        order = np.lexsort((self.rank[self.lower], self.rank[self.upper], pair))
+        return _inversions(pair[order] * int(self.widths.max()) + self.rank[self.lower][order])
+
+    def coordinates(self, sizes, weights, gap, passes):
+        """Cross-axis centre of every node: near its neighbours, in layer order, ``gap`` apart."""
+        order = np.lexsort((self.rank, self.layer))
+        layer = self.layer[order]
+        half = sizes[order] / 2
+        separation = np.where(layer[1:] == layer[:-1], half[:-1] + half[1:] + gap, 0.0)
+        offset = np.concatenate(([0.0], np.cumsum(separation)))
+        offset -= offset[self.starts[layer]]  # each layer packed from 0
+        position = np.empty(self.count)
+        position[order] = offset
+
+        for _ in range(passes):
+            for parity in (1, 0):
+                means, counts = self._neighbour_means(position, weights)
+                target = np.where(counts > 0, means, position)[order]
+                chosen = layer % 2 == parity
+                fitted = _isotonic((target - offset)[chosen].tolist(),
+                                   weights[order][chosen].tolist(), layer[chosen].tolist())
+                position[order[chosen]] = fitted + offset[chosen]
+        return position
+
+
+def layered_layout(edges, nodes=None, size=(2.0, 1.0), sizes=None, direction='TB',
+                   layer_gap=1.0, node_gap=0.5, sweeps=4):
+    """
+    Lay out the directed graph ``edges`` (``(source, target)`` pairs) in layers.
+
+    ``nodes`` adds nodes without edges and fixes the initial order; any node
+    named only in ``edges`` is added after them. Boxes are ``size`` (width,
+    height) unless ``sizes`` maps the node to its own. ``direction`` is
+    ``'TB'`` (layers top to bottom) or ``'LR'`` (left to right).
+    ``layer_gap`` and ``node_gap`` are the space between layers and between
+    neighbours in a layer. Self-loops are ignored. Returns a ``Layout`` in
+    layout units; ``Layout.fit`` scales it to the axes.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f'unknown direction {direction!r}; expected one of {DIRECTIONS}')
+    timings = {}
+    start = time.perf_counter()
+
+    names, index = [], {}
+    for name in list(nodes or ()) + [name for edge in edges for name in edge]:
+        if name not in index:
+            index[name] = len(names)
+            names.append(name)
+    count = len(names)
+    if not count:
+        return Layout({}, [], {}, 0, 0, {})
+    pairs = [(index[source], index[target]) for source, target in edges]
+
+    reverse, preorder = _break_cycles(count, pairs)
+    dag = [(target, source) if flip else (source, target)
+           for (source, target), flip in zip(pairs, reverse) if source != target]
+    timings['cycles'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    layer = _assign_layers(count, dag)
+    # Dummy nodes start out just after their edge's source in search order
+    key = [float(number) for number in preorder]
+    chains, segments = [], []
+    for source, target in dag:
+        chain = [source]
+        for step in range(layer[source] + 1, layer[target]):
+            chain.append(len(layer))
+            layer.append(step)
+            key.append(preorder[source] + 0.5)
+        chain.append(target)
+        segments.extend(zip(chain, chain[1:]))
+        chains.append(chain)
+    timings['layers'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph = _Graph(layer, segments, key)
+    best_rank, best = graph.rank.copy(), graph.crossings()
+    for sweep in range(sweeps):
+        if not best:
+            break
+        graph.sweep(downward=sweep % 2 == 0)
+        crossings = graph.crossings()
+        if crossings < best:
+            best_rank, best = graph.rank.copy(), crossings
+    graph.set_rank(best_rank)
+    timings['order'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sizes = sizes or {}
+    extents = np.zeros((len(layer), 2))
+    extents[:count] = [sizes.get(name, size) for name in names]
+    # TB: layers stack vertically and a layer runs along x; LR swaps the axes
+    cross, along = (0, 1) if direction == 'TB' else (1, 0)
+    weights = np.full(len(layer), DUMMY_WEIGHT)
+    weights[:count] = 1.0
+    position = graph.coordinates(extents[:, cross], weights, node_gap, COORDINATE_PASSES)
+    thickness = np.zeros(len(graph.widths))
+    np.maximum.at(thickness, graph.layer[:count], extents[:count, along])
+    starts = np.concatenate(([0.0], np.cumsum(thickness + layer_gap)[:-1]))
+    depth = starts[graph.layer] + thickness[graph.layer] / 2
+
+    # First layer at the top (TB) or the left (LR); the first node in a layer
+    # on the left (TB) or at the top (LR)
+    if direction == 'TB':
+        centers = np.column_stack((position, -depth))
+        step_x, step_y = 0.0, -1.0  # from one layer to the next
+    else:
+        centers = np.column_stack((depth, -position))
+        step_x, step_y = 1.0, 0.0
+    corners = (centers[:count] - extents[:count] / 2).tolist()
+    boxes = {name: (corner[0], corner[1], width, height)
+             for name, corner, (width, height) in zip(names, corners, extents[:count].tolist())}
+
+    # Edges leave a box on the side facing the next layer and enter on the side
+    # facing the previous one. They cross each layer in between straight
+    # through the band the layer's boxes occupy, and bend only in the gaps.
+    centers = centers.tolist()
+    reach = (np.where(np.arange(len(layer)) < count, extents[:, along],
+                      thickness[graph.layer]) / 2).tolist()
+    routes, chain_of = [], iter(chains)
+    for (source, target), flip in zip(pairs, reverse):
+        if source == target:
+            continue
+        chain = next(chain_of)
+        first, last = chain[0], chain[-1]
+        points = [(centers[first][0] + step_x * reach[first], centers[first][1] + step_y * reach[first])]
+        for dummy in chain[1:-1]:
+            (x, y), half = centers[dummy], reach[dummy]
+            points.append((x - step_x * half, y - step_y * half))
+            points.append((x + step_x * half, y + step_y * half))
+        points.append((centers[last][0] - step_x * reach[last], centers[last][1] - step_y * reach[last]))
+        if flip:
+            points.reverse()
+        routes.append((names[source], names[target], points))
+    timings['coordinates'] = time.perf_counter() - start
+
+    return Layout(boxes, routes, {name: layer[node] for node, name in enumerate(names)},
+                  best, len(layer) - count, timings)
+
+
+def _takes_xy(arrow):
+    """True if ``arrow`` takes its end points as four coordinates, like ``ArrowKit.draw_xy``."""
+    try:
+        parameters = inspect.signature(arrow).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    required = [parameter for parameter in parameters if parameter.default is parameter.empty
+                and parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD)]
+    return len(required) == 5
+
+
+def draw_layout(ax, layout, box, arrow, route=None, labels=None, colors=None):
+    """
+    Draw ``layout`` with a script's own helpers: ``box(ax, x, y, width,
+    height, text)`` for every node and ``arrow`` for every straight edge.
+    ``arrow`` may take ``(ax, start, end)`` like ``ArrowKit.draw`` or
+    ``(ax, start_x, start_y, end_x, end_y)`` like ``ArrowKit.draw_xy``.
+    Edges that bend around other layers are drawn with ``route(ax,
+    points)``, such as ``ArrowKit.draw_path``; without one, their first and
+    last points are joined by ``arrow``. ``labels`` maps nodes to box text
+    (default: the node itself). ``colors`` is passed to ``box`` as
+    ``color=``, either one color or a dict by node; helpers whose color has
+    no default need it.
+    """
+    labels = labels or {}
+    draw_arrow = arrow
+    if _takes_xy(arrow):
+        def draw_arrow(ax, start, end):
+            return arrow(ax, start[0], start[1], end[0], end[1])
+    for node, (x, y, width, height) in layout.boxes.items():
+        color = colors.get(node) if isinstance(colors, dict) else colors
+        options = {} if color is None else {'color': color}
+        box(ax, x, y, width, height, labels.get(node, str(node)), **options)
+    for _, _, points in layout.routes:
+        if len(points) > 2 and route is not None:
+            route(ax, points)
+        else:
+            draw_arrow(ax, points[0], points[-1])
+
+
+def random_flowchart(count, branching=1.5, reach=8, seed=0):
+    """
+    Edges of a random flowchart-like graph: each node after the first has
+    about ``branching`` parents among the ``reach`` nodes before it.
+    """
+    generator = random.Random(seed)
+    edges = []
+    for node in range(1, count):
+        parents = {node - generator.randint(1, min(reach, node))
+                   for _ in range(max(1, round(generator.expovariate(1 / branching))))}
+        edges.extend((parent, node) for parent in sorted(parents))
+    return edges
+
+
+def render_layout(layout, path):
+    """Draw ``layout`` on a 16x12 figure with the default kits and save it to ``path``."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    from .primitives import ArrowKit, BoxKit
+
+    box_kit, arrow_kit = BoxKit(fontsize=6), ArrowKit(shrink=2, mutation_scale=10, linewidth=1)
+    fig, ax = plt.subplots(figsize=(16, 12))
+    ax.set_xlim(0, 16)
+    ax.set_ylim(0, 12)
+    ax.axis('off')
+    draw_layout(ax, layout.fit((0.2, 15.8), (0.2, 11.8)), box_kit.draw, arrow_kit.draw,
+                route=arrow_kit.draw_path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fig.savefig(path, dpi=100)
+    plt.close(fig)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time the layered layout on random flowcharts.')
+    parser.add_argument('--nodes', type=int, nargs='+', default=[20, 100, 1000, 5000],
+                        help='graph sizes to lay out (default: 20 100 1000 5000)')
+    parser.add_argument('--direction', choices=DIRECTIONS, default='TB',
+                        help='layers run top to bottom or left to right (default: TB)')
+    parser.add_argument('--seed', type=int, default=0, help='random graph seed (default: 0)')
+    parser.add_argument('--render', metavar='DIR',
+                        help='also draw each layout with the shared box and arrow kits')
+    args = parser.parse_args(argv)
+
+    print(f'🧭 Layered layout, random flowcharts (direction {args.direction})')
+    print('=' * 92)
+    print(f'{"Nodes":>7} {"Edges":>7} {"Layers":>7} {"Dummies":>8} {"Crossings":>10} '
+          f'{"Cycles":>8} {"Layers":>8} {"Order":>8} {"Coords":>8} {"Total (ms)":>11}')
+    for count in args.nodes:
+        edges = random_flowchart(count, seed=args.seed)
+        gc.collect()  # time the layout, not the previous figure's garbage
+        layout = layered_layout(edges, nodes=range(count), direction=args.direction)
+        timings = layout.timings
+        print(f'{count:>7} {len(edges):>7} {max(layout.layers.values()) + 1:>7} '
+              f'{layout.dummies:>8} {layout.crossings:>10} '
+              + ' '.join(f'{timings[stage] * 1000:>8.1f}'
+                         for stage in ('cycles', 'layers', 'order', 'coordinates'))
+              + f' {sum(timings.values()) * 1000:>11.1f}')
+        if args.render:
+            path = render_layout(layout, os.path.join(args.render, f'layout_{count}.png'))
+            print(f'   🖼️  {path}')
+    print('=' * 92)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""
+Micro-benchmarks for shared DaC drawing primitives.
+
+Each benchmark builds the real course figures that use a primitive twice, once
+with the reference implementation the primitive replaced and once with the
+shared one, and reports per figure:
+
+- the number of artists in the figure (``Figure.findobj()``),
+- the time to build the figure (calling its builder),
+- the best-of-N ``canvas.draw()`` time,
+- the largest per-channel difference between the two renderings (0-255).
+
+Usage (from the Terraform-IBM-Cloud-Training directory):
+    python3 -m dac_toolkit.microbench gradient --repeat 5
+    python3 -m dac_toolkit.microbench batching
+    python3 -m dac_toolkit.microbench spec
+    python3 -m dac_toolkit.microbench primitives
+"""
+
+import argparse
+import ast
+import sys
+import time
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.patches import Circle, FancyBboxPatch, Rectangle
+
+from .cache import _ScriptIndex
+from .discovery import COURSE_ROOT, discover_tasks
+from .batching import batch_patches
+from .primitives import ANNOTATION, ArrowKit, BoxKit
+from .runner import load_script
+from .spec import compile_spec
+
+
+def count_artists(fig):
+    """Every artist reachable from the figure, including the figure itself."""
+    return len(fig.findobj())
+
+
+def time_draw(fig, repeat=5):
+    """Best wall time of ``repeat`` full canvas draws, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fig.canvas.draw()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def rendered_pixels(fig):
+    """RGBA pixels of the last draw."""
+    return np.asarray(fig.canvas.buffer_rgba()).copy()
+
+
+def legacy_gradient_box(ax, pos, size, start_color, end_color, alpha=0.8):
+    """Reference: the original 20-``Rectangle`` gradient from the topic 2 scripts."""
+    x, y = pos
+    width, height = size
+
+    n_steps = 20
+    for i in range(n_steps):
+        ratio = i / (n_steps - 1)
+        r = int(int(start_color[1:3], 16) * (1 - ratio) + int(end_color[1:3], 16) * ratio)
+        g = int(int(start_color[3:5], 16) * (1 - ratio) + int(end_color[3:5], 16) * ratio)
+        b = int(int(start_color[5:7], 16) * (1 - ratio) + int(end_color[5:7], 16) * ratio)
+        color = f'#{r:02x}{g:02x}{b:02x}'
+
+        rect = Rectangle((x, y + i * height / n_steps), width, height / n_steps,
+                         facecolor=color, alpha=alpha, edgecolor='none')
+        ax.add_patch(rect)
+
+
+def unbatched_patches(ax):
+    """Reference: leave ``ax.add_patch`` alone, one artist per shape."""
+    return None
+
+
+def tasks_using(name, root=COURSE_ROOT):
+    """FigureTasks whose builder (or anything it calls) references ``name``."""
+    tasks, indexes = [], {}
+    for task in discover_tasks(root):
+        if task.script not in indexes:
+            indexes[task.script] = _ScriptIndex(task.script)
+        index = indexes[task.script]
+        for definition in index.closure(task.function):
+            if any(isinstance(node, ast.Name) and node.id == name
+                   for node in ast.walk(index.definitions[definition])):
+                tasks.append(task)
+                break
+    return tasks
+
+
+def _measure(task, repeat):
+    module = load_script(task)
+    with plt.style.context(getattr(module, 'STYLE', []), after_reset=True):
+        start = time.perf_counter()
+        fig = module.FIGURES[task.name]()
+        build = time.perf_counter() - start
+        draw = time_draw(fig, repeat)
+        result = (count_artists(fig), build, draw, rendered_pixels(fig))
+    plt.close(fig)
+    return result
+
+
+def compare_primitive(name, reference, repeat=5, root=COURSE_ROOT, derive=False):
+    """
+    Build every figure that uses the primitive ``name`` with ``reference``
+    swapped in, then with the shared implementation, and print the comparison.
+    With ``derive``, the swapped-in value is ``reference(shared)``.
+    """
+    tasks = tasks_using(name, root)
+    if not tasks:
+        print(f'❌ No figures use {name}')
+        return 1
+
+    print(f'🧪 {name}: {len(tasks)} figures, best of {repeat} draws')
+    print('=' * 106)
+    print(f'{"Figure":<44} {"Artists":>15} {"Build (ms)":>17} {"Draw (ms)":>17} {"Max Δ":>9}')
+    totals = np.zeros(6)
+    for task in tasks:
+        module = load_script(task)
+        shared = getattr(module, name)
+        setattr(module, name, reference(shared) if derive else reference)
+        try:
+            before_artists, before_build, before_draw, before_pixels = _measure(task, repeat)
+        finally:
+            setattr(module, name, shared)
+        after_artists, after_build, after_draw, after_pixels = _measure(task, repeat)
+
+        if before_pixels.shape == after_pixels.shape:
+            delta = np.abs(before_pixels.astype(np.int16) - after_pixels).max()
+            changed_text = f'{delta}'
+        else:
+            changed_text = 'size differs'
+        totals += (before_artists, after_artists, before_build, after_build,
+                   before_draw, after_draw)
+        print(f'{task.function[:44]:<44} {before_artists:>6} → {after_artists:<6} '
+              f'{before_build * 1000:>7.1f} → {after_build * 1000:<7.1f} '
+              f'{before_draw * 1000:>7.1f} → {after_draw * 1000:<7.1f} {changed_text:>9}')
+
+    print('=' * 106)
+    print(f'{"Total":<44} {int(totals[0]):>6} → {int(totals[1]):<6} '
+          f'{totals[2] * 1000:>7.1f} → {totals[3] * 1000:<7.1f} '
+          f'{totals[4] * 1000:>7.1f} → {totals[5] * 1000:<7.1f}')
+    print(f'📉 Artists: {totals[1] / totals[0] - 1:+.0%} | '
+          f'Build time: {totals[3] / totals[2] - 1:+.0%} | '
+          f'Draw time: {totals[5] / totals[4] - 1:+.0%}')
+    return 0
+
+
+def bench_gradient(repeat):
+    return compare_primitive('create_gradient_box', legacy_gradient_box, repeat)
+
+
+def shape_grid_figure(count, batched, styles=4):
+    """``count`` non-overlapping step circles and rounded boxes in ``styles`` colors."""
+    fig, ax = plt.subplots(figsize=(16, 12))
+    if batched:
+        batch_patches(ax)
+    columns = int(np.ceil(np.sqrt(count)))
+    ax.set_xlim(0, columns * 2)
+    ax.set_ylim(0, columns * 2)
+    ax.axis('off')
+    for i in range(count):
+        x, y = (i % columns) * 2 + 1, (i // columns) * 2 + 1
+        color = f'C{i % styles}'
+        if i % 2:
+            ax.add_patch(Circle((x, y), 0.6, facecolor=color, alpha=0.8, edgecolor=color))
+        else:
+            ax.add_patch(FancyBboxPatch((x - 0.6, y - 0.4), 1.2, 0.8, boxstyle='round,pad=0.1',
+                                        facecolor=color, alpha=0.3, edgecolor=color, linewidth=2))
+    return fig
+
+
+def shape_scaling(counts=(50, 200, 800), repeat=5):
+    """Print draw time against shape count, with and without batching."""
+    print(f'\n📈 Draw time by shape count (4 colors, best of {repeat} draws)')
+    print(f'{"Shapes":>8} {"Unbatched (ms)":>16} {"Batched (ms)":>14} {"Artists":>17}')
+    for count in counts:
+        row = []
+        for batched in (False, True):
+            fig = shape_grid_figure(count, batched)
+            row.append((time_draw(fig, repeat), count_artists(fig)))
+            plt.close(fig)
+        (plain, plain_artists), (batched, batched_artists) = row
+        print(f'{count:>8} {plain * 1000:>16.1f} {batched * 1000:>14.1f} '
+              f'{plain_artists:>7} → {batched_artists:<7}')
+
+
+def bench_batching(repeat):
+    status = compare_primitive('batch_patches', unbatched_patches, repeat)
+    shape_scaling(repeat=repeat)
+    return status
+
+
+def unbatched_spec(spec, batched=True):
+    """Reference: compile a spec with one artist per shape and arrow."""
+    return compile_spec(spec, batched=False)
+
+
+def chain_spec(count, styles=4):
+    """A spec of ``count`` boxes in a grid, each joined to the next by an arrow."""
+    columns = int(np.ceil(np.sqrt(count)))
+    colors = [f'C{i}' for i in range(styles)]
+    boxes = [{'id': f'b{i}', 'x': (i % columns) * 2 + 0.4, 'y': (i // columns) * 2 + 0.6,
+              'width': 1.2, 'height': 0.8, 'facecolor': colors[i % styles], 'style': 'box'}
+             for i in range(count)]
+    edges = [{'from': f'b{i}', 'to': f'b{i + 1}', 'color': colors[i % styles]}
+             for i in range(count - 1)]
+    return {'figure': {'size': [16, 12], 'xlim': [0, columns * 2], 'ylim': [0, columns * 2]},
+            'styles': {'box': {'boxstyle': 'round,pad=0.1', 'alpha': 0.5, 'linewidth': 2}},
+            'boxes': boxes, 'edges': edges}
+
+
+def spec_scaling(counts=(50, 200, 800), repeat=5):
+    """Print draw time against box count for a compiled spec, with and without batching."""
+    print(f'\n📈 Draw time by spec size (boxes + arrows, 4 colors, best of {repeat} draws)')
+    print(f'{"Boxes":>8} {"Unbatched (ms)":>16} {"Batched (ms)":>14} {"Artists":>17}')
+    for count in counts:
+        row = []
+        for batched in (False, True):
+            fig = compile_spec(chain_spec(count), batched=batched)
+            row.append((time_draw(fig, repeat), count_artists(fig)))
+            plt.close(fig)
+        (plain, plain_artists), (batched, batched_artists) = row
+        print(f'{count:>8} {plain * 1000:>16.1f} {batched * 1000:>14.1f} '
+              f'{plain_artists:>7} → {batched_artists:<7}')
+
+
+def bench_spec(repeat):
+    status = compare_primitive('compile_spec', unbatched_spec, repeat)
+    spec_scaling(repeat=repeat)
+    return status
+
+
+# One kit per primitive shape, in the settings most course scripts use
+PRIMITIVE_KITS = {
+    'box': BoxKit(),
+    'connection arrow': ArrowKit(shrink=5, mutation_scale=20),
+    'annotation arrow': ArrowKit(alpha=0.8, connectionstyle='arc3,rad=0.1', kind=ANNOTATION),
+}
+
+
+def primitive_grid_figure(kit, count, styles=4):
+    """``count`` boxes or arrows drawn with ``kit`` in a grid. Returns the figure and build time."""
+    fig, ax = plt.subplots(figsize=(16, 12))
+    columns = int(np.ceil(np.sqrt(count)))
+    ax.set_xlim(0, columns * 2)
+    ax.set_ylim(0, columns * 2)
+    ax.axis('off')
+    start = time.perf_counter()
+    for i in range(count):
+        x, y = (i % columns) * 2 + 0.4, (i // columns) * 2 + 0.6
+        if isinstance(kit, BoxKit):
+            kit.draw(ax, x, y, 1.2, 0.8, f'Box {i}', color=f'C{i % styles}')
+        else:
+            kit.draw(ax, (x, y), (x + 1.2, y + 0.8), color=f'C{i % styles}')
+    return fig, time.perf_counter() - start
+
+
+def primitive_costs(count=200, repeat=5):
+    """Print the per-primitive build and draw cost of each kit against its helper form."""
+    print(f'\n📈 Cost per primitive ({count} per figure, best of {repeat} builds and draws)')
+    print(f'{"Primitive":<18} {"Build (µs)":>17} {"Draw (µs)":>17} {"Artists":>17} {"Max Δ":>7}')
+    for label, kit in PRIMITIVE_KITS.items():
+        row = []
+        for variant in (kit.reference(), kit):
+            build = float('inf')
+            for _ in range(repeat):
+                plt.close('all')
+                fig, seconds = primitive_grid_figure(variant, count)
+                build = min(build, seconds)
+            draw = time_draw(fig, repeat)
+            row.append((build, draw, count_artists(fig), rendered_pixels(fig)))
+            plt.close(fig)
+        (helper_build, helper_draw, helper_artists, helper_pixels), \
+            (kit_build, kit_draw, kit_artists, kit_pixels) = row
+        delta = np.abs(helper_pixels.astype(np.int16) - kit_pixels).max()
+        print(f'{label:<18} {helper_build / count * 1e6:>7.0f} → {kit_build / count * 1e6:<7.0f} '
+              f'{helper_draw / count * 1e6:>7.0f} → {kit_draw / count * 1e6:<7.0f} '
+              f'{helper_artists:>7} → {kit_artists:<7} {delta:>7}')
+
+
+def bench_primitives(repeat):
+    status = 0
+    for name in ('BOX_KIT', 'ARROW_KIT'):
+        status |= compare_primitive(name, lambda kit: kit.reference(), repeat, derive=True)
+        print()
+    primitive_costs(repeat=repeat)
+    return status
+
+
+BENCHMARKS = {
+    'batching': bench_batching,
+    'gradient': bench_gradient,
+    'primitives': bench_primitives,
+    'spec': bench_spec,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for shared DaC primitives.')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='draws per figure; the best time is reported (default: 5)')
+    args = parser.parse_args(argv)
+    return BENCHMARKS[args.benchmark](args.repeat)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
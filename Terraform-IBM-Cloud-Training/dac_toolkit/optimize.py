@@ -0,0 +1,297 @@
+"""
+Palette PNG optimization for the rendered DaC diagrams.
+
+matplotlib saves every figure as 32-bit RGBA, but a diagram is a few flat
+IBM brand colors (``IBM_COLORS``, ``COLORS``, white background, text grey)
+plus their antialiased edges: typically 2,000-4,000 distinct colors across
+10+ million pixels. Such an image fits an 8-bit palette with no visible
+change, at roughly a third of the size.
+
+For each PNG:
+
+1. Images with at most 256 colors get an exact palette (lossless).
+2. Otherwise an adaptive palette is built in CIELAB. The ``SEED_COLORS``
+   most frequent colors are kept exactly: background, box fills, text. The
+   remaining slots go, one at a time, to the color currently mapped
+   furthest from the palette, weighted by how often it occurs. Every color
+   then maps to its nearest palette entry.
+3. The mapping is accepted only within the perceptual error bound: 99.9% of
+   pixels within ``P999_DELTA_E`` (CIE76 ΔE, ~2.3 is a just-noticeable
+   difference) and no pixel beyond ``MAX_DELTA_E``. Otherwise the image
+   stays truecolor and is only re-encoded.
+4. The result is encoded with zlib level 9 under each strategy in
+   ``ZLIB_STRATEGIES`` and the smallest stream wins. The file is replaced
+   only if it gets smaller. DPI and text chunks are kept.
+
+Images with real transparency are never quantized.
+
+Usage (from the Terraform-IBM-Cloud-Training directory):
+    python3 -m dac_toolkit.optimize --jobs 4              # every PNG in the course
+    python3 -m dac_toolkit.optimize --topic 06-State --dry-run
+    python3 build_diagrams.py --optimize                  # optimize as figures are saved
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+import traceback
+import zlib
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, PngImagePlugin
+
+from .discovery import COURSE_ROOT, _matches
+
+PALETTE_SIZE = 256
+
+# Most frequent colors always kept exactly (background, fills, text)
+SEED_COLORS = 64
+
+# Perceptual error bound (CIE76 ΔE) for accepting a quantized palette
+P999_DELTA_E = 2.3
+MAX_DELTA_E = 16.0
+
+# zlib strategies tried at level 9; the smallest encoding is kept
+ZLIB_STRATEGIES = (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED)
+
+# Where the course keeps its PNGs
+PNG_PATTERN = '*/*/DaC/**/*.png'
+
+# status is 'optimized', 'kept' (no smaller encoding) or 'failed';
+# mode is 'exact', 'palette' or 'truecolor'; delta_e is (p99.9, max) or None
+OptimizeResult = namedtuple('OptimizeResult',
+                            'path status before after mode delta_e seconds error')
+
+# sRGB (D65) -> XYZ, and the D65 white point
+_RGB_TO_XYZ = np.array([[0.4124, 0.3576, 0.1805],
+                        [0.2126, 0.7152, 0.0722],
+                        [0.0193, 0.1192, 0.9505]])
+_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+
+def srgb_to_lab(rgb):
+    """``(n, 3)`` 0-255 sRGB colors -> ``(n, 3)`` CIELAB."""
+    linear = rgb / 255.0
+    linear = np.where(linear <= 0.04045, linear / 12.92, ((linear + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ _RGB_TO_XYZ.T / _WHITE
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), 7.787 * xyz + 16 / 116)
+    return np.column_stack([116 * f[:, 1] - 16, 500 * (f[:, 0] - f[:, 1]),
+                            200 * (f[:, 1] - f[:, 2])])
+
+
+def adaptive_palette(colors, counts, size=PALETTE_SIZE, seed=SEED_COLORS):
+    """
+    Indices into ``colors`` chosen as the palette, and each color's ΔE to
+    its nearest palette entry.
+    """
+    lab = srgb_to_lab(colors.astype(float))
+    chosen = list(np.argsort(-counts, kind='stable')[:seed])
+    distance = np.full(len(colors), np.inf)
+    for index in chosen:
+        distance = np.minimum(distance, np.linalg.norm(lab - lab[index], axis=1))
+    weight = np.log1p(counts)
+    while len(chosen) < min(size, len(colors)):
+        index = int(np.argmax(distance * weight))
+        chosen.append(index)
+        distance = np.minimum(distance, np.linalg.norm(lab - lab[index], axis=1))
+    return np.array(chosen), distance
+
+
+def pixel_percentile(delta_e, counts, fraction):
+    """ΔE that ``fraction`` of the pixels stay within."""
+    order = np.argsort(delta_e)
+    cumulative = np.cumsum(counts[order]) / counts.sum()
+    return float(delta_e[order][min(np.searchsorted(cumulative, fraction), len(order) - 1)])
+
+
+def quantize(image):
+    """
+    Palette version of an opaque RGB image, or None if it misses the bound.
+
+    Returns ``(image, mode, delta_e)`` with mode 'exact' or 'palette'.
+    """
+    found = image.getcolors(1 << 24)
+    counts = np.array([count for count, _ in found])
+    colors = np.array([color for _, color in found], dtype=np.int64)
+
+    if len(colors) <= PALETTE_SIZE:
+        chosen = nearest = np.arange(len(colors))
+        mode, bound = 'exact', (0.0, 0.0)
+    else:
+        chosen, delta_e = adaptive_palette(colors, counts)
+        bound = (pixel_percentile(delta_e, counts, 0.999), float(delta_e.max()))
+        if bound[0] > P999_DELTA_E or bound[1] > MAX_DELTA_E:
+            return None
+        # Nearest palette entry per distinct color
+        lab = srgb_to_lab(colors.astype(float))
+        palette_lab = lab[chosen]
+        nearest = np.concatenate([
+            np.linalg.norm(block[:, np.newaxis] - palette_lab[np.newaxis], axis=2).argmin(axis=1)
+            for block in np.array_split(lab, max(1, len(lab) // 4096))])
+        mode = 'palette'
+
+    # Applied to the pixels through a 24-bit lookup table
+    lookup = np.zeros(1 << 24, dtype=np.uint8)
+    lookup[(colors[:, 0] << 16) | (colors[:, 1] << 8) | colors[:, 2]] = nearest
+    pixels = np.asarray(image, dtype=np.uint32)
+    indices = lookup[(pixels[..., 0] << 16) | (pixels[..., 1] << 8) | pixels[..., 2]]
+    result = Image.frombytes('P', image.size, indices.tobytes())
+    result.putpalette(colors[chosen].astype(np.uint8).ravel().tobytes())
+    return result, mode, bound
+
+
+def encode_png(image, info):
+    """Smallest PNG encoding of ``image`` across ``ZLIB_STRATEGIES``."""
+    options = {}
+    if 'dpi' in info:
+        options['dpi'] = info['dpi']
+    text = {key: value for key, value in info.items() if isinstance(value, str)}
+    if text:
+        options['pnginfo'] = PngImagePlugin.PngInfo()
+        for key, value in text.items():
+            options['pnginfo'].add_text(key, value)
+
+    best = None
+    for strategy in ZLIB_STRATEGIES:
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG', optimize=True, compress_level=9,
+                   compress_type=strategy, **options)
+        if best is None or buffer.tell() < len(best):
+            best = buffer.getvalue()
+    return best
+
+
+def optimize_png(path, dry_run=False):
+    """Re-encode one PNG in place if that makes it smaller. Never raises."""
+    start = time.perf_counter()
+    before = os.path.getsize(path)
+    try:
+        with Image.open(path) as source:
+            source.load()
+            info = dict(source.info)
+            image = source.convert('RGBA')
+        quantized = None
+        if image.getchannel('A').getextrema() == (255, 255):
+            image = image.convert('RGB')
+            quantized = quantize(image)
+        if quantized is None:
+            data, mode, delta_e = encode_png(image, info), 'truecolor', None
+        else:
+            data, mode, delta_e = encode_png(quantized[0], info), quantized[1], quantized[2]
+
+        if len(data) >= before:
+            return OptimizeResult(path, 'kept', before, before, mode, delta_e,
+                                  time.perf_counter() - start, None)
+        if not dry_run:
+            with open(path + '.tmp', 'wb') as handle:
+                handle.write(data)
+            os.replace(path + '.tmp', path)
+        return OptimizeResult(path, 'optimized', before, len(data), mode, delta_e,
+                              time.perf_counter() - start, None)
+    except Exception:
+        return OptimizeResult(path, 'failed', before, before, None, None,
+                              time.perf_counter() - start, traceback.format_exc())
+
+
+def find_pngs(root=COURSE_ROOT, topics=None):
+    """Every non-empty PNG under the DaC folders, optionally filtered by topic."""
+    paths = []
+    root = Path(root).resolve()
+    for path in sorted(root.glob(PNG_PATTERN)):
+        if not path.stat().st_size:
+            continue
+        if topics and not _matches('/'.join(path.relative_to(root).parts[:2]), topics):
+            continue
+        paths.append(str(path))
+    return paths
+
+
+def optimize_files(paths, jobs=1, dry_run=False, report=None):
+    """Optimize ``paths`` across ``jobs`` processes; returns the OptimizeResults."""
+    results = []
+    jobs = max(1, min(jobs, len(paths) or 1))
+    if jobs == 1:
+        for path in paths:
+            results.append(optimize_png(path, dry_run))
+            if report:
+                report(results[-1])
+        return results
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(optimize_png, path, dry_run) for path in paths]
+        for future in as_completed(futures):
+            results.append(future.result())
+            if report:
+                report(results[-1])
+    return results
+
+
+def print_summary(results, wall_time, dry_run=False):
+    before = sum(result.before for result in results)
+    after = sum(result.after for result in results)
+    failed = [result for result in results if result.status == 'failed']
+    modes = {}
+    for result in results:
+        if result.status == 'optimized':
+            modes[result.mode] = modes.get(result.mode, 0) + 1
+
+    print('=' * 70)
+    print('🗜️  PNG Optimization Summary' + (' (dry run)' if dry_run else ''))
+    print(f'   Files: {len(results)} | optimized: {sum(modes.values())} '
+          f'({", ".join(f"{count} {mode}" for mode, count in sorted(modes.items())) or "none"})')
+    print(f'   Size: {before / (1024 * 1024):.1f} MB → {after / (1024 * 1024):.1f} MB '
+          f'({(after - before) / before if before else 0:+.0%})')
+    print(f'   Wall time: {wall_time:.1f}s')
+    if failed:
+        print(f'\n❌ Failed files ({len(failed)}):')
+        for result in failed:
+            print(f'   • {os.path.relpath(result.path, COURSE_ROOT)}')
+            print('     ' + result.error.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Losslessly or perceptually-losslessly shrink the DaC PNGs.')
+    parser.add_argument('paths', nargs='*',
+                        help='PNG files to optimize (default: every PNG in the course)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes (default: all cores)')
+    parser.add_argument('-t', '--topic', action='append', default=[],
+                        help='only optimize topics matching this substring or glob (repeatable)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='report the savings without rewriting any file')
+    parser.add_argument('--root', default=str(COURSE_ROOT),
+                        help='course root to scan (default: this repository)')
+    args = parser.parse_args(argv)
+
+    paths = [os.path.abspath(path) for path in args.paths] or find_pngs(args.root, args.topic)
+    if not paths:
+        print('❌ No PNG files matched')
+        return 1
+
+    print(f'🗜️  Optimizing {len(paths)} PNG files with {max(1, min(args.jobs, len(paths)))} worker(s)...')
+    print('=' * 70)
+    start = time.perf_counter()
+
+    def report(result):
+        marker = {'optimized': '✅', 'kept': '➖'}.get(result.status, '❌')
+        detail = result.mode or 'error'
+        if result.delta_e and result.mode == 'palette':
+            detail += f', ΔE p99.9 {result.delta_e[0]:.1f} max {result.delta_e[1]:.1f}'
+        print(f'{marker} {os.path.relpath(result.path, args.root)}: '
+              f'{result.before / 1024:.0f} KB → {result.after / 1024:.0f} KB '
+              f'({(result.after - result.before) / result.before:+.0%}, {detail}) '
+              f'({result.seconds:.2f}s)')
+
+    results = optimize_files(paths, args.jobs, args.dry_run, report)
+    print_summary(results, time.perf_counter() - start, args.dry_run)
+    return 0 if not any(result.status == 'failed' for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
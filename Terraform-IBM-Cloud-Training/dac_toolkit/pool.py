@@ -0,0 +1,131 @@
+"""
+Pooled Agg canvases for long-lived render workers.
+
+Every diagram is a 14x10 or 16x12 inch figure saved at 300 DPI, so each
+save needs an Agg pixel buffer of roughly 4800x3600 (about 70-85 MB). Plain
+Agg allocates a new buffer for every figure. After ``plt.close()`` the
+buffer also lingers: every ``Text`` keeps a reference to the renderer that
+last drew it, and the closed figure's artists form reference cycles that
+hold the renderer until Python's next full garbage collection. A worker
+rendering a whole topic therefore accumulates one dead buffer per figure.
+
+This backend is Agg with two changes:
+
+- Buffers come from a per-process ``RendererPool`` keyed by pixel size and
+  DPI. A canvas takes a buffer from the pool when it first draws at a size,
+  and returns it as soon as it needs a different size. Figures of the same
+  figsize share their full-size layout buffer from one diagram to the next,
+  and re-rendering a figure reuses its cropped save buffer too.
+- Closing a figure drops those ``Text`` references and returns the buffer
+  to the pool at once, instead of leaving it to the garbage collector.
+
+Each diagram still gets a fresh ``Figure``. Creating a figure costs well
+under a millisecond. A reused one would carry over ``rcParams``-derived
+state (facecolor, subplot parameters, layout engine) from the previous
+topic's style.
+
+Idle buffers are kept up to ``max_bytes`` and the least recently released
+are dropped first. Output is pixel-identical to plain Agg.
+
+Usage::
+
+    matplotlib.use('module://dac_toolkit.pool')
+"""
+
+from matplotlib.backend_bases import FigureManagerBase, _Backend
+from matplotlib.backends.backend_agg import FigureCanvasAgg, RendererAgg, _BackendAgg
+from matplotlib.text import Text
+
+# Agg keeps 4 bytes of RGBA and 1 byte of alpha mask per pixel
+BYTES_PER_PIXEL = 5
+
+# Idle buffers kept per worker: two full-size 16x12 inch buffers at 300 DPI
+DEFAULT_POOL_MB = 200
+
+
+def buffer_bytes(key):
+    """Approximate size of the Agg buffers for ``(width, height, dpi)``."""
+    width, height, _ = key
+    return int(width * height * BYTES_PER_PIXEL)
+
+
+class RendererPool:
+    """Idle ``RendererAgg`` objects by ``(width, height, dpi)``, least recently released first."""
+
+    def __init__(self, max_bytes=DEFAULT_POOL_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._idle = []
+        self.idle_bytes = 0
+        self.allocations = 0
+        self.allocated_bytes = 0
+        self.reuses = 0
+
+    def acquire(self, width, height, dpi):
+        key = (width, height, dpi)
+        for index in range(len(self._idle) - 1, -1, -1):
+            if self._idle[index][0] == key:
+                _, renderer = self._idle.pop(index)
+                self.idle_bytes -= buffer_bytes(key)
+                self.reuses += 1
+                return renderer
+        self.allocations += 1
+        self.allocated_bytes += buffer_bytes(key)
+        return RendererAgg(width, height, dpi)
+
+    def release(self, key, renderer):
+        size = buffer_bytes(key)
+        if size > self.max_bytes:
+            return
+        self._idle.append((key, renderer))
+        self.idle_bytes += size
+        while self.idle_bytes > self.max_bytes:
+            evicted, _ = self._idle.pop(0)
+            self.idle_bytes -= buffer_bytes(evicted)
+
+    def clear(self):
+        self._idle = []
+        self.idle_bytes = 0
+
+    def stats(self):
+        return {'allocations': self.allocations, 'allocated_bytes': self.allocated_bytes,
+                'reuses': self.reuses, 'idle_bytes': self.idle_bytes}
+
+
+# One pool per worker process
+POOL = RendererPool()
+
+
+class FigureManagerPooled(FigureManagerBase):
+    def destroy(self):
+        # Texts remember the last renderer that drew them; forget it so the
+        # closed figure's reference cycles do not keep the buffer alive
+        for text in self.canvas.figure.findobj(Text):
+            text._renderer = None
+        self.canvas.release_renderer()
+        super().destroy()
+
+
+class FigureCanvasPooled(FigureCanvasAgg):
+    manager_class = FigureManagerPooled
+
+    def get_renderer(self):
+        width, height = self.get_width_height(physical=True)
+        key = width, height, self.figure.dpi
+        if self._lastKey != key:
+            self.release_renderer()
+            self.renderer = POOL.acquire(*key)
+            self._lastKey = key
+        return self.renderer
+
+    def release_renderer(self):
+        """Return this canvas's buffer to the pool; the next draw takes another."""
+        if self._lastKey is not None:
+            POOL.release(self._lastKey, self.renderer)
+            self.renderer = None
+            self._lastKey = None
+
+
+@_Backend.export
+class _BackendPooled(_BackendAgg):
+    FigureCanvas = FigureCanvasPooled
+    FigureManager = FigureManagerPooled
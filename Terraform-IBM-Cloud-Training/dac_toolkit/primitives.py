@@ -0,0 +1,292 @@
+"""
+Shared box and arrow primitives for DaC diagrams.
+
+A dozen scripts used to define their own ``create_rounded_box`` /
+``create_arrow`` / ``add_component_box`` / ``add_arrow`` helpers. They
+differ in a few settings (box padding, edge color, line width, font size,
+arrow shrink) and each rebuilt its box style and arrow settings on every
+call. A ``BoxKit`` or ``ArrowKit`` holds one set of those settings, built
+once. The scripts keep their helper names and signatures; each helper is a
+one-line adapter onto a kit method of the same shape::
+
+    from dac_toolkit.primitives import ArrowKit, BoxKit
+
+    BOX_KIT = BoxKit(boxstyle='round,pad=0.02', edgecolor=IBM_GRAY, linewidth=1.5)
+    ARROW_KIT = ArrowKit(shrink=5, mutation_scale=20, linewidth=2)
+
+    def create_rounded_box(ax, x, y, width, height, text, color=IBM_BLUE,
+                           text_color=IBM_WHITE, fontsize=10):
+        \"\"\"Create a rounded rectangle with text.\"\"\"
+        return BOX_KIT.draw(ax, x, y, width, height, text, color, text_color, fontsize)
+
+Kit methods per helper signature:
+
+- ``BoxKit.draw(ax, x, y, width, height, text, color, text_color, fontsize,
+  style=None, alpha=None)``: every box helper.
+- ``ArrowKit.draw(ax, start, end, color, style, linewidth, alpha=None, label='')``:
+  helpers taking two points.
+- ``ArrowKit.draw_xy(ax, start_x, start_y, end_x, end_y, color)``: helpers
+  taking four coordinates.
+- ``ArrowKit.draw_path(ax, points, color=None)``: an arrow along a polyline,
+  such as a bent edge from ``layout.py``.
+
+``ArrowKit(routing=ORTHOGONAL)`` routes every arrow it draws around the
+boxes and labels of its Axes when the figure is drawn (see ``routing.py``).
+
+Drawing through a kit is cheaper than the helpers it replaces, with the same
+pixels:
+
+- Box, arrow and connection styles are parsed once per kit and shared.
+- A box's data extent follows from its geometry. ``add_patch`` traced every
+  rounded outline to update the data limits.
+- Arrows are the same ``ConnectionPatch`` (or ``FancyArrowPatch``) objects,
+  but they are handed straight to an ``ArrowBatch``. ``add_patch`` computed
+  every arrow's shrunk and clipped outline only to find that it does not
+  change the data limits.
+- Boxes and arrows are batched per Axes with the stacking rule of
+  ``batching.py``, so each style layer is drawn in one call.
+
+``kit.reference()`` is the same kit drawing the way the old helpers did, for
+``python3 -m dac_toolkit.microbench primitives``.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import matplotlib
+from matplotlib.patches import ArrowStyle, BoxStyle, ConnectionPatch, ConnectionStyle, \
+    FancyArrowPatch, FancyBboxPatch
+from matplotlib.path import Path
+from matplotlib.transforms import Bbox
+
+from .batching import patch_batcher
+from .routing import ROUTINGS, edge_router
+
+# Arrow kinds: how the replaced helper created its arrows
+CONNECTION = 'connection'  # ConnectionPatch(start, end, 'data', 'data', ...)
+FANCY = 'fancy'  # FancyArrowPatch(start, end, ...)
+ANNOTATION = 'annotation'  # ax.annotate('', xy=end, xytext=start, arrowprops=...)
+ARROW_KINDS = (CONNECTION, FANCY, ANNOTATION)
+
+# Points an arrow head reaches beyond its end points, per unit of mutation scale
+HEAD_REACH = 0.5
+
+
+@lru_cache(maxsize=None)
+def box_style(spec):
+    """Shared ``BoxStyle`` for a spec such as ``'round,pad=0.02'``."""
+    return BoxStyle(spec)
+
+
+@lru_cache(maxsize=None)
+def arrow_style(spec):
+    """Shared ``ArrowStyle`` for a spec such as ``'->'``."""
+    return ArrowStyle(spec)
+
+
+@lru_cache(maxsize=None)
+def connection_style(spec):
+    """Shared ``ConnectionStyle`` for a spec such as ``'arc3,rad=0.1'``."""
+    return ConnectionStyle(spec)
+
+
+def _box_extent(style, x, y, width, height):
+    """Data-space extent of a fancy box, or None if only its outline can tell."""
+    if isinstance(style, (BoxStyle.Round, BoxStyle.Square)):
+        pad = style.pad
+        return Bbox.from_bounds(x - pad, y - pad, width + 2 * pad, height + 2 * pad)
+    return None
+
+
+def _arc_rad(style):
+    return style.rad if isinstance(style, ConnectionStyle.Arc3) else None
+
+
+class BoxKit:
+    """A filled, outlined fancy box with a centered label, in one house style."""
+
+    def __init__(self, boxstyle='round,pad=0.02', edgecolor='#525252', linewidth=1.5,
+                 color='#0f62fe', text_color='white', fontsize=10, fontweight='bold',
+                 wrap=True, batched=True):
+        self.boxstyle = boxstyle
+        self.edgecolor = edgecolor
+        self.linewidth = linewidth
+        self.color = color
+        self.text_color = text_color
+        self.fontsize = fontsize
+        self.fontweight = fontweight
+        self.wrap = wrap
+        self.batched = batched
+
+    def reference(self):
+        """This kit drawing like the per-script helpers: no shared styles, no batching."""
+        return BoxKit(self.boxstyle, self.edgecolor, self.linewidth, self.color,
+                      self.text_color, self.fontsize, self.fontweight, self.wrap, batched=False)
+
+    def draw(self, ax, x, y, width, height, text, color=None, text_color=None, fontsize=None,
+             style=None, alpha=None):
+        """
+        Draw a box with ``(x, y)`` as its lower left corner and ``text`` in its
+        center. Unset arguments take the kit's values; ``style`` overrides the
+        box style. Returns the ``FancyBboxPatch``.
+        """
+        spec = style or self.boxstyle
+        options = {} if alpha is None else {'alpha': alpha}
+        box = FancyBboxPatch((x, y), width, height,
+                             boxstyle=box_style(spec) if self.batched else spec,
+                             facecolor=self.color if color is None else color,
+                             edgecolor=self.edgecolor, linewidth=self.linewidth, **options)
+        if self.batched:
+            patch_batcher(ax).add_patch(box, _box_extent(box.get_boxstyle(), x, y, width, height))
+        else:
+            ax.add_patch(box)
+
+        ax.text(x + width / 2, y + height / 2, text, ha='center', va='center',
+                fontsize=self.fontsize if fontsize is None else fontsize,
+                color=self.text_color if text_color is None else text_color,
+                fontweight=self.fontweight, wrap=self.wrap)
+        return box
+
+
+class ArrowKit:
+    """
+    A straight or arced arrow between two data points, in one house style.
+
+    ``kind`` reproduces the artist the replaced helper created (see
+    ``ARROW_KINDS``); ``shrink`` and ``mutation_scale`` default to that
+    artist's own defaults when None. With a ``routing`` (see ``ROUTINGS``)
+    the arrows are routed around the Axes' shapes and texts instead of
+    taking the shortest line; shrink and connection style do not apply.
+    """
+
+    def __init__(self, color='#525252', arrowstyle='->', shrink=None, mutation_scale=None,
+                 linewidth=2, connectionstyle='arc3', alpha=None, kind=CONNECTION,
+                 label_offset=2, label_fontsize=10, routing=None, batched=True):
+        if kind not in ARROW_KINDS:
+            raise ValueError(f'unknown arrow kind {kind!r}; expected one of {ARROW_KINDS}')
+        if routing is not None and routing not in ROUTINGS:
+            raise ValueError(f'unknown routing {routing!r}; expected one of {ROUTINGS}')
+        self.color = color
+        self.arrowstyle = arrowstyle
+        self.shrink = shrink
+        self.mutation_scale = mutation_scale
+        self.linewidth = linewidth
+        self.connectionstyle = connectionstyle
+        self.alpha = alpha
+        self.kind = kind
+        self.label_offset = label_offset
+        self.label_fontsize = label_fontsize
+        self.routing = routing
+        self.batched = batched
+
+    def reference(self):
+        """This kit drawing like the per-script helpers: no shared styles, no batching."""
+        return ArrowKit(self.color, self.arrowstyle, self.shrink, self.mutation_scale,
+                        self.linewidth, self.connectionstyle, self.alpha, self.kind,
+                        self.label_offset, self.label_fontsize, self.routing, batched=False)
+
+    def _options(self, style, color, linewidth, alpha):
+        arrowstyle = style or self.arrowstyle
+        options = {
+            'arrowstyle': arrow_style(arrowstyle) if self.batched else arrowstyle,
+            'connectionstyle': (connection_style(self.connectionstyle) if self.batched
+                                else self.connectionstyle),
+            'linewidth': self.linewidth if linewidth is None else linewidth,
+        }
+        if self.shrink is not None:
+            options['shrinkA'] = options['shrinkB'] = self.shrink
+        if self.mutation_scale is not None:
+            options['mutation_scale'] = self.mutation_scale
+        alpha = self.alpha if alpha is None else alpha
+        if alpha is not None:
+            options['alpha'] = alpha
+        color = self.color if color is None else color
+        if self.kind == CONNECTION:
+            options['facecolor'] = options['edgecolor'] = color
+        else:
+            options['color'] = color
+        return options
+
+    def _emit_reference(self, ax, start, end, options):
+        if self.kind == CONNECTION:
+            return ax.add_patch(ConnectionPatch(start, end, 'data', 'data', **options))
+        if self.kind == FANCY:
+            return ax.add_patch(FancyArrowPatch(start, end, **options))
+        return ax.annotate('', xy=end, xytext=start, arrowprops=options).arrow_patch
+
+    def _emit_batched(self, ax, start, end, options):
+        rad = _arc_rad(options['connectionstyle'])
+        if rad is None:
+            # Only arc3 curves have an extent known without drawing them
+            return self._emit_reference(ax, start, end, options)
+        if self.kind == CONNECTION:
+            arrow = ConnectionPatch(start, end, 'data', 'data', **options)
+        elif self.kind == FANCY:
+            arrow = FancyArrowPatch(start, end, **options)
+        else:
+            # What ax.annotate('', ...) draws: an unclipped arrow at text z-order,
+            # sized by the font size, from the (empty) text to the annotated point
+            options.setdefault('mutation_scale', matplotlib.rcParams['font.size'])
+            arrow = FancyArrowPatch(start, end, zorder=3, clip_on=False, **options)
+
+        start_px, end_px = ax.transData.transform([start, end])
+        extent = Bbox([np.minimum(start_px, end_px), np.maximum(start_px, end_px)])
+        # An arc3 curve bows out by up to half its control point's offset
+        bulge = abs(rad) * ((end_px - start_px) ** 2).sum() ** 0.5 / 2
+        extent = extent.padded(bulge).transformed(ax.transData.inverted())
+        margin = arrow.get_mutation_scale() * HEAD_REACH + arrow.get_linewidth()
+        return patch_batcher(ax).add_arrow(arrow, extent, margin)
+
+    def _along(self, points, options):
+        """A path-mode arrow through ``points``: no shrink or connection style."""
+        for key in ('connectionstyle', 'shrinkA', 'shrinkB'):
+            options.pop(key, None)
+        if self.kind == ANNOTATION:
+            options.setdefault('mutation_scale', matplotlib.rcParams['font.size'])
+            options.update(zorder=3, clip_on=False)
+        return FancyArrowPatch(path=Path(points), **options)
+
+    def _emit_along(self, ax, arrow, extent):
+        if not self.batched:
+            return ax.add_patch(arrow)
+        margin = arrow.get_mutation_scale() * HEAD_REACH + arrow.get_linewidth()
+        return patch_batcher(ax).add_arrow(arrow, extent, margin)
+
+    def draw(self, ax, start, end, color=None, style=None, linewidth=None, alpha=None, label=''):
+        """
+        Draw an arrow from ``start`` to ``end`` (data coordinates). Unset
+        arguments take the kit's values; ``style`` overrides the arrow style.
+        A ``label`` is written above the midpoint in the arrow's color.
+        Returns the arrow patch.
+        """
+        options = self._options(style, color, linewidth, alpha)
+        if self.routing is not None:
+            # Routed when the figure is drawn, so its extent is not known yet
+            arrow = self._along([start, end], options)
+            edge_router(ax).add(arrow, start, end)
+            self._emit_along(ax, arrow, None)
+        elif self.batched:
+            arrow = self._emit_batched(ax, start, end, options)
+        else:
+            arrow = self._emit_reference(ax, start, end, options)
+
+        if label:
+            ax.text((start[0] + end[0]) / 2, (start[1] + end[1]) / 2 + self.label_offset, label,
+                    ha='center', va='bottom', fontsize=self.label_fontsize,
+                    color=self.color if color is None else color, weight='bold',
+                    bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.8))
+        return arrow
+
+    def draw_xy(self, ax, start_x, start_y, end_x, end_y, color=None):
+        """``draw`` for helpers that take the end points as four coordinates."""
+        return self.draw(ax, (start_x, start_y), (end_x, end_y), color)
+
+    def draw_path(self, ax, points, color=None):
+        """
+        Draw an arrow along the polyline ``points`` (data coordinates), with
+        its head at the last point. The line runs exactly through the points:
+        there is no shrink or connection style. Returns the arrow patch.
+        """
+        points = np.asarray(points, dtype=float)
+        arrow = self._along(points, self._options(None, color, None, None))
+        return self._emit_along(ax, arrow, Bbox([points.min(axis=0), points.max(axis=0)]))
@@ -0,0 +1,87 @@
+"""
+Machine-readable report of a DaC build.
+
+Every build writes one JSON document, by default to
+``.dac_cache/build_report.json``, with one entry per figure::
+
+    {"format": 1, "finished": "2026-10-17T09:12:44Z", "wall_seconds": 94.2,
+     "jobs": 2, "formats": ["png"], "timeout": 120,
+     "counts": {"ok": 98, "cached": 0, "failed": 1, "timeout": 1, "error": 0},
+     "figures": [{"key": "06-State-Management/...:create_state_lifecycle_diagram",
+                  "topic": "...", "script": "06-State-Management/.../state_management_diagrams.py",
+                  "function": "create_state_lifecycle_diagram",
+                  "name": "figure_6_1_1_state_lifecycle.png", "status": "ok", "seconds": 1.21,
+                  "outputs": [{"path": ".../figure_6_1_1_state_lifecycle.png", "bytes": 402331}],
+                  "error": null,
+                  "memory": {"peak_rss_mb": 212.4, "stray_figures": 0, "allocations": 0,
+                             "allocated_bytes": 0, "reuses": 2}}, ...]}
+
+``status`` is ``ok``, ``cached``, ``failed``, ``timeout`` or ``error``.
+``error`` is the full traceback of a failed figure. ``name`` is the
+figure's registry key. A script that does not parse, or whose ``FIGURES``
+cannot be read, gets a single ``error`` entry whose ``function`` is the
+script's file name and whose ``name`` is null. A figure whose cache key
+cannot be computed, because a toolkit module it imports does not parse, is
+also reported as ``error``. ``memory`` is the worker's peak RSS, the figures
+it left open, and its Agg buffer allocations when pooled (see ``pool.py``);
+it is null for cached, timed-out and error entries. Paths are relative to the course root.
+Figures are listed in build order, so two reports can be diffed.
+"""
+
+import json
+import os
+import time
+
+from .tasks import FAILED_STATUSES
+
+REPORT_FORMAT = 1
+REPORT_NAME = 'build_report.json'
+
+STATUSES = ('ok', 'cached') + FAILED_STATUSES
+
+
+def figure_entry(result, root):
+    """Report entry for one ``RenderResult``."""
+    task = result.task
+    return {
+        'key': task.key,
+        'topic': task.topic,
+        'script': os.path.relpath(task.script, root),
+        'function': task.function,
+        'name': task.name,
+        'status': result.status,
+        'seconds': round(result.seconds, 3),
+        'outputs': [{'path': os.path.relpath(path, root),
+                     'bytes': os.path.getsize(path) if os.path.exists(path) else None}
+                    for path in result.outputs],
+        'error': result.error,
+        'memory': result.memory or None,
+    }
+
+
+def build_report(results, tasks, wall_time, jobs, formats, timeout, root):
+    """The report of a build; ``tasks`` gives the figure order."""
+    order = {task: index for index, task in enumerate(tasks)}
+    figures = [figure_entry(result, root)
+               for result in sorted(results, key=lambda result: order.get(result.task, len(order)))]
+    return {
+        'format': REPORT_FORMAT,
+        'finished': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'wall_seconds': round(wall_time, 3),
+        'jobs': jobs,
+        'formats': [export_format.label for export_format in formats],
+        'timeout': timeout or None,
+        'counts': {status: sum(result.status == status for result in results)
+                   for status in STATUSES},
+        'figures': figures,
+    }
+
+
+def write_report(path, report):
+    """Write ``report`` to ``path`` atomically."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+        handle.write('\n')
+    os.replace(path + '.tmp', path)
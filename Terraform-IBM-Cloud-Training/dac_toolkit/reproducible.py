@@ -0,0 +1,103 @@
+"""
+Byte-reproducible DaC output.
+
+By default, rebuilding unchanged sources can still produce different bytes:
+
+- figures that draw random data use the unseeded global RNG;
+- date footers and SVG/PDF/PS metadata record the build time;
+- SVG element ids are salted with a random UUID;
+- PNG and SVG/PDF metadata name the matplotlib version, and Pillow encoder
+  settings follow library defaults.
+
+In reproducible mode (``build_diagrams.py --reproducible``):
+
+- ``random`` and ``numpy.random`` are seeded per figure from its task key,
+  and their previous state is restored afterwards;
+- ``SOURCE_DATE_EPOCH`` is the build time. If unset, the commit time of the
+  course's git HEAD is used. matplotlib reads it for SVG/PDF/PS dates, and
+  the scripts' "Generated:" footers read it through ``build_datetime()``;
+- ``svg.hashsalt`` is the task key;
+- version and date metadata are stripped and encoder settings are pinned
+  (``METADATA``, ``PIL_OPTIONS``).
+
+``--verify-reproducible`` renders every figure twice in separate worker
+processes and fails if any output differs by a single byte.
+
+This module imports neither matplotlib nor numpy at import time, so the
+diagram scripts can use ``build_datetime()`` cheaply.
+"""
+
+import hashlib
+import os
+import random
+import subprocess
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Metadata per format: drop version strings and timestamps
+METADATA = {
+    'png': {'Software': None},
+    'svg': {'Creator': None, 'Date': None},
+    'pdf': {'Creator': None, 'Producer': None, 'CreationDate': None},
+}
+
+# Pillow encoder settings pinned to today's defaults, so an upgrade cannot change them silently
+PIL_OPTIONS = {
+    'png': {'compress_level': 6},
+    'webp': {'quality': 80, 'method': 4},
+    'jpg': {'quality': 75},
+    'jpeg': {'quality': 75},
+}
+
+
+def build_datetime():
+    """Build time for figure footers: ``SOURCE_DATE_EPOCH`` (UTC) if set, else now."""
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    if epoch:
+        return datetime.fromtimestamp(int(epoch), tz=timezone.utc)
+    return datetime.now()
+
+
+def source_date_epoch(root):
+    """``SOURCE_DATE_EPOCH``, or the commit time of git HEAD in ``root`` ('0' without git)."""
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    if epoch:
+        return epoch
+    try:
+        return subprocess.run(['git', 'log', '-1', '--format=%ct'], cwd=str(root), check=True,
+                              capture_output=True, text=True).stdout.strip() or '0'
+    except (OSError, subprocess.CalledProcessError):
+        return '0'
+
+
+def figure_seed(task):
+    """Stable 32-bit RNG seed derived from the task key."""
+    return int(hashlib.sha256(task.key.encode('utf-8')).hexdigest()[:8], 16)
+
+
+@contextmanager
+def reproducible_figure(task):
+    """Seed the global RNGs and fix the SVG hash salt while ``task`` is built and saved."""
+    import matplotlib
+    import numpy as np
+
+    seed = figure_seed(task)
+    random_state, numpy_state = random.getstate(), np.random.get_state()
+    random.seed(seed)
+    np.random.seed(seed)
+    try:
+        with matplotlib.rc_context({'svg.hashsalt': task.key}):
+            yield
+    finally:
+        random.setstate(random_state)
+        np.random.set_state(numpy_state)
+
+
+def save_options(extension):
+    """Extra ``savefig`` keywords for ``extension`` in reproducible mode."""
+    options = {}
+    if extension in METADATA:
+        options['metadata'] = METADATA[extension]
+    if extension in PIL_OPTIONS:
+        options['pil_kwargs'] = PIL_OPTIONS[extension]
+    return options
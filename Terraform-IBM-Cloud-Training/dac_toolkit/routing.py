@@ -0,0 +1,641 @@
+"""
+Orthogonal edge routing around the boxes and labels of DaC diagrams.
+
+Straight and ``arc3`` arrows cut through whatever lies between their end
+points; in dense figures that is other boxes and their labels. An
+``OrthogonalRouter`` routes connectors as horizontal and vertical segments
+around rectangular obstacles instead:
+
+1. **Index**: obstacles, grown by a clearance, go into a uniform grid
+   (``GridIndex``), so a segment is only tested against the few obstacles in
+   the cells it crosses. The routes already laid go into a second grid.
+2. **Shapes**: the straight line, the two L shapes and the two Z shapes
+   (bending halfway) between the end points are tried first. The clear one
+   with the fewest bends and the least overlap with earlier routes wins.
+   Most edges stop here.
+3. **Search**: otherwise an A* search runs over the sparse grid of obstacle
+   borders (and the channels halfway between them) in a window around the
+   end points. Bends and overlaps with earlier routes cost extra; the
+   estimate is weighted so that the search heads for the end instead of
+   comparing every near-equal lane. The window grows until a route is found.
+
+Obstacles that contain an end point are the edge's own boxes (or a panel
+around them) and are ignored for that edge. The route is then clipped to
+the outline of the smallest such box, so edges can run between box centers.
+
+A script's arrow helper routes its arrows by drawing them through a routed
+kit; obstacles are collected from the Axes when the figure is drawn, so it
+does not matter whether the boxes are drawn before or after the arrows::
+
+    from dac_toolkit.primitives import ArrowKit
+    from dac_toolkit.routing import ORTHOGONAL
+
+    ARROW_KIT = ArrowKit(color=IBM_GRAY, linewidth=2, routing=ORTHOGONAL)
+
+``route_layout(layout)`` routes the edges of a ``layout.py`` layout the
+same way, in data units.
+
+Usage (from the Terraform-IBM-Cloud-Training directory):
+    python3 -m dac_toolkit.routing                       # time routed layouts
+    python3 -m dac_toolkit.routing --nodes 100 1000 --render /tmp/routes
+"""
+
+import argparse
+import gc
+import heapq
+import math
+import os
+import sys
+import time
+
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.collections import PolyCollection
+from matplotlib.patches import FancyArrowPatch, FancyBboxPatch, Patch, Rectangle
+from matplotlib.path import Path
+from matplotlib.text import Text
+from matplotlib.transforms import Bbox
+
+from .batching import ArrowBatch, PatchBatch
+from .layout import Layout, layered_layout, random_flowchart, render_layout
+
+# Arrow routings a kit can ask for
+ORTHOGONAL = 'orthogonal'
+ROUTINGS = (ORTHOGONAL,)
+
+# Points kept free around every obstacle on an Axes
+CLEARANCE = 4
+
+# A rectangle covering more grid cells than this is tested against every query
+LARGE_CELLS = 1024
+
+# Segment axes, for the side a route should leave or enter a box by
+HORIZONTAL, VERTICAL = 0, 1
+
+# Positions closer than this (in obstacle units) are the same grid line
+TOLERANCE = 1e-9
+
+
+class GridIndex:
+    """
+    Uniform grid over axis-aligned rectangles ``(x0, y0, x1, y1)``: which of
+    them may touch a given box.
+    """
+
+    def __init__(self, cell):
+        self.cell = float(cell)
+        self.rects = []
+        self.cells = {}
+        self.large = []  # ids of rectangles too big to list per cell
+
+    def _span(self, low, high):
+        return range(math.floor(low / self.cell), math.floor(high / self.cell) + 1)
+
+    def insert(self, rect):
+        """Add ``rect`` and return its id."""
+        index = len(self.rects)
+        self.rects.append(rect)
+        columns, rows = self._span(rect[0], rect[2]), self._span(rect[1], rect[3])
+        if len(columns) * len(rows) > LARGE_CELLS:
+            self.large.append(index)
+            return index
+        cells = self.cells
+        for column in columns:
+            for row in rows:
+                cells.setdefault((column, row), []).append(index)
+        return index
+
+    def query(self, x0, y0, x1, y1):
+        """Ids of the rectangles in the cells the box ``x0, y0, x1, y1`` touches."""
+        found = set(self.large)
+        cells = self.cells
+        for column in self._span(x0, x1):
+            for row in self._span(y0, y1):
+                found.update(cells.get((column, row), ()))
+        return found
+
+
+def _contains(rect, point):
+    return rect[0] <= point[0] <= rect[2] and rect[1] <= point[1] <= rect[3]
+
+
+def _axis(start, end):
+    return HORIZONTAL if start[1] == end[1] else VERTICAL
+
+
+def _coverage(shape, rows, columns):
+    """
+    How many of the blocks ``rows[0][k]:rows[1][k]`` x ``columns[0][k]:columns[1][k]``
+    cover each cell of a ``shape`` array (empty blocks count nothing).
+    """
+    counts = np.zeros((shape[0] + 1, shape[1] + 1), dtype=np.int32)
+    top, bottom = np.clip(rows[0], 0, shape[0]), np.clip(rows[1], 0, shape[0])
+    left, right = np.clip(columns[0], 0, shape[1]), np.clip(columns[1], 0, shape[1])
+    keep = (top < bottom) & (left < right)
+    top, bottom, left, right = top[keep], bottom[keep], left[keep], right[keep]
+    np.add.at(counts, (top, left), 1)
+    np.add.at(counts, (top, right), -1)
+    np.add.at(counts, (bottom, left), -1)
+    np.add.at(counts, (bottom, right), 1)
+    return counts.cumsum(axis=0).cumsum(axis=1)[:-1, :-1]
+
+
+def _simplify(points):
+    """Drop repeated points and the middle of three collinear points."""
+    kept = [points[0]]
+    for point in points[1:]:
+        if point == kept[-1]:
+            continue
+        if len(kept) >= 2 and (kept[-2][0] == kept[-1][0] == point[0]
+                               or kept[-2][1] == kept[-1][1] == point[1]):
+            kept[-1] = point
+        else:
+            kept.append(point)
+    return kept if len(kept) > 1 else [points[0], points[-1]]
+
+
+class OrthogonalRouter:
+    """
+    Routes edges as horizontal and vertical segments around ``obstacles``,
+    a sequence of ``(x0, y0, x1, y1)`` rectangles in units that are the same
+    along both axes (display pixels, or the data units of a layout).
+
+    ``clearance`` is the free space kept around every obstacle. ``outlines``
+    tells, per obstacle, what a route ending inside it is clipped to: True
+    for its rectangle, a ``Path`` for another shape, None to never clip to
+    it (labels). ``bend_cost`` is the length one bend is worth (default: the
+    median obstacle size) and ``overlap_cost`` the extra cost per unit of
+    length shared with an earlier route.
+    """
+
+    def __init__(self, obstacles, clearance=0.0, outlines=None, bend_cost=None,
+                 overlap_cost=1.0):
+        self.bounds = [tuple(map(float, rect)) for rect in obstacles]
+        self.outlines = list(outlines) if outlines is not None else [True] * len(self.bounds)
+        self.clearance = clearance
+        self.rects = [(x0 - clearance, y0 - clearance, x1 + clearance, y1 + clearance)
+                      for x0, y0, x1, y1 in self.bounds]
+        sizes = sorted(max(x1 - x0, y1 - y0) for x0, y0, x1, y1 in self.rects)
+        median = sizes[len(sizes) // 2] if sizes else 1.0
+        self.bend_cost = median if bend_cost is None else bend_cost
+        self.overlap_cost = overlap_cost
+        self.index = GridIndex(max(median, TOLERANCE))
+        for rect in self.rects:
+            self.index.insert(rect)
+        self.segments = GridIndex(max(median, TOLERANCE))
+        self.extent = ((min(rect[0] for rect in self.rects), min(rect[1] for rect in self.rects),
+                        max(rect[2] for rect in self.rects), max(rect[3] for rect in self.rects))
+                       if self.rects else (0.0, 0.0, 0.0, 0.0))
+        self.shaped = 0  # edges routed by a straight, L or Z shape
+        self.searched = 0  # edges routed by the grid search
+        self.blocked = 0  # edges with no free route, drawn as an L shape anyway
+
+    def _containers(self, point):
+        # Strictly inside: a route may start on the grown border of a box
+        x, y = point
+        rects = self.rects
+        return {index for index in self.index.query(x, y, x, y)
+                if rects[index][0] < x < rects[index][2] and rects[index][1] < y < rects[index][3]}
+
+    def _clear(self, start, end, ignore):
+        """True if the segment ``start``-``end`` enters no obstacle outside ``ignore``."""
+        x0, x1 = sorted((start[0], end[0]))
+        y0, y1 = sorted((start[1], end[1]))
+        rects = self.rects
+        for index in self.index.query(x0, y0, x1, y1):
+            if index in ignore:
+                continue
+            a, b, c, d = rects[index]
+            if a < x1 and c > x0 and b < y1 and d > y0:
+                return False
+        return True
+
+    def _overlap(self, start, end):
+        """Length of the segment ``start``-``end`` that runs along earlier routes."""
+        x0, x1 = sorted((start[0], end[0]))
+        y0, y1 = sorted((start[1], end[1]))
+        total = 0.0
+        segments = self.segments.rects
+        for index in self.segments.query(x0 - TOLERANCE, y0 - TOLERANCE,
+                                         x1 + TOLERANCE, y1 + TOLERANCE):
+            a, b, c, d = segments[index]
+            if y0 == y1 and b == d and abs(b - y0) <= TOLERANCE:
+                total += max(0.0, min(x1, c) - max(x0, a))
+            elif x0 == x1 and a == c and abs(a - x0) <= TOLERANCE:
+                total += max(0.0, min(y1, d) - max(y0, b))
+        return total
+
+    def _bends(self, points, leave, enter):
+        """Bends of ``points``, counting a first or last segment on the wrong axis."""
+        bends = len(points) - 2
+        if leave is not None and _axis(points[0], points[1]) != leave:
+            bends += 1
+        if enter is not None and _axis(points[-2], points[-1]) != enter:
+            bends += 1
+        return bends
+
+    def _shapes(self, start, end, ignore, leave, enter):
+        """The best clear straight, Z or L route, or None."""
+        (sx, sy), (ex, ey) = start, end
+        if sx == ex or sy == ey:
+            candidates = [[start, end]]
+        else:
+            # On a tie the Z shapes win: they bend halfway between the ends
+            mx, my = (sx + ex) / 2, (sy + ey) / 2
+            candidates = [[start, (sx, my), (ex, my), end], [start, (mx, sy), (mx, ey), end],
+                          [start, (ex, sy), end], [start, (sx, ey), end]]
+        best, best_cost = None, math.inf
+        for points in candidates:
+            cost = self._bends(points, leave, enter) * self.bend_cost
+            if cost >= best_cost:
+                continue
+            if all(self._clear(a, b, ignore) for a, b in zip(points, points[1:])):
+                cost += self.overlap_cost * sum(self._overlap(a, b)
+                                                for a, b in zip(points, points[1:]))
+                if cost < best_cost:
+                    best, best_cost = points, cost
+        return best
+
+    def _grid(self, window, start, end, ignore):
+        """Grid lines inside ``window``, which edges are free, and the routes on each edge."""
+        x0, y0, x1, y1 = window
+        ids = [index for index in self.index.query(x0, y0, x1, y1) if index not in ignore]
+        rects = np.array([self.rects[index] for index in ids], dtype=float).reshape(-1, 4)
+
+        def lines(low, high, ends, starts, stops):
+            values = np.concatenate((starts, stops))
+            values = np.unique(np.concatenate(([low, high], ends,
+                                               values[(values > low) & (values < high)])))
+            # Channels halfway between borders keep routes off the obstacles
+            return np.unique(np.concatenate((values, (values[:-1] + values[1:]) / 2)))
+
+        xs = lines(x0, x1, (start[0], end[0]), rects[:, 0], rects[:, 2])
+        ys = lines(y0, y1, (start[1], end[1]), rects[:, 1], rects[:, 3])
+        # Blocked edges: those whose midpoint lies inside an obstacle. Each
+        # obstacle covers a block of rows and columns, counted with a 2-D
+        # difference array; the same counts routes already laid on a line.
+        inner_x = np.searchsorted(xs, rects[:, 0], 'right'), np.searchsorted(xs, rects[:, 2])
+        inner_y = np.searchsorted(ys, rects[:, 1], 'right'), np.searchsorted(ys, rects[:, 3])
+        span_x = np.searchsorted(xs, rects[:, 0]), np.searchsorted(xs, rects[:, 2], 'right') - 1
+        span_y = np.searchsorted(ys, rects[:, 1]), np.searchsorted(ys, rects[:, 3], 'right') - 1
+        across = _coverage((len(ys), len(xs) - 1), inner_y, span_x) == 0  # edge i -> i + 1
+        along = _coverage((len(ys) - 1, len(xs)), span_y, inner_x) == 0  # edge j -> j + 1
+
+        segments = np.array([self.segments.rects[index]
+                             for index in self.segments.query(x0, y0, x1, y1)]).reshape(-1, 4)
+        flat = segments[:, 1] == segments[:, 3]
+        rows = np.searchsorted(ys, segments[flat, 1] - TOLERANCE)
+        on_line = np.abs(ys[rows.clip(0, len(ys) - 1)] - segments[flat, 1]) <= TOLERANCE
+        shared_across = _coverage(
+            (len(ys), len(xs) - 1), (rows[on_line], rows[on_line] + 1),
+            (np.searchsorted(xs, segments[flat, 0][on_line] - TOLERANCE),
+             np.searchsorted(xs, segments[flat, 2][on_line] + TOLERANCE) - 1))
+        columns = np.searchsorted(xs, segments[~flat, 0] - TOLERANCE)
+        on_line = np.abs(xs[columns.clip(0, len(xs) - 1)] - segments[~flat, 0]) <= TOLERANCE
+        shared_along = _coverage(
+            (len(ys) - 1, len(xs)),
+            (np.searchsorted(ys, segments[~flat, 1][on_line] - TOLERANCE),
+             np.searchsorted(ys, segments[~flat, 3][on_line] + TOLERANCE) - 1),
+            (columns[on_line], columns[on_line] + 1))
+        return xs, ys, across, along, shared_across, shared_along
+
+    def _search(self, start, end, ignore, leave, enter, window):
+        """A route on the obstacle grid inside ``window`` (near the cheapest), or None."""
+        xs, ys, across, along, shared_across, shared_along = self._grid(window, start, end, ignore)
+        height, width = len(ys), len(xs)
+        # Cost of each move from each node, NaN when blocked, row-major like the nodes
+        across = np.where(across, np.diff(xs) * (1 + self.overlap_cost * (shared_across > 0)),
+                          np.nan)
+        along = np.where(along, np.diff(ys)[:, None] * (1 + self.overlap_cost * (shared_along > 0)),
+                         np.nan)
+        right, left, up, down = (np.full((height, width), np.nan) for _ in range(4))
+        right[:, :-1] = left[:, 1:] = across
+        up[:-1] = down[1:] = along
+        moves = ((1, HORIZONTAL, right.ravel().tolist()), (-1, HORIZONTAL, left.ravel().tolist()),
+                 (width, VERTICAL, up.ravel().tolist()), (-width, VERTICAL, down.ravel().tolist()))
+
+        # A* estimate per state (node * 2 + axis the node was reached along):
+        # the Manhattan distance, plus a bend if the end needs the other axis.
+        # It is scaled by the cost of a shared line: between many near-equal
+        # lanes, an exact search would expand most of the grid to find the
+        # one with the least overlap.
+        bend = self.bend_cost
+        off_x = (xs != end[0])[None, :]
+        off_y = (ys != end[1])[:, None]
+        distance = np.abs(xs - end[0])[None, :] + np.abs(ys - end[1])[:, None]
+        estimate = np.stack([distance + bend * off_y, distance + bend * off_x], axis=-1)
+        estimate = ((1 + self.overlap_cost) * estimate).ravel().tolist()
+        xs, ys = xs.tolist(), ys.tolist()
+        source = ys.index(start[1]) * width + xs.index(start[0])
+        goal = ys.index(end[1]) * width + xs.index(end[0])
+
+        best = [math.inf] * (2 * height * width)
+        parents = [-1] * (2 * height * width)
+        queue = []
+        for axis in (HORIZONTAL, VERTICAL) if leave is None else (leave,):
+            state = 2 * source + axis
+            best[state] = 0.0
+            # On a tie in the estimate, the state furthest along is expanded first
+            heapq.heappush(queue, (estimate[state], -0.0, state))
+        while queue:
+            _, cost, state = heapq.heappop(queue)
+            cost = -cost
+            if cost > best[state]:
+                continue
+            node = state >> 1
+            if node == goal:
+                break
+            axis = state & 1
+            for delta, next_axis, costs in moves:
+                step = costs[node]
+                if step != step:  # NaN: blocked
+                    continue
+                total = cost + step
+                if next_axis != axis:
+                    total += bend
+                following = node + delta
+                if following == goal and enter is not None and next_axis != enter:
+                    total += bend
+                key = 2 * following + next_axis
+                if total < best[key]:
+                    best[key] = total
+                    parents[key] = state
+                    heapq.heappush(queue, (total + estimate[key], -total, key))
+        else:
+            return None
+
+        points = []
+        while state != -1:
+            node = state >> 1
+            points.append((xs[node % width], ys[node // width]))
+            state = parents[state]
+        return points[::-1]
+
+    def _searched_route(self, start, end, ignore, leave, enter):
+        (sx, sy), (ex, ey) = start, end
+        pad = max(abs(ex - sx), abs(ey - sy)) / 8 + self.index.cell
+        while True:
+            window = (min(sx, ex) - pad, min(sy, ey) - pad, max(sx, ex) + pad, max(sy, ey) + pad)
+            points = self._search(start, end, ignore, leave, enter, window)
+            if points is not None:
+                return points
+            left, bottom, right, top = self.extent
+            if window[0] < left and window[1] < bottom and window[2] > right and window[3] > top:
+                return None
+            pad *= 4
+
+    def _clip(self, points, ignore, other):
+        """``points`` from where they leave the smallest box around ``points[0]``."""
+        start = points[0]
+        boxes = [index for index in ignore if self.outlines[index] is not None
+                 and _contains(self.bounds[index], start)
+                 and not _contains(self.bounds[index], other)]
+        if not boxes:
+            return points
+        index = min(boxes, key=lambda index: (self.bounds[index][2] - self.bounds[index][0])
+                    * (self.bounds[index][3] - self.bounds[index][1]))
+        bounds, outline = self.bounds[index], self.outlines[index]
+        for position, (a, b) in enumerate(zip(points, points[1:])):
+            if outline is True:
+                if _contains(bounds, b):
+                    continue
+                # A segment leaving an axis-aligned box exits at its clamped end
+                exit = (min(max(b[0], bounds[0]), bounds[2]), min(max(b[1], bounds[1]), bounds[3]))
+            else:
+                if outline.contains_point(b):
+                    continue
+                if not outline.contains_point(a):
+                    exit = a
+                else:
+                    inside, outside = a, b
+                    for _ in range(30):
+                        middle = ((inside[0] + outside[0]) / 2, (inside[1] + outside[1]) / 2)
+                        if outline.contains_point(middle):
+                            inside = middle
+                        else:
+                            outside = middle
+                    exit = outside
+            return [exit] + points[position + 1:]
+        return points[-1:] * 2
+
+    def route(self, start, end, leave=None, enter=None):
+        """
+        The orthogonal route from ``start`` to ``end`` as a list of points,
+        clipped to the boxes the end points lie in. ``leave`` and ``enter``
+        are the axes (``HORIZONTAL`` or ``VERTICAL``) the first and last
+        segments should run along; a route that does not costs a bend. The
+        route is remembered, so later routes avoid running along it.
+        """
+        start = (float(start[0]), float(start[1]))
+        end = (float(end[0]), float(end[1]))
+        if start == end:
+            return [start, end]
+        starts, ends = self._containers(start), self._containers(end)
+        ignore = starts | ends
+        points = self._shapes(start, end, ignore, leave, enter)
+        if points is not None:
+            self.shaped += 1
+        else:
+            points = self._searched_route(start, end, ignore, leave, enter)
+            if points is not None:
+                self.searched += 1
+            else:
+                self.blocked += 1
+                points = [start, (end[0], start[1]), end]
+        points = _simplify(points)
+        points = self._clip(points, starts, end)
+        points = self._clip(points[::-1], ends, start)[::-1]
+        for a, b in zip(points, points[1:]):
+            self.segments.insert((min(a[0], b[0]), min(a[1], b[1]),
+                                  max(a[0], b[0]), max(a[1], b[1])))
+        return points
+
+    def hits(self, points, ends):
+        """Obstacles outside ``ends`` that the route ``points`` enters (a check)."""
+        hit = set()
+        for a, b in zip(points, points[1:]):
+            x0, x1 = sorted((a[0], b[0]))
+            y0, y1 = sorted((a[1], b[1]))
+            for index in self.index.query(x0, y0, x1, y1):
+                c = self.bounds[index]
+                if index not in ends and c[0] < x1 and c[2] > x0 and c[1] < y1 and c[3] > y0:
+                    hit.add(index)
+        return hit
+
+
+def _is_solid(patch):
+    return patch.get_visible() and patch.get_fill() and patch.get_facecolor()[3] > 0
+
+
+def _outline(patch, to_display):
+    """What a route ending in ``patch`` is clipped to: True for its box, else its path."""
+    if isinstance(patch, (Rectangle, FancyBboxPatch)):
+        return True
+    transform = patch.get_transform()
+    if not patch.is_transform_set():
+        # Batched shapes hold data coordinates
+        transform = transform + to_display
+    return transform.transform_path(patch.get_path())
+
+
+class AxesRouter(Artist):
+    """
+    Routes the orthogonal arrows of one Axes when it is drawn. It is drawn
+    first and paints nothing: it collects the Axes' filled shapes, gradient
+    boxes and texts as obstacles, routes every arrow added since the last
+    draw (all of them, in the order they were added) in display space, and
+    hands each arrow its path in data coordinates.
+    """
+
+    def __init__(self, ax, clearance=CLEARANCE):
+        super().__init__()
+        self.ax = ax
+        self.clearance = clearance  # points
+        self.arrows = []  # (FancyArrowPatch, start, end) in data coordinates
+        self._routed = 0
+        self.router = None  # the OrthogonalRouter of the last routing
+        self.set_zorder(-math.inf)
+        self.set_in_layout(False)
+
+    def add(self, arrow, start, end):
+        """Route ``arrow``, a path-mode ``FancyArrowPatch``, from ``start`` to ``end``."""
+        self.arrows.append((arrow, start, end))
+        self._routed = 0
+        self.stale = True
+        return arrow
+
+    def get_window_extent(self, renderer=None):
+        return Bbox.null()
+
+    def obstacles(self, renderer):
+        """Display-space boxes of the Axes' shapes and texts, and their outlines."""
+        to_display = self.ax.transData
+        rects, outlines = [], []
+
+        def add(extent, outline):
+            if extent.width > 0 and extent.height > 0 and np.isfinite(extent.extents).all():
+                rects.append(tuple(extent.extents))
+                outlines.append(outline)
+
+        for artist in self.ax._children:
+            if isinstance(artist, PatchBatch):
+                for patch in artist.source_patches:
+                    if _is_solid(patch):
+                        outline = _outline(patch, to_display)
+                        add(patch.get_path().get_extents(patch.get_patch_transform() + to_display),
+                            outline)
+            elif isinstance(artist, (ArrowBatch, FancyArrowPatch)) or not artist.get_visible():
+                continue
+            elif isinstance(artist, Patch):
+                if _is_solid(artist):
+                    add(artist.get_window_extent(renderer), _outline(artist, to_display))
+            elif isinstance(artist, PolyCollection):
+                add(artist.get_window_extent(renderer), True)
+            elif isinstance(artist, Text) and artist.get_text().strip():
+                # Text's own extent: an Annotation's would include its arrow
+                extent = Text.get_window_extent(artist, renderer)
+                frame = artist.get_bbox_patch()
+                if frame is not None:
+                    artist.update_bbox_position_size(renderer)
+                    extent = Bbox.union([extent, frame.get_window_extent(renderer)])
+                add(extent, None)
+        return rects, outlines
+
+    def draw(self, renderer):
+        if self._routed == len(self.arrows) or not self.get_visible():
+            return
+        rects, outlines = self.obstacles(renderer)
+        self.router = OrthogonalRouter(rects, renderer.points_to_pixels(self.clearance), outlines)
+        to_display = self.ax.transData
+        from_display = to_display.inverted()
+        for arrow, start, end in self.arrows:
+            points = self.router.route(*to_display.transform([start, end]))
+            # A path-mode arrow draws this path; see FancyArrowPatch.__init__
+            arrow._path_original = Path(from_display.transform(points))
+            arrow.stale = True
+        self._routed = len(self.arrows)
+
+
+def edge_router(ax):
+    """The AxesRouter of ``ax``, created and added to it if needed."""
+    router = getattr(ax, '_dac_router', None)
+    if router is None:
+        router = ax._dac_router = AxesRouter(ax)
+        ax.add_artist(router)
+    return router
+
+
+def route_layout(layout, clearance=0.1, direction='TB'):
+    """
+    ``layout`` (see ``layout.py``) with every edge routed orthogonally. An
+    edge leaves its source on the side facing the next layer and enters its
+    target on the side facing the previous one (``direction`` as given to
+    ``layered_layout``). ``clearance`` is in the layout's data units. The
+    router is kept as ``routed.router``.
+    """
+    began = time.perf_counter()
+    rects = [(x, y, x + width, y + height) for x, y, width, height in layout.boxes.values()]
+    router = OrthogonalRouter(rects, clearance)
+
+    def port(node, forward):
+        """Side midpoint of ``node`` facing the next layer (or the previous one)."""
+        x, y, width, height = layout.boxes[node]
+        if direction == 'TB':
+            side, step = ((x + width / 2, y), (0, -clearance)) if forward else \
+                ((x + width / 2, y + height), (0, clearance))
+        else:
+            side, step = ((x + width, y + height / 2), (clearance, 0)) if forward else \
+                ((x, y + height / 2), (-clearance, 0))
+        return side, (side[0] + step[0], side[1] + step[1])
+
+    axis = VERTICAL if direction == 'TB' else HORIZONTAL
+    routes = []
+    for source, target, _ in layout.routes:
+        forward = layout.layers[source] < layout.layers[target]
+        (exit, first), (entry, last) = port(source, forward), port(target, not forward)
+        points = router.route(first, last, leave=axis, enter=axis)
+        routes.append((source, target, _simplify([exit] + points + [entry])))
+    timings = dict(layout.timings, routes=time.perf_counter() - began)
+    routed = Layout(layout.boxes, routes, layout.layers, layout.crossings, layout.dummies, timings)
+    routed.router = router
+    return routed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time orthogonal edge routing on laid-out '
+                                                 'random flowcharts.')
+    parser.add_argument('--nodes', type=int, nargs='+', default=[20, 100, 1000, 5000],
+                        help='graph sizes to lay out and route (default: 20 100 1000 5000)')
+    parser.add_argument('--seed', type=int, default=0, help='random graph seed (default: 0)')
+    parser.add_argument('--render', metavar='DIR',
+                        help='also draw each routed layout with the shared box and arrow kits')
+    args = parser.parse_args(argv)
+
+    print('🧭 Orthogonal routing of layered layouts, random flowcharts')
+    print('=' * 78)
+    print(f'{"Nodes":>7} {"Edges":>7} {"Shapes":>8} {"Searched":>9} {"Blocked":>8} '
+          f'{"Box hits":>9} {"Layout":>10} {"Routes (ms)":>12}')
+    for count in args.nodes:
+        edges = random_flowchart(count, seed=args.seed)
+        layout = layered_layout(edges, nodes=range(count))
+        gc.collect()  # time the routing, not the layout's garbage
+        routed = route_layout(layout)
+        router = routed.router
+        names = list(layout.boxes)
+        position = {node: index for index, node in enumerate(names)}
+        hits = sum(len(router.hits(points, {position[source], position[target]}))
+                   for source, target, points in routed.routes)
+        timings = routed.timings
+        print(f'{count:>7} {len(routed.routes):>7} {router.shaped:>8} {router.searched:>9} '
+              f'{router.blocked:>8} {hits:>9} '
+              f'{(sum(timings.values()) - timings["routes"]) * 1000:>10.1f} '
+              f'{timings["routes"] * 1000:>12.1f}')
+        if args.render:
+            path = render_layout(routed, os.path.join(args.render, f'routes_{count}.png'))
+            print(f'   🖼️  {path}')
+    print('=' * 78)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
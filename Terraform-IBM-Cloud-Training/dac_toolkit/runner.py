@@ -0,0 +1,145 @@
+"""
+Worker-side execution of a single FigureTask.
+
+Workers always render on Agg, whatever backend pyplot would otherwise pick
+on this machine: by default ``POOLED_BACKEND``, which reuses Agg pixel
+buffers between figures and frees them as soon as a figure is closed (see
+``pool.py``), or plain ``BUILD_BACKEND`` when pooling is turned off.
+
+Diagram scripts have no import-time side effects, so each worker imports a
+script at most once and keeps it warm for every later figure. A figure is
+built and saved inside ``plt.style.context(module.STYLE, after_reset=True)``:
+rcParams start from matplotlib's defaults for every figure and are restored
+afterwards, so topics rendered in the same worker never see each other's
+styling. The figure is then written in every requested format from a single
+layout pass (see ``export.py``) and, if asked, its PNGs are palette-optimized
+in the same worker (see ``optimize.py``). In reproducible mode the figure
+is built with seeded RNGs and saved with fixed metadata (see
+``reproducible.py``). Font families the style names but this machine lacks
+are resolved once per style rather than on every text draw (see
+``fonts.py``), and text wrapping and layout are memoized across figures
+(see ``textcache.py``).
+"""
+
+import importlib.util
+import os
+import re
+import sys
+import time
+import traceback
+from contextlib import nullcontext
+
+import matplotlib
+from .backends import BUILD_BACKEND, POOLED_BACKEND
+matplotlib.use(POOLED_BACKEND)
+import matplotlib.pyplot as plt
+from matplotlib._pylab_helpers import Gcf
+
+from . import textcache
+from .benchmark import peak_rss_mb
+from .export import DEFAULT_FORMATS, export_figure
+from .fonts import resolved_fonts
+from .optimize import optimize_png
+from .pool import POOL
+from .reproducible import reproducible_figure
+from .tasks import SAVE_SETTINGS, RenderResult
+
+# script path -> imported module
+_loaded = {}
+
+
+def _module_name(task):
+    slug = re.sub(r'\W+', '_', task.topic).strip('_').lower()
+    return f'dac_{slug}_{os.path.splitext(os.path.basename(task.script))[0]}'
+
+
+def load_script(task, reload=False):
+    """Import the task's script, once per process unless ``reload`` is set."""
+    if reload or task.script not in _loaded:
+        name = _module_name(task)
+        spec = importlib.util.spec_from_file_location(name, task.script)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+        _loaded[task.script] = module
+    return _loaded[task.script]
+
+
+def _use_backend(pool):
+    backend = POOLED_BACKEND if pool else BUILD_BACKEND
+    if matplotlib.get_backend().lower() != backend.lower():
+        plt.switch_backend(backend)
+
+
+def _memory(before, fig=None):
+    """
+    Worker peak RSS and the figures left open besides ``fig``, plus the
+    pool's allocations since ``before`` (if pooled).
+    """
+    memory = {'peak_rss_mb': round(peak_rss_mb(), 1),
+              'stray_figures': sum(manager.canvas.figure is not fig
+                                   for manager in Gcf.get_all_fig_managers())}
+    if before is not None:
+        after = POOL.stats()
+        memory.update({'allocations': after['allocations'] - before['allocations'],
+                       'allocated_bytes': after['allocated_bytes'] - before['allocated_bytes'],
+                       'reuses': after['reuses'] - before['reuses']})
+    return memory
+
+
+def _text_counts(before):
+    """Text layout cache hits and misses since ``before``."""
+    after = textcache.CACHE.stats()
+    return {name: after[name] - before[name] for name in before}
+
+
+def render_task(task, formats=DEFAULT_FORMATS, optimize=False, backends=None, extent=None,
+                pool=True, reproducible=False, text_cache=True, output_dir=None):
+    """
+    Build one registered figure and export it in ``formats``. Never raises.
+
+    ``extent`` is the figure's stored tight box, if any (see ``extent.py``).
+    ``pool`` selects the pooled Agg backend (see ``pool.py``), and
+    ``reproducible`` seeds the figure and pins its metadata (see
+    ``reproducible.py``). ``text_cache`` memoizes text wrapping and layout
+    across figures (see ``textcache.py``). ``output_dir`` writes the outputs
+    below ``output_dir/<topic>`` instead of the script's DaC folder.
+    """
+    start = time.perf_counter()
+    _use_backend(pool)
+    if text_cache:
+        textcache.install()
+    else:
+        textcache.uninstall()
+    before = POOL.stats() if pool else None
+    text_before = dict(textcache.CACHE.counts)
+    fig = None
+    try:
+        module = load_script(task)
+        builder = module.FIGURES[task.name]
+        output = os.path.join(task.dac_dir if output_dir is None
+                              else os.path.join(output_dir, task.topic), task.output)
+        with plt.style.context(getattr(module, 'STYLE', []), after_reset=True), \
+                resolved_fonts(), \
+                (reproducible_figure(task) if reproducible else nullcontext()):
+            fig = builder()
+            outputs, timings, extent = export_figure(
+                fig, output, formats, getattr(module, 'SAVEFIG_OPTIONS', SAVE_SETTINGS),
+                backends, extent, reproducible)
+        if optimize:
+            optimize_start = time.perf_counter()
+            for path in outputs:
+                if path.endswith('.png'):
+                    result = optimize_png(path)
+                    if result.status == 'failed':
+                        raise RuntimeError(f'optimizing {path} failed:\n{result.error}')
+            timings['optimize'] = time.perf_counter() - optimize_start
+        return RenderResult(task, 'ok', time.perf_counter() - start, outputs, None, timings,
+                            extent, _memory(before, fig), _text_counts(text_before))
+    except Exception:
+        return RenderResult(task, 'failed', time.perf_counter() - start, [],
+                            traceback.format_exc(), {}, None, _memory(before, fig),
+                            _text_counts(text_before))
+    finally:
+        # Also closes anything a failed or careless builder left open (see workers.py)
+        plt.close('all')
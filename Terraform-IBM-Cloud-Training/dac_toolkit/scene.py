@@ -0,0 +1,851 @@
+"""
+Recorded scene graphs of DaC figures: record once, compare and replay.
+
+Saving a figure does two things: matplotlib lays out and draws every
+artist, then the backend rasterizes and encodes the result. This module
+stops after the first part. ``record_figure`` saves a built figure through
+a recording renderer. It measures text exactly like Agg does, but instead
+of filling pixels it keeps every drawing call: paths, markers, collections,
+meshes, images and text, each with its graphics state. The calls land in a
+``Scene``, a flat list of small ``__slots__`` nodes in device pixels at the
+save DPI, after the tight crop.
+
+- **Compare.** ``Scene.digest()`` hashes every node. Two recordings of a
+  figure have the same digest exactly when the same calls would reach the
+  backend, so a figure can be checked for changes without rasterizing or
+  encoding it. Figures are recorded with seeded RNGs and
+  ``SOURCE_DATE_EPOCH`` footers, as in a reproducible build. ``diff_scenes`` also reports which calls differ and the
+  pixel region they cover.
+- **Reload.** A scene is pickled and compressed to
+  ``<cache_dir>/scenes/<figure>.scene``. Loading one skips importing the
+  script and running its builder.
+- **Replay.** ``replay_scene`` draws a scene on any backend: PNG through
+  Agg reproduces the original pixels, and SVG, PDF or another DPI are
+  scaled from the recorded coordinates. Font and text rcParams are
+  recorded too, so a replay does not depend on the script's ``STYLE``.
+
+Recording happens at the renderer rather than by wrapping ``Axes``
+methods. Builders also draw through ``plot``, ``bar``, ``table``, legends,
+tick labels and ``tight_layout``, and all of them end up as renderer calls,
+so every registered figure records without changes to its script.
+
+Layout on disk::
+
+    <cache_dir>/scenes/<topic>_<function>.scene    zlib-compressed pickle of a Scene
+
+Usage (from the Terraform-IBM-Cloud-Training directory):
+    python3 -m dac_toolkit.scene -t 06-State-Management          # record, report changes
+    python3 -m dac_toolkit.scene --check                         # exit 1 if a figure changed
+    python3 -m dac_toolkit.scene -t 06-State --replay /tmp/scenes --formats png,svg
+"""
+
+import argparse
+import difflib
+import hashlib
+import os
+import pickle
+import re
+import sys
+import time
+import traceback
+import zlib
+from collections import namedtuple
+
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+from matplotlib.artist import Artist
+from matplotlib.backends.backend_agg import FigureCanvasAgg, RendererAgg
+from matplotlib.font_manager import FontProperties
+from matplotlib.path import Path
+from matplotlib.transforms import Affine2D, Bbox, TransformedPath
+
+from .cache import DEFAULT_CACHE_DIR
+from .discovery import COURSE_ROOT, discover_tasks
+from .export import ExportFormat, output_path, parse_formats
+from .fonts import register_bundled_fonts, resolved_fonts
+from .reproducible import reproducible_figure, source_date_epoch
+from .runner import load_script
+from .tasks import SAVE_SETTINGS
+
+# Bump when the node layout changes; older scene files are then re-recorded
+SCENE_FORMAT = 1
+
+SCENES_DIR = 'scenes'
+SCENE_EXTENSION = '.scene'
+
+# rcParams that change how recorded text and paths reach the backend
+SCENE_RC = tuple(key for key in (
+    'font.family', 'font.serif', 'font.sans-serif', 'font.monospace', 'font.cursive',
+    'font.fantasy', 'text.hinting', 'text.hinting_factor', 'text.kerning_factor',
+    'text.antialiased', 'mathtext.fontset', 'mathtext.fallback', 'mathtext.default',
+    'mathtext.rm', 'mathtext.it', 'mathtext.bf', 'mathtext.bfit', 'mathtext.sf', 'mathtext.tt',
+    'mathtext.cal', 'agg.path.chunksize') if key in matplotlib.rcParams)
+
+
+def _freeze(value):
+    """Recorded values are copied, so later changes to an artist cannot reach the scene."""
+    if isinstance(value, np.ndarray):
+        return np.array(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _matrix(transform):
+    return np.array(transform.get_matrix(), dtype=float)
+
+
+def _update_digest(digest, value):
+    """Feed ``value`` to ``digest`` by content, independent of object identity."""
+    if isinstance(value, np.ndarray):
+        digest.update(f'a{value.dtype.str}{value.shape}'.encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (tuple, list)):
+        digest.update(f't{len(value)}'.encode())
+        for item in value:
+            _update_digest(digest, item)
+    elif isinstance(value, SceneNode):
+        value.update_digest(digest)
+    else:
+        digest.update(f'{type(value).__name__}:{value!r};'.encode())
+
+
+class SceneNode:
+    """Base of every scene node: plain values in ``__slots__``, compared by content."""
+
+    __slots__ = ()
+
+    def values(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def update_digest(self, digest):
+        digest.update(type(self).__name__.encode())
+        for value in self.values():
+            _update_digest(digest, value)
+
+    def digest(self):
+        digest = hashlib.sha256()
+        self.update_digest(digest)
+        return digest.hexdigest()
+
+    def __getstate__(self):
+        return self.values()
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+
+class PathData(SceneNode):
+    """A ``Path`` as arrays, with the simplification settings Agg reads from it."""
+
+    __slots__ = ('vertices', 'codes', 'simplify', 'threshold')
+
+    def __init__(self, path):
+        self.vertices = np.array(path.vertices, dtype=float)
+        self.codes = None if path.codes is None else np.array(path.codes)
+        self.simplify = path.should_simplify
+        self.threshold = path.simplify_threshold
+
+    def path(self):
+        path = Path(self.vertices, self.codes)
+        path.should_simplify = self.simplify
+        path.simplify_threshold = self.threshold
+        return path
+
+
+class GCState(SceneNode):
+    """Everything a ``GraphicsContextBase`` carries, in device pixels and points."""
+
+    __slots__ = ('alpha', 'forced_alpha', 'antialiased', 'capstyle', 'joinstyle', 'cliprect',
+                 'clippath', 'clippath_matrix', 'dashes', 'linewidth', 'rgb', 'hatch',
+                 'hatch_color', 'hatch_linewidth', 'url', 'gid', 'snap', 'sketch')
+
+    def __init__(self, gc):
+        self.alpha = float(gc._alpha)
+        self.forced_alpha = bool(gc._forced_alpha)
+        self.antialiased = int(gc._antialiased)
+        self.capstyle = gc.get_capstyle()
+        self.joinstyle = gc.get_joinstyle()
+        cliprect = gc.get_clip_rectangle()
+        self.cliprect = None if cliprect is None else tuple(float(v) for v in cliprect.bounds)
+        path, affine = gc.get_clip_path()
+        self.clippath = None if path is None else PathData(path)
+        self.clippath_matrix = None if path is None else _matrix(affine)
+        offset, dashes = gc.get_dashes()
+        self.dashes = (offset, None if dashes is None else tuple(float(v) for v in dashes))
+        self.linewidth = float(gc.get_linewidth())
+        self.rgb = tuple(float(v) for v in gc.get_rgb())
+        self.hatch = gc.get_hatch()
+        self.hatch_color = None if gc._hatch_color is None else \
+            tuple(float(v) for v in gc._hatch_color)
+        self.hatch_linewidth = getattr(gc, '_hatch_linewidth', None)
+        self.url = gc.get_url()
+        self.gid = gc.get_gid()
+        self.snap = gc.get_snap()
+        self.sketch = _freeze(gc.get_sketch_params())
+
+    def apply(self, gc, scale):
+        """Set this state on a backend's fresh ``gc``, scaling pixel geometry by ``scale``."""
+        gc.set_alpha(self.alpha if self.forced_alpha else None)
+        gc.set_foreground(self.rgb, isRGBA=True)
+        gc.set_antialiased(self.antialiased)
+        gc.set_capstyle(self.capstyle)
+        gc.set_joinstyle(self.joinstyle)
+        if self.cliprect is not None:
+            x, y, width, height = (value * scale for value in self.cliprect)
+            gc.set_clip_rectangle(Bbox.from_bounds(x, y, width, height))
+        if self.clippath is not None:
+            gc.set_clip_path(TransformedPath(self.clippath.path(),
+                                             _scaled(Affine2D(self.clippath_matrix), scale)))
+        gc.set_dashes(*self.dashes)
+        gc.set_linewidth(self.linewidth)
+        gc.set_hatch(self.hatch)
+        if self.hatch_color is not None:
+            gc.set_hatch_color(self.hatch_color)
+        if self.hatch_linewidth is not None and hasattr(gc, 'set_hatch_linewidth'):
+            gc.set_hatch_linewidth(self.hatch_linewidth)
+        gc.set_url(self.url)
+        gc.set_gid(self.gid)
+        gc.set_snap(self.snap)
+        if self.sketch is not None:
+            gc.set_sketch_params(*self.sketch)
+
+
+def _scaled(transform, scale):
+    return transform if scale == 1 else transform + Affine2D().scale(scale)
+
+
+def _offset_values(offsets, offset_trans):
+    """Offsets with any non-affine part applied, and the remaining affine matrix."""
+    offsets = np.asarray(offsets, dtype=float)
+    if not offset_trans.is_affine:
+        offsets = offset_trans.transform_non_affine(offsets)
+        offset_trans = offset_trans.get_affine()
+    return np.array(offsets), _matrix(offset_trans)
+
+
+def _extent(points):
+    """``(x0, y0, x1, y1)`` of an ``(N, 2)`` array of device points, or None."""
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    points = points[np.isfinite(points).all(axis=1)]
+    if not len(points):
+        return None
+    return (*points.min(axis=0), *points.max(axis=0))
+
+
+class PathOp(SceneNode):
+    __slots__ = ('state', 'path', 'matrix', 'face')
+
+    def __init__(self, state, path, transform, face):
+        self.state = state
+        self.path = PathData(path)
+        self.matrix = _matrix(transform)
+        self.face = None if face is None else tuple(float(v) for v in face)
+
+    def replay(self, renderer, gc, scale):
+        renderer.draw_path(gc, self.path.path(), _scaled(Affine2D(self.matrix), scale), self.face)
+
+    def extent(self):
+        return _extent(Affine2D(self.matrix).transform(self.path.vertices))
+
+
+class MarkersOp(SceneNode):
+    __slots__ = ('state', 'marker', 'marker_matrix', 'path', 'matrix', 'face')
+
+    def __init__(self, state, marker_path, marker_trans, path, trans, face):
+        self.state = state
+        self.marker = PathData(marker_path)
+        self.marker_matrix = _matrix(marker_trans)
+        self.path = PathData(path)
+        self.matrix = _matrix(trans)
+        self.face = None if face is None else tuple(float(v) for v in face)
+
+    def replay(self, renderer, gc, scale):
+        renderer.draw_markers(gc, self.marker.path(), _scaled(Affine2D(self.marker_matrix), scale),
+                              self.path.path(), _scaled(Affine2D(self.matrix), scale), self.face)
+
+    def extent(self):
+        return _extent(Affine2D(self.matrix).transform(self.path.vertices))
+
+
+class CollectionOp(SceneNode):
+    __slots__ = ('state', 'master', 'paths', 'transforms', 'offsets', 'offset_matrix',
+                 'facecolors', 'edgecolors', 'linewidths', 'linestyles', 'antialiaseds', 'urls',
+                 'offset_position', 'hatchcolors')
+
+    def __init__(self, state, master_transform, paths, all_transforms, offsets, offset_trans,
+                 facecolors, edgecolors, linewidths, linestyles, antialiaseds, urls,
+                 offset_position, hatchcolors):
+        self.state = state
+        self.master = _matrix(master_transform)
+        self.paths = tuple(PathData(path) for path in paths)
+        self.transforms = np.array(all_transforms, dtype=float)
+        self.offsets, self.offset_matrix = _offset_values(offsets, offset_trans)
+        self.facecolors = np.array(facecolors, dtype=float)
+        self.edgecolors = np.array(edgecolors, dtype=float)
+        self.linewidths = np.array(linewidths, dtype=float)
+        self.linestyles = _freeze(list(linestyles))
+        self.antialiaseds = np.array(antialiaseds)
+        self.urls = _freeze(list(urls))
+        self.offset_position = offset_position
+        self.hatchcolors = None if hatchcolors is None else np.array(hatchcolors, dtype=float)
+
+    def replay(self, renderer, gc, scale):
+        extra = {} if self.hatchcolors is None else {'hatchcolors': self.hatchcolors}
+        renderer.draw_path_collection(
+            gc, _scaled(Affine2D(self.master), scale), [path.path() for path in self.paths],
+            self.transforms, self.offsets, _scaled(Affine2D(self.offset_matrix), scale),
+            self.facecolors, self.edgecolors, self.linewidths, list(self.linestyles),
+            self.antialiaseds, list(self.urls), self.offset_position, **extra)
+
+    def extent(self):
+        # Every path may be drawn at every offset, so the box is their sum
+        master = Affine2D(self.master)
+        paths = _extent(np.concatenate([master.transform(path.vertices) for path in self.paths])
+                        if self.paths else [])
+        offsets = _extent(Affine2D(self.offset_matrix).transform(self.offsets)
+                          if len(self.offsets) else [])
+        if paths is None or offsets is None:
+            return paths or offsets
+        return tuple(path + offset for path, offset in zip(paths, offsets))
+
+
+class QuadMeshOp(SceneNode):
+    __slots__ = ('state', 'master', 'width', 'height', 'coordinates', 'offsets', 'offset_matrix',
+                 'facecolors', 'antialiased', 'edgecolors')
+
+    def __init__(self, state, master_transform, mesh_width, mesh_height, coordinates, offsets,
+                 offset_trans, facecolors, antialiased, edgecolors):
+        self.state = state
+        self.master = _matrix(master_transform)
+        self.width = int(mesh_width)
+        self.height = int(mesh_height)
+        self.coordinates = np.array(coordinates, dtype=float)
+        self.offsets, self.offset_matrix = _offset_values(offsets, offset_trans)
+        self.facecolors = np.array(facecolors, dtype=float)
+        self.antialiased = bool(antialiased)
+        self.edgecolors = np.array(edgecolors, dtype=float)
+
+    def replay(self, renderer, gc, scale):
+        renderer.draw_quad_mesh(gc, _scaled(Affine2D(self.master), scale), self.width, self.height,
+                                self.coordinates, self.offsets,
+                                _scaled(Affine2D(self.offset_matrix), scale), self.facecolors,
+                                self.antialiased, self.edgecolors)
+
+    def extent(self):
+        return _extent(Affine2D(self.master).transform(self.coordinates.reshape(-1, 2)))
+
+
+class GouraudOp(SceneNode):
+    __slots__ = ('state', 'triangles', 'colors', 'matrix')
+
+    def __init__(self, state, triangles, colors, transform):
+        self.state = state
+        self.triangles = np.array(triangles, dtype=float)
+        self.colors = np.array(colors, dtype=float)
+        self.matrix = _matrix(transform)
+
+    def replay(self, renderer, gc, scale):
+        renderer.draw_gouraud_triangles(gc, self.triangles, self.colors,
+                                        _scaled(Affine2D(self.matrix), scale))
+
+    def extent(self):
+        return _extent(Affine2D(self.matrix).transform(self.triangles.reshape(-1, 2)))
+
+
+class ImageOp(SceneNode):
+    __slots__ = ('state', 'x', 'y', 'pixels')
+
+    def __init__(self, state, x, y, im):
+        self.state = state
+        self.x, self.y = float(x), float(y)
+        self.pixels = np.array(im)
+
+    def replay(self, renderer, gc, scale):
+        pixels = self.pixels
+        if scale != 1 and not hasattr(renderer, 'image_dpi'):
+            # Raster backends place images pixel for pixel; vector ones size them by image_dpi
+            from PIL import Image
+
+            height, width = pixels.shape[:2]
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            pixels = np.array(Image.fromarray(pixels).resize(size, Image.LANCZOS))
+        renderer.draw_image(gc, self.x * scale, self.y * scale, pixels)
+
+    def extent(self):
+        height, width = self.pixels.shape[:2]
+        return (self.x, self.y, self.x + width, self.y + height)
+
+
+class FontData(SceneNode):
+    """A ``FontProperties`` as plain values."""
+
+    __slots__ = ('family', 'style', 'variant', 'weight', 'stretch', 'size', 'file',
+                 'math_fontfamily')
+
+    def __init__(self, prop):
+        self.family = tuple(prop.get_family())
+        self.style = prop.get_style()
+        self.variant = prop.get_variant()
+        self.weight = prop.get_weight()
+        self.stretch = prop.get_stretch()
+        self.size = float(prop.get_size_in_points())
+        self.file = prop.get_file()
+        self.math_fontfamily = prop.get_math_fontfamily()
+
+    def properties(self):
+        return FontProperties(family=list(self.family), style=self.style, variant=self.variant,
+                              weight=self.weight, stretch=self.stretch, size=self.size,
+                              fname=self.file, math_fontfamily=self.math_fontfamily)
+
+
+class _TextFeatures:
+    """Stands in for the ``Text`` a backend may ask for font features and language."""
+
+    def __init__(self, features, language):
+        self._features = features
+        self._language = language
+
+    def get_fontfeatures(self):
+        return self._features
+
+    def get_language(self):
+        return self._language
+
+
+class TextOp(SceneNode):
+    __slots__ = ('state', 'x', 'y', 'text', 'font', 'angle', 'ismath', 'features', 'language')
+
+    def __init__(self, state, x, y, text, prop, angle, ismath, mtext):
+        self.state = state
+        # Anchors are kept bottom-up like every other op; see ``replay``
+        self.x, self.y = float(x), float(y)
+        self.text = text
+        self.font = FontData(prop)
+        self.angle = float(angle)
+        self.ismath = ismath
+        self.features = _freeze(getattr(mtext, 'get_fontfeatures', lambda: None)())
+        self.language = _freeze(getattr(mtext, 'get_language', lambda: None)())
+
+    def replay(self, renderer, gc, scale):
+        mtext = None if self.features is None and self.language is None else \
+            _TextFeatures(self.features, self.language)
+        x, y = self.x * scale, self.y * scale
+        if renderer.flipy():
+            y = renderer.get_canvas_width_height()[1] - y
+        if self.ismath == 'TeX':
+            renderer.draw_tex(gc, x, y, self.text, self.font.properties(), self.angle, mtext=mtext)
+        else:
+            renderer.draw_text(gc, x, y, self.text, self.font.properties(), self.angle,
+                               ismath=self.ismath, mtext=mtext)
+
+    def extent(self):
+        # Only the anchor: measuring the text would need a layout pass
+        return (self.x, self.y, self.x, self.y)
+
+
+class Scene(SceneNode):
+    """
+    A recorded figure: its canvas size in pixels at ``dpi``, the rcParams its
+    text depends on, the distinct graphics states and the drawing calls in
+    order. Each op refers to its state by index.
+    """
+
+    __slots__ = ('format', 'matplotlib', 'width', 'height', 'dpi', 'rc', 'states', 'ops')
+
+    def __init__(self, width, height, dpi, rc, states, ops):
+        self.format = SCENE_FORMAT
+        self.matplotlib = matplotlib.__version__
+        self.width, self.height, self.dpi = float(width), float(height), float(dpi)
+        self.rc = rc
+        self.states = states
+        self.ops = ops
+
+    def op_digests(self):
+        """One digest per op, including the state it is drawn with."""
+        digests = []
+        for op in self.ops:
+            digest = hashlib.sha256()
+            self.states[op.state].update_digest(digest)
+            op.update_digest(digest)
+            digests.append(digest.hexdigest())
+        return digests
+
+    def counts(self):
+        """Ops per kind, e.g. ``{'PathOp': 812, 'TextOp': 95}``."""
+        counts = {}
+        for op in self.ops:
+            counts[type(op).__name__] = counts.get(type(op).__name__, 0) + 1
+        return counts
+
+    def replay(self, renderer, scale=1):
+        with matplotlib.rc_context(dict(self.rc)):
+            for op in self.ops:
+                gc = renderer.new_gc()
+                self.states[op.state].apply(gc, scale)
+                op.replay(renderer, gc, scale)
+                gc.restore()
+
+
+class SceneRecorder(RendererAgg):
+    """
+    An Agg renderer that records drawing calls instead of rasterizing them.
+
+    Text is measured by Agg itself, so layout, wrapping and the tight crop
+    match an Agg save exactly. Only a 1x1 pixel buffer is allocated.
+    """
+
+    def __init__(self, width, height, dpi):
+        super().__init__(1, 1, dpi)
+        self.width, self.height = width, height
+        self.bbox = Bbox.from_bounds(0, 0, width, height)
+        self.ops = []
+        self.states = []
+        self._state_index = {}
+
+    def _update_methods(self):
+        # RendererAgg binds its C++ drawing methods per instance; keep ours
+        pass
+
+    def _state(self, gc):
+        state = GCState(gc)
+        key = state.digest()
+        if key not in self._state_index:
+            self._state_index[key] = len(self.states)
+            self.states.append(state)
+        return self._state_index[key]
+
+    def get_canvas_width_height(self):
+        return self.width, self.height
+
+    def draw_path(self, gc, path, transform, rgbFace=None):
+        self.ops.append(PathOp(self._state(gc), path, transform, rgbFace))
+
+    def draw_markers(self, gc, marker_path, marker_trans, path, trans, rgbFace=None):
+        self.ops.append(MarkersOp(self._state(gc), marker_path, marker_trans, path, trans, rgbFace))
+
+    def draw_path_collection(self, gc, master_transform, paths, all_transforms, offsets,
+                             offset_trans, facecolors, edgecolors, linewidths, linestyles,
+                             antialiaseds, urls, offset_position, *, hatchcolors=None):
+        self.ops.append(CollectionOp(self._state(gc), master_transform, paths, all_transforms,
+                                     offsets, offset_trans, facecolors, edgecolors, linewidths,
+                                     linestyles, antialiaseds, urls, offset_position, hatchcolors))
+
+    def draw_quad_mesh(self, gc, master_transform, meshWidth, meshHeight, coordinates, offsets,
+                       offsetTrans, facecolors, antialiased, edgecolors):
+        self.ops.append(QuadMeshOp(self._state(gc), master_transform, meshWidth, meshHeight,
+                                   coordinates, offsets, offsetTrans, facecolors, antialiased,
+                                   edgecolors))
+
+    def draw_gouraud_triangles(self, gc, triangles_array, colors_array, transform):
+        self.ops.append(GouraudOp(self._state(gc), triangles_array, colors_array, transform))
+
+    def draw_image(self, gc, x, y, im, transform=None):
+        self.ops.append(ImageOp(self._state(gc), x, y, im))
+
+    def draw_text(self, gc, x, y, s, prop, angle, ismath=False, mtext=None):
+        # Text arrives flipped against the canvas height (``flipy``); unflip it
+        self.ops.append(TextOp(self._state(gc), x, self.height - y, s, prop, angle, ismath,
+                               mtext))
+
+    def draw_tex(self, gc, x, y, s, prop, angle, *, mtext=None):
+        self.ops.append(TextOp(self._state(gc), x, self.height - y, s, prop, angle, 'TeX',
+                               mtext))
+
+    def scene(self):
+        rc = tuple((key, _freeze(matplotlib.rcParams[key])) for key in SCENE_RC)
+        return Scene(self.width, self.height, self.dpi, rc, self.states, self.ops)
+
+
+class _SceneSink:
+    """Receives the scene of a save instead of a file."""
+
+    scene = None
+
+
+class SceneCanvas(FigureCanvasAgg):
+    """Canvas whose ``scene`` format records a ``SceneRecorder`` pass."""
+
+    filetypes = {'scene': 'DaC scene graph'}
+
+    def get_renderer(self):
+        width, height = self.get_width_height(physical=True)
+        key = (width, height, self.figure.dpi)
+        if getattr(self, '_recorder_key', None) != key:
+            self._recorder_key = key
+            self.renderer = SceneRecorder(width, height, self.figure.dpi)
+        return self.renderer
+
+    def print_scene(self, filename_or_obj, **kwargs):
+        # Whole pixels, as Agg sizes its canvas; text positions depend on it
+        width, height = self.get_width_height(physical=True)
+        recorder = SceneRecorder(width, height, self.figure.dpi)
+        self.figure.draw(recorder)
+        scene = recorder.scene()
+        if isinstance(filename_or_obj, _SceneSink):
+            filename_or_obj.scene = scene
+        else:
+            save_scene(scene, filename_or_obj)
+
+
+def record_figure(fig, savefig_options=None):
+    """The ``Scene`` that saving ``fig`` with ``savefig_options`` would draw."""
+    options = dict(savefig_options or SAVE_SETTINGS)
+    for key in ('format', 'backend', 'metadata', 'pil_kwargs'):
+        options.pop(key, None)
+    sink = _SceneSink()
+    canvas = fig.canvas
+    try:
+        SceneCanvas(fig)
+        fig.savefig(sink, format='scene', **options)
+    finally:
+        fig.set_canvas(canvas)
+    return sink.scene
+
+
+class SceneArtist(Artist):
+    """Draws a recorded scene; scaled when the figure is saved at another DPI."""
+
+    def __init__(self, scene):
+        super().__init__()
+        self.scene = scene
+
+    def draw(self, renderer):
+        self.scene.replay(renderer, self.figure.dpi / self.scene.dpi)
+
+
+def replay_scene(scene, path, export_format=None, backend=None):
+    """Write ``scene`` to ``path`` through the backend for ``export_format``'s file type."""
+    from matplotlib.figure import Figure
+
+    register_bundled_fonts()
+    export_format = export_format or ExportFormat(os.path.splitext(path)[1][1:] or 'png', None)
+    # The nudge keeps whole-pixel sizes from rounding down to the pixel below
+    fig = Figure(figsize=((scene.width + 1e-6) / scene.dpi, (scene.height + 1e-6) / scene.dpi),
+                 dpi=scene.dpi)
+    # The recorded figure background is one of the ops
+    fig.patch.set_visible(False)
+    fig.add_artist(SceneArtist(scene))
+    options = {'format': export_format.extension, 'dpi': export_format.dpi or scene.dpi}
+    if backend:
+        options['backend'] = backend
+    fig.savefig(path, **options)
+
+
+def save_scene(scene, path_or_file):
+    data = zlib.compress(pickle.dumps(scene, protocol=pickle.HIGHEST_PROTOCOL), 1)
+    if hasattr(path_or_file, 'write'):
+        path_or_file.write(data)
+        return
+    directory = os.path.dirname(os.path.abspath(path_or_file))
+    os.makedirs(directory, exist_ok=True)
+    with open(path_or_file + '.tmp', 'wb') as handle:
+        handle.write(data)
+    os.replace(path_or_file + '.tmp', path_or_file)
+
+
+def load_scene(path):
+    """The ``Scene`` stored at ``path``, or None if it is missing or from another format."""
+    try:
+        with open(path, 'rb') as handle:
+            scene = pickle.loads(zlib.decompress(handle.read()))
+    except (OSError, zlib.error, pickle.UnpicklingError, AttributeError, EOFError):
+        return None
+    if not isinstance(scene, Scene) or scene.format != SCENE_FORMAT \
+            or scene.matplotlib != matplotlib.__version__:
+        return None
+    return scene
+
+
+def scene_path(task, cache_dir=DEFAULT_CACHE_DIR):
+    slug = re.sub(r'[^\w.-]+', '_', task.key).strip('_')
+    return os.path.join(str(cache_dir), SCENES_DIR, slug + SCENE_EXTENSION)
+
+
+SceneDiff = namedtuple('SceneDiff', 'changed added removed region')
+
+
+def diff_scenes(old, new):
+    """
+    How ``new`` differs from ``old``: ops changed, added and removed, and
+    the device-pixel region ``(x0, y0, x1, y1)`` they cover in either scene
+    (None if nothing differs). Text contributes its anchor point only.
+    """
+    matcher = difflib.SequenceMatcher(None, old.op_digests(), new.op_digests(), autojunk=False)
+    changed = added = removed = 0
+    extents = []
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        if tag == 'replace':
+            changed += min(old_end - old_start, new_end - new_start)
+        added += max(0, (new_end - new_start) - (old_end - old_start))
+        removed += max(0, (old_end - old_start) - (new_end - new_start))
+        extents.extend(op.extent() for op in old.ops[old_start:old_end])
+        extents.extend(op.extent() for op in new.ops[new_start:new_end])
+    if (old.width, old.height, old.dpi) != (new.width, new.height, new.dpi):
+        extents.append((0, 0, max(old.width, new.width), max(old.height, new.height)))
+    extents = [extent for extent in extents if extent is not None]
+    region = None
+    if extents:
+        region = (min(e[0] for e in extents), min(e[1] for e in extents),
+                  max(e[2] for e in extents), max(e[3] for e in extents))
+    return SceneDiff(changed, added, removed, region)
+
+
+RecordResult = namedtuple('RecordResult', 'task status seconds scene error')
+
+
+def record_task(task):
+    """
+    Build one registered figure and record its scene. Never raises.
+
+    The figure is built reproducibly (see ``reproducible.py``), so its scene
+    changes only when its sources do.
+    """
+    start = time.perf_counter()
+    try:
+        module = load_script(task)
+        with plt.style.context(getattr(module, 'STYLE', []), after_reset=True), \
+                resolved_fonts(), reproducible_figure(task):
+            fig = module.FIGURES[task.name]()
+            scene = record_figure(fig, getattr(module, 'SAVEFIG_OPTIONS', SAVE_SETTINGS))
+        return RecordResult(task, 'ok', time.perf_counter() - start, scene, None)
+    except Exception:
+        return RecordResult(task, 'failed', time.perf_counter() - start, None,
+                            traceback.format_exc())
+    finally:
+        plt.close('all')
+
+
+def _describe(scene_diff):
+    parts = [f'{count} {label}' for count, label in ((scene_diff.changed, 'changed'),
+                                                      (scene_diff.added, 'added'),
+                                                      (scene_diff.removed, 'removed')) if count]
+    text = ', '.join(parts) or 'canvas resized'
+    if scene_diff.region is not None:
+        x0, y0, x1, y1 = (int(round(value)) for value in scene_diff.region)
+        text += f' in x {x0}-{x1}, y {y0}-{y1} px'
+    return text
+
+
+def record_scenes(tasks, cache_dir, store=True):
+    """Record ``tasks``, compare each with its stored scene and print the outcome."""
+    statuses = {'unchanged': 0, 'changed': 0, 'new': 0, 'failed': 0}
+    seconds = scene_bytes = 0
+    for index, task in enumerate(tasks, 1):
+        result = record_task(task)
+        seconds += result.seconds
+        prefix = f'[{index:>3}/{len(tasks)}] {task.key}'
+        if result.status == 'failed':
+            statuses['failed'] += 1
+            print(f'❌ {prefix}\n     ' + result.error.strip().splitlines()[-1])
+            continue
+        path = scene_path(task, cache_dir)
+        previous = load_scene(path)
+        if previous is None:
+            status, note = 'new', f'{len(result.scene.ops)} ops'
+        elif previous.digest() == result.scene.digest():
+            status, note = 'unchanged', f'{len(result.scene.ops)} ops'
+        else:
+            status, note = 'changed', _describe(diff_scenes(previous, result.scene))
+        statuses[status] += 1
+        if store and status != 'unchanged':
+            save_scene(result.scene, path)
+        if os.path.exists(path):
+            scene_bytes += os.path.getsize(path)
+        marker = {'unchanged': '✅', 'changed': '🔄', 'new': '🆕'}[status]
+        print(f'{marker} {prefix} ({result.seconds:.2f}s, {note})')
+    print('=' * 70)
+    print('🎬 Scene Summary')
+    print(f'   Figures: {len(tasks)} ({statuses["unchanged"]} unchanged, {statuses["changed"]} '
+          f'changed, {statuses["new"]} new, {statuses["failed"]} failed)')
+    print(f'   Record time: {seconds:.1f}s | Scenes: {scene_bytes / 1024:.0f} KB')
+    return statuses
+
+
+def replay_scenes(tasks, cache_dir, output_dir, formats):
+    """
+    Write every stored scene of ``tasks`` in ``formats`` below
+    ``output_dir/<topic>``. Returns the number of figures not written.
+    """
+    missing = failed = written = 0
+    start = time.perf_counter()
+    for task in tasks:
+        load_start = time.perf_counter()
+        scene = load_scene(scene_path(task, cache_dir))
+        if scene is None:
+            missing += 1
+            print(f'⚠️  {task.key}: no stored scene; record it first')
+            continue
+        loaded = time.perf_counter() - load_start
+        try:
+            for export_format in formats:
+                path = output_path(os.path.join(output_dir, task.topic, task.output),
+                                   export_format)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                replay_scene(scene, path, export_format)
+                written += 1
+        except Exception:
+            failed += 1
+            print(f'❌ {task.key}\n     ' + traceback.format_exc().strip().splitlines()[-1])
+            continue
+        print(f'🎞️  {task.key} (load {loaded * 1000:.0f} ms, total '
+              f'{time.perf_counter() - load_start:.2f}s)')
+    print('=' * 70)
+    print(f'🎞️  Replayed {written} file(s) in {time.perf_counter() - start:.1f}s'
+          + (f'; {missing} figure(s) had no scene' if missing else '')
+          + (f'; {failed} failed' if failed else ''))
+    return missing + failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Record DaC figures as scene graphs, report which ones changed, '
+                    'or replay stored scenes without running their builders.')
+    parser.add_argument('-t', '--topic', action='append', default=[],
+                        help='only process topics matching this substring or glob (repeatable)')
+    parser.add_argument('-f', '--figure', action='append', default=[],
+                        help='only process figures whose function or file name matches (repeatable)')
+    parser.add_argument('--check', action='store_true',
+                        help='do not store new scenes; exit 1 if any figure changed or is new')
+    parser.add_argument('--replay', metavar='DIR',
+                        help='write the stored scenes to DIR/<topic>/ instead of recording')
+    parser.add_argument('--formats', default='png',
+                        help='formats for --replay, e.g. png,svg,pdf,png@72 (default: png)')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                        help='where scenes are stored (default: %(default)s)')
+    parser.add_argument('--root', default=str(COURSE_ROOT),
+                        help='course root to scan (default: this repository)')
+    args = parser.parse_args(argv)
+    try:
+        formats = parse_formats(args.formats)
+    except ValueError as error:
+        parser.error(str(error))
+
+    tasks = discover_tasks(args.root, topics=args.topic, figures=args.figure)
+    if not tasks:
+        print('❌ No figures matched the given filters')
+        return 1
+
+    # Date footers must not change a scene between runs
+    os.environ['SOURCE_DATE_EPOCH'] = source_date_epoch(args.root)
+    if args.replay:
+        print(f'🎞️  Replaying {len(tasks)} stored scene(s) to {args.replay}...')
+        print('=' * 70)
+        return 1 if replay_scenes(tasks, args.cache_dir, args.replay, formats) else 0
+
+    print(f'🎬 Recording {len(tasks)} figure(s)...')
+    print('=' * 70)
+    statuses = record_scenes(tasks, args.cache_dir, store=not args.check)
+    if statuses['failed']:
+        return 1
+    if args.check and (statuses['changed'] or statuses['new']):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,487 @@
+"""
+Local rendering server for course-portal previews.
+
+Shelling out to a diagram script pays for a fresh interpreter, the
+matplotlib import and the script import on every request, before a single
+figure is drawn. This server pays that once. Worker processes import
+matplotlib and every diagram module at startup and stay warm, and rendered
+results are kept in memory:
+
+    GET /render/<topic>/<figure>?format=png&dpi=100   the figure's bytes
+    GET /figures                                      JSON list of figures and their URLs
+    GET /stats                                        JSON cache and request counters
+
+``<figure>`` is the builder name (``diagram_2_variable_patterns``) or the
+output file name (``variable_patterns.png``). ``format`` is png (default),
+svg, pdf, webp or jpg. ``dpi`` defaults to the script's own DPI and is
+capped at ``MAX_DPI``.
+
+- **Cache.** Results go into an LRU bounded by total bytes. The key is the
+  figure's render-cache source digest plus format and DPI (see
+  ``cache.py``). Editing a figure, a helper it uses or the script's
+  ``STYLE`` changes the key, and the worker re-imports the edited script
+  before rendering. Concurrent requests for the same key share one render.
+  Responses carry the key as an ``ETag`` and honour ``If-None-Match``.
+- **Toolkit edits.** The key also covers the ``dac_toolkit`` modules a
+  figure imports, and workers cannot re-import those safely. Once any
+  toolkit module is saved, the pool is replaced before the next render, so
+  no result is cached under a new key from old toolkit code. Workers are
+  spawned rather than forked, so they do not inherit the server's own
+  already-imported toolkit modules.
+- **Concurrency.** Requests are accepted on threads and rendered in a
+  process pool, because matplotlib itself is not thread-safe.
+- **Failures.** A render still running after ``--timeout`` seconds answers
+  504, and its pool is replaced, since a hung worker cannot be stopped on
+  its own. Renders queued on the old pool are retried once on the new one.
+  A pool whose worker died (``BrokenProcessPool``) is replaced the same
+  way, so later requests keep working without a restart.
+- **Figure index.** Figures are discovered once. An unknown figure only
+  triggers a new discovery if a diagram script was added, removed or
+  saved since the last one.
+
+Usage (from the Terraform-IBM-Cloud-Training directory):
+    python3 -m dac_toolkit.server                       # http://127.0.0.1:8765
+    python3 -m dac_toolkit.server -j 4 --cache-mb 512 -t 06-State
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+from .cache import SourceHasher
+from .discovery import COURSE_ROOT, discover_tasks, find_diagram_scripts
+from .export import ExportFormat
+from .workers import DEFAULT_TIMEOUT
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_MB = 256
+
+# A 16x12 inch figure at 600 DPI is already ~70 megapixels
+MAX_DPI = 600
+
+CONTENT_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+    'pdf': 'application/pdf',
+    'webp': 'image/webp',
+    'jpg': 'image/jpeg',
+}
+
+# Every module a worker may import from this package
+TOOLKIT_DIR = Path(__file__).resolve().parent
+
+
+class RenderTimeout(RuntimeError):
+    """A render ran longer than the service's timeout."""
+
+
+# Worker side: script path -> modification time of the imported version
+_imported = {}
+
+
+def _load_current(task):
+    """Import the task's script in this worker, again if it changed on disk."""
+    from .runner import load_script
+
+    stamp = os.stat(task.script).st_mtime_ns
+    previous = _imported.get(task.script)
+    load_script(task, reload=previous is not None and previous != stamp)
+    _imported[task.script] = stamp
+
+
+def _warm(tasks):
+    """Worker initializer: import matplotlib and every served script up front."""
+    for task in tasks:
+        try:
+            _load_current(task)
+        except Exception:
+            # Reported when the figure is requested
+            pass
+
+
+def _render(task, export_format):
+    """Render one figure in a worker. Returns ``(bytes, None)`` or ``(None, error)``."""
+    from .runner import render_task
+
+    try:
+        _load_current(task)
+    except Exception as error:
+        return None, f'importing {os.path.basename(task.script)} failed: {error}'
+    with tempfile.TemporaryDirectory(prefix='dac_server_') as directory:
+        result = render_task(task, [export_format], output_dir=directory)
+        if result.status != 'ok':
+            return None, result.error.strip().splitlines()[-1]
+        with open(result.outputs[0], 'rb') as handle:
+            return handle.read(), None
+
+
+class ResultCache:
+    """Rendered bytes by key, least recently used evicted first once over ``max_bytes``."""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = data
+            self.bytes += len(data)
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.bytes,
+                    'max_bytes': self.max_bytes, 'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions}
+
+
+class RenderService:
+    """Figure lookup, source-keyed result cache and the warm worker pool."""
+
+    def __init__(self, root=COURSE_ROOT, topics=None, jobs=1, cache_mb=DEFAULT_CACHE_MB,
+                 timeout=DEFAULT_TIMEOUT):
+        self.root = root
+        self.topics = topics
+        self.jobs = jobs
+        self.timeout = timeout  # seconds a render may take (0 = no limit)
+        self._scripts_stamp = self._scripts_state()
+        self._toolkit_stamp = self._toolkit_state()
+        self.tasks = discover_tasks(root, topics=topics)
+        self.cache = ResultCache(cache_mb * 1024 * 1024)
+        self.renders = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self._hasher = SourceHasher()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._executor = self._new_executor()
+
+    def _new_executor(self):
+        # One task per script is enough to import every module
+        scripts = list({task.script: task for task in self.tasks}.values())
+        return ProcessPoolExecutor(max_workers=self.jobs, initializer=_warm, initargs=(scripts,),
+                                   mp_context=multiprocessing.get_context('spawn'))
+
+    def _restart(self, executor, toolkit_stamp=None):
+        """
+        Replace ``executor`` with a fresh pool, unless another thread already
+        did. ``toolkit_stamp`` is the toolkit state the new pool imports.
+        """
+        toolkit_stamp = toolkit_stamp or self._toolkit_state()
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = self._new_executor()
+            self._toolkit_stamp = toolkit_stamp
+            self.restarts += 1
+        # A hung worker never picks up the shutdown; stop it (Python 3.14 has a public call)
+        terminate = getattr(executor, 'terminate_workers', None)
+        if terminate is not None:
+            terminate()
+            return
+        # shutdown() drops the pool's process table, so take it first
+        processes = list((getattr(executor, '_processes', None) or {}).values())
+        executor.shutdown(wait=False)
+        for process in processes:
+            process.terminate()
+
+    def start(self):
+        """Start every worker and wait until each has imported the scripts."""
+        for future in [self._executor.submit(os.getpid) for _ in range(self.jobs)]:
+            future.result()
+
+    def close(self):
+        self._executor.shutdown()
+
+    def _scripts_state(self):
+        """The diagram scripts and their modification times, to tell when to rediscover."""
+        state = []
+        for script in find_diagram_scripts(self.root):
+            try:
+                state.append((str(script), os.stat(script).st_mtime_ns))
+            except OSError:
+                continue
+        return state
+
+    @staticmethod
+    def _toolkit_state():
+        """The toolkit modules and their modification times, to tell when workers are stale."""
+        state = []
+        for path in sorted(TOOLKIT_DIR.glob('*.py')):
+            try:
+                state.append((path.name, path.stat().st_mtime_ns))
+            except OSError:
+                continue
+        return state
+
+    def _refresh_toolkit(self):
+        """Replace the pool if a toolkit module changed since it started; returns the state."""
+        stamp = self._toolkit_state()
+        with self._lock:
+            executor, current = self._executor, self._toolkit_stamp
+        if stamp != current:
+            self._restart(executor, stamp)
+        return stamp
+
+    def find(self, topic, figure):
+        """The task for ``topic`` and builder or output name ``figure``, or None."""
+        for attempt in range(2):
+            for task in self.tasks:
+                if task.topic == topic and figure in (
+                        task.function, task.name, os.path.splitext(task.name)[0],
+                        task.function.rsplit('.', 1)[-1]):
+                    return task
+            if attempt == 1:
+                break
+            # New figures appear without a restart, but only a changed script is rediscovered
+            stamp = self._scripts_state()
+            if stamp == self._scripts_stamp:
+                break
+            try:
+                tasks = discover_tasks(self.root, topics=self.topics)
+            except (SyntaxError, ValueError):
+                # A script being edited; keep the last good index
+                break
+            self.tasks, self._scripts_stamp = tasks, stamp
+        return None
+
+    def key(self, task, export_format):
+        with self._lock:
+            return self._hasher.digest(task, export_format.label)
+
+    def _submit(self, task, export_format):
+        """
+        Render in the pool; retried once on a fresh pool if the pool broke.
+        Returns ``(bytes, error, toolkit state the rendering pool imported)``.
+        """
+        for attempt in range(2):
+            try:
+                # Submitted under the lock, so never to a pool another thread has shut down
+                with self._lock:
+                    executor, toolkit_stamp = self._executor, self._toolkit_stamp
+                    pending = executor.submit(_render, task, export_format)
+                return pending.result(self.timeout or None) + (toolkit_stamp,)
+            except FutureTimeoutError:
+                self.timeouts += 1
+                self._restart(executor)
+                raise RenderTimeout(f'still rendering after {self.timeout:g}s; '
+                                    f'its worker was stopped') from None
+            except BrokenProcessPool:
+                self._restart(executor)
+                if attempt == 1:
+                    raise
+
+    def render(self, task, export_format):
+        """
+        ``(bytes, cache hit, key)``; raises RenderTimeout if the render
+        times out and RuntimeError if the figure fails.
+        """
+        toolkit_stamp = self._refresh_toolkit()
+        key = self.key(task, export_format)
+        data = self.cache.get(key)
+        if data is not None:
+            return data, True, key
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if owner:
+            try:
+                data, error, rendered_with = self._submit(task, export_format)
+                self.renders += 1
+                # A toolkit saved mid-render leaves the result unkeyed; serve it uncached
+                if data is not None and rendered_with == toolkit_stamp == self._toolkit_state():
+                    self.cache.put(key, data)
+                future.set_result((data, error))
+            except RenderTimeout as error:
+                future.set_exception(error)
+            except Exception as error:
+                future.set_result((None, f'{type(error).__name__}: {error}'))
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+        data, error = future.result()
+        if data is None:
+            raise RuntimeError(error)
+        return data, False, key
+
+    def figures(self):
+        return [{'topic': task.topic, 'function': task.function, 'name': task.name,
+                 'url': f'/render/{quote(task.topic)}/{quote(task.function)}'}
+                for task in self.tasks]
+
+    def stats(self):
+        return {'figures': len(self.tasks), 'workers': self.jobs, 'renders': self.renders,
+                'timeouts': self.timeouts, 'pool_restarts': self.restarts,
+                'inflight': len(self._inflight), 'cache': self.cache.stats()}
+
+
+def parse_render_query(query):
+    """``ExportFormat`` from ``format=`` and ``dpi=``; raises ValueError if invalid."""
+    params = parse_qs(query)
+    extension = params.get('format', ['png'])[-1].lower()
+    extension = 'jpg' if extension == 'jpeg' else extension
+    if extension not in CONTENT_TYPES:
+        raise ValueError(f'unsupported format {extension!r} '
+                         f'(valid: {", ".join(CONTENT_TYPES)})')
+    dpi = params.get('dpi', [''])[-1]
+    if dpi and (not dpi.isdigit() or not 0 < int(dpi) <= MAX_DPI):
+        raise ValueError(f'dpi must be an integer from 1 to {MAX_DPI}')
+    return ExportFormat(extension, int(dpi) if dpi else None)
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    """Routes requests to the ``RenderService`` in ``self.server.service``."""
+
+    server_version = 'DaCRenderServer/1.0'
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        path = unquote(url.path)
+        self._note = ''
+        if path == '/figures':
+            self._send_json(200, self.server.service.figures())
+        elif path == '/stats':
+            self._send_json(200, self.server.service.stats())
+        elif path.startswith('/render/'):
+            self._render(path[len('/render/'):].strip('/'), url.query)
+        else:
+            self._send_json(404, {'error': 'not found; try /figures, /stats or '
+                                           '/render/<topic>/<figure>'})
+        print(f'🌐 {self.command} {self.path} → {self._status} '
+              f'({(time.perf_counter() - start) * 1000:.0f} ms{self._note})')
+
+    def _render(self, target, query):
+        topic, _, figure = target.rpartition('/')
+        try:
+            export_format = parse_render_query(query)
+        except ValueError as error:
+            self._send_json(400, {'error': str(error)})
+            return
+        task = self.server.service.find(topic, figure)
+        if task is None:
+            self._send_json(404, {'error': f'no figure {figure!r} in topic {topic!r}'})
+            return
+        try:
+            data, hit, key = self.server.service.render(task, export_format)
+        except RenderTimeout as error:
+            self._send_json(504, {'error': str(error), 'figure': task.key})
+            return
+        except RuntimeError as error:
+            self._send_json(500, {'error': str(error), 'figure': task.key})
+            return
+        self._note = ', cached' if hit else ', rendered'
+        etag = f'"{key}"'
+        if self.headers.get('If-None-Match') == etag:
+            self._status = 304
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self._status = 200
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPES[export_format.extension])
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Render-Cache', 'hit' if hit else 'miss')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, indent=2).encode('utf-8')
+        self._status = status
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Requests are logged once, with their timing, by do_GET
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Serve DaC figures over HTTP from warm worker processes.')
+    parser.add_argument('--host', default=DEFAULT_HOST,
+                        help='interface to listen on (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help='port to listen on (default: %(default)s)')
+    parser.add_argument('-j', '--jobs', type=int, default=min(2, os.cpu_count() or 1),
+                        help='render worker processes (default: %(default)s)')
+    parser.add_argument('-t', '--topic', action='append', default=[],
+                        help='only serve topics matching this substring or glob (repeatable)')
+    parser.add_argument('--cache-mb', type=int, default=DEFAULT_CACHE_MB,
+                        help='memory for rendered results (default: %(default)s MB)')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help='seconds a render may take before answering 504 '
+                             '(default: %(default)s; 0 = no limit)')
+    parser.add_argument('--root', default=str(COURSE_ROOT),
+                        help='course root to scan (default: this repository)')
+    args = parser.parse_args(argv)
+
+    service = RenderService(args.root, args.topic, max(1, args.jobs), args.cache_mb,
+                            args.timeout)
+    if not service.tasks:
+        print('❌ No figures matched the given filters')
+        return 1
+    start = time.perf_counter()
+    print(f'🔥 Warming {service.jobs} worker(s) with {len(service.tasks)} figures...')
+    service.start()
+    server = ThreadingHTTPServer((args.host, args.port), RenderHandler)
+    server.daemon_threads = True
+    server.service = service
+    print(f'🚀 Serving on http://{args.host}:{server.server_port}/ '
+          f'(ready in {time.perf_counter() - start:.1f}s; Ctrl+C to stop)')
+    print('=' * 70)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print('\n👋 Stopped serving')
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,606 @@
+"""
+Declarative diagram specs compiled to batched matplotlib artists.
+
+Most DaC figures are boxes with centred text, arrows between them and a few
+free labels, drawn by 50-100 lines of coordinate-heavy helper calls. A spec
+describes the same figure as data, in JSON (or YAML if PyYAML is
+installed)::
+
+    {"version": 1,
+     "figure": {"size": [16, 12], "dpi": 300, "xlim": [0, 10], "ylim": [0, 10]},
+     "colors": {"blue": "#1261FE", "gray": "#525252"},
+     "styles": {"step": {"boxstyle": "round,pad=0.02", "edgecolor": "gray",
+                         "font": {"size": 10, "color": "white", "weight": "bold"}}},
+     "title": {"text": "Terraform Workflow", "font": {"size": 20, "color": "blue"}},
+     "boxes": [{"id": "init", "x": 0.5, "y": 6.5, "width": 1.8, "height": 1.5,
+                "text": "terraform init", "style": "step", "facecolor": "blue"}],
+     "edges": [{"from": "init.right", "to": "plan.left", "color": "gray"}],
+     "groups": [{"id": "dev", "members": ["init", "plan"], "label": "Development"}],
+     "labels": [{"text": "IBM Cloud", "x": 0.02, "y": 0.02, "coords": "axes"}]}
+
+- **Colors** are names from ``colors`` or anything matplotlib accepts.
+- **Styles** are named defaults; an element's own keys override its style.
+  ``font`` is merged key by key.
+- **Edges** join ``[x, y]`` points or box anchors: ``"id.left"``,
+  ``"id.right"``, ``"id.top"``, ``"id.bottom"``, ``"id.center"``, or
+  ``"id"`` for the side facing the other end.
+- **Groups** draw one box around their members, behind them, with an
+  optional label above it.
+
+``compile_spec`` draws groups, then boxes, then edges, then text. With
+``batched=True`` (the default) every box goes through ``batch_patches``
+and the edges of each z-order become one ``ArrowBatch``, so a figure costs a
+handful of collections instead of one artist per shape (see
+``batching.py``). Text stays ordinary ``Text`` artists, which the text
+layout cache already speeds up.
+
+``validate_spec`` lists every problem at once (unknown keys, missing
+fields, duplicate or unknown ids, bad colors). ``spec_digest`` hashes the
+canonical JSON form, so the render cache ignores formatting edits to a
+spec file. ``diff_specs`` lists the elements two specs add, remove or
+change.
+
+Usage (from the Terraform-IBM-Cloud-Training directory):
+    python3 -m dac_toolkit.spec path/to/specs/*.json
+    python3 -m dac_toolkit.spec spec.json --render /tmp/specs
+    python3 -m dac_toolkit.spec old.json --diff new.json
+    python3 -m dac_toolkit.microbench spec       # batched vs one artist per shape
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+SPEC_VERSION = 1
+SPEC_EXTENSIONS = ('.json', '.yaml', '.yml')
+
+# Sub-directory of a DaC directory that holds its specs
+SPECS_DIR = 'specs'
+
+SECTIONS = ('version', 'description', 'figure', 'colors', 'styles', 'title', 'groups', 'boxes',
+            'edges', 'labels')
+ELEMENT_SECTIONS = ('groups', 'boxes', 'edges', 'labels')
+
+FIGURE_KEYS = ('size', 'dpi', 'xlim', 'ylim', 'axis', 'facecolor', 'tight_layout')
+SHAPE_KEYS = ('style', 'facecolor', 'edgecolor', 'linewidth', 'linestyle', 'boxstyle', 'alpha',
+              'hatch', 'zorder', 'font')
+ELEMENT_KEYS = {
+    'boxes': ('id', 'x', 'y', 'width', 'height', 'text') + SHAPE_KEYS,
+    'groups': ('id', 'members', 'padding', 'label') + SHAPE_KEYS,
+    'edges': ('id', 'from', 'to', 'style', 'color', 'linewidth', 'linestyle', 'arrowstyle',
+              'connectionstyle', 'shrink', 'mutation_scale', 'alpha', 'zorder', 'label', 'font'),
+    'labels': ('id', 'text', 'x', 'y', 'coords', 'style', 'font', 'bbox', 'zorder'),
+}
+STYLE_KEYS = tuple(sorted({key for keys in ELEMENT_KEYS.values() for key in keys}
+                          - {'id', 'style', 'x', 'y', 'width', 'height', 'text', 'members',
+                             'from', 'to', 'label'}))
+TITLE_KEYS = ('text', 'font', 'y')
+BBOX_KEYS = ('boxstyle', 'facecolor', 'edgecolor', 'linewidth', 'alpha')
+
+# Spec font keys -> Text properties
+FONT_KEYS = {
+    'size': 'fontsize',
+    'color': 'color',
+    'weight': 'fontweight',
+    'style': 'fontstyle',
+    'family': 'family',
+    'ha': 'ha',
+    'va': 'va',
+    'wrap': 'wrap',
+    'rotation': 'rotation',
+    'linespacing': 'linespacing',
+}
+
+SIDES = ('left', 'right', 'top', 'bottom', 'center')
+COORDS = ('data', 'axes', 'figure')
+
+# Defaults of each element kind, under the spec's styles and the element's own keys
+DEFAULTS = {
+    'boxes': {'boxstyle': 'square,pad=0', 'facecolor': 'white', 'edgecolor': 'black',
+              'linewidth': 1.0, 'linestyle': 'solid', 'zorder': 1,
+              'font': {'ha': 'center', 'va': 'center'}},
+    'groups': {'boxstyle': 'round,pad=0', 'facecolor': 'none', 'edgecolor': 'gray',
+               'linewidth': 1.0, 'linestyle': 'dashed', 'zorder': 0.5, 'padding': 0.2,
+               'font': {'ha': 'left', 'va': 'bottom'}},
+    'edges': {'color': 'black', 'linewidth': 1.0, 'linestyle': 'solid', 'arrowstyle': '->',
+              'connectionstyle': 'arc3', 'shrink': 5, 'mutation_scale': 10, 'zorder': 1,
+              'font': {'ha': 'center', 'va': 'center'}},
+    'labels': {'coords': 'data', 'font': {}},
+}
+
+
+class SpecError(ValueError):
+    """A spec that cannot be loaded or compiled; ``problems`` lists every reason."""
+
+    def __init__(self, message, problems=()):
+        self.problems = list(problems)
+        if self.problems:
+            message = message + ':\n' + '\n'.join(f'  - {problem}' for problem in self.problems)
+        super().__init__(message)
+
+
+def load_spec(path):
+    """Parse a JSON or YAML spec file. Raises SpecError if it cannot be read."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SPEC_EXTENSIONS:
+        raise SpecError(f'{path}: unsupported spec extension {extension!r} '
+                        f'(valid: {", ".join(SPEC_EXTENSIONS)})')
+    try:
+        with open(path, encoding='utf-8') as handle:
+            if extension == '.json':
+                spec = json.load(handle)
+            else:
+                try:
+                    import yaml
+                except ImportError:
+                    raise SpecError(f'{path}: YAML specs need PyYAML (pip install pyyaml)')
+                spec = yaml.safe_load(handle)
+    except SpecError:
+        raise
+    except (OSError, ValueError) as error:
+        raise SpecError(f'{path}: {error}')
+    except Exception as error:
+        # yaml.YAMLError and friends
+        raise SpecError(f'{path}: {type(error).__name__}: {error}')
+    if not isinstance(spec, dict):
+        raise SpecError(f'{path}: a spec must be a mapping, not {type(spec).__name__}')
+    return spec
+
+
+def spec_digest(spec):
+    """SHA-256 of the canonical JSON form of ``spec`` (key order and layout ignored)."""
+    canonical = json.dumps(spec, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def element_id(section, item, index):
+    """The id an element is reported and diffed by."""
+    if isinstance(item, dict) and item.get('id') is not None:
+        return str(item['id'])
+    if section == 'edges' and isinstance(item, dict):
+        return f'{_endpoint_label(item.get("from"))}->{_endpoint_label(item.get("to"))}'
+    return f'#{index}'
+
+
+def _endpoint_label(endpoint):
+    if isinstance(endpoint, (list, tuple)):
+        return '(' + ', '.join(str(value) for value in endpoint) + ')'
+    return str(endpoint)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_pair(value):
+    return isinstance(value, (list, tuple)) and len(value) == 2 and all(map(_is_number, value))
+
+
+def _check_keys(item, allowed, where, problems):
+    for key in item:
+        if key not in allowed:
+            problems.append(f'{where}: unknown key {key!r}')
+
+
+def _resolve_color(spec, value):
+    return spec.get('colors', {}).get(value, value) if isinstance(value, str) else value
+
+
+def _check_color(spec, value, where, problems):
+    from matplotlib.colors import is_color_like
+
+    if value is None or value == 'none':
+        return
+    if not is_color_like(_resolve_color(spec, value)):
+        problems.append(f'{where}: {value!r} is neither a color nor a name in colors')
+
+
+def _check_style_values(spec, item, where, problems):
+    """Colors and fonts of an element, style or group, wherever they appear."""
+    for key in ('facecolor', 'edgecolor', 'color'):
+        if key in item:
+            _check_color(spec, item[key], f'{where}.{key}', problems)
+    for key in ('linewidth', 'alpha', 'zorder', 'shrink', 'mutation_scale', 'padding'):
+        if key in item and not _is_number(item[key]):
+            problems.append(f'{where}.{key}: expected a number, got {item[key]!r}')
+    font = item.get('font')
+    if font is not None:
+        if not isinstance(font, dict):
+            problems.append(f'{where}.font: expected a mapping')
+        else:
+            _check_keys(font, FONT_KEYS, f'{where}.font', problems)
+            if 'color' in font:
+                _check_color(spec, font['color'], f'{where}.font.color', problems)
+    bbox = item.get('bbox')
+    if bbox is not None:
+        if not isinstance(bbox, dict):
+            problems.append(f'{where}.bbox: expected a mapping')
+        else:
+            _check_keys(bbox, BBOX_KEYS, f'{where}.bbox', problems)
+            for key in ('facecolor', 'edgecolor'):
+                if key in bbox:
+                    _check_color(spec, bbox[key], f'{where}.bbox.{key}', problems)
+
+
+def _check_endpoint(endpoint, boxes, where, problems):
+    if _is_pair(endpoint):
+        return
+    if not isinstance(endpoint, str):
+        problems.append(f'{where}: expected [x, y] or "box" or "box.side", got {endpoint!r}')
+        return
+    name, _, side = endpoint.partition('.')
+    if name not in boxes:
+        problems.append(f'{where}: unknown box {name!r}')
+    elif side and side not in SIDES:
+        problems.append(f'{where}: unknown side {side!r} (valid: {", ".join(SIDES)})')
+
+
+def validate_spec(spec):
+    """Every problem with ``spec`` as a list of strings; empty if it compiles."""
+    problems = []
+    if not isinstance(spec, dict):
+        return [f'a spec must be a mapping, not {type(spec).__name__}']
+    _check_keys(spec, SECTIONS, 'spec', problems)
+    version = spec.get('version', SPEC_VERSION)
+    if version != SPEC_VERSION:
+        problems.append(f'version: unsupported spec version {version!r} (expected {SPEC_VERSION})')
+
+    figure = spec.get('figure', {})
+    if not isinstance(figure, dict):
+        problems.append('figure: expected a mapping')
+    else:
+        _check_keys(figure, FIGURE_KEYS, 'figure', problems)
+        for key in ('size', 'xlim', 'ylim'):
+            if key in figure and not _is_pair(figure[key]):
+                problems.append(f'figure.{key}: expected [a, b], got {figure[key]!r}')
+        if 'dpi' in figure and not (_is_number(figure['dpi']) and figure['dpi'] > 0):
+            problems.append(f'figure.dpi: expected a positive number, got {figure["dpi"]!r}')
+        if 'facecolor' in figure:
+            _check_color(spec, figure['facecolor'], 'figure.facecolor', problems)
+
+    colors = spec.get('colors', {})
+    if not isinstance(colors, dict):
+        problems.append('colors: expected a mapping of name -> color')
+    else:
+        for name, value in colors.items():
+            _check_color({}, value, f'colors.{name}', problems)
+
+    styles = spec.get('styles', {})
+    if not isinstance(styles, dict):
+        problems.append('styles: expected a mapping of name -> style')
+        styles = {}
+    for name, style in styles.items():
+        if not isinstance(style, dict):
+            problems.append(f'styles.{name}: expected a mapping')
+            continue
+        _check_keys(style, STYLE_KEYS, f'styles.{name}', problems)
+        _check_style_values(spec, style, f'styles.{name}', problems)
+
+    title = spec.get('title')
+    if title is not None:
+        if not isinstance(title, dict) or not isinstance(title.get('text'), str):
+            problems.append('title: expected a mapping with a text')
+        else:
+            _check_keys(title, TITLE_KEYS, 'title', problems)
+            _check_style_values(spec, title, 'title', problems)
+
+    ids = {}
+    for section in ELEMENT_SECTIONS:
+        items = spec.get(section, [])
+        if not isinstance(items, list):
+            problems.append(f'{section}: expected a list')
+            continue
+        for index, item in enumerate(items):
+            where = f'{section}[{element_id(section, item, index)}]'
+            if not isinstance(item, dict):
+                problems.append(f'{where}: expected a mapping')
+                continue
+            _check_keys(item, ELEMENT_KEYS[section], where, problems)
+            if 'id' in item:
+                if item['id'] in ids:
+                    problems.append(f'{where}: duplicate id (also in {ids[item["id"]]})')
+                ids.setdefault(item['id'], section)
+            if 'style' in item and item['style'] not in styles:
+                problems.append(f'{where}.style: unknown style {item["style"]!r}')
+            _check_style_values(spec, item, where, problems)
+            required = {'boxes': ('x', 'y', 'width', 'height'), 'labels': ('x', 'y'),
+                        'edges': (), 'groups': ()}[section]
+            for key in required:
+                if not _is_number(item.get(key)):
+                    problems.append(f'{where}.{key}: expected a number, got {item.get(key)!r}')
+            for key in ('width', 'height'):
+                if _is_number(item.get(key)) and item[key] <= 0:
+                    problems.append(f'{where}.{key}: must be positive')
+            if section == 'labels':
+                if not isinstance(item.get('text'), str):
+                    problems.append(f'{where}.text: expected a string')
+                if item.get('coords', 'data') not in COORDS:
+                    problems.append(f'{where}.coords: expected one of {", ".join(COORDS)}')
+
+    boxes = {item['id'] for item in spec.get('boxes', []) if isinstance(item, dict) and 'id' in item}
+    for index, edge in enumerate(spec.get('edges', []) if isinstance(spec.get('edges'), list) else []):
+        if isinstance(edge, dict):
+            where = f'edges[{element_id("edges", edge, index)}]'
+            for key in ('from', 'to'):
+                _check_endpoint(edge.get(key), boxes, f'{where}.{key}', problems)
+    for index, group in enumerate(spec.get('groups', []) if isinstance(spec.get('groups'), list) else []):
+        if isinstance(group, dict):
+            where = f'groups[{element_id("groups", group, index)}]'
+            members = group.get('members')
+            if not isinstance(members, list) or not members:
+                problems.append(f'{where}.members: expected a non-empty list of box ids')
+                continue
+            for member in members:
+                if member not in boxes:
+                    problems.append(f'{where}.members: unknown box {member!r}')
+    return problems
+
+
+def diff_specs(old, new):
+    """Lines describing what ``new`` adds (+), removes (-) or changes (~) relative to ``old``."""
+    changes = []
+    for section in ('version', 'description', 'figure', 'colors', 'styles', 'title'):
+        before, after = old.get(section), new.get(section)
+        if before == after:
+            continue
+        if isinstance(before, dict) and isinstance(after, dict):
+            for key in sorted(set(before) | set(after), key=str):
+                if before.get(key) != after.get(key):
+                    changes.append(f'~ {section}.{key}: {before.get(key)!r} -> {after.get(key)!r}')
+        else:
+            changes.append(f'~ {section}: {before!r} -> {after!r}')
+    for section in ELEMENT_SECTIONS:
+        before = {element_id(section, item, index): item
+                  for index, item in enumerate(old.get(section, []))}
+        after = {element_id(section, item, index): item
+                 for index, item in enumerate(new.get(section, []))}
+        for name in before:
+            if name not in after:
+                changes.append(f'- {section}[{name}]')
+        for name, item in after.items():
+            if name not in before:
+                changes.append(f'+ {section}[{name}]')
+            elif item != before[name]:
+                keys = sorted(set(item) | set(before[name]))
+                changes.extend(f'~ {section}[{name}].{key}: {before[name].get(key)!r} -> '
+                               f'{item.get(key)!r}'
+                               for key in keys if item.get(key) != before[name].get(key))
+    return changes
+
+
+def _resolved(spec, section, item):
+    """``item`` on top of its style and the section defaults, with colors resolved."""
+    merged = dict(DEFAULTS[section])
+    style = spec.get('styles', {}).get(item.get('style'), {})
+    font = dict(merged.get('font', {}))
+    for layer in (style, item):
+        font.update(layer.get('font', {}))
+        merged.update(layer)
+    merged['font'] = font
+    for key in ('facecolor', 'edgecolor', 'color'):
+        if key in merged:
+            merged[key] = _resolve_color(spec, merged[key])
+    return merged
+
+
+def _text_properties(spec, font):
+    properties = {FONT_KEYS[key]: value for key, value in font.items()}
+    if 'color' in properties:
+        properties['color'] = _resolve_color(spec, properties['color'])
+    return properties
+
+
+def _anchor(box, side):
+    x, y, width, height = box['x'], box['y'], box['width'], box['height']
+    return {'left': (x, y + height / 2), 'right': (x + width, y + height / 2),
+            'top': (x + width / 2, y + height), 'bottom': (x + width / 2, y),
+            'center': (x + width / 2, y + height / 2)}[side]
+
+
+def _facing_side(box, towards):
+    """The side of ``box`` whose outward direction best points at ``towards``."""
+    cx, cy = _anchor(box, 'center')
+    dx, dy = towards[0] - cx, towards[1] - cy
+    if abs(dx) * box['height'] >= abs(dy) * box['width']:
+        return 'right' if dx >= 0 else 'left'
+    return 'top' if dy >= 0 else 'bottom'
+
+
+def edge_points(edge, boxes):
+    """Data-space ``(start, end)`` of an edge; ``boxes`` maps id -> box."""
+    def parse(endpoint):
+        if _is_pair(endpoint):
+            return None, tuple(endpoint), None
+        name, _, side = endpoint.partition('.')
+        return boxes[name], None, side or None
+
+    ends = [parse(edge['from']), parse(edge['to'])]
+    for index, (box, point, side) in enumerate(ends):
+        if box is not None and side is not None:
+            ends[index] = (box, _anchor(box, side), side)
+    for index, (box, point, side) in enumerate(ends):
+        if point is None:
+            other_box, other_point, _ = ends[1 - index]
+            towards = other_point if other_point is not None else _anchor(other_box, 'center')
+            ends[index] = (box, _anchor(box, _facing_side(box, towards)), None)
+    return ends[0][1], ends[1][1]
+
+
+def _group_extent(group, boxes):
+    members = [boxes[member] for member in group['members']]
+    padding = group['padding']
+    left = min(box['x'] for box in members) - padding
+    bottom = min(box['y'] for box in members) - padding
+    right = max(box['x'] + box['width'] for box in members) + padding
+    top = max(box['y'] + box['height'] for box in members) + padding
+    return left, bottom, right - left, top - bottom
+
+
+def _shape(item, x, y, width, height):
+    from matplotlib.patches import FancyBboxPatch
+
+    return FancyBboxPatch((x, y), width, height, boxstyle=item['boxstyle'],
+                          facecolor=item['facecolor'], edgecolor=item['edgecolor'],
+                          linewidth=item['linewidth'], linestyle=item['linestyle'],
+                          alpha=item.get('alpha'), hatch=item.get('hatch'), zorder=item['zorder'])
+
+
+def compile_spec(spec, batched=True):
+    """Draw ``spec`` on a new pyplot figure and return it. Raises SpecError if it is invalid."""
+    import matplotlib.pyplot as plt
+    from matplotlib.patches import FancyArrowPatch
+
+    from .batching import SUPPORTED, ArrowBatch, batch_patches
+
+    problems = validate_spec(spec)
+    if problems:
+        raise SpecError('invalid diagram spec', problems)
+
+    figure = spec.get('figure', {})
+    fig, ax = plt.subplots(figsize=tuple(figure.get('size', (16, 12))),
+                           dpi=figure.get('dpi', 100))
+    if 'facecolor' in figure:
+        fig.set_facecolor(_resolve_color(spec, figure['facecolor']))
+    ax.set_xlim(*figure.get('xlim', (0, 10)))
+    ax.set_ylim(*figure.get('ylim', (0, 10)))
+    if not figure.get('axis', False):
+        ax.axis('off')
+    # Without the matplotlib internals batching needs, draw every artist on its own
+    batched = batched and SUPPORTED
+    if batched:
+        batch_patches(ax)
+
+    title = spec.get('title')
+    if title is not None:
+        fig.suptitle(title['text'], y=title.get('y', 0.98),
+                     **_text_properties(spec, title.get('font', {})))
+
+    texts = []
+    boxes = {}
+    resolved_boxes = []
+    for item in spec.get('boxes', []):
+        box = _resolved(spec, 'boxes', item)
+        resolved_boxes.append(box)
+        if 'id' in box:
+            boxes[box['id']] = box
+
+    for item in spec.get('groups', []):
+        group = _resolved(spec, 'groups', item)
+        x, y, width, height = _group_extent(group, boxes)
+        ax.add_patch(_shape(group, x, y, width, height))
+        if group.get('label'):
+            texts.append((x, y + height, group['label'], group['font']))
+
+    for box in resolved_boxes:
+        ax.add_patch(_shape(box, box['x'], box['y'], box['width'], box['height']))
+        if box.get('text'):
+            texts.append((box['x'] + box['width'] / 2, box['y'] + box['height'] / 2,
+                          box['text'], box['font']))
+
+    arrows = {}
+    for item in spec.get('edges', []):
+        edge = _resolved(spec, 'edges', item)
+        start, end = edge_points(edge, boxes)
+        options = dict(arrowstyle=edge['arrowstyle'], connectionstyle=edge['connectionstyle'],
+                       shrinkA=edge['shrink'], shrinkB=edge['shrink'],
+                       mutation_scale=edge['mutation_scale'], facecolor=edge['color'],
+                       edgecolor=edge['color'], linewidth=edge['linewidth'],
+                       linestyle=edge['linestyle'], alpha=edge.get('alpha'),
+                       zorder=edge['zorder'])
+        if batched:
+            arrows.setdefault(edge['zorder'], []).append(
+                FancyArrowPatch(start, end, transform=ax.transData, **options))
+        else:
+            ax.add_patch(FancyArrowPatch(start, end, **options))
+        if edge.get('label'):
+            texts.append(((start[0] + end[0]) / 2, (start[1] + end[1]) / 2, edge['label'],
+                          edge['font']))
+    for zorder, batch in arrows.items():
+        ax.add_collection(ArrowBatch(batch, zorder=zorder), autolim=False)
+
+    for x, y, text, font in texts:
+        ax.text(x, y, text, **_text_properties(spec, font))
+
+    transforms = {'data': ax.transData, 'axes': ax.transAxes, 'figure': fig.transFigure}
+    for item in spec.get('labels', []):
+        label = _resolved(spec, 'labels', item)
+        options = _text_properties(spec, label['font'])
+        if 'bbox' in label:
+            options['bbox'] = {key: _resolve_color(spec, value)
+                               for key, value in label['bbox'].items()}
+        if 'zorder' in label:
+            options['zorder'] = label['zorder']
+        ax.text(label['x'], label['y'], label['text'], transform=transforms[label['coords']],
+                **options)
+
+    if figure.get('tight_layout', False):
+        fig.tight_layout()
+    return fig
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Validate, diff or render declarative DaC diagram specs.')
+    parser.add_argument('specs', nargs='+', help='JSON or YAML spec files')
+    parser.add_argument('--render', metavar='DIR',
+                        help='render every spec to DIR/<name>.png')
+    parser.add_argument('--diff', metavar='SPEC',
+                        help='list what SPEC changes relative to the (single) given spec')
+    parser.add_argument('--unbatched', action='store_true',
+                        help='render with one artist per shape (for comparison)')
+    args = parser.parse_args(argv)
+
+    if args.diff:
+        if len(args.specs) != 1:
+            parser.error('--diff compares exactly one spec with SPEC')
+        try:
+            changes = diff_specs(load_spec(args.specs[0]), load_spec(args.diff))
+        except SpecError as error:
+            print(f'❌ {error}')
+            return 1
+        for change in changes:
+            print(change)
+        print(f'📐 {len(changes)} change(s)')
+        return 0
+
+    failed = 0
+    specs = []
+    for path in args.specs:
+        try:
+            spec = load_spec(path)
+            problems = validate_spec(spec)
+        except SpecError as error:
+            spec, problems = None, [str(error)]
+        if problems:
+            failed += 1
+            print(f'❌ {path}')
+            for problem in problems:
+                print(f'   • {problem}')
+        else:
+            print(f'✅ {path} ({sum(len(spec.get(section, [])) for section in ELEMENT_SECTIONS)} '
+                  f'elements, digest {spec_digest(spec)[:12]})')
+            specs.append((path, spec))
+
+    if args.render and specs:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        os.makedirs(args.render, exist_ok=True)
+        for path, spec in specs:
+            output = os.path.join(args.render,
+                                  os.path.splitext(os.path.basename(path))[0] + '.png')
+            fig = compile_spec(spec, batched=not args.unbatched)
+            try:
+                fig.savefig(output, bbox_inches='tight')
+            finally:
+                plt.close(fig)
+            print(f'🖼️  {output}')
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
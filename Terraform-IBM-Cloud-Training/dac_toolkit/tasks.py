@@ -0,0 +1,52 @@
+"""
+Task and result records shared by the build driver and its workers.
+
+Kept free of matplotlib imports so the driver can plan a build, and serve
+cache hits, without paying the plotting import cost.
+"""
+
+import os
+from collections import namedtuple
+
+# savefig options for scripts that do not define SAVEFIG_OPTIONS
+SAVE_SETTINGS = {'dpi': 300, 'bbox_inches': 'tight'}
+
+
+class FigureTask(namedtuple('FigureTask', 'topic script name function output')):
+    """
+    One independently renderable figure: a single entry of a script's
+    ``FIGURES`` registry.
+
+    topic    -- topic folder relative to the course root, e.g.
+                '06-State-Management/02-State-Locking-Drift-Detection'
+    script   -- absolute path of the ``*_diagrams.py`` script
+    name     -- registry key, i.e. the output file name
+    function -- builder name, or 'Class.method' for class-based scripts
+    output   -- output path relative to the DaC directory
+    """
+
+    __slots__ = ()
+
+    @property
+    def key(self):
+        """Stable identifier used in logs and reports."""
+        return f'{self.topic}:{self.function}'
+
+    @property
+    def dac_dir(self):
+        """Directory the script lives in; outputs are relative to it."""
+        return os.path.dirname(self.script)
+
+
+# status is 'ok', 'cached', 'failed', 'timeout' or 'error' (the script or a module
+# it imports could not be read, so nothing was rendered); outputs are absolute paths;
+# timings maps export stage ('layout', 'png', 'svg', ...) -> seconds;
+# extent is the tight box (inches) the figure was cropped to, if any;
+# memory holds the worker's peak RSS and its Agg buffer allocations (see pool.py);
+# text holds the text layout cache hits and misses of this figure (see textcache.py)
+RenderResult = namedtuple('RenderResult',
+                          'task status seconds outputs error timings extent memory text',
+                          defaults=(None, None, None))
+
+# Statuses of a figure that did not render
+FAILED_STATUSES = ('failed', 'timeout', 'error')
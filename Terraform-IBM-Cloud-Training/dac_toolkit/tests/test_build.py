@@ -0,0 +1,100 @@
+"""
+A course build keeps going past scripts it cannot read.
+
+Run from the Terraform-IBM-Cloud-Training directory:
+    python3 -m pytest dac_toolkit/tests
+"""
+
+import json
+import textwrap
+
+import pytest
+
+from dac_toolkit import build
+from dac_toolkit.discovery import discover_tasks
+
+GOOD_SCRIPT = '''
+import matplotlib.pyplot as plt
+
+OUTPUT_DIR = 'generated_diagrams'
+
+
+def draw_square():
+    fig, ax = plt.subplots(figsize=(1, 1))
+    ax.plot([0, 1], [0, 1])
+    return fig
+
+
+FIGURES = {'square.png': draw_square}
+'''
+
+SCRIPTS = {
+    '01-Good/01-Square': ('good_diagrams.py', GOOD_SCRIPT),
+    # Does not parse
+    '02-Broken/01-Syntax': ('syntax_diagrams.py', 'def broken(:\n'),
+    # Parses, but the registry value is not a builder
+    '03-Broken/01-Registry': ('registry_diagrams.py', '''
+        def make():
+            return {}
+
+        FIGURES = {'figure.png': make()['figure']}
+    '''),
+    # Discovered, but its cache key reads a toolkit module that does not exist
+    '04-Broken/01-Toolkit': ('toolkit_diagrams.py', '''
+        from dac_toolkit.no_such_module import draw
+
+        FIGURES = {'figure.png': draw}
+    '''),
+}
+
+
+@pytest.fixture
+def course(tmp_path):
+    """A course root with one good script next to three broken ones."""
+    for topic, (name, source) in SCRIPTS.items():
+        dac_dir = tmp_path / topic / 'DaC'
+        dac_dir.mkdir(parents=True)
+        (dac_dir / name).write_text(textwrap.dedent(source), encoding='utf-8')
+    return tmp_path
+
+
+def _build(course, *extra):
+    return build.main(['--root', str(course), '--cache-dir', str(course / '.dac_cache'),
+                       '-j', '1', '--timeout', '0', '--no-pool', *extra])
+
+
+def test_broken_scripts_are_reported_and_the_rest_is_built(course):
+    assert _build(course) == 1
+
+    report = json.loads((course / '.dac_cache' / 'build_report.json').read_text())
+    assert report['counts']['ok'] == 1
+    assert report['counts']['error'] == 3
+    entries = {entry['topic']: entry for entry in report['figures']}
+    assert entries['01-Good/01-Square']['status'] == 'ok'
+    assert (course / '01-Good/01-Square/DaC/generated_diagrams/square.png').exists()
+
+    syntax = entries['02-Broken/01-Syntax']
+    assert syntax['status'] == 'error'
+    assert syntax['function'] == 'syntax_diagrams.py' and syntax['name'] is None
+    assert 'SyntaxError' in syntax['error']
+    assert 'unsupported FIGURES entry' in entries['03-Broken/01-Registry']['error']
+    toolkit = entries['04-Broken/01-Toolkit']
+    assert toolkit['name'] == 'figure.png'
+    assert 'no_such_module' in toolkit['error']
+
+
+def test_list_names_broken_scripts(course, capsys):
+    assert _build(course, '--list') == 1
+    output = capsys.readouterr().out
+    assert '01-Good/01-Square:draw_square' in output
+    assert '02-Broken/01-Syntax:syntax_diagrams.py: SyntaxError' in output
+    assert '03-Broken/01-Registry:registry_diagrams.py: ValueError' in output
+
+
+def test_discovery_raises_without_an_errors_list(course):
+    with pytest.raises(SyntaxError):
+        discover_tasks(course)
+    errors = []
+    tasks = discover_tasks(course, errors=errors)
+    assert [task.function for task in tasks] == ['draw_square', 'draw']
+    assert [task.function for task, _ in errors] == ['syntax_diagrams.py', 'registry_diagrams.py']
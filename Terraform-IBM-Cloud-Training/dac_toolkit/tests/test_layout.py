@@ -0,0 +1,76 @@
+"""
+``draw_layout`` draws through the box and arrow helpers of the flowchart
+scripts it was written for, whatever their signatures.
+
+Run from the Terraform-IBM-Cloud-Training directory:
+    python3 -m pytest dac_toolkit/tests
+"""
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import pytest
+
+from dac_toolkit.discovery import discover_tasks
+from dac_toolkit.layout import draw_layout, layered_layout
+from dac_toolkit.runner import load_script
+
+# vpc -> vsi skips the subnet layer, so one edge bends
+EDGES = [('vpc', 'subnet'), ('subnet', 'vsi'), ('vpc', 'lb'), ('lb', 'vsi'), ('vpc', 'vsi')]
+LABELS = {'vpc': 'VPC', 'subnet': 'Subnet', 'vsi': 'VSI', 'lb': 'Load Balancer'}
+
+# topic -> (box helper, arrow helper, colors= for a box helper without a default color)
+HELPERS = {
+    '04-Resource-Provisioning-Management/03-Resource-Dependencies-Attributes':
+        ('create_rounded_box', 'create_arrow', None),
+    '05-Modularization-Best-Practices/01-Creating-Reusable-Modules':
+        ('create_rounded_box', 'create_arrow', '#0f62fe'),
+    '08-Automation-Advanced-Integration/03-Troubleshooting-Lifecycle-Management':
+        ('add_component_box', 'add_arrow', None),
+}
+
+
+@pytest.mark.parametrize('topic', sorted(HELPERS))
+@pytest.mark.parametrize('routed', [False, True], ids=['arrows', 'routes'])
+def test_draw_layout_with_script_helpers(topic, routed):
+    module = load_script(discover_tasks(topics=[topic])[0])
+    box, arrow, colors = HELPERS[topic]
+    layout = layered_layout(EDGES, size=(2, 1)).fit((0.5, 15.5), (0.5, 11.5))
+
+    fig, ax = plt.subplots(figsize=(16, 12))
+    try:
+        ax.set_xlim(0, 16)
+        ax.set_ylim(0, 12)
+        route = module.ARROW_KIT.draw_path if routed else None
+        draw_layout(ax, layout, getattr(module, box), getattr(module, arrow), route=route,
+                    labels=LABELS, colors=colors)
+        fig.canvas.draw()
+        assert set(LABELS.values()) <= {text.get_text() for text in ax.texts}
+        assert ax.patches or ax.collections
+    finally:
+        plt.close(fig)
+
+
+def test_draw_layout_colors_by_node():
+    drawn = {}
+
+    def box(ax, x, y, width, height, text, color):
+        drawn[text] = color
+
+    layout = layered_layout([('a', 'b')])
+    draw_layout(None, layout, box, lambda ax, start, end: None, colors={'a': 'red', 'b': 'blue'})
+    assert drawn == {'a': 'red', 'b': 'blue'}
+
+
+def test_draw_layout_passes_four_coordinates():
+    arrows = []
+
+    def arrow(ax, start_x, start_y, end_x, end_y, color='gray'):
+        arrows.append((start_x, start_y, end_x, end_y))
+
+    layout = layered_layout([('a', 'b')])
+    draw_layout(None, layout, lambda *args: None, arrow)
+    (_, _, points), = layout.routes
+    assert arrows == [(*points[0], *points[-1])]
@@ -0,0 +1,252 @@
+"""
+Text layout cache shared by every figure a render worker builds.
+
+matplotlib caches raw glyph metrics per renderer, but not the layout of a
+``Text``. Each ``Text._get_layout()`` call looks up the font file again,
+reads its ascender and descender tables, measures every line, and aligns
+and rotates the result. A text is laid out several times per save: for
+``tight_layout``, for the tight bounding box and for the draw itself. The
+same strings also recur across figures: the 'IBM Cloud Terraform Training'
+watermark, the 'IBM Cloud' branding badge, diagram titles and lock record
+fields.
+
+Once ``install()`` has run, layouts are memoized in a per-process LRU keyed
+by everything the layout depends on:
+
+- the (wrapped) string;
+- the font properties, plus the rcParams that resolve them to a font file
+  and set its hinting;
+- alignment, rotation, line spacing and figure DPI.
+
+A hit returns the stored layout without touching the font. Position is not
+part of the key because the layout is relative to the text's anchor. Only
+Agg renderers are cached, as vector renderers measure text differently.
+TeX and mathtext strings are always laid out by matplotlib itself. Output
+is pixel-identical.
+
+The cache wraps the private ``Text._get_layout(renderer)`` and
+``Text._get_wrapped_text()``. ``install()`` checks that both exist with
+those signatures, along with the other private ``Text`` helpers used to
+build keys. On a matplotlib where they do not, ``Text`` is left untouched
+and every text is laid out uncached.
+
+``stats()`` counts hits and misses; the build summary reports them per run:
+
+    python3 -m dac_toolkit.textcache -t 05-Modularization
+"""
+
+import argparse
+import inspect
+import os
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+import matplotlib
+import matplotlib.pyplot as plt
+from matplotlib import cbook
+from matplotlib.backends.backend_agg import RendererAgg
+from matplotlib.text import Text
+
+from .discovery import COURSE_ROOT, discover_tasks
+from .fonts import font_rc_key
+
+# Layouts kept per worker; a full build has a few thousand distinct texts
+DEFAULT_MAX_ENTRIES = 20000
+
+
+class TextLayoutCache:
+    """Memoized text wraps and layouts by key, least recently used evicted first."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.counts = {'layout_hits': 0, 'layout_misses': 0, 'wrap_hits': 0, 'wrap_misses': 0}
+
+    def lookup(self, kind, key, compute):
+        """The entry for ``(kind, key)``, computed and stored on a miss."""
+        key = (kind, key)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.counts[f'{kind}_misses'] += 1
+            entry = self._entries[key] = compute()
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+            self.counts[f'{kind}_hits'] += 1
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        return dict(self.counts, entries=len(self._entries))
+
+
+# One cache per worker process
+CACHE = TextLayoutCache()
+
+
+def _has_method(name, parameters):
+    """True if ``Text`` has a method ``name`` taking exactly ``parameters``."""
+    method = getattr(Text, name, None)
+    if not callable(method):
+        return False
+    try:
+        return list(inspect.signature(method).parameters) == parameters
+    except (TypeError, ValueError):
+        return False
+
+
+# The private Text internals the cache patches or reads to build keys
+SUPPORTED = (_has_method('_get_layout', ['self', 'renderer'])
+             and _has_method('_get_wrapped_text', ['self'])
+             and _has_method('_get_wrap_line_width', ['self'])
+             and _has_method('_get_multialignment', ['self'])
+             and hasattr(Text, 'get_parse_math'))
+
+_original_get_layout = getattr(Text, '_get_layout', None)
+_original_get_wrapped_text = getattr(Text, '_get_wrapped_text', None)
+
+
+def font_key(text):
+    """Font properties of ``text`` and the rcParams that turn them into glyph metrics."""
+    prop = text.get_fontproperties()
+    rc = matplotlib.rcParams
+    return (tuple(prop.get_family()), prop.get_style(), prop.get_variant(), prop.get_weight(),
+            prop.get_stretch(), prop.get_size_in_points(), prop.get_file(),
+            text.figure.dpi, rc['text.hinting'], rc['text.hinting_factor'],
+            rc['text.kerning_factor'], rc.get('font.enable_last_resort'), font_rc_key(rc))
+
+
+def layout_key(text, renderer):
+    """Cache key for laying out ``text`` on ``renderer``, or None if it must not be cached."""
+    if not isinstance(renderer, RendererAgg) or text.get_usetex():
+        return None
+    string = text._get_wrapped_text()
+    if text.get_parse_math() and cbook.is_math_text(string):
+        return None
+    return (string, font_key(text), text.get_parse_math(), text._linespacing,
+            text._get_multialignment(), text.get_rotation(), text.get_rotation_mode(),
+            text.get_horizontalalignment(), text.get_verticalalignment())
+
+
+def _cached_get_layout(self, renderer):
+    key = layout_key(self, renderer)
+    if key is None:
+        return _original_get_layout(self, renderer)
+    bbox, lines, box = CACHE.lookup('layout', key, lambda: _original_get_layout(self, renderer))
+    # Callers may mutate what they get back; the cached entry must not change
+    return bbox.frozen(), list(lines), box
+
+
+def _cached_get_wrapped_text(self):
+    # Wrapping measures with the renderer that last drew the text
+    if not self.get_wrap() or self.get_usetex() or \
+            not isinstance(getattr(self, '_renderer', None), RendererAgg):
+        return _original_get_wrapped_text(self)
+    # The line width is all that position, rotation and figure size contribute
+    key = (self.get_text(), font_key(self), self._get_wrap_line_width())
+    return CACHE.lookup('wrap', key, lambda: _original_get_wrapped_text(self))
+
+
+def install():
+    """
+    Route every ``Text`` wrap and layout in this process through ``CACHE``.
+    Returns False, leaving ``Text`` untouched, if this matplotlib lacks the
+    private methods the cache relies on.
+    """
+    if not SUPPORTED:
+        return False
+    Text._get_layout = _cached_get_layout
+    Text._get_wrapped_text = _cached_get_wrapped_text
+    return True
+
+
+def uninstall():
+    """Restore matplotlib's uncached ``Text`` wrapping and layout."""
+    if not SUPPORTED:
+        return
+    Text._get_layout = _original_get_layout
+    Text._get_wrapped_text = _original_get_wrapped_text
+
+
+def is_installed():
+    return Text._get_layout is _cached_get_layout
+
+
+def hit_rate(counts, kind):
+    """'84% of 2616' for ``kind`` ('layout' or 'wrap') in a ``stats()``-style dict."""
+    hits, misses = counts.get(f'{kind}_hits', 0), counts.get(f'{kind}_misses', 0)
+    return f'{hits / (hits + misses):.0%} of {hits + misses}' if hits + misses else 'none'
+
+
+def _render_all(tasks, directory):
+    from .export import DEFAULT_FORMATS, export_figure
+    from .fonts import resolved_fonts
+    from .runner import load_script
+    from .tasks import SAVE_SETTINGS
+
+    start = time.perf_counter()
+    for task in tasks:
+        module = load_script(task)
+        with plt.style.context(getattr(module, 'STYLE', []), after_reset=True), resolved_fonts():
+            fig = module.FIGURES[task.name]()
+            export_figure(fig, os.path.join(directory, task.name), DEFAULT_FORMATS,
+                          getattr(module, 'SAVEFIG_OPTIONS', SAVE_SETTINGS))
+        plt.close('all')
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Render figures with and without the text layout cache and compare.')
+    parser.add_argument('-t', '--topic', action='append', default=[],
+                        help='only render topics matching this substring or glob (repeatable)')
+    parser.add_argument('-f', '--figure', action='append', default=[],
+                        help='only render figures whose function or file name matches (repeatable)')
+    parser.add_argument('--root', default=str(COURSE_ROOT),
+                        help='course root to scan (default: this repository)')
+    args = parser.parse_args(argv)
+
+    tasks = discover_tasks(args.root, topics=args.topic, figures=args.figure)
+    if not tasks:
+        print('❌ No figures matched the given filters')
+        return 1
+    if not SUPPORTED:
+        print(f'❌ matplotlib {matplotlib.__version__} lacks the Text internals the cache uses')
+        return 1
+
+    import warnings
+    warnings.simplefilter('ignore')
+    matplotlib.use('Agg')
+    print(f'🔤 Text layout cache: {len(tasks)} figures, rendered as PNG in one process')
+    print('=' * 70)
+    with tempfile.TemporaryDirectory(prefix='dac_textcache_') as directory:
+        # Warm-up pass: imports, fonts and matplotlib's own metric caches
+        _render_all(tasks, directory)
+        uninstall()
+        uncached = _render_all(tasks, directory)
+        CACHE.clear()
+        install()
+        cached = _render_all(tasks, directory)
+        first = CACHE.stats()
+        repeat = _render_all(tasks, directory)
+        uninstall()
+    second = CACHE.stats()
+    runs = (('Uncached', uncached, {}),
+            ('Cached, empty cache', cached, first),
+            ('Cached, warm cache', repeat, {name: second[name] - first[name] for name in first}))
+    for label, seconds, counts in runs:
+        print(f'{label:<22} {seconds:>6.2f}s  ' + '  '.join(
+            f'{kind}s {hit_rate(counts, kind)}' for kind in ('layout', 'wrap') if counts))
+    print('=' * 70)
+    print(f'🏁 {second["entries"]} distinct wraps and layouts; '
+          f'{cached / uncached - 1:+.0%} on a cold cache, {repeat / uncached - 1:+.0%} warm')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""
+Deep-zoom tile pyramids of the 300 DPI master diagrams.
+
+Dense figures (``create_enterprise_identity_architecture``,
+``create_compliance_framework_matrix``, ...) are 4000+ px masters. A viewer
+that shows the whole PNG has to decode all of it just to zoom into one
+corner. This stage cuts each master into a Deep Zoom (DZI) pyramid: every
+level is half the size of the one above, down to 1x1 px, and each level is
+split into 256 px tiles:
+
+    <OUTPUT_DIR>/tiles/<stem>.dzi                        descriptor (size, tile size, format)
+    <OUTPUT_DIR>/tiles/<stem>_files/<level>/<col>_<row>.webp
+
+A DZI viewer such as OpenSeadragon reads the descriptor and fetches only
+the tiles visible at the current zoom. Each tile overlaps its neighbours
+by ``OVERLAP`` px so that no seams show when tiles are scaled. The tiles
+are recorded in ``<OUTPUT_DIR>/tiles/manifest.json``::
+
+    {"01_enterprise_identity_architecture.png": {
+        "sha256": "...", "width": 4770, "height": 3570,
+        "dzi": "01_enterprise_identity_architecture.dzi", "levels": 14,
+        "tiles": 373, "bytes": 554362, "settings": {...}}}
+
+The master PNG is decoded once and never re-rendered. Each level is
+box-reduced from the one above. As with the web derivatives (see
+``derivatives.py``), only masters whose SHA-256 or tile settings changed
+are tiled, across a process pool. A master's new pyramid is written next to
+the old one and swapped in at the end.
+
+Usage (from the Terraform-IBM-Cloud-Training directory):
+    python3 -m dac_toolkit.tiles --jobs 4 --topic 07-Security-Compliance
+    python3 build_diagrams.py --tiles
+"""
+
+import argparse
+import math
+import os
+import shutil
+import sys
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .cache import file_digest
+from .derivatives import ENCODER_OPTIONS, find_masters, load_manifest, resample_source, \
+    save_manifest
+from .discovery import COURSE_ROOT
+
+TILE_SIZE = 256
+OVERLAP = 1
+TILE_FORMAT = 'webp'
+
+# Sub-directory of each OUTPUT_DIR that holds the pyramids and manifest
+TILES_DIR = 'tiles'
+
+DZI_TEMPLATE = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" TileSize="{tile_size}" '
+                'Overlap="{overlap}" Format="{extension}">\n'
+                '  <Size Width="{width}" Height="{height}"/>\n'
+                '</Image>\n')
+
+# status is 'ok', 'unchanged' or 'failed'; entry is the master's manifest entry
+TileResult = namedtuple('TileResult', 'master status seconds entry error')
+
+
+def tile_settings(tile_size=TILE_SIZE, overlap=OVERLAP, extension=TILE_FORMAT):
+    return {'tile_size': tile_size, 'overlap': overlap, 'extension': extension,
+            'options': ENCODER_OPTIONS.get(extension, {})}
+
+
+def tiles_dir(master):
+    return os.path.join(os.path.dirname(master), TILES_DIR)
+
+
+def pyramid_paths(master):
+    """``(descriptor, tile directory)`` of ``master``'s pyramid."""
+    stem = os.path.splitext(os.path.basename(master))[0]
+    directory = tiles_dir(master)
+    return os.path.join(directory, f'{stem}.dzi'), os.path.join(directory, f'{stem}_files')
+
+
+def level_count(width, height):
+    """Levels of a DZI pyramid: level 0 is 1x1 px, the last is full size."""
+    return math.ceil(math.log2(max(width, height))) + 1
+
+
+def tile_boxes(width, height, tile_size=TILE_SIZE, overlap=OVERLAP):
+    """``(column, row, box)`` for every tile of a ``width`` x ``height`` level."""
+    for column in range(math.ceil(width / tile_size)):
+        for row in range(math.ceil(height / tile_size)):
+            x, y = column * tile_size, row * tile_size
+            yield column, row, (max(0, x - overlap), max(0, y - overlap),
+                                min(width, x + tile_size + overlap),
+                                min(height, y + tile_size + overlap))
+
+
+def is_current(master, entry, digest, settings):
+    """True if ``entry`` already describes this exact master's pyramid."""
+    if not entry or entry.get('sha256') != digest or entry.get('settings') != settings:
+        return False
+    descriptor, directory = pyramid_paths(master)
+    return os.path.exists(descriptor) and os.path.isdir(directory)
+
+
+def tile_master(master, digest, settings=None):
+    """Write the tile pyramid of one master and return its manifest entry. Never raises."""
+    from PIL import Image
+
+    settings = settings or tile_settings()
+    start = time.perf_counter()
+    descriptor, directory = pyramid_paths(master)
+    staging = directory + '.tmp'
+    try:
+        with Image.open(master) as image:
+            image.load()
+            width, height = image.size
+            levels = level_count(width, height)
+            shutil.rmtree(staging, ignore_errors=True)
+            level_image = resample_source(image)
+            count = total_bytes = 0
+            # Full size first; every smaller level is a 2x box reduction of the last
+            for level in range(levels - 1, -1, -1):
+                level_dir = os.path.join(staging, str(level))
+                os.makedirs(level_dir)
+                for column, row, box in tile_boxes(*level_image.size, settings['tile_size'],
+                                                   settings['overlap']):
+                    path = os.path.join(level_dir, f'{column}_{row}.{settings["extension"]}')
+                    level_image.crop(box).save(path, format=Image.registered_extensions()[
+                        f'.{settings["extension"]}'], **settings['options'])
+                    count += 1
+                    total_bytes += os.path.getsize(path)
+                if level:
+                    level_image = level_image.reduce(2)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(staging, directory)
+        with open(descriptor + '.tmp', 'w', encoding='utf-8') as handle:
+            handle.write(DZI_TEMPLATE.format(width=width, height=height, **settings))
+        os.replace(descriptor + '.tmp', descriptor)
+        entry = {'sha256': digest, 'width': width, 'height': height,
+                 'dzi': os.path.basename(descriptor), 'levels': levels, 'tiles': count,
+                 'bytes': total_bytes, 'settings': settings}
+        return TileResult(master, 'ok', time.perf_counter() - start, entry, None)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        return TileResult(master, 'failed', time.perf_counter() - start, None,
+                          traceback.format_exc())
+
+
+def build_tiles(masters, jobs=1, settings=None, force=False, report=None):
+    """
+    Bring the pyramids of ``masters`` up to date and update their manifests.
+
+    Returns the TileResults, one per master; ``report`` is called with each
+    result as it arrives.
+    """
+    settings = settings or tile_settings()
+    manifests, pending, results = {}, [], []
+    for master in masters:
+        directory = tiles_dir(master)
+        if directory not in manifests:
+            manifests[directory] = load_manifest(directory)
+        digest = file_digest(master)
+        entry = manifests[directory].get(os.path.basename(master))
+        if not force and is_current(master, entry, digest, settings):
+            results.append(TileResult(master, 'unchanged', 0.0, entry, None))
+        else:
+            pending.append((master, digest))
+
+    for result in results:
+        if report:
+            report(result)
+
+    jobs = max(1, min(jobs, len(pending) or 1))
+    if jobs == 1:
+        fresh = (tile_master(master, digest, settings) for master, digest in pending)
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        futures = [executor.submit(tile_master, master, digest, settings)
+                   for master, digest in pending]
+        fresh = (future.result() for future in as_completed(futures))
+    try:
+        for result in fresh:
+            results.append(result)
+            if result.status == 'ok':
+                manifests[tiles_dir(result.master)][os.path.basename(result.master)] = result.entry
+            if report:
+                report(result)
+    finally:
+        if jobs > 1:
+            executor.shutdown()
+
+    for directory, manifest in manifests.items():
+        # Drop pyramids whose master has been removed from the output directory
+        masters_dir = os.path.dirname(directory)
+        for name in [name for name in manifest if not os.path.exists(os.path.join(masters_dir, name))]:
+            stale = os.path.join(masters_dir, name)
+            descriptor, tiles = pyramid_paths(stale)
+            shutil.rmtree(tiles, ignore_errors=True)
+            if os.path.exists(descriptor):
+                os.remove(descriptor)
+            del manifest[name]
+        save_manifest(directory, manifest)
+    return results
+
+
+def print_summary(results, wall_time):
+    done = [result for result in results if result.status != 'failed']
+    failed = [result for result in results if result.status == 'failed']
+    print('=' * 70)
+    print('🧩 Tile Pyramid Summary')
+    print(f'   Masters: {len(done)}/{len(results)} '
+          f'({sum(result.status == "ok" for result in results)} tiled, '
+          f'{sum(result.status == "unchanged" for result in results)} unchanged)')
+    print(f'   Wall time: {wall_time:.1f}s')
+    if done:
+        tiles = sum(result.entry['tiles'] for result in done)
+        tile_bytes = sum(result.entry['bytes'] for result in done)
+        print(f'   Tiles: {tiles} ({tile_bytes / (1024 * 1024):.1f} MB, '
+              f'{tile_bytes / tiles / 1024:.1f} KB per tile)')
+    if failed:
+        print(f'\n❌ Failed masters ({len(failed)}):')
+        for result in failed:
+            print(f'   • {os.path.relpath(result.master, COURSE_ROOT)}')
+            print('     ' + result.error.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Cut the DaC master PNGs into deep-zoom (DZI) tile pyramids.')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes (default: all cores)')
+    parser.add_argument('-t', '--topic', action='append', default=[],
+                        help='only process topics matching this substring or glob (repeatable)')
+    parser.add_argument('-f', '--figure', action='append', default=[],
+                        help='only process figures whose function or file name matches (repeatable)')
+    parser.add_argument('--tile-size', type=int, default=TILE_SIZE,
+                        help='tile edge in px (default: %(default)s)')
+    parser.add_argument('--format', choices=sorted(ENCODER_OPTIONS), default=TILE_FORMAT,
+                        help='tile format (default: %(default)s)')
+    parser.add_argument('--force', action='store_true',
+                        help='re-tile every master even if it is unchanged')
+    parser.add_argument('--root', default=str(COURSE_ROOT),
+                        help='course root to scan (default: this repository)')
+    args = parser.parse_args(argv)
+    if args.tile_size <= 2 * OVERLAP:
+        parser.error(f'--tile-size must be larger than {2 * OVERLAP}')
+
+    masters = find_masters(args.root, topics=args.topic, figures=args.figure)
+    if not masters:
+        print('❌ No rendered masters matched the given filters')
+        return 1
+
+    print(f'🧩 Checking {len(masters)} masters against their tile manifests...')
+    print('=' * 70)
+    start = time.perf_counter()
+
+    def report(result):
+        marker = {'ok': '✅', 'unchanged': '♻️ '}.get(result.status, '❌')
+        print(f'{marker} {os.path.relpath(result.master, args.root)} ({result.seconds:.2f}s)')
+
+    results = build_tiles(masters, args.jobs, tile_settings(args.tile_size, OVERLAP, args.format),
+                          force=args.force, report=report)
+    print_summary(results, time.perf_counter() - start)
+    return 0 if all(result.status != 'failed' for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
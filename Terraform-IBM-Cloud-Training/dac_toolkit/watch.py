@@ -0,0 +1,286 @@
+"""
+Watch mode: re-render only the figures an edit changed, as fast previews.
+
+Tweaking one coordinate in a diagram script and re-running it redraws every
+figure of the script at 300 DPI. The watcher instead polls, for saves, every
+file a watched figure's render-cache digest reads (stdlib only, no
+file-watching dependency): the script, the ``dac_toolkit`` modules it
+imports and the spec files it names. When one of them is saved:
+
+- the script's figures are rediscovered and each one's source digest is
+  recomputed. This is the render cache's digest (see ``cache.py``): the
+  figure function plus every helper, class and constant it reads, the
+  script's ``STYLE``, its toolkit modules and specs. Comment and whitespace
+  edits change nothing;
+- edited toolkit modules, and the toolkit modules that import them, are
+  reloaded; then only that script's module is re-imported, once, in this
+  long-lived process. matplotlib, fonts and the other scripts stay warm;
+- only the figures whose digest changed are rendered, at a preview DPI, to
+  ``.dac_preview/<topic>/...``. The committed 300 DPI diagrams are never
+  touched. Run ``build_diagrams.py`` for those.
+
+A figure that fails keeps its old digest, so it is retried on the next
+save. A save that does not parse, or whose ``FIGURES`` registry is invalid,
+is reported and watching continues. Each update prints the time from the
+save to the written preview.
+
+Usage (from the Terraform-IBM-Cloud-Training directory):
+    python3 -m dac_toolkit.watch -t 04-Resource-Provisioning-Management/02-HCL
+    python3 -m dac_toolkit.watch -f hcl_syntax --dpi 100 --initial
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+
+from .cache import TOOLKIT_PACKAGE, SourceHasher, toolkit_path
+from .discovery import COURSE_ROOT, discover_tasks
+from .export import ExportFormat
+
+DEFAULT_PREVIEW_DIR = COURSE_ROOT / '.dac_preview'
+
+# Preview resolution; the committed diagrams are rendered at 300 DPI
+PREVIEW_DPI = 72
+
+# Seconds between checks for saved scripts
+POLL_INTERVAL = 0.2
+
+
+def _stamp(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class ScriptWatcher:
+    """One watched script: when it was last saved and the source digest of each figure."""
+
+    def __init__(self, script, tasks, root, figures, hasher, environment):
+        self.script = script
+        self.tasks = tasks
+        self.root = root
+        self.figures = figures
+        self.hasher = hasher
+        self.environment = environment
+        self.stamps = {}
+        self._watch_files()
+        self.stamp = max(self.stamps.values(), default=0)  # latest save seen, in ns
+        self.digests = {task.name: self._digest(task) for task in tasks}
+
+    def _digest(self, task):
+        return self.hasher.digest(task, self.environment)
+
+    def _watch_files(self):
+        """Poll every file the figures' digests read; just the script while it does not parse."""
+        try:
+            paths = {path for task in self.tasks for path in self.hasher.files(task)}
+        except SyntaxError:
+            paths = set(self.stamps) | {self.script}
+        self.stamps = {path: self.stamps.get(path, _stamp(path)) for path in paths}
+
+    def saved(self):
+        """The files saved since the last call (empty if none)."""
+        saved = []
+        for path, stamp in self.stamps.items():
+            current = _stamp(path)
+            if current != stamp and current is not None:
+                self.stamps[path] = current
+                self.stamp = max(self.stamp, current)
+                saved.append(path)
+        return saved
+
+    def toolkit_modules(self):
+        """The toolkit modules the script imports, directly or not."""
+        modules = set()
+        for task in self.tasks:
+            try:
+                modules.update(self.hasher.toolkit_modules(task))
+            except SyntaxError:
+                pass
+        return modules
+
+    def changed_tasks(self):
+        """
+        Rediscover the script's figures; return ``[(task, digest)]`` for
+        each figure that is new or whose source digest changed. Raises
+        SyntaxError while the script or a toolkit module does not parse,
+        and ValueError while its ``FIGURES`` registry is invalid.
+        """
+        topic = self.tasks[0].topic
+        self.tasks = [task for task in discover_tasks(self.root, topics=[topic],
+                                                      figures=self.figures)
+                      if task.script == self.script] or self.tasks
+        # The figures may now read other helpers, toolkit modules or specs
+        self._watch_files()
+        changed = []
+        for task in self.tasks:
+            digest = self._digest(task)
+            if self.digests.get(task.name) != digest:
+                changed.append((task, digest))
+        return changed
+
+
+def watched_scripts(tasks, root, figures, environment):
+    """One ``ScriptWatcher`` per script that has matching figures."""
+    hasher = SourceHasher()
+    by_script = {}
+    for task in tasks:
+        by_script.setdefault(task.script, []).append(task)
+    return [ScriptWatcher(script, script_tasks, root, figures, hasher, environment)
+            for script, script_tasks in by_script.items()]
+
+
+def reload_toolkit(modules, hasher, scope):
+    """
+    Re-import the toolkit ``modules``, and every module of ``scope`` (the
+    toolkit modules the watched scripts import) that imports one of them.
+    The build machinery (runner, text cache, ...) is never re-imported. If
+    a module fails to import, the old ones are kept and the error raised.
+    Returns the names re-imported.
+    """
+    loaded = {name for name in sys.modules
+              if name.startswith(f'{TOOLKIT_PACKAGE}.')} & set(scope)
+    stale = set(modules) & loaded
+    growing = True
+    while growing:
+        dependents = {name for name in loaded - stale
+                      if stale & set(hasher.toolkit_imports(name))}
+        growing = bool(dependents)
+        stale |= dependents
+
+    # Dropped together and imported afresh, so each one binds the others' new
+    # definitions whatever order (or import cycle) they come in
+    old = {name: sys.modules.pop(name) for name in stale}
+    package = sys.modules[TOOLKIT_PACKAGE]
+    try:
+        for name in sorted(stale):
+            importlib.import_module(name)
+    except BaseException:
+        sys.modules.update(old)
+        for name, module in old.items():
+            setattr(package, name.rsplit('.', 1)[1], module)
+        raise
+    return sorted(stale)
+
+
+def render_previews(tasks, formats, output_dir, reload=False):
+    """Render ``tasks`` (all from one script) as previews; return their results."""
+    from .runner import load_script, render_task
+
+    if reload:
+        # Re-import once here; the renders below reuse the fresh module
+        load_script(tasks[0], reload=True)
+    return [render_task(task, formats, output_dir=output_dir) for task in tasks]
+
+
+def _report(result, root):
+    if result.status == 'ok':
+        paths = ', '.join(os.path.relpath(path, root) for path in result.outputs)
+        print(f'   ✅ {result.task.function} → {paths} ({result.seconds:.2f}s)')
+    else:
+        print(f'   ❌ {result.task.function}: {result.error.strip().splitlines()[-1]}')
+
+
+def update(watcher, formats, output_dir, root):
+    """Handle a save of ``watcher.script`` or of a file its figures read."""
+    name = os.path.basename(watcher.script)
+    try:
+        changed = watcher.changed_tasks()
+    except SyntaxError as error:
+        print(f'❌ {os.path.basename(error.filename or name)}: line {error.lineno}: {error.msg}')
+        return
+    except ValueError as error:
+        print(f'❌ {name}: {error}')
+        return
+    if not changed:
+        print(f'💤 {name} saved; no figure changed')
+        return
+
+    print(f'🔁 {name}: {len(changed)} figure(s) changed')
+    try:
+        results = render_previews([task for task, _ in changed], formats, output_dir, reload=True)
+    except Exception as error:
+        print(f'   ❌ importing {name} failed: {type(error).__name__}: {error}')
+        return
+    digests = dict(changed)
+    for result in results:
+        _report(result, root)
+        if result.status == 'ok':
+            watcher.digests[result.task.name] = digests[result.task]
+    if any(result.status == 'ok' for result in results):
+        print(f'⚡ Preview updated {time.time() - watcher.stamp / 1e9:.2f}s after save')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Watch DaC scripts and re-render only the figures an edit changed.')
+    parser.add_argument('-t', '--topic', action='append', default=[],
+                        help='only watch topics matching this substring or glob (repeatable)')
+    parser.add_argument('-f', '--figure', action='append', default=[],
+                        help='only watch figures whose function or file name matches (repeatable)')
+    parser.add_argument('--dpi', type=int, default=PREVIEW_DPI,
+                        help='preview resolution (default: %(default)s)')
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL,
+                        help='seconds between checks for saved scripts (default: %(default)s)')
+    parser.add_argument('--initial', action='store_true',
+                        help='render every watched figure once before watching')
+    parser.add_argument('--output-dir', default=str(DEFAULT_PREVIEW_DIR),
+                        help='where previews are written (default: %(default)s)')
+    parser.add_argument('--root', default=str(COURSE_ROOT),
+                        help='course root to scan (default: this repository)')
+    args = parser.parse_args(argv)
+    if args.dpi <= 0:
+        parser.error('--dpi must be positive')
+
+    tasks = discover_tasks(args.root, topics=args.topic, figures=args.figure)
+    if not tasks:
+        print('❌ No figures matched the given filters')
+        return 1
+
+    formats = [ExportFormat('png', args.dpi)]
+    watchers = watched_scripts(tasks, args.root, args.figure, formats[0].label)
+    print(f'👀 Watching {len(tasks)} figures in {len(watchers)} script(s); '
+          f'{args.dpi} DPI previews in {os.path.relpath(args.output_dir, args.root)}/')
+    # Pay for matplotlib and the scripts now rather than on the first save
+    start = time.perf_counter()
+    from .runner import load_script
+    for watcher in watchers:
+        load_script(watcher.tasks[0])
+    print(f'   Ready in {time.perf_counter() - start:.1f}s (Ctrl+C to stop)')
+
+    if args.initial:
+        for watcher in watchers:
+            for result in render_previews(watcher.tasks, formats, args.output_dir):
+                _report(result, args.root)
+    print('=' * 70)
+
+    hasher = watchers[0].hasher
+    try:
+        while True:
+            saved = {watcher: watcher.saved() for watcher in watchers}
+            toolkit = {module for watcher, paths in saved.items() if paths
+                       for module in watcher.toolkit_modules()
+                       if str(toolkit_path(module)) in paths}
+            if toolkit:
+                scope = set().union(*(watcher.toolkit_modules() for watcher in watchers))
+                try:
+                    reloaded = reload_toolkit(toolkit, hasher, scope)
+                except Exception as error:
+                    print(f'❌ reloading {", ".join(sorted(toolkit))} failed: '
+                          f'{type(error).__name__}: {error}')
+                else:
+                    print(f'🔄 Re-imported {", ".join(reloaded)}')
+            for watcher, paths in saved.items():
+                if paths:
+                    update(watcher, formats, args.output_dir, args.root)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print('\n👋 Stopped watching')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
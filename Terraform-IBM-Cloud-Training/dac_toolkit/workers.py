@@ -0,0 +1,192 @@
+"""
+Render worker processes with bounded memory.
+
+A long build pushes every figure through a few worker processes. Anything
+a figure leaves behind stays in its worker until the end: a figure that
+was never closed, a canvas still referenced from module state, or memory
+the allocator does not return. At 300 DPI one canvas is ~70 MB, so a
+handful of leaks make the build's memory depend on which figures failed.
+These workers check themselves after every task:
+
+- **RSS.** The resident set size after each task is reported with the
+  result.
+- **Leaked figures.** ``render_task`` counts figures the builder left open
+  besides the one it returned (for example when it raised after creating
+  its figure) and closes them. Every ``LEAK_CHECK_INTERVAL`` tasks, and
+  before it exits, a worker also collects garbage and counts figures still
+  alive after being closed. Those are held by a reference somewhere.
+- **Recycling.** A worker exits after ``max_tasks`` tasks or once its RSS
+  is above ``max_rss_mb``, and a fresh one takes its place. A worker that
+  dies (for example killed by the OOM killer) fails only the task it was
+  running.
+- **Timeouts.** A task still running after ``timeout`` seconds of wall
+  clock has its worker terminated and is reported as timed out. A figure
+  that loops forever or deadlocks cannot stall the build.
+
+``ProcessPoolExecutor`` can only recycle workers from Python 3.11
+(``max_tasks_per_child``) and never by memory, so workers are plain
+``multiprocessing`` processes, each fed one task at a time over a pipe.
+
+Usage (from the Terraform-IBM-Cloud-Training directory):
+    python3 build_diagrams.py --max-worker-rss 768 --max-tasks-per-worker 20
+"""
+
+import gc
+import multiprocessing
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+from .benchmark import rss_mb
+
+# Recycle a worker once its RSS is above this after a task (MB; 0 = never)
+DEFAULT_MAX_RSS_MB = 1024
+
+# Recycle a worker after this many tasks (0 = never)
+DEFAULT_MAX_TASKS = 0
+
+# Wall-clock seconds a task may run before its worker is stopped (0 = no limit)
+DEFAULT_TIMEOUT = 120
+
+# Tasks between full garbage collections that look for retained figures
+LEAK_CHECK_INTERVAL = 10
+
+
+def retained_figures():
+    """Figures still alive after a full collection that pyplot no longer manages."""
+    from matplotlib._pylab_helpers import Gcf
+    from matplotlib.figure import Figure
+
+    gc.collect()
+    managed = {id(manager.canvas.figure) for manager in Gcf.get_all_fig_managers()}
+    return sum(isinstance(item, Figure) and id(item) not in managed for item in gc.get_objects())
+
+
+def _worker_main(connection, max_tasks, max_rss_mb):
+    """Run ``(function, args)`` jobs until told to stop or a limit is reached."""
+    done = retained = 0
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        function, args = job
+        result = function(*args)
+        done += 1
+        rss = rss_mb()
+        retire = None
+        if max_rss_mb and rss > max_rss_mb:
+            retire = 'rss'
+        elif max_tasks and done >= max_tasks:
+            retire = 'tasks'
+        health = {'worker_rss_mb': round(rss, 1), 'worker_tasks': done}
+        if retire or done % LEAK_CHECK_INTERVAL == 0:
+            # Only figures that appeared since the last check count against this task
+            count = retained_figures()
+            health['retained_figures'] = count - retained
+            retained = count
+        if retire:
+            health['retired'] = retire
+        connection.send((result, health))
+        if retire:
+            return
+
+
+class _Worker:
+    def __init__(self, context, max_tasks, max_rss_mb):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, max_tasks, max_rss_mb),
+                                       daemon=True)
+        self.process.start()
+        child.close()
+        self.args = None
+        self.started = self.deadline = None
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.connection.close()
+
+
+class WorkerPool:
+    """
+    ``jobs`` worker processes that recycle themselves at ``max_tasks`` tasks
+    or ``max_rss_mb`` of RSS, and are stopped when a task runs longer than
+    ``timeout`` seconds. ``0`` disables a limit.
+    """
+
+    def __init__(self, jobs, max_tasks=DEFAULT_MAX_TASKS, max_rss_mb=DEFAULT_MAX_RSS_MB,
+                 timeout=DEFAULT_TIMEOUT):
+        self.jobs = max(1, jobs)
+        self.max_tasks = max_tasks
+        self.max_rss_mb = max_rss_mb
+        self.timeout = timeout
+        self.started = 0
+        self._context = multiprocessing.get_context()
+
+    def _spawn(self):
+        self.started += 1
+        return _Worker(self._context, self.max_tasks, self.max_rss_mb)
+
+    def map(self, function, jobs, on_failure):
+        """
+        Yield ``(args, result, health)`` for every ``args`` in ``jobs`` as it
+        finishes. ``health`` is the worker's report for that task (see
+        ``_worker_main``). If a worker dies mid-task or times out,
+        ``on_failure(args, status, message, seconds)`` supplies the result
+        instead, with ``status`` 'failed' or 'timeout', and health is None.
+        """
+        queue = deque(jobs)
+        idle = [self._spawn() for _ in range(min(self.jobs, len(queue)))]
+        busy = []
+        try:
+            while queue or busy:
+                while queue and idle:
+                    worker = idle.pop()
+                    worker.args = queue.popleft()
+                    worker.started = time.monotonic()
+                    worker.deadline = worker.started + self.timeout if self.timeout else None
+                    worker.connection.send((function, worker.args))
+                    busy.append(worker)
+                deadlines = [worker.deadline for worker in busy if worker.deadline is not None]
+                ready = wait([worker.connection for worker in busy]
+                             + [worker.process.sentinel for worker in busy],
+                             max(0, min(deadlines) - time.monotonic()) if deadlines else None)
+                now = time.monotonic()
+                for worker in list(busy):
+                    if worker.connection in ready or worker.process.sentinel in ready:
+                        try:
+                            result, health = worker.connection.recv()
+                        except (EOFError, OSError):
+                            worker.process.join()
+                            result, health = on_failure(
+                                worker.args, 'failed', f'worker process exited with code '
+                                                       f'{worker.process.exitcode}',
+                                now - worker.started), None
+                    elif worker.deadline is not None and now >= worker.deadline:
+                        result, health = on_failure(
+                            worker.args, 'timeout', f'TimeoutError: still running after '
+                                                    f'{self.timeout:g}s; its worker was stopped',
+                            now - worker.started), None
+                        worker.process.terminate()
+                    else:
+                        continue
+                    busy.remove(worker)
+                    if health is None or health.get('retired'):
+                        worker.stop()
+                        if queue:
+                            idle.append(self._spawn())
+                    else:
+                        idle.append(worker)
+                    yield worker.args, result, health
+        finally:
+            for worker in idle + busy:
+                worker.stop()